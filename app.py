@@ -1,15 +1,37 @@
 from flask import Flask
 from flask_cors import CORS
 from backend.services.model_service import model_service
-from backend.controllers import prediction_controller, health_controller
-from backend.config.settings import HOST, PORT, logger
+from backend.controllers import (
+    prediction_controller, health_controller, explanation_controller, job_controller, incremental_controller
+)
+from backend.services.job_service import job_service
+from backend.services.scheduler_service import INTERACTIVE, BULK
+from backend.controllers.admission import admission_controlled
+from backend.controllers.scheduling import scheduled
+from backend.controllers.compression import RequestDecompressionMiddleware, compress_response
+from backend.controllers.tracing import start_request_trace, finish_request_trace, discard_request_trace
+from backend.config.settings import HOST, PORT, ADMISSION_BATCH_COST, logger, setup_logging
 import webbrowser
 import threading
 
+# Ponto de entrada do servidor (python app.py ou gunicorn app:app)
+setup_logging()
+
 # Configuração da aplicação Flask com suporte a CORS e arquivos estáticos
 app = Flask(__name__, static_folder='frontend', static_url_path='')
 CORS(app)
 
+# Rastreamento (TRACING=1): duração de cada etapa no cabeçalho Server-Timing.
+# Registrado antes da compressão para que o after_request dela seja medido
+app.before_request(start_request_trace)
+app.after_request(finish_request_trace)
+app.teardown_request(discard_request_trace)
+
+# Corpos comprimidos (gzip/zstd): requisições descomprimidas antes das rotas e
+# respostas grandes comprimidas conforme o Accept-Encoding
+app.wsgi_app = RequestDecompressionMiddleware(app.wsgi_app)
+app.after_request(compress_response)
+
 
 @app.route('/')
 def serve_index():
@@ -19,9 +41,30 @@ def serve_index():
 # Rotas de health check e informações do sistema
 app.add_url_rule('/api', 'home', health_controller.home, methods=['GET'])
 app.add_url_rule('/api/health', 'health_check', health_controller.health_check, methods=['GET'])
+app.add_url_rule('/api/metrics', 'metrics', health_controller.metrics, methods=['GET'])
+app.add_url_rule('/api/drift', 'drift', health_controller.drift, methods=['GET'])
+
+# Rotas de predição do modelo, escalonadas por faixa de prioridade (predições
+# interativas à frente dos lotes) e protegidas pelo controle de admissão. A
+# fila fica do lado de fora: a admissão só vê o trabalho em execução
+app.add_url_rule('/api/predict', 'predict',
+                 scheduled(admission_controlled(prediction_controller.predict), INTERACTIVE), methods=['POST'])
+app.add_url_rule('/api/predict/batch', 'predict_batch',
+                 scheduled(admission_controlled(prediction_controller.predict_batch, cost=ADMISSION_BATCH_COST), BULK),
+                 methods=['POST'])
+app.add_url_rule('/api/explain', 'explain',
+                 scheduled(admission_controlled(explanation_controller.explain, cost=ADMISSION_BATCH_COST), BULK),
+                 methods=['POST'])
+app.add_url_rule('/api/predict/incremental', 'predict_incremental',
+                 scheduled(admission_controlled(incremental_controller.predict_incremental), INTERACTIVE),
+                 methods=['POST'])
+app.add_url_rule('/api/predict/incremental/<session_id>', 'close_incremental_session',
+                 incremental_controller.close_session, methods=['DELETE'])
 
-# Rotas de predição do modelo
-app.add_url_rule('/api/predict', 'predict', prediction_controller.predict, methods=['POST'])
+# Rotas de jobs em lote (processados em segundo plano, fora do controle de admissão)
+app.add_url_rule('/api/jobs', 'create_job', job_controller.create_job, methods=['POST'])
+app.add_url_rule('/api/jobs/<job_id>', 'get_job', job_controller.get_job, methods=['GET'])
+app.add_url_rule('/api/jobs/<job_id>/result', 'get_job_result', job_controller.get_job_result, methods=['GET'])
 
 # Handlers para tratamento de erros HTTP
 app.register_error_handler(404, health_controller.handle_404)
@@ -34,6 +77,7 @@ def initialize_app():
     try:
         logger.info("Iniciando aplicação...")
         model_service.load_model()
+        job_service.start()
         logger.info("Aplicação inicializada com sucesso!")
         
         print("\nAPI de Classificação de Discurso de Ódio")
@@ -41,7 +85,15 @@ def initialize_app():
         print("🔗 Endpoints da API disponíveis em /api/*")
         print("   GET  /api - Status da API")
         print("   GET  /api/health - Health check")
+        print("   GET  /api/metrics - Métricas operacionais")
+        print("   GET  /api/drift - Sketches de drift do tráfego")
         print("   POST /api/predict - Classificar um comentário")
+        print("   POST /api/predict/batch - Classificar um lote de comentários")
+        print("   POST /api/predict/incremental - Predição incremental (enquanto o usuário digita)")
+        print("   POST /api/explain - Explicar a classificação (tokens mais relevantes)")
+        print("   POST /api/jobs - Criar um job em lote (arquivo CSV ou texto)")
+        print("   GET  /api/jobs/<id> - Progresso de um job")
+        print("   GET  /api/jobs/<id>/result - Resultado (CSV) de um job concluído")
         print(f"\n🏠 Frontend disponível em http://{HOST}:{PORT}")
         print(f"🌐 Servidor rodando em http://{HOST}:{PORT}\n")
         
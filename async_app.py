@@ -0,0 +1,349 @@
+"""
+Variante assíncrona da API (aiohttp)
+
+Expõe /api/predict, /api/predict/batch, /api/health e /api/metrics do app
+Flask (sem /api/explain, /api/drift, /api/predict/incremental e /api/jobs),
+compartilhando o ModelService e a validação das requisições (inclusive "echo"
+dos lotes) e comprimindo as respostas como o app Flask. O processamento do modelo é
+executado em um executor limitado (threads ou processos), liberando o event
+loop para atender milhares de conexões keep-alive com poucos workers. Quando
+o cliente desconecta, a requisição é cancelada e os lotes ainda não
+processados são descartados.
+
+As estatísticas do modelo (cache, cascata, modo sombra e memória) são lidas
+pelo executor, onde as predições acontecem: com ASYNC_EXECUTOR=process, cada
+resposta traz as de um dos processos do executor (campo "pid").
+
+Corpos de requisição comprimidos são decodificados pelo próprio aiohttp
+(gzip e deflate; zstd apenas com o suporte opcional do aiohttp), com o
+limite de client_max_size, e não pelo RequestDecompressionMiddleware do
+app Flask.
+
+Uso:
+    python async_app.py
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from backend.services.model_service import model_service
+from backend.config.settings import (
+    HOST, PORT, ERROR_MESSAGES, ASYNC_EXECUTOR, ASYNC_MAX_WORKERS, ASYNC_MAX_PENDING,
+    ASYNC_BATCH_CHUNK_SIZE, ASYNC_KEEPALIVE_TIMEOUT, ASYNC_BACKLOG, TRACING,
+    COMPRESS_RESPONSES, COMPRESSION_MIN_SIZE, logger, setup_logging
+)
+from backend.utils.request_validator import (
+    validate_prediction_payload, validate_batch_payload, validate_echo, strip_echo
+)
+from backend.utils.compression import choose_encoding, compress
+from backend.utils.logging_setup import log_success, get_logging_stats
+from backend.utils.tracing import span, current_trace, start_trace, end_trace, get_tracing_stats
+
+try:
+    from aiohttp import web
+except ImportError as e:
+    raise ImportError("O app assíncrono requer o pacote aiohttp: pip install aiohttp") from e
+
+
+def _init_process_worker():
+    """Configura o logging e carrega o modelo em cada processo do executor"""
+    setup_logging()
+    if not model_service.is_loaded():
+        model_service.load_model()
+
+
+def _call_in_worker(method, *args):
+    """Executa um método do ModelService global do processo worker"""
+    return getattr(model_service, method)(*args)
+
+
+def _call_on_service(service, method, *args):
+    """Executa um método do ModelService informado (executor de threads)"""
+    return getattr(service, method)(*args)
+
+
+class OffloadedScoring:
+    """
+    Executa as predições fora do event loop, em um executor limitado.
+
+    O semáforo limita as tarefas pendentes para que picos de requisições
+    esperem no event loop em vez de acumular trabalho no executor.
+    """
+
+    def __init__(self, service, executor=ASYNC_EXECUTOR, max_workers=ASYNC_MAX_WORKERS,
+                 max_pending=ASYNC_MAX_PENDING):
+        self.service = service
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_process_worker)
+            self._target = _call_in_worker
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scoring')
+            self._target = functools.partial(_call_on_service, service)
+        self._pending = asyncio.Semaphore(max_pending)
+
+    async def run(self, method, *args):
+        """Executa um método do ModelService no executor"""
+        target = self._target
+        if current_trace() is not None and isinstance(self._executor, ThreadPoolExecutor):
+            # Etapas do ModelService registradas no trace da requisição
+            target = functools.partial(contextvars.copy_context().run, target)
+        with span('executor'):
+            async with self._pending:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, target, method, *args)
+
+    def shutdown(self):
+        """Finaliza o executor, descartando tarefas ainda não iniciadas"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+SERVICE_KEY = web.AppKey('service', object)
+SCORING_KEY = web.AppKey('scoring', OffloadedScoring)
+
+
+async def _read_json(request):
+    """Lê o corpo JSON da requisição (None se inválido)"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def _model_not_loaded():
+    """Resposta padrão para modelo não carregado"""
+    return web.json_response({
+        'error': 'Modelo não carregado',
+        'message': ERROR_MESSAGES['MODEL_NOT_LOADED']
+    }, status=500)
+
+
+async def home(request):
+    """Endpoint principal com status da API"""
+    return web.json_response({
+        'status': 'API funcionando!',
+        'model_loaded': request.app[SERVICE_KEY].is_loaded(),
+        'endpoints': {
+            'predict': '/api/predict (POST)',
+            'predict_batch': '/api/predict/batch (POST)',
+            'health': '/api/health (GET)',
+            'metrics': '/api/metrics (GET)',
+        }
+    })
+
+
+@web.middleware
+async def tracing_middleware(request, handler):
+    """Rastreia as rotas /api e devolve as durações no cabeçalho Server-Timing"""
+    if not request.path.startswith('/api'):
+        return await handler(request)
+    token = start_trace(f'{request.method} {request.path}')
+    try:
+        response = await handler(request)
+    finally:
+        trace = end_trace(token)
+    response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@web.middleware
+async def compression_middleware(request, handler):
+    """
+    Comprime respostas acima de COMPRESSION_MIN_SIZE com a codificação
+    negociada pelo Accept-Encoding (como compress_response no app Flask).
+    """
+    response = await handler(request)
+    if (not COMPRESS_RESPONSES or not isinstance(response, web.Response) or response.status < 200
+            or response.status in (204, 304) or 'Content-Encoding' in response.headers):
+        return response
+
+    response.headers.add('Vary', 'Accept-Encoding')
+    body = response.body
+    if not isinstance(body, bytes) or len(body) < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    with span('compress'):
+        response.body = compress(body, encoding)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+async def health_check(request):
+    """Endpoint de health check"""
+    response = {
+        'status': 'healthy',
+        'model_loaded': request.app[SERVICE_KEY].is_loaded(),
+        'timestamp': datetime.now().isoformat()
+    }
+
+    # ?verbose=1: memória de um worker do executor (onde o modelo é usado)
+    if request.query.get('verbose') == '1':
+        response['memory'] = await request.app[SCORING_KEY].run('get_memory_report')
+
+    return web.json_response(response)
+
+
+async def metrics(request):
+    """Endpoint com métricas operacionais do serviço"""
+    # Estatísticas de um worker do executor (com processos, as do event loop estariam sempre vazias)
+    scoring_stats = await request.app[SCORING_KEY].run('get_scoring_stats')
+    return web.json_response({
+        **scoring_stats,
+        'logging': get_logging_stats(),
+        'tracing': get_tracing_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+async def predict(request):
+    """Endpoint para predição de um único comentário"""
+    try:
+        if not request.app[SERVICE_KEY].is_loaded():
+            return _model_not_loaded()
+
+        with span('validate'):
+            comment, error = validate_prediction_payload(await _read_json(request))
+        if error:
+            body, status = error
+            return web.json_response(body, status=status)
+
+        result = await request.app[SCORING_KEY].run('predict_single', comment)
+
+        if result['error']:
+            return web.json_response({
+                'error': 'Erro na predição',
+                'message': result['message']
+            }, status=500)
+
+        del result['error']
+
+        log_success(logger, '/api/predict', 'Predição realizada',
+                    prediction=result['prediction'], confidence=result['confidence'])
+
+        with span('serialize'):
+            return web.json_response(result)
+
+    except asyncio.CancelledError:
+        logger.info("Requisição /predict cancelada: cliente desconectado")
+        raise
+    except Exception as e:
+        logger.error(f"Erro no endpoint /predict: {e}")
+        return web.json_response({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }, status=500)
+
+
+async def predict_batch(request):
+    """Endpoint para predição de um lote de comentários"""
+    try:
+        if not request.app[SERVICE_KEY].is_loaded():
+            return _model_not_loaded()
+
+        with span('validate'):
+            data = await _read_json(request)
+            comments, error = validate_batch_payload(data)
+            if not error:
+                # echo=false omite comment e processed_comment dos resultados (respostas menores)
+                echo, error = validate_echo(data)
+        if error:
+            body, status = error
+            return web.json_response(body, status=status)
+
+        # Processar em partes: se o cliente desconectar, as partes restantes não são enviadas
+        results = []
+        collapsed = 0
+        for start in range(0, len(comments), ASYNC_BATCH_CHUNK_SIZE):
+            chunk = comments[start:start + ASYNC_BATCH_CHUNK_SIZE]
+            result = await request.app[SCORING_KEY].run('predict_batch', chunk)
+
+            if result['error']:
+                return web.json_response({
+                    'error': 'Erro na predição',
+                    'message': result['message']
+                }, status=500)
+
+            results.extend(result['results'])
+            collapsed += result['collapsed']
+
+        log_success(logger, '/api/predict/batch', 'Predição em lote realizada',
+                    total=len(results), collapsed=collapsed)
+
+        if not echo:
+            strip_echo(results)
+
+        with span('serialize'):
+            return web.json_response({
+                'results': results,
+                'total': len(results),
+                'collapsed': collapsed
+            })
+
+    except asyncio.CancelledError:
+        logger.info("Requisição /predict/batch cancelada: cliente desconectado")
+        raise
+    except Exception as e:
+        logger.error(f"Erro no endpoint /predict/batch: {e}")
+        return web.json_response({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }, status=500)
+
+
+def create_app(service=model_service, scoring=None, tracing=TRACING):
+    """
+    Cria a aplicação aiohttp.
+
+    Args:
+        service: ModelService compartilhado com o app Flask
+        scoring: Executor de predições (padrão: OffloadedScoring com as configurações)
+        tracing: Rastrear as rotas /api (cabeçalho Server-Timing)
+
+    Returns:
+        web.Application: Aplicação configurada
+    """
+    middlewares = [tracing_middleware] if tracing else []
+    app = web.Application(middlewares=middlewares + [compression_middleware])
+    app[SERVICE_KEY] = service
+    app[SCORING_KEY] = scoring or OffloadedScoring(service)
+
+    app.router.add_get('/api', home)
+    app.router.add_get('/api/health', health_check)
+    app.router.add_get('/api/metrics', metrics)
+    app.router.add_post('/api/predict', predict)
+    app.router.add_post('/api/predict/batch', predict_batch)
+
+    async def shutdown_scoring(app):
+        app[SCORING_KEY].shutdown()
+
+    app.on_cleanup.append(shutdown_scoring)
+    return app
+
+
+if __name__ == '__main__':
+    setup_logging()
+    try:
+        logger.info("Iniciando aplicação assíncrona...")
+        model_service.load_model()
+
+        print("\nAPI de Classificação de Discurso de Ódio (assíncrona)")
+        print("=" * 50)
+        print(f"⚙️  Executor: {ASYNC_EXECUTOR} ({ASYNC_MAX_WORKERS} workers)")
+        print(f"🌐 Servidor rodando em http://{HOST}:{PORT}\n")
+
+        web.run_app(
+            create_app(),
+            host=HOST,
+            port=PORT,
+            backlog=ASYNC_BACKLOG,
+            keepalive_timeout=ASYNC_KEEPALIVE_TIMEOUT,
+            handler_cancellation=True,
+        )
+
+    except Exception as e:
+        logger.error(f"Erro fatal: {e}")
+        exit(1)
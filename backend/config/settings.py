@@ -4,22 +4,196 @@ Configurações do projeto
 import os
 from datetime import datetime
 import logging
+from backend.utils.logging_setup import configure_logging, parse_sample_rates
+
+# Ambiente de execução: define os padrões de logging ('development', 'test' ou 'production')
+APP_ENV = os.getenv('APP_ENV', 'development')
+
+# Configuração de logging por ambiente: nível, formato e taxa de amostragem
+# dos logs de sucesso das rotas de predição
+LOG_DEFAULTS = {
+    'development': {'level': 'INFO', 'format': 'text', 'sample_rate': '1.0'},
+    'test': {'level': 'WARNING', 'format': 'text', 'sample_rate': '1.0'},
+    'production': {'level': 'INFO', 'format': 'json', 'sample_rate': '0.01'},
+}
+_log_defaults = LOG_DEFAULTS.get(APP_ENV, LOG_DEFAULTS['development'])
+LOG_LEVEL = os.getenv('LOG_LEVEL', _log_defaults['level']).upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', _log_defaults['format'])  # 'json' ou 'text'
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', _log_defaults['sample_rate']))
+# Taxas por rota, ex.: "/api/predict=0.01,/api/predict/batch=0.1"
+LOG_ROUTE_SAMPLE_RATES = parse_sample_rates(os.getenv('LOG_ROUTE_SAMPLE_RATES', ''))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Não coletar arquivo/linha e processo em cada registro (altera globais do módulo logging)
+LOG_FAST_RECORDS = os.getenv('LOG_FAST_RECORDS', '0') == '1'
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def setup_logging():
+    """
+    Instala o logging não bloqueante com as configurações acima.
+
+    Chamado pelos pontos de entrada (app.py, async_app.py, router.py, ferramentas
+    e processos dos jobs), não na importação das configurações.
+    """
+    return configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_ROUTE_SAMPLE_RATES,
+                             LOG_SAMPLE_RATE, fast_records=LOG_FAST_RECORDS)
+
 # Configurações do servidor
 HOST = '0.0.0.0'
-PORT = 5000
+PORT = int(os.getenv('PORT', '5000'))
 
 # Caminhos dos arquivos
-MODEL_PATH = 'hate_speech_classifier_model.pkl'
+MODEL_PATH = os.getenv('MODEL_PATH', 'hate_speech_classifier_model.pkl')
 MODEL_INFO_PATH = 'model_info.json'
 
 # Limites da API
 MAX_BATCH_SIZE = 100
 
+# Tokenização rápida na inferência (textos já processados por preprocess_text)
+FAST_TOKENIZER = os.getenv('FAST_TOKENIZER', '1') == '1'
+
+# Deduplicação dos lotes: cópias exatas (após preprocess_text) são processadas
+# uma única vez; quase duplicatas (MinHash + Jaccard) apenas se ativado
+BATCH_DEDUP = os.getenv('BATCH_DEDUP', '1') == '1'
+BATCH_NEAR_DUPLICATES = os.getenv('BATCH_NEAR_DUPLICATES', '0') == '1'
+BATCH_NEAR_DUPLICATE_SIMILARITY = float(os.getenv('BATCH_NEAR_DUPLICATE_SIMILARITY', '0.8'))
+
+# Cascata: triagem por léxico antes do modelo completo. Comentários sem nenhum
+# token com peso na direção de discurso de ódio são decididos sem vetorização.
+# Com CASCADE_LEXICON_SIZE=0 o léxico tem todos esses tokens e a triagem é
+# exata; com N > 0 apenas os N de maior peso (mais rápida, com erro medido)
+CASCADE = os.getenv('CASCADE', '0') == '1'
+CASCADE_LEXICON_SIZE = int(os.getenv('CASCADE_LEXICON_SIZE', '0'))
+CASCADE_MIN_MARGIN = float(os.getenv('CASCADE_MIN_MARGIN', '0.0'))
+
+# Cache de resultados: LRU em memória por worker e, opcionalmente, um banco
+# SQLite compartilhado pelos workers do nó (desativado se o caminho for vazio)
+CACHE_SIZE = int(os.getenv('CACHE_SIZE', '10000'))
+CACHE_SHARED_PATH = os.getenv('CACHE_SHARED_PATH', '')
+CACHE_SHARED_MAX_ENTRIES = int(os.getenv('CACHE_SHARED_MAX_ENTRIES', '1000000'))
+CACHE_SHARED_TIMEOUT = 0.5  # segundos de espera por um banco bloqueado
+
+# Compressão dos corpos: requisições gzip/zstd são descomprimidas e respostas
+# acima de COMPRESSION_MIN_SIZE bytes são comprimidas conforme o Accept-Encoding
+COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', '1') == '1'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '1'))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', '3'))
+MAX_DECOMPRESSED_SIZE = 16 * 1024 * 1024
+
+# Rastreamento das rotas /api: duração de cada etapa no cabeçalho Server-Timing
+# e, se houver um endpoint, exportação OTLP/HTTP (ex.: http://localhost:4318/v1/traces)
+TRACING = os.getenv('TRACING', '0') == '1'
+TRACING_OTLP_ENDPOINT = os.getenv('TRACING_OTLP_ENDPOINT', '')
+TRACING_SERVICE_NAME = os.getenv('TRACING_SERVICE_NAME', 'hate-speech-api')
+TRACING_EXPORT_QUEUE = 1000
+TRACING_EXPORT_TIMEOUT = 2.0  # segundos
+
+# Memória: tracemalloc em volta da carga do modelo (desativado por padrão: o
+# rastreamento infla o RSS do worker) e orçamento verificado pelo teste de
+# regressão de memória do modelo servido
+MEMORY_PROFILE_LOAD = os.getenv('MEMORY_PROFILE_LOAD', '0') == '1'
+MODEL_MEMORY_BUDGET_MB = float(os.getenv('MODEL_MEMORY_BUDGET_MB', '4'))
+
+# Jobs em lote (POST /api/jobs): arquivos classificados em segundo plano por um
+# pool de processos com prioridade reduzida, com o estado em SQLite (os jobs
+# sobrevivem a reinícios). Caminhos locais do servidor ("path") só são aceitos
+# dentro de JOBS_INPUT_ROOT; vazio (padrão) os desativa e só aceita arquivos enviados
+JOBS_DIR = os.getenv('JOBS_DIR', 'jobs')
+JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', os.path.join(JOBS_DIR, 'jobs.sqlite'))
+JOBS_INPUT_ROOT = os.getenv('JOBS_INPUT_ROOT', '')
+JOBS_MAX_WORKERS = int(os.getenv('JOBS_MAX_WORKERS', '1'))
+JOBS_CHUNK_SIZE = int(os.getenv('JOBS_CHUNK_SIZE', '1000'))
+JOBS_MAX_PENDING = int(os.getenv('JOBS_MAX_PENDING', '100'))
+JOBS_WORKER_NICE = int(os.getenv('JOBS_WORKER_NICE', '10'))
+# Na inicialização, um job em execução cujo processo (host:pid) não existe mais
+# é retomado; se o processo não puder ser verificado (outro host), só após
+# JOBS_STALE_SECONDS sem progresso
+JOBS_STALE_SECONDS = 60
+
+# Predição incremental (POST /api/predict/incremental): sessões da caixa de
+# comentários com as contagens de tokens do texto; cada edição recalcula o
+# score apenas com os tokens que mudaram. Sessões em LRU com expiração por
+# inatividade; as somas são recalculadas do zero a cada N edições
+INCREMENTAL_MAX_SESSIONS = int(os.getenv('INCREMENTAL_MAX_SESSIONS', '10000'))
+INCREMENTAL_SESSION_TTL = float(os.getenv('INCREMENTAL_SESSION_TTL', '300'))  # segundos
+INCREMENTAL_MAX_CHARS = int(os.getenv('INCREMENTAL_MAX_CHARS', '5000'))
+INCREMENTAL_MAX_EDITS = 50  # edições por requisição
+INCREMENTAL_RESYNC_EDITS = 256
+
+# Monitoramento de drift (GET /api/drift): por janela de tempo, histogramas de
+# bordas fixas (combináveis por soma) das margens, do tamanho dos comentários e
+# da fração de tokens fora do vocabulário, além das contagens de rótulos. Com
+# DRIFT_SHARED_PATH, cada worker publica as suas janelas em um SQLite comum e o
+# endpoint combina as de todos os workers do nó. A referência calculada no
+# hate.csv (backend/tools/drift_baseline.py) fica ao lado de model_info.json
+DRIFT = os.getenv('DRIFT', '1') == '1'
+DRIFT_WINDOW = int(os.getenv('DRIFT_WINDOW', '3600'))  # segundos
+DRIFT_MAX_WINDOWS = int(os.getenv('DRIFT_MAX_WINDOWS', '24'))
+DRIFT_SHARED_PATH = os.getenv('DRIFT_SHARED_PATH', '')
+DRIFT_FLUSH_INTERVAL = 5.0  # segundos entre publicações no SQLite compartilhado
+DRIFT_OOV_SAMPLE = 10  # comentários por lote com a fração fora do vocabulário calculada (exige tokenizar)
+DRIFT_BASELINE_PATH = os.getenv('DRIFT_BASELINE_PATH', 'drift_baseline.json')
+
+# Roteador (router.py): fica na frente de várias instâncias da API e escolhe o
+# nó de cada comentário por hashing consistente do texto preprocessado, para
+# que cópias do mesmo texto caiam sempre no mesmo cache. ROUTER_NODES lista as
+# URLs dos nós separadas por vírgula; 'round_robin' ignora a afinidade (comparação)
+ROUTER_PORT = int(os.getenv('ROUTER_PORT', '8000'))
+ROUTER_NODES = [url.strip() for url in os.getenv('ROUTER_NODES', '').split(',') if url.strip()]
+ROUTER_STRATEGY = os.getenv('ROUTER_STRATEGY', 'hash')  # 'hash' ou 'round_robin'
+ROUTER_VIRTUAL_NODES = int(os.getenv('ROUTER_VIRTUAL_NODES', '160'))  # posições de cada nó no anel
+ROUTER_MAX_CONNECTIONS = int(os.getenv('ROUTER_MAX_CONNECTIONS', '8'))  # conexões keep-alive por nó
+ROUTER_FANOUT_WORKERS = int(os.getenv('ROUTER_FANOUT_WORKERS', '16'))  # partes de lotes enviadas em paralelo
+ROUTER_TIMEOUT = float(os.getenv('ROUTER_TIMEOUT', '10'))  # segundos
+ROUTER_HEALTH_INTERVAL = float(os.getenv('ROUTER_HEALTH_INTERVAL', '2'))  # segundos; 0 desativa
+# Token (Authorization: Bearer) exigido por POST/DELETE /api/router/nodes; vazio
+# desativa as rotas e os nós vêm apenas de --node/ROUTER_NODES
+ROUTER_ADMIN_TOKEN = os.getenv('ROUTER_ADMIN_TOKEN', '')
+
+# Explicações: quantidade padrão e máxima de tokens retornados por comentário
+EXPLAIN_TOP_K = 10
+EXPLAIN_MAX_TOP_K = 50
+
+# Controle de admissão (load shedding) das rotas de predição
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', '64'))
+ADMISSION_DEGRADE_IN_FLIGHT = int(os.getenv('ADMISSION_DEGRADE_IN_FLIGHT', '32'))
+ADMISSION_LATENCY_BUDGET_MS = float(os.getenv('ADMISSION_LATENCY_BUDGET_MS', '1000'))
+ADMISSION_DEGRADE_LATENCY_MS = float(os.getenv('ADMISSION_DEGRADE_LATENCY_MS', '250'))
+ADMISSION_EWMA_ALPHA = 0.2
+ADMISSION_BATCH_COST = 10
+ADMISSION_RETRY_AFTER = 1  # segundos
+ADMISSION_DEGRADED_MAX_CHARS = 280
+
+# Faixas de prioridade das rotas de predição: cada faixa tem sua cota de
+# workers e sua fila limitada; os lotes (/api/predict/batch, /api/explain)
+# só começam quando não há predições interativas (/api/predict) esperando e,
+# entre partes de SCHEDULER_BULK_CHUNK_SIZE comentários, pausam enquanto houver
+# predições interativas em andamento (no máximo SCHEDULER_YIELD_TIMEOUT por pausa)
+SCHEDULER = os.getenv('SCHEDULER', '1') == '1'
+SCHEDULER_INTERACTIVE_WORKERS = int(os.getenv('SCHEDULER_INTERACTIVE_WORKERS', str(os.cpu_count() or 1)))
+SCHEDULER_INTERACTIVE_QUEUE = int(os.getenv('SCHEDULER_INTERACTIVE_QUEUE', '256'))
+SCHEDULER_BULK_WORKERS = int(os.getenv('SCHEDULER_BULK_WORKERS', '1'))
+SCHEDULER_BULK_QUEUE = int(os.getenv('SCHEDULER_BULK_QUEUE', '32'))
+SCHEDULER_QUEUE_TIMEOUT = float(os.getenv('SCHEDULER_QUEUE_TIMEOUT', '5'))  # segundos
+SCHEDULER_BULK_CHUNK_SIZE = 25
+SCHEDULER_YIELD_TIMEOUT = 0.05  # segundos
+
+# App assíncrono (async_app.py): executor para o processamento do modelo
+ASYNC_EXECUTOR = os.getenv('ASYNC_EXECUTOR', 'thread')  # 'thread' ou 'process'
+ASYNC_MAX_WORKERS = int(os.getenv('ASYNC_MAX_WORKERS', str(os.cpu_count() or 1)))
+ASYNC_MAX_PENDING = int(os.getenv('ASYNC_MAX_PENDING', '256'))
+ASYNC_BATCH_CHUNK_SIZE = 25
+ASYNC_KEEPALIVE_TIMEOUT = 75
+ASYNC_BACKLOG = 2048
+
+# Modo sombra: avaliação de um modelo candidato em paralelo ao modelo servido
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH', '')
+SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', '0.1'))
+SHADOW_MAX_WORKERS = int(os.getenv('SHADOW_MAX_WORKERS', '1'))
+SHADOW_MAX_QUEUE = int(os.getenv('SHADOW_MAX_QUEUE', '100'))
+
 # Mensagens de erro padrão
 ERROR_MESSAGES = {
     'MODEL_NOT_LOADED': 'O modelo de ML não foi carregado corretamente',
@@ -29,14 +203,49 @@ ERROR_MESSAGES = {
     'INTERNAL_ERROR': 'Erro interno do servidor',
     'MISSING_COMMENTS': 'Campo "comments" é obrigatório',
     'INVALID_FORMAT': 'Campo "comments" deve ser uma lista',
+    'EMPTY_COMMENTS': 'Campo "comments" deve conter ao menos um comentário',
     'TOO_MANY_COMMENTS': 'Máximo de 100 comentários por requisição',
     'NOT_FOUND': 'Endpoint não encontrado',
     'METHOD_NOT_ALLOWED': 'Método não permitido',
-    'MODEL_INFO_NOT_AVAILABLE': 'Informações do modelo não disponíveis'
+    'MODEL_INFO_NOT_AVAILABLE': 'Informações do modelo não disponíveis',
+    'EXPLANATION_NOT_AVAILABLE': 'O modelo carregado não é linear e não suporta explicações',
+    'TOO_MANY_REQUESTS': 'Limite de requisições simultâneas atingido, tente novamente em instantes',
+    'SERVICE_OVERLOADED': 'Serviço sobrecarregado, tente novamente em instantes',
+    'INVALID_TOP_K': 'Campo "top_k" deve ser um inteiro entre 1 e 50',
+    'INVALID_ECHO': 'Campo "echo" deve ser true ou false',
+    'UNSUPPORTED_ENCODING': 'Content-Encoding não suportado (use gzip ou zstd)',
+    'INVALID_COMPRESSED_BODY': 'Corpo comprimido inválido ou corrompido',
+    'PAYLOAD_TOO_LARGE': 'Corpo descomprimido excede o tamanho máximo permitido',
+    'LANE_QUEUE_FULL': 'Fila de requisições desta rota cheia, tente novamente em instantes',
+    'QUEUE_TIMEOUT': 'Tempo de espera na fila excedido, tente novamente em instantes',
+    'MISSING_JOB_INPUT': 'Envie um arquivo (campo "file") ou um caminho local (campo "path")',
+    'INVALID_JOB_PATH': 'Caminho inexistente ou fora do diretório de entrada permitido',
+    'JOB_PATHS_DISABLED': 'Caminhos locais desativados no servidor (JOBS_INPUT_ROOT): envie o arquivo no campo "file"',
+    'INVALID_JOB_FORMAT': 'Campo "format" deve ser "csv" ou "text"',
+    'INVALID_JOB_ENCODING': 'Campo "encoding" deve ser uma codificação válida',
+    'TOO_MANY_JOBS': 'Limite de jobs pendentes atingido, tente novamente mais tarde',
+    'JOB_NOT_FOUND': 'Job não encontrado',
+    'JOB_NOT_COMPLETED': 'O resultado só fica disponível quando o job é concluído',
+    'MISSING_SESSION_INPUT': 'Envie "text" (abre ou ressincroniza a sessão) ou "session_id", "revision" e "edits"',
+    'INVALID_EDITS': 'Campo "edits" deve ser uma lista de até 50 objetos {"start", "end", "text"}',
+    'INVALID_EDIT': 'Edição fora dos limites do texto da sessão',
+    'TEXT_TOO_LONG': 'Texto excede o tamanho máximo da sessão',
+    'SESSION_NOT_FOUND': 'Sessão inexistente ou expirada: reenvie o texto inteiro',
+    'SESSION_REVISION_MISMATCH': 'Revisão divergente: reenvie o texto inteiro',
+    'INCREMENTAL_NOT_AVAILABLE': 'O modelo carregado não suporta predição incremental',
+    'INVALID_DRIFT_WINDOWS': 'Parâmetro "windows" deve ser um inteiro positivo',
+    'NO_BACKENDS': 'Nenhum nó de inferência disponível, tente novamente em instantes',
+    'INVALID_NODE_URL': 'Campo "url" deve ser a URL http(s) de um nó da API',
+    'NODE_NOT_FOUND': 'Nó não registrado no roteador',
+    'ROUTER_ADMIN_DISABLED': 'Alteração de nós desativada: configure ROUTER_ADMIN_TOKEN ou use --node/ROUTER_NODES',
+    'ROUTER_ADMIN_UNAUTHORIZED': 'Token de administração do roteador ausente ou inválido'
 }
 
 # Configurações de resposta
 RESPONSE_LABELS = {
     'HATE_SPEECH': 'É discurso de ódio',
     'NOT_HATE_SPEECH': 'Não é discurso de ódio'
-} 
\ No newline at end of file
+}
+
+# Classe do modelo que representa discurso de ódio (0 = ódio, 1 = não ódio)
+HATE_SPEECH_CLASS = 0 
\ No newline at end of file
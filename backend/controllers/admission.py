@@ -0,0 +1,55 @@
+"""
+Controle de admissão das rotas de predição (load shedding)
+"""
+import functools
+import time
+from flask import jsonify, g
+from backend.services.admission_service import (
+    admission_service, DEGRADE, REJECT_BUSY, REJECT_OVERLOADED
+)
+from backend.config.settings import ERROR_MESSAGES, ADMISSION_RETRY_AFTER
+
+
+def _reject(status, error, message):
+    """Resposta rápida de rejeição com o cabeçalho Retry-After"""
+    response = jsonify({
+        'error': error,
+        'message': message
+    })
+    response.status_code = status
+    response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+    return response
+
+
+def admission_controlled(view, cost=1):
+    """
+    Envolve uma rota com o controle de admissão.
+
+    Requisições acima do orçamento recebem 429/503 imediatamente; em modo
+    degradado a rota é executada com g.degraded = True. A latência é
+    acompanhada separadamente para cada rota (nome da função).
+
+    Args:
+        view: Função da rota
+        cost: Unidades de trabalho da rota (lotes custam mais)
+
+    Returns:
+        function: Rota protegida
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        decision = admission_service.acquire(cost, view.__name__)
+
+        if decision == REJECT_BUSY:
+            return _reject(429, 'Muitas requisições', ERROR_MESSAGES['TOO_MANY_REQUESTS'])
+        if decision == REJECT_OVERLOADED:
+            return _reject(503, 'Serviço sobrecarregado', ERROR_MESSAGES['SERVICE_OVERLOADED'])
+
+        g.degraded = decision == DEGRADE
+        start = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission_service.release(cost, 1000 * (time.perf_counter() - start), view.__name__)
+
+    return wrapper
@@ -0,0 +1,80 @@
+"""
+Compressão dos corpos de requisição e resposta do app Flask
+"""
+import io
+import json
+from flask import request
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import get_input_stream
+from backend.config.settings import (
+    ERROR_MESSAGES, COMPRESS_RESPONSES, COMPRESSION_MIN_SIZE, MAX_DECOMPRESSED_SIZE, logger
+)
+from backend.utils.compression import (
+    choose_encoding, compress, decompress, UnsupportedEncodingError, PayloadTooLargeError
+)
+from backend.utils.tracing import span
+
+
+class RequestDecompressionMiddleware:
+    """
+    Middleware WSGI que descomprime corpos com Content-Encoding gzip/zstd
+    antes de chegarem às rotas, que continuam lendo JSON normalmente.
+    """
+
+    def __init__(self, wsgi_app, max_size=MAX_DECOMPRESSED_SIZE):
+        self.wsgi_app = wsgi_app
+        self.max_size = max_size
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding in ('', 'identity'):
+            return self.wsgi_app(environ, start_response)
+
+        try:
+            body = decompress(get_input_stream(environ).read(self.max_size + 1), encoding, self.max_size)
+        except UnsupportedEncodingError:
+            return self._error(415, 'Codificação não suportada', ERROR_MESSAGES['UNSUPPORTED_ENCODING'])(
+                environ, start_response)
+        except PayloadTooLargeError:
+            return self._error(413, 'Corpo muito grande', ERROR_MESSAGES['PAYLOAD_TOO_LARGE'])(
+                environ, start_response)
+        except ValueError as e:
+            logger.warning(f"Corpo comprimido inválido: {e}")
+            return self._error(400, 'Dados inválidos', ERROR_MESSAGES['INVALID_COMPRESSED_BODY'])(
+                environ, start_response)
+
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+        environ.pop('HTTP_CONTENT_ENCODING', None)
+        environ.pop('HTTP_TRANSFER_ENCODING', None)
+        environ['wsgi.input_terminated'] = False
+        return self.wsgi_app(environ, start_response)
+
+    @staticmethod
+    def _error(status, error, message):
+        """Resposta de erro no mesmo formato das rotas (fora do contexto do Flask)"""
+        return Response(json.dumps({'error': error, 'message': message}), status=status,
+                        mimetype='application/json')
+
+
+def compress_response(response):
+    """
+    Comprime respostas acima de COMPRESSION_MIN_SIZE com a codificação
+    negociada pelo Accept-Encoding (registrado com app.after_request).
+    """
+    if (not COMPRESS_RESPONSES or response.direct_passthrough or response.status_code < 200
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    with span('compress'):
+        response.set_data(compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
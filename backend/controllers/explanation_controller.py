@@ -0,0 +1,76 @@
+"""
+Controller responsável pelas rotas de explicação das predições
+"""
+from flask import jsonify, request
+from backend.services.model_service import model_service
+from backend.config.settings import ERROR_MESSAGES, EXPLAIN_TOP_K, EXPLAIN_MAX_TOP_K, logger
+from backend.utils.request_validator import validate_prediction_payload, validate_batch_payload
+
+
+def explain():
+    """Endpoint que retorna os tokens que mais contribuíram para a predição"""
+    try:
+        # Verificar se modelo está carregado
+        if not model_service.is_loaded():
+            return jsonify({
+                'error': 'Modelo não carregado',
+                'message': ERROR_MESSAGES['MODEL_NOT_LOADED']
+            }), 500
+
+        if model_service.scorer is None:
+            return jsonify({
+                'error': 'Explicação indisponível',
+                'message': ERROR_MESSAGES['EXPLANATION_NOT_AVAILABLE']
+            }), 501
+
+        # Obter dados da requisição
+        data = request.get_json(silent=True)
+
+        if not data or not isinstance(data, dict):
+            return jsonify({
+                'error': 'Dados inválidos',
+                'message': ERROR_MESSAGES['INVALID_DATA']
+            }), 400
+
+        top_k = data.get('top_k', EXPLAIN_TOP_K)
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= EXPLAIN_MAX_TOP_K:
+            return jsonify({
+                'error': 'Parâmetro inválido',
+                'message': ERROR_MESSAGES['INVALID_TOP_K']
+            }), 400
+
+        # Aceitar um único comentário ou um lote
+        is_batch = 'comments' in data
+        if is_batch:
+            comments, error = validate_batch_payload(data)
+        else:
+            comment, error = validate_prediction_payload(data)
+            comments = [comment]
+
+        if error:
+            body, status = error
+            return jsonify(body), status
+
+        # Calcular explicações
+        result = model_service.explain_batch(comments, top_k)
+
+        if result['error']:
+            return jsonify({
+                'error': 'Erro na explicação',
+                'message': result['message']
+            }), 500
+
+        if is_batch:
+            return jsonify({
+                'results': result['results'],
+                'total': len(result['results'])
+            })
+
+        return jsonify(result['results'][0])
+
+    except Exception as e:
+        logger.error(f"Erro no endpoint /explain: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
@@ -1,10 +1,16 @@
 """
 Controller responsável pelas rotas de health check e informações
 """
-from flask import jsonify
+from flask import jsonify, request
 from datetime import datetime
 from backend.services.model_service import model_service
+from backend.services.admission_service import admission_service
+from backend.services.job_service import job_service
+from backend.services.incremental_service import incremental_service
+from backend.services.scheduler_service import scheduler_service
 from backend.config.settings import ERROR_MESSAGES
+from backend.utils.logging_setup import get_logging_stats
+from backend.utils.tracing import get_tracing_stats
 
 
 def home():
@@ -14,20 +20,72 @@ def home():
         'model_loaded': model_service.is_loaded(),
         'endpoints': {
             'predict': '/api/predict (POST)',
+            'predict_batch': '/api/predict/batch (POST)',
+            'predict_incremental': '/api/predict/incremental (POST)',
+            'explain': '/api/explain (POST)',
+            'jobs': '/api/jobs (POST), /api/jobs/<id> (GET), /api/jobs/<id>/result (GET)',
             'health': '/api/health (GET)',
+            'metrics': '/api/metrics (GET)',
+            'drift': '/api/drift (GET)',
         }
     })
 
 
 def health_check():
     """Endpoint de health check"""
-    return jsonify({
+    admission_stats = admission_service.get_stats()
+    response = {
         'status': 'healthy',
         'model_loaded': model_service.is_loaded(),
+        'shed': {
+            'shed_429': admission_stats['shed_429'],
+            'shed_503': admission_stats['shed_503'],
+            'degraded': admission_stats['degraded']
+        },
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    # ?verbose=1: memória do worker (RSS, modelo por componente e caches)
+    if request.args.get('verbose') == '1':
+        response['memory'] = model_service.get_memory_report()
+    
+    return jsonify(response)
+
+
+def metrics():
+    """Endpoint com métricas operacionais do serviço"""
+    return jsonify({
+        'admission': admission_service.get_stats(),
+        'scheduler': scheduler_service.get_stats(),
+        'shadow': model_service.get_shadow_stats(),
+        'cache': model_service.get_cache_stats(),
+        'cascade': model_service.get_cascade_stats(),
+        'jobs': job_service.get_stats(),
+        'incremental': incremental_service.get_stats(),
+        'logging': get_logging_stats(),
+        'tracing': get_tracing_stats(),
         'timestamp': datetime.now().isoformat()
     })
 
 
+def drift():
+    """
+    Endpoint com os sketches de drift do tráfego por janela de tempo.
+    
+    ?windows=N limita o relatório às N janelas mais recentes.
+    """
+    windows = request.args.get('windows')
+    if windows is not None:
+        if not windows.isdigit() or int(windows) < 1:
+            return jsonify({
+                'error': 'Parâmetro inválido',
+                'message': ERROR_MESSAGES['INVALID_DRIFT_WINDOWS']
+            }), 400
+        windows = int(windows)
+    
+    return jsonify(dict(model_service.get_drift_report(windows), timestamp=datetime.now().isoformat()))
+
+
 def handle_404(error):
     """Handler para erro 404"""
     return jsonify({
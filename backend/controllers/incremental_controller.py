@@ -0,0 +1,80 @@
+"""
+Controller responsável pelas rotas de predição incremental (enquanto o usuário digita)
+"""
+from flask import jsonify, request
+from backend.services.incremental_service import (
+    incremental_service, SESSION_NOT_FOUND, REVISION_MISMATCH, INVALID_EDIT, TEXT_TOO_LONG, NOT_AVAILABLE
+)
+from backend.services.model_service import model_service
+from backend.config.settings import ERROR_MESSAGES, logger
+from backend.utils.request_validator import validate_incremental_payload
+from backend.utils.tracing import span
+
+# Status HTTP e título de cada código de erro das sessões
+ERROR_RESPONSES = {
+    SESSION_NOT_FOUND: (404, 'Sessão não encontrada'),
+    REVISION_MISMATCH: (409, 'Revisão divergente'),
+    INVALID_EDIT: (400, 'Edição inválida'),
+    TEXT_TOO_LONG: (400, 'Texto muito longo'),
+    NOT_AVAILABLE: (501, 'Predição incremental indisponível'),
+}
+
+
+def predict_incremental():
+    """
+    Endpoint de predição incremental.
+
+    {"text": ...} abre uma sessão (ou ressincroniza "session_id") com o texto
+    inteiro; {"session_id", "revision", "edits": [{"start", "end", "text"}]}
+    aplica edições ao texto da sessão. As respostas trazem "session_id" e a
+    nova "revision", usada na próxima chamada.
+    """
+    try:
+        # Verificar se modelo está carregado
+        if not model_service.is_loaded():
+            return jsonify({
+                'error': 'Modelo não carregado',
+                'message': ERROR_MESSAGES['MODEL_NOT_LOADED']
+            }), 500
+
+        # Obter e validar dados da requisição
+        with span('validate'):
+            payload, error = validate_incremental_payload(request.get_json(silent=True))
+        if error:
+            body, status = error
+            return jsonify(body), status
+
+        with span('score'):
+            if payload['text'] is not None:
+                result = incremental_service.open(payload['text'], payload['session_id'])
+            else:
+                result = incremental_service.update(payload['session_id'], payload['revision'], payload['edits'])
+
+        if result['error']:
+            status, error = ERROR_RESPONSES[result['code']]
+            body = {'error': error, 'message': ERROR_MESSAGES[result['code']]}
+            if 'revision' in result:
+                body['revision'] = result['revision']
+            return jsonify(body), status
+
+        del result['error']
+        with span('serialize'):
+            return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Erro no endpoint /predict/incremental: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
+
+
+def close_session(session_id):
+    """Endpoint que encerra uma sessão de predição incremental"""
+    if not incremental_service.close(session_id):
+        status, error = ERROR_RESPONSES[SESSION_NOT_FOUND]
+        return jsonify({
+            'error': error,
+            'message': ERROR_MESSAGES[SESSION_NOT_FOUND]
+        }), status
+    return '', 204
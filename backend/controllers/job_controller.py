@@ -0,0 +1,94 @@
+"""
+Controller responsável pelas rotas de jobs em lote
+"""
+import os
+from flask import jsonify, request, send_file
+from backend.services.job_service import job_service, is_valid_encoding, INPUT_FORMATS
+from backend.config.settings import ERROR_MESSAGES, logger
+
+
+def _error(error, key, status):
+    """Resposta de erro no formato padrão da API"""
+    return jsonify({
+        'error': error,
+        'message': ERROR_MESSAGES[key]
+    }), status
+
+
+def create_job():
+    """
+    Endpoint que cria um job em lote.
+
+    Aceita um arquivo enviado (multipart, campo "file") ou, se JOBS_INPUT_ROOT
+    estiver configurado, um caminho local do servidor dentro dele (JSON ou
+    formulário, campo "path"). Campos opcionais: "format"
+    ('csv' com a coluna "comment" ou 'text' com um comentário por linha;
+    padrão pela extensão) e "encoding" (padrão utf-8).
+    """
+    try:
+        upload = request.files.get('file')
+        data = request.get_json(silent=True) if request.is_json else request.form
+        if not isinstance(data, dict) and not hasattr(data, 'get'):
+            return _error('Dados inválidos', 'INVALID_DATA', 400)
+
+        path = data.get('path')
+        if upload is None and not path:
+            return _error('Entrada ausente', 'MISSING_JOB_INPUT', 400)
+        if upload is None and not job_service.input_root:
+            return _error('Caminhos locais desativados', 'JOB_PATHS_DISABLED', 400)
+
+        filename = upload.filename if upload is not None else path
+        input_format = data.get('format') or ('csv' if str(filename or '').lower().endswith('.csv') else 'text')
+        if input_format not in INPUT_FORMATS:
+            return _error('Formato inválido', 'INVALID_JOB_FORMAT', 400)
+
+        encoding = data.get('encoding') or 'utf-8'
+        if not is_valid_encoding(encoding):
+            return _error('Codificação inválida', 'INVALID_JOB_ENCODING', 400)
+
+        if job_service.is_full():
+            response, status = _error('Muitos jobs', 'TOO_MANY_JOBS', 429)
+            response.headers['Retry-After'] = '60'
+            return response, status
+
+        if upload is not None:
+            job = job_service.submit_upload(upload, input_format, encoding)
+        else:
+            input_path = job_service.resolve_input_path(str(path))
+            if input_path is None:
+                return _error('Caminho inválido', 'INVALID_JOB_PATH', 400)
+            job = job_service.submit_path(input_path, input_format, encoding)
+
+        response = jsonify(job)
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+
+    except Exception as e:
+        logger.error(f"Erro no endpoint /jobs: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
+
+
+def get_job(job_id):
+    """Endpoint com o estado, o progresso e a vazão de um job"""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return _error('Job não encontrado', 'JOB_NOT_FOUND', 404)
+    return jsonify(job)
+
+
+def get_job_result(job_id):
+    """Endpoint que serve o arquivo de resultado (CSV) de um job concluído"""
+    if job_service.get_job(job_id) is None:
+        return _error('Job não encontrado', 'JOB_NOT_FOUND', 404)
+
+    result_path = job_service.get_result_path(job_id)
+    if result_path is None:
+        return _error('Job não concluído', 'JOB_NOT_COMPLETED', 409)
+
+    return send_file(
+        os.path.abspath(result_path), mimetype='text/csv', as_attachment=True,
+        download_name=f"{job_id}.csv"
+    )
@@ -1,11 +1,30 @@
 """
 Controller responsável pelas rotas de predição
 """
-from flask import jsonify, request
+from flask import jsonify, request, g
 from datetime import datetime
 from backend.services.model_service import model_service
-from backend.config.settings import ERROR_MESSAGES, MAX_BATCH_SIZE, logger
+from backend.controllers.scheduling import yield_to_interactive
+from backend.config.settings import ERROR_MESSAGES, ADMISSION_DEGRADED_MAX_CHARS, SCHEDULER_BULK_CHUNK_SIZE, logger
+from backend.utils.request_validator import (
+    validate_prediction_payload, validate_batch_payload, validate_echo, strip_echo
+)
+from backend.utils.logging_setup import log_success
+from backend.utils.text_preprocessor import preprocess_text
 from backend.utils.text_preprocessor import validate_comment
+from backend.utils.tracing import span
+
+
+def _degrade(comment):
+    """
+    Início do comentário processado no modo degradado.
+
+    Se o início truncado não for um comentário válido (ex.: só pontuação, vazio
+    após preprocess_text), o texto inteiro é mantido.
+    """
+    truncated = comment[:ADMISSION_DEGRADED_MAX_CHARS]
+    is_valid, _ = validate_comment(truncated)
+    return truncated if is_valid else comment
 
 
 def predict():
@@ -18,30 +37,18 @@ def predict():
                 'message': ERROR_MESSAGES['MODEL_NOT_LOADED']
             }), 500
         
-        # Obter dados da requisição
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Dados inválidos',
-                'message': ERROR_MESSAGES['INVALID_DATA']
-            }), 400
-        
-        if 'comment' not in data:
-            return jsonify({
-                'error': 'Campo obrigatório ausente',
-                'message': ERROR_MESSAGES['MISSING_COMMENT']
-            }), 400
+        # Obter e validar dados da requisição
+        with span('validate'):
+            data = request.get_json()
+            comment, error = validate_prediction_payload(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
         
-        comment = data['comment']
-        
-        # Validar comentário
-        is_valid, error_msg = validate_comment(comment)
-        if not is_valid:
-            return jsonify({
-                'error': 'Comentário inválido',
-                'message': error_msg
-            }), 400
+        # Modo degradado (controle de admissão): processar apenas o início do texto
+        degraded = g.get('degraded', False)
+        if degraded:
+            comment = _degrade(comment)
         
         # Fazer predição
         result = model_service.predict_single(comment)
@@ -54,14 +61,123 @@ def predict():
         
         # Remover campo de erro do resultado
         del result['error']
+        if degraded:
+            result['degraded'] = True
         
-        logger.info(f"Predição realizada: {result['prediction']} (confiança: {result['confidence']}%)")
+        log_success(logger, '/api/predict', 'Predição realizada',
+                    prediction=result['prediction'], confidence=result['confidence'])
         
-        return jsonify(result)
+        with span('serialize'):
+            return jsonify(result)
         
     except Exception as e:
         logger.error(f"Erro no endpoint /predict: {e}")
         return jsonify({
             'error': 'Erro interno do servidor',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+def _predict_batch_in_chunks(comments):
+    """
+    Predição de um lote. Sob o escalonador, o lote é deduplicado uma única vez,
+    apenas os textos únicos são processados em partes e, entre elas, aguarda as
+    predições interativas em andamento.
+    """
+    if g.get('lane') is None:
+        return model_service.predict_batch(comments)
+    
+    # Cópias em partes diferentes seriam classificadas de novo: agrupa o lote inteiro antes de dividir
+    if model_service.deduplicate:
+        index_by_text = {}
+        unique_comments = []
+        positions = []
+        for comment in comments:
+            processed = preprocess_text(comment)
+            if processed not in index_by_text:
+                index_by_text[processed] = len(unique_comments)
+                unique_comments.append(comment)
+            positions.append(index_by_text[processed])
+    else:
+        unique_comments = comments
+        positions = range(len(comments))
+    
+    unique_results = []
+    collapsed = len(comments) - len(unique_comments)
+    for start in range(0, len(unique_comments), SCHEDULER_BULK_CHUNK_SIZE):
+        if start:
+            yield_to_interactive()
+        result = model_service.predict_batch(unique_comments[start:start + SCHEDULER_BULK_CHUNK_SIZE])
+        if result['error']:
+            return result
+        unique_results.extend(result['results'])
+        collapsed += result['collapsed']
+    
+    results = [
+        dict(unique_results[position], comment=comment)
+        for comment, position in zip(comments, positions)
+    ]
+    return {'error': False, 'results': results, 'collapsed': collapsed}
+
+
+def predict_batch():
+    """Endpoint para predição de um lote de comentários"""
+    try:
+        # Verificar se modelo está carregado
+        if not model_service.is_loaded():
+            return jsonify({
+                'error': 'Modelo não carregado',
+                'message': ERROR_MESSAGES['MODEL_NOT_LOADED']
+            }), 500
+        
+        # Obter e validar dados da requisição
+        with span('validate'):
+            data = request.get_json()
+            comments, error = validate_batch_payload(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
+        
+        # echo=false omite comment e processed_comment dos resultados (respostas menores)
+        echo, error = validate_echo(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
+        
+        # Modo degradado (controle de admissão): processar apenas o início dos textos
+        degraded = g.get('degraded', False)
+        if degraded:
+            comments = [_degrade(comment) for comment in comments]
+        
+        # Fazer predições
+        result = _predict_batch_in_chunks(comments)
+        
+        if result['error']:
+            return jsonify({
+                'error': 'Erro na predição',
+                'message': result['message']
+            }), 500
+        
+        log_success(logger, '/api/predict/batch', 'Predição em lote realizada',
+                    total=len(result['results']), collapsed=result['collapsed'])
+        
+        if not echo:
+            strip_echo(result['results'])
+        
+        response = {
+            'results': result['results'],
+            'total': len(result['results']),
+            'collapsed': result['collapsed']
+        }
+        if degraded:
+            response['degraded'] = True
+        
+        with span('serialize'):
+            return jsonify(response)
+        
+    except Exception as e:
+        logger.error(f"Erro no endpoint /predict/batch: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,137 @@
+"""
+Controller responsável pelas rotas do roteador (router.py)
+"""
+import hmac
+from flask import jsonify, request
+from datetime import datetime
+from backend.services.router_service import router_service, NO_BACKENDS
+from backend.config.settings import ERROR_MESSAGES, ROUTER_ADMIN_TOKEN, logger
+from backend.utils.request_validator import validate_prediction_payload, validate_batch_payload
+
+
+def _proxy_response(result):
+    """Resposta ao cliente com o status, o corpo e os cabeçalhos do nó"""
+    if result['error']:
+        response = jsonify({
+            'error': 'Serviço indisponível',
+            'message': ERROR_MESSAGES[NO_BACKENDS]
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+    response = jsonify(result['body'])
+    response.status_code = result['status']
+    response.headers.update(result['headers'])
+    return response
+
+
+def predict():
+    """Endpoint que encaminha uma predição única ao nó do comentário"""
+    try:
+        data = request.get_json(silent=True)
+        _, error = validate_prediction_payload(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
+
+        return _proxy_response(router_service.predict(data))
+
+    except Exception as e:
+        logger.error(f"Erro no roteamento de /predict: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
+
+
+def predict_batch():
+    """Endpoint que divide um lote entre os nós e recombina as respostas"""
+    try:
+        data = request.get_json(silent=True)
+        _, error = validate_batch_payload(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
+
+        return _proxy_response(router_service.predict_batch(data))
+
+    except Exception as e:
+        logger.error(f"Erro no roteamento de /predict/batch: {e}")
+        return jsonify({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }), 500
+
+
+def health_check():
+    """Health check do roteador: saudável se houver ao menos um nó no anel"""
+    stats = router_service.get_stats()
+    healthy = stats['healthy'] > 0
+    return jsonify({
+        'status': 'healthy' if healthy else 'unhealthy',
+        'nodes': len(stats['nodes']),
+        'healthy_nodes': stats['healthy'],
+        'timestamp': datetime.now().isoformat()
+    }), 200 if healthy else 503
+
+
+def nodes():
+    """Endpoint com os nós, a fatia do anel de cada um e os contadores do roteador"""
+    return jsonify(dict(router_service.get_stats(), timestamp=datetime.now().isoformat()))
+
+
+def _admin_error():
+    """
+    Verifica o token de administração (Authorization: Bearer).
+
+    Returns:
+        tuple: (corpo, status) do erro ou None se autorizado
+    """
+    if not ROUTER_ADMIN_TOKEN:
+        return jsonify({
+            'error': 'Operação desativada',
+            'message': ERROR_MESSAGES['ROUTER_ADMIN_DISABLED']
+        }), 403
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ROUTER_ADMIN_TOKEN.encode()):
+        return jsonify({
+            'error': 'Não autorizado',
+            'message': ERROR_MESSAGES['ROUTER_ADMIN_UNAUTHORIZED']
+        }), 401
+    return None
+
+
+def _node_url():
+    """URL do corpo {"url": ...} (ou None)"""
+    data = request.get_json(silent=True)
+    url = data.get('url') if isinstance(data, dict) else None
+    return url if isinstance(url, str) else None
+
+
+def add_node():
+    """Endpoint que registra um nó (entra no anel e recebe a sua fatia das chaves); exige o token"""
+    error = _admin_error()
+    if error:
+        return error
+    try:
+        added = router_service.add_node(_node_url())
+    except ValueError:
+        return jsonify({
+            'error': 'URL inválida',
+            'message': ERROR_MESSAGES['INVALID_NODE_URL']
+        }), 400
+    return jsonify(router_service.get_stats()), 201 if added else 200
+
+
+def remove_node():
+    """Endpoint que remove um nó (as chaves dele passam aos sucessores no anel); exige o token"""
+    error = _admin_error()
+    if error:
+        return error
+    if not router_service.remove_node(_node_url()):
+        return jsonify({
+            'error': 'Nó não encontrado',
+            'message': ERROR_MESSAGES['NODE_NOT_FOUND']
+        }), 404
+    return jsonify(router_service.get_stats())
@@ -0,0 +1,55 @@
+"""
+Faixas de prioridade das rotas de predição
+"""
+import functools
+from flask import g
+from backend.controllers.admission import _reject
+from backend.services.scheduler_service import scheduler_service, QUEUE_FULL, TIMEOUT
+from backend.config.settings import ERROR_MESSAGES, SCHEDULER
+from backend.utils.tracing import span
+
+
+def scheduled(view, lane):
+    """
+    Envolve uma rota com a fila da sua faixa de prioridade.
+
+    A rota só é executada quando o escalonador libera uma vaga na faixa; com
+    a fila cheia a resposta é 429 e, após o tempo máximo de espera, 503.
+
+    Args:
+        view: Função da rota
+        lane: Faixa da rota (INTERACTIVE ou BULK)
+
+    Returns:
+        function: Rota escalonada (a própria rota se SCHEDULER=0)
+    """
+    if not SCHEDULER:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with span('queue'):
+            decision = scheduler_service.acquire(lane)
+
+        if decision == QUEUE_FULL:
+            return _reject(429, 'Fila cheia', ERROR_MESSAGES['LANE_QUEUE_FULL'])
+        if decision == TIMEOUT:
+            return _reject(503, 'Tempo de espera excedido', ERROR_MESSAGES['QUEUE_TIMEOUT'])
+
+        g.lane = lane
+        try:
+            return view(*args, **kwargs)
+        finally:
+            scheduler_service.release(lane)
+
+    return wrapper
+
+
+def yield_to_interactive():
+    """
+    Ponto de pausa entre as partes de uma rota em lote: aguarda as predições
+    de maior prioridade em andamento (sem efeito fora de uma rota escalonada)
+    """
+    lane = g.get('lane')
+    if lane is not None:
+        scheduler_service.yield_to_higher(lane)
@@ -0,0 +1,27 @@
+"""
+Rastreamento das requisições do app Flask (cabeçalho Server-Timing)
+"""
+from flask import request, g
+from backend.config.settings import TRACING
+from backend.utils.tracing import start_trace, end_trace
+
+
+def start_request_trace():
+    """before_request: inicia o trace das rotas /api (se o rastreamento estiver ativo)"""
+    if TRACING and request.path.startswith('/api'):
+        g.trace_token = start_trace(f'{request.method} {request.path}')
+
+
+def finish_request_trace(response):
+    """after_request: finaliza o trace e devolve as durações em Server-Timing"""
+    token = g.pop('trace_token', None)
+    if token is not None:
+        response.headers['Server-Timing'] = end_trace(token).server_timing()
+    return response
+
+
+def discard_request_trace(error=None):
+    """teardown_request: descarta o trace de uma requisição que terminou sem resposta"""
+    token = g.pop('trace_token', None)
+    if token is not None:
+        end_trace(token)
@@ -0,0 +1,115 @@
+"""
+Serviço de controle de admissão (load shedding) das rotas de predição
+"""
+import threading
+from backend.config.settings import (
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_DEGRADE_IN_FLIGHT, ADMISSION_LATENCY_BUDGET_MS,
+    ADMISSION_DEGRADE_LATENCY_MS, ADMISSION_EWMA_ALPHA
+)
+
+# Decisões de admissão
+ACCEPT = 'accept'
+DEGRADE = 'degrade'
+REJECT_BUSY = 'reject_busy'          # 429: muitas requisições simultâneas
+REJECT_OVERLOADED = 'reject_overloaded'  # 503: latência recente acima do orçamento
+
+# Rota das requisições sem rota informada
+DEFAULT_ROUTE = 'default'
+
+
+class AdmissionService:
+    """
+    Decide se uma requisição deve ser aceita, atendida em modo degradado ou
+    rejeitada rapidamente, com base no trabalho em andamento e na latência
+    recente (média móvel exponencial).
+
+    O trabalho em andamento é somado entre as rotas; a latência é acompanhada
+    por rota, para que lotes e explicações lentos (ou esperando na faixa BULK)
+    não degradem nem rejeitem as predições únicas.
+    """
+
+    def __init__(self, max_in_flight=ADMISSION_MAX_IN_FLIGHT, degrade_in_flight=ADMISSION_DEGRADE_IN_FLIGHT,
+                 latency_budget_ms=ADMISSION_LATENCY_BUDGET_MS, degrade_latency_ms=ADMISSION_DEGRADE_LATENCY_MS,
+                 alpha=ADMISSION_EWMA_ALPHA):
+        self.max_in_flight = max_in_flight
+        self.degrade_in_flight = degrade_in_flight
+        self.latency_budget_ms = latency_budget_ms
+        self.degrade_latency_ms = degrade_latency_ms
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera o estado e os contadores"""
+        with self._lock:
+            self._in_flight = 0
+            self._route_in_flight = {}
+            self._latency_ewma_ms = {}
+            self._counts = {ACCEPT: 0, DEGRADE: 0, REJECT_BUSY: 0, REJECT_OVERLOADED: 0}
+
+    def acquire(self, cost=1, route=DEFAULT_ROUTE):
+        """
+        Tenta admitir uma requisição.
+
+        Args:
+            cost: Unidades de trabalho da requisição (lotes custam mais)
+            route: Rota cuja latência recente é considerada
+
+        Returns:
+            str: ACCEPT, DEGRADE, REJECT_BUSY ou REJECT_OVERLOADED. Para as
+            duas primeiras, release deve ser chamado ao final da requisição.
+        """
+        with self._lock:
+            # Sem trabalho em andamento a latência registrada está desatualizada:
+            # sempre admitir, para que a média volte a refletir o estado atual
+            idle = self._in_flight == 0
+            route_idle = self._route_in_flight.get(route, 0) == 0
+            latency_ms = self._latency_ewma_ms.get(route, 0.0)
+
+            if not idle and self._in_flight + cost > self.max_in_flight:
+                decision = REJECT_BUSY
+            elif not route_idle and latency_ms > self.latency_budget_ms:
+                decision = REJECT_OVERLOADED
+            elif (self._in_flight + cost > self.degrade_in_flight
+                  or latency_ms > self.degrade_latency_ms):
+                decision = DEGRADE
+            else:
+                decision = ACCEPT
+
+            self._counts[decision] += 1
+            if decision in (ACCEPT, DEGRADE):
+                self._in_flight += cost
+                self._route_in_flight[route] = self._route_in_flight.get(route, 0) + 1
+
+            return decision
+
+    def release(self, cost, latency_ms, route=DEFAULT_ROUTE):
+        """
+        Registra o fim de uma requisição admitida.
+
+        Args:
+            cost: Mesmo custo informado em acquire
+            latency_ms: Duração da requisição em milissegundos
+            route: Mesma rota informada em acquire
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - cost)
+            self._route_in_flight[route] = max(0, self._route_in_flight.get(route, 0) - 1)
+            previous = self._latency_ewma_ms.get(route, 0.0)
+            self._latency_ewma_ms[route] = previous + self.alpha * (latency_ms - previous)
+
+    def get_stats(self):
+        """Retorna o estado atual e os contadores de descarte"""
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'latency_ewma_ms': {route: round(ms, 3) for route, ms in self._latency_ewma_ms.items()},
+                'accepted': self._counts[ACCEPT],
+                'degraded': self._counts[DEGRADE],
+                'shed_429': self._counts[REJECT_BUSY],
+                'shed_503': self._counts[REJECT_OVERLOADED],
+            }
+
+
+# Instância singleton do serviço
+admission_service = AdmissionService()
@@ -0,0 +1,225 @@
+"""
+Vetorização TF-IDF em lote sem objetos Python por comentário
+"""
+import re
+import threading
+import numpy as np
+from scipy.sparse import csr_matrix
+from backend.services.linear_scorer import CompactLinearModel
+
+# Separador entre documentos no texto concatenado do lote. Textos processados
+# não contêm espaços dentro das palavras, então o separador vira um token próprio
+DOCUMENT_SEPARATOR = '\x00'
+SEPARATOR_COLUMN = -2
+UNKNOWN_COLUMN = -1
+
+# Caracteres ASCII que não são \w nem espaço para str.split(): palavras com
+# eles (ou com caracteres não ASCII) precisam do token_pattern
+_SPECIAL_ASCII_RE = re.compile('[\x01-\x08\x0e-\x1b\x7f]')
+
+
+class BatchVectorizer:
+    """
+    Vetoriza lotes de textos já processados (preprocess_text) com o
+    vocabulário e o IDF do modelo servido, montando indptr/indices/data
+    diretamente em buffers NumPy.
+
+    Cada parte do lote (chunk_size textos) é concatenada e tokenizada de uma
+    vez; o mapeamento token -> coluna, a contagem de termos, o IDF e a
+    normalização L2 são operações vetorizadas.
+    Colunas a partir de n_output participam apenas da norma (termos de norma
+    do CompactLinearModel) e são removidas da matriz final.
+
+    Os buffers de saída são mantidos por thread e reutilizados entre lotes:
+    a matriz retornada por transform é válida até a próxima chamada na mesma
+    thread (use copy=True para mantê-la).
+
+    dtype é o tipo dos valores TF-IDF (float32 para os modelos compactos de
+    precisão reduzida).
+    """
+
+    def __init__(self, vocabulary, idf, n_output=None, token_pattern=r"(?u)\b\w\w+\b",
+                 initial_capacity=65536, chunk_size=2048, dtype=np.float64):
+        self.vocabulary = vocabulary
+        self._lookup = dict(vocabulary)
+        self._lookup[DOCUMENT_SEPARATOR] = SEPARATOR_COLUMN
+        self.dtype = np.dtype(dtype)
+        self.idf = np.asarray(idf, dtype=self.dtype)
+        self.n_output = len(self.idf) if n_output is None else n_output
+        self.initial_capacity = initial_capacity
+        self.chunk_size = chunk_size
+        self._token_re = re.compile(token_pattern)
+        self._buffers = threading.local()
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Cria o vetorizador a partir do modelo servido.
+
+        Args:
+            model: Pipeline TF-IDF (unigramas) + classificador ou CompactLinearModel
+
+        Returns:
+            BatchVectorizer ou None se o modelo não for suportado
+        """
+        if isinstance(model, CompactLinearModel):
+            # Termos de norma ocupam colunas após as ativas
+            n_active = len(model.vocabulary)
+            vocabulary = dict(model.vocabulary)
+            norm_tokens = list(model.norm_vocabulary.items())
+            for offset, (token, _) in enumerate(norm_tokens):
+                vocabulary[token] = n_active + offset
+            idf = np.concatenate([
+                model.idf,
+                model.norm_idf[np.array([group for _, group in norm_tokens], dtype=np.intp)]
+            ]) if norm_tokens else model.idf
+            return cls(vocabulary, idf, n_output=n_active, token_pattern=model.token_pattern,
+                       dtype=model.compute_dtype)
+
+        steps = getattr(model, 'steps', None)
+        if not isinstance(steps, list) or not hasattr(steps[0][1], 'vocabulary_'):
+            return None
+
+        vectorizer = steps[0][1]
+        params = vectorizer.get_params()
+        token_pattern = params['token_pattern']
+        if getattr(params['analyzer'], 'token_pattern', None):
+            # FastAnalyzer instalado: mesmo padrão do analisador original
+            token_pattern = params['analyzer'].token_pattern
+        elif params['analyzer'] != 'word':
+            return None
+
+        if (params['ngram_range'] != (1, 1) or params['tokenizer'] is not None
+                or params['preprocessor'] is not None or params['strip_accents'] is not None
+                or params['norm'] != 'l2' or params['sublinear_tf'] or params['binary']
+                or not params['use_idf']):
+            return None
+
+        return cls(vectorizer.vocabulary_, vectorizer.idf_, token_pattern=token_pattern)
+
+    def _get_buffers(self, n_rows):
+        """Retorna os buffers da thread atual, com indptr para n_rows linhas"""
+        buffers = self._buffers
+        if getattr(buffers, 'indices', None) is None:
+            buffers.indices = np.empty(self.initial_capacity, dtype=np.int32)
+            buffers.data = np.empty(self.initial_capacity, dtype=self.dtype)
+        if getattr(buffers, 'indptr', None) is None or buffers.indptr.size < n_rows + 1:
+            buffers.indptr = np.empty(max(1024, 2 * (n_rows + 1)), dtype=np.int32)
+        return buffers
+
+    def _reserve(self, buffers, used, nnz):
+        """Amplia indices/data para nnz elementos, preservando os used primeiros"""
+        if buffers.indices.size >= nnz:
+            return
+        capacity = 2 * nnz
+        indices = np.empty(capacity, dtype=np.int32)
+        data = np.empty(capacity, dtype=self.dtype)
+        indices[:used] = buffers.indices[:used]
+        data[:used] = buffers.data[:used]
+        buffers.indices, buffers.data = indices, data
+
+    def _lookup_columns(self, texts):
+        """
+        Tokeniza o lote inteiro e mapeia cada token para (documento, coluna).
+
+        Returns:
+            tuple: (documentos, colunas) como arrays NumPy, apenas de tokens do vocabulário
+        """
+        joined = (' ' + DOCUMENT_SEPARATOR + ' ').join(texts)
+        if joined.count(DOCUMENT_SEPARATOR) != len(texts) - 1:
+            texts = [text.replace(DOCUMENT_SEPARATOR, ' ') for text in texts]
+            joined = (' ' + DOCUMENT_SEPARATOR + ' ').join(texts)
+
+        words = joined.split()
+        lookup = self._lookup.get
+        columns = np.fromiter(
+            (lookup(word, UNKNOWN_COLUMN) for word in words), dtype=np.int64, count=len(words)
+        )
+        documents = np.cumsum(columns == SEPARATOR_COLUMN)
+
+        # Palavras fora do vocabulário com caracteres especiais (acentos, emojis,
+        # pontuação Unicode) podem conter tokens do vocabulário: aplicar o
+        # token_pattern apenas a elas, e só se o lote tiver algum desses caracteres
+        extra_documents, extra_columns = [], []
+        if not joined.isascii() or _SPECIAL_ASCII_RE.search(joined):
+            for i in np.flatnonzero(columns == UNKNOWN_COLUMN):
+                word = words[i]
+                if word.isascii() and word.isalnum():
+                    continue
+                for token in self._token_re.findall(word):
+                    column = self.vocabulary.get(token)
+                    if column is not None:
+                        extra_documents.append(documents[i])
+                        extra_columns.append(column)
+
+        known = columns >= 0
+        documents, columns = documents[known], columns[known]
+        if extra_columns:
+            documents = np.concatenate([documents, np.asarray(extra_documents, dtype=documents.dtype)])
+            columns = np.concatenate([columns, np.asarray(extra_columns, dtype=np.int64)])
+
+        return documents, columns
+
+    def transform(self, texts, copy=False):
+        """
+        Vetoriza um lote de textos processados.
+
+        Args:
+            texts: Lista de textos (saída de preprocess_text)
+            copy: Copia a matriz para fora dos buffers reutilizados
+
+        Returns:
+            csr_matrix: TF-IDF normalizado (n_textos x n_output)
+        """
+        n_rows = len(texts)
+        if n_rows == 0:
+            return csr_matrix((0, self.n_output), dtype=self.dtype)
+
+        buffers = self._get_buffers(n_rows)
+        indptr = buffers.indptr[:n_rows + 1]
+        indptr[0] = 0
+        nnz = 0
+
+        # Partes de tamanho fixo limitam a memória temporária (palavras e chaves)
+        for start in range(0, n_rows, self.chunk_size):
+            chunk = texts[start:start + self.chunk_size]
+            rows, columns, values = self._vectorize_chunk(chunk)
+
+            self._reserve(buffers, nnz, nnz + len(values))
+            buffers.indices[nnz:nnz + len(values)] = columns
+            buffers.data[nnz:nnz + len(values)] = values
+            indptr[start + 1:start + len(chunk) + 1] = np.bincount(rows, minlength=len(chunk))
+            nnz += len(values)
+
+        np.cumsum(indptr, out=indptr)
+
+        # Atribuição direta: o construtor copiaria fatias pequenas de buffers grandes
+        X = csr_matrix((n_rows, self.n_output), dtype=self.dtype)
+        X.data, X.indices, X.indptr = buffers.data[:nnz], buffers.indices[:nnz], indptr
+        return X.copy() if copy else X
+
+    def _vectorize_chunk(self, texts):
+        """
+        Calcula os valores TF-IDF normalizados de uma parte do lote.
+
+        Returns:
+            tuple: (linhas, colunas, valores) ordenados por linha e coluna
+        """
+        documents, columns = self._lookup_columns(texts)
+
+        # Frequência de cada (documento, coluna): chaves ordenadas por linha e coluna
+        n_columns = len(self.idf)
+        keys, term_counts = np.unique(documents * n_columns + columns, return_counts=True)
+        rows = keys // n_columns
+        columns = keys - rows * n_columns
+
+        values = np.multiply(term_counts, self.idf[columns], dtype=self.dtype)
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        values /= norms[rows]
+
+        # Remover colunas usadas apenas na norma
+        if self.n_output < n_columns:
+            output = columns < self.n_output
+            rows, columns, values = rows[output], columns[output], values[output]
+
+        return rows, columns, values
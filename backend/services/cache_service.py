@@ -0,0 +1,282 @@
+"""
+Cache de resultados de predição em dois níveis
+
+O primeiro nível é um LRU em memória, exclusivo de cada worker. O segundo,
+opcional, é um banco SQLite em disco compartilhado por todos os workers do
+nó (modo WAL: leituras concorrentes e escritas serializadas), que também
+sobrevive a reinícios.
+
+As chaves são hashes do texto preprocessado com a versão do modelo: uma
+recarga com outro modelo invalida os dois níveis automaticamente.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from backend.config.settings import (
+    CACHE_SIZE, CACHE_SHARED_PATH, CACHE_SHARED_MAX_ENTRIES, CACHE_SHARED_TIMEOUT, logger
+)
+from backend.utils.memory_profile import deep_sizeof
+
+# Limite de parâmetros por consulta (SQLITE_MAX_VARIABLE_NUMBER em versões antigas)
+SQLITE_MAX_VARIABLES = 999
+
+
+def cache_key(version, processed_text):
+    """
+    Calcula a chave de cache de um texto para uma versão do modelo.
+
+    Args:
+        version: Versão (impressão digital) do modelo servido
+        processed_text: Texto já processado por preprocess_text
+
+    Returns:
+        bytes: Hash de 16 bytes
+    """
+    return hashlib.blake2b(f"{version}\x00{processed_text}".encode(), digest_size=16).digest()
+
+
+class SharedCacheTier:
+    """
+    Nível de cache compartilhado entre processos em um arquivo SQLite.
+
+    Cada thread de cada processo abre a sua própria conexão no primeiro uso:
+    conexões SQLite não podem atravessar um fork (gunicorn --preload cria o
+    ModelService antes dos workers). Erros do banco (arquivo bloqueado,
+    disco cheio) nunca interrompem a predição: a consulta vira um miss e a
+    escrita é descartada.
+    """
+
+    # Intervalo de escritas entre verificações do limite de entradas
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, path, max_entries=CACHE_SHARED_MAX_ENTRIES, timeout=CACHE_SHARED_TIMEOUT):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Valida o arquivo e cria a tabela sem manter a conexão (aberta de novo em cada processo)
+        self._open().close()
+
+    def _open(self):
+        """Abre uma conexão, criando a tabela se necessário"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+        return connection
+
+    def _connect(self):
+        """Retorna a conexão da thread atual neste processo (aberta no primeiro uso)"""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            # Conexão herdada de outro processo (fork) não é reutilizada
+            self._local.connection = self._open()
+            self._local.pid = pid
+        return self._local.connection
+
+    def get_many(self, keys):
+        """
+        Busca várias chaves com uma consulta por bloco de SQLITE_MAX_VARIABLES.
+
+        Returns:
+            dict: Valores encontrados, por chave
+        """
+        found = {}
+        try:
+            connection = self._connect()
+            for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ','.join('?' * len(chunk))
+                rows = connection.execute(f"SELECT key, value FROM results WHERE key IN ({placeholders})", chunk)
+                found.update((key, json.loads(value)) for key, value in rows)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache compartilhado indisponível (leitura): {e}")
+        return found
+
+    def put_many(self, items):
+        """Grava vários pares (chave, valor) em uma única transação"""
+        if not items:
+            return
+        now = time.time()
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                    [(key, json.dumps(value), now) for key, value in items]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache compartilhado indisponível (escrita): {e}")
+            return
+
+        with self._lock:
+            self._writes += len(items)
+            prune = self._writes >= self.PRUNE_INTERVAL
+            if prune:
+                self._writes = 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Remove as entradas mais antigas além de max_entries"""
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                (count,) = connection.execute("SELECT COUNT(*) FROM results").fetchone()
+                if count > self.max_entries:
+                    connection.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY created LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Falha ao limpar o cache compartilhado: {e}")
+
+    def clear(self):
+        """Remove todas as entradas"""
+        self._connect().execute("DELETE FROM results")
+
+    def close(self):
+        """Fecha a conexão da thread atual"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class ResultCache:
+    """
+    Cache de resultados por texto preprocessado e versão do modelo.
+
+    Os valores são dicionários serializáveis em JSON (classe prevista e
+    dados de confiança). Consultas passam primeiro pelo LRU local; acertos
+    no nível compartilhado são promovidos para o LRU.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, shared_path=CACHE_SHARED_PATH):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.shared = None
+        if shared_path:
+            try:
+                self.shared = SharedCacheTier(shared_path)
+                logger.info(f"✅ Cache compartilhado ativado: {shared_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache compartilhado desativado: {e}")
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera os contadores"""
+        with self._lock:
+            self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def get_many(self, version, texts):
+        """
+        Busca os resultados de vários textos (lotes: uma consulta ao nível compartilhado).
+
+        Args:
+            version: Versão do modelo servido
+            texts: Textos já processados
+
+        Returns:
+            list: Valor em cache ou None para cada texto
+        """
+        keys = [cache_key(version, text) for text in texts]
+        values = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    values[index] = value
+                else:
+                    missing.append(index)
+            self._stats['local_hits'] += len(keys) - len(missing)
+
+        if missing and self.shared is not None:
+            found = self.shared.get_many([keys[index] for index in missing])
+            if found:
+                with self._lock:
+                    for key, value in found.items():
+                        self._store(key, value)
+                still_missing = []
+                for index in missing:
+                    value = found.get(keys[index])
+                    if value is not None:
+                        values[index] = value
+                    else:
+                        still_missing.append(index)
+                with self._lock:
+                    self._stats['shared_hits'] += len(missing) - len(still_missing)
+                missing = still_missing
+
+        with self._lock:
+            self._stats['misses'] += len(missing)
+
+        return values
+
+    def put_many(self, version, texts, values):
+        """Armazena os resultados de vários textos nos dois níveis"""
+        items = [(cache_key(version, text), value) for text, value in zip(texts, values)]
+        with self._lock:
+            for key, value in items:
+                self._store(key, value)
+        if self.shared is not None:
+            self.shared.put_many(items)
+
+    def get(self, version, text):
+        """Busca o resultado de um texto (ou None)"""
+        return self.get_many(version, [text])[0]
+
+    def put(self, version, text, value):
+        """Armazena o resultado de um texto"""
+        self.put_many(version, [text], [value])
+
+    def _store(self, key, value):
+        """Insere no LRU local, removendo as entradas menos usadas (com o lock adquirido)"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def memory_usage(self):
+        """Memória aproximada do LRU local em bytes"""
+        with self._lock:
+            size = sys.getsizeof(self._entries)
+            items = list(self._entries.items())
+        seen = set()
+        return size + sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in items)
+
+    def clear(self):
+        """Esvazia o LRU local"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Retorna o tamanho do LRU e os contadores de acertos"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_size'] = len(self._entries)
+        stats['shared'] = self.shared.path if self.shared is not None else None
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
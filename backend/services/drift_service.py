@@ -0,0 +1,578 @@
+"""
+Monitoramento de drift do tráfego de predição
+
+Por janela de tempo (DRIFT_WINDOW segundos), cada worker mantém um sketch do
+tráfego: contagens de rótulos e histogramas de bordas fixas da margem da
+decision function, do tamanho dos comentários (caracteres do texto bruto) e da
+fração de tokens fora do vocabulário. Como as bordas são as mesmas em todos os
+workers e na referência, combinar sketches é somar contagens: o resultado é
+idêntico ao de um único sketch com todo o tráfego, e a memória não depende do
+volume (apenas DRIFT_MAX_WINDOWS janelas são mantidas).
+
+A comparação com a referência (calculada no hate.csv por
+backend/tools/drift_baseline.py) usa a diferença da taxa de discurso de ódio e
+o PSI (population stability index) de cada histograma.
+"""
+import json
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
+from backend.config.settings import (
+    DRIFT, DRIFT_WINDOW, DRIFT_MAX_WINDOWS, DRIFT_SHARED_PATH, DRIFT_FLUSH_INTERVAL, DRIFT_OOV_SAMPLE,
+    CACHE_SHARED_TIMEOUT,
+    HATE_SPEECH_CLASS, logger
+)
+from backend.services.linear_scorer import CompactLinearModel
+
+# Bordas dos histogramas. Valores abaixo da primeira ou acima da última borda
+# são contados em underflow/overflow
+MARGIN_EDGES = np.round(np.linspace(-4.0, 4.0, 81), 2)
+LENGTH_EDGES = np.array([0, 1, 2, 4, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256,
+                         384, 512, 768, 1024, 1536, 2048, 3072, 4096], dtype=np.float64)
+OOV_EDGES = np.round(np.linspace(0.0, 1.0, 21), 2)
+HISTOGRAM_EDGES = OrderedDict([('margin', MARGIN_EDGES), ('length', LENGTH_EDGES), ('oov_ratio', OOV_EDGES)])
+
+# A confiança é arredondada em 2 casas: 100.00 corresponde a |margem| >= ~9.9
+CONFIDENCE_CLIP = 0.99995
+MIN_MARGIN = 1e-9
+
+# Fração mínima por faixa no PSI (evita log de zero em faixas vazias)
+PSI_EPSILON = 1e-4
+
+
+class Histogram:
+    """
+    Histograma de bordas fixas com contagens de underflow e overflow.
+
+    As contagens ficam em uma lista e cada valor é localizado com bisect: as
+    predições chegam de uma em uma ou em lotes pequenos, tamanhos em que o
+    custo fixo das chamadas NumPy dominaria.
+    """
+
+    __slots__ = ('edges', '_bounds', 'counts', 'underflow', 'overflow', 'total')
+
+    def __init__(self, edges):
+        self.edges = edges
+        self._bounds = edges.tolist()
+        self.counts = [0] * (len(edges) - 1)
+        self.underflow = 0
+        self.overflow = 0
+        self.total = 0.0
+
+    @property
+    def count(self):
+        """Quantidade de valores registrados"""
+        return sum(self.counts) + self.underflow + self.overflow
+
+    def add(self, values):
+        """Registra valores (NaN é ignorado; a última borda é inclusiva, como em np.histogram)"""
+        bounds, counts = self._bounds, self.counts
+        low, high, last = bounds[0], bounds[-1], len(counts) - 1
+        for value in values:
+            if value != value:
+                continue
+            if value < low:
+                self.underflow += 1
+            elif value > high:
+                self.overflow += 1
+            else:
+                counts[min(bisect_right(bounds, value) - 1, last)] += 1
+            self.total += float(value)
+
+    def merge(self, other):
+        """Soma as contagens de outro histograma com as mesmas bordas"""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histogramas com bordas diferentes não podem ser combinados")
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.total += other.total
+
+    def quantile(self, q):
+        """Quantil aproximado (interpolação linear dentro da faixa), ou None se vazio"""
+        count = self.count
+        if not count:
+            return None
+        target = q * count
+        cumulative = self.underflow
+        if target <= cumulative:
+            return float(self.edges[0])
+        for index, bin_count in enumerate(self.counts):
+            if bin_count and cumulative + bin_count >= target:
+                low, high = self.edges[index], self.edges[index + 1]
+                return float(low + (high - low) * (target - cumulative) / bin_count)
+            cumulative += bin_count
+        return float(self.edges[-1])
+
+    def fractions(self):
+        """Frações por faixa, com underflow e overflow nas pontas"""
+        counts = np.concatenate(([self.underflow], self.counts, [self.overflow])).astype(np.float64)
+        return counts / counts.sum()
+
+    def summary(self):
+        """Quantidade, média e quantis"""
+        count = self.count
+        return {
+            'count': count,
+            'mean': round(self.total / count, 4) if count else None,
+            **{name: round(value, 4) if value is not None else None
+               for name, value in (('p50', self.quantile(0.5)), ('p90', self.quantile(0.9)),
+                                   ('p99', self.quantile(0.99)))},
+        }
+
+    def to_dict(self):
+        """Contagens serializáveis em JSON (as bordas ficam em HISTOGRAM_EDGES)"""
+        return {
+            'counts': list(self.counts),
+            'underflow': self.underflow,
+            'overflow': self.overflow,
+            'sum': self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, edges, data):
+        """Reconstrói um histograma a partir de to_dict"""
+        histogram = cls(edges)
+        counts = [int(count) for count in data['counts']]
+        if len(counts) != len(histogram.counts):
+            raise ValueError("Quantidade de faixas diferente das bordas")
+        histogram.counts = counts
+        histogram.underflow = int(data['underflow'])
+        histogram.overflow = int(data['overflow'])
+        histogram.total = float(data['sum'])
+        return histogram
+
+
+def psi(expected, actual):
+    """
+    Population stability index entre dois histogramas (None se algum estiver vazio).
+
+    Referência usual: < 0.1 estável, 0.1 a 0.25 mudança moderada, > 0.25 drift.
+    """
+    if not expected.count or not actual.count:
+        return None
+    expected_fractions = np.maximum(expected.fractions(), PSI_EPSILON)
+    actual_fractions = np.maximum(actual.fractions(), PSI_EPSILON)
+    return round(float(np.sum((actual_fractions - expected_fractions)
+                              * np.log(actual_fractions / expected_fractions))), 4)
+
+
+class DriftSketch:
+    """Sketch do tráfego de uma janela: contagens de rótulos e histogramas"""
+
+    def __init__(self, start=None):
+        self.start = start
+        self.labels = {'hate': 0, 'not_hate': 0}
+        self.histograms = OrderedDict((name, Histogram(edges)) for name, edges in HISTOGRAM_EDGES.items())
+
+    @property
+    def count(self):
+        """Quantidade de predições registradas"""
+        return self.labels['hate'] + self.labels['not_hate']
+
+    def add(self, is_hate, lengths, margins=None, oov_ratios=None):
+        """
+        Registra predições.
+
+        Args:
+            is_hate: Booleanos (discurso de ódio) por predição
+            lengths: Tamanhos dos comentários
+            margins: Margens da decision function (NaN se indisponível)
+            oov_ratios: Frações de tokens fora do vocabulário (NaN se sem tokens)
+        """
+        hate = sum(1 for value in is_hate if value)
+        self.labels['hate'] += hate
+        self.labels['not_hate'] += len(is_hate) - hate
+        self.histograms['length'].add(lengths)
+        if margins is not None:
+            self.histograms['margin'].add(margins)
+        if oov_ratios is not None:
+            self.histograms['oov_ratio'].add(oov_ratios)
+
+    def merge(self, other):
+        """Soma outro sketch a este"""
+        for label, count in other.labels.items():
+            self.labels[label] += count
+        for name, histogram in self.histograms.items():
+            histogram.merge(other.histograms[name])
+        return self
+
+    def copy(self):
+        """Cópia independente do sketch"""
+        return DriftSketch.from_dict(self.to_dict())
+
+    def hate_rate(self):
+        """Fração de predições de discurso de ódio (None se vazio)"""
+        return self.labels['hate'] / self.count if self.count else None
+
+    def compare(self, baseline):
+        """Diferença da taxa de ódio e PSI de cada histograma em relação à referência"""
+        rate, baseline_rate = self.hate_rate(), baseline.hate_rate()
+        return {
+            'hate_rate_delta': round(rate - baseline_rate, 4) if rate is not None and baseline_rate is not None else None,
+            'psi': {name: psi(baseline.histograms[name], histogram) for name, histogram in self.histograms.items()},
+        }
+
+    def summary(self, baseline=None):
+        """Resumo do sketch e, com uma referência, a comparação com ela"""
+        rate = self.hate_rate()
+        summary = {
+            'count': self.count,
+            'hate_rate': round(rate, 4) if rate is not None else None,
+            **{name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+        if self.start is not None:
+            summary['start'] = datetime.fromtimestamp(self.start).isoformat()
+        if baseline is not None:
+            summary['drift'] = self.compare(baseline)
+        return summary
+
+    def to_dict(self):
+        """Sketch serializável em JSON (combinável por DriftSketch.merge após from_dict)"""
+        return {
+            'start': self.start,
+            'labels': dict(self.labels),
+            **{name: histogram.to_dict() for name, histogram in self.histograms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstrói um sketch a partir de to_dict"""
+        sketch = cls(data.get('start'))
+        sketch.labels = {'hate': int(data['labels']['hate']), 'not_hate': int(data['labels']['not_hate'])}
+        for name, edges in HISTOGRAM_EDGES.items():
+            sketch.histograms[name] = Histogram.from_dict(edges, data[name])
+        return sketch
+
+
+def signed_margins(predictions, confidences):
+    """
+    Margens da decision function recuperadas da confiança (sigmoide de |margem|)
+    e do rótulo previsto: positivas para "não é ódio", como a decision function.
+
+    Returns:
+        list: Margens (NaN para confianças que não vêm da decision function)
+    """
+    margins = [math.nan] * len(predictions)
+    for index, (prediction, confidence_data) in enumerate(zip(predictions, confidences)):
+        if confidence_data['method'] != 'decision_function':
+            continue
+        probability = min(confidence_data['confidence'] / 100, CONFIDENCE_CLIP)
+        # Confiança 50.00 (margem arredondada para 0): o rótulo decide o lado da fronteira
+        margin = max(math.log(probability / (1 - probability)), MIN_MARGIN)
+        margins[index] = -margin if int(prediction) == HATE_SPEECH_CLASS else margin
+    return margins
+
+
+def vocabulary_tokens(vectorizer):
+    """Tokens do vocabulário de um vetorizador TF-IDF ou CompactLinearModel"""
+    if isinstance(vectorizer, CompactLinearModel):
+        return frozenset(vectorizer.vocabulary) | frozenset(vectorizer.norm_vocabulary)
+    return frozenset(vectorizer.vocabulary_)
+
+
+def oov_ratios(analyzer, vocabulary, processed_texts):
+    """
+    Fração de tokens fora do vocabulário por texto.
+
+    Returns:
+        list: Frações (NaN para textos sem tokens após as stop words)
+    """
+    ratios = []
+    for text in processed_texts:
+        tokens = analyzer(text)
+        ratios.append(sum(token not in vocabulary for token in tokens) / len(tokens) if tokens else math.nan)
+    return ratios
+
+
+def baseline_document(sketch, source, comments, model_version):
+    """Conteúdo do arquivo de referência (DRIFT_BASELINE_PATH)"""
+    return {
+        'created': datetime.now().isoformat(),
+        'source': source,
+        'comments': comments,
+        'model_version': model_version,
+        'edges': {name: edges.tolist() for name, edges in HISTOGRAM_EDGES.items()},
+        'sketch': sketch.to_dict(),
+    }
+
+
+class SharedSketchStore:
+    """
+    Sketches de todos os workers do nó em um arquivo SQLite.
+
+    Cada worker grava o sketch acumulado de cada janela (uma linha por worker
+    e janela); a leitura combina as linhas. Erros do banco nunca interrompem
+    a predição: a escrita é descartada e a leitura volta vazia.
+    """
+
+    def __init__(self, path, timeout=CACHE_SHARED_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        """Retorna a conexão da thread atual, criando a tabela se necessário"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sketches (worker TEXT NOT NULL, start INTEGER NOT NULL, "
+                "data TEXT NOT NULL, PRIMARY KEY (worker, start))"
+            )
+            self._local.connection = connection
+        return connection
+
+    def publish(self, worker, sketches, oldest):
+        """Grava os sketches de um worker e remove as janelas anteriores a oldest"""
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO sketches (worker, start, data) VALUES (?, ?, ?)",
+                    [(worker, start, json.dumps(data)) for start, data in sketches.items()]
+                )
+                connection.execute("DELETE FROM sketches WHERE start < ?", (oldest,))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Sketches de drift compartilhados indisponíveis (escrita): {e}")
+
+    def read(self, oldest):
+        """
+        Lê os sketches das janelas a partir de oldest.
+
+        Returns:
+            list: (worker, DriftSketch)
+        """
+        try:
+            rows = self._connect().execute("SELECT worker, data FROM sketches WHERE start >= ?", (oldest,)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Sketches de drift compartilhados indisponíveis (leitura): {e}")
+            return []
+        return [(worker, DriftSketch.from_dict(json.loads(data))) for worker, data in rows]
+
+
+class DriftMonitor:
+    """
+    Sketches do tráfego por janela de tempo e comparação com a referência.
+
+    Seguro para uso concorrente. Com um SharedSketchStore, as janelas
+    alteradas são publicadas a cada flush_interval segundos e o relatório
+    combina as de todos os workers.
+    """
+
+    def __init__(self, enabled=DRIFT, window=DRIFT_WINDOW, max_windows=DRIFT_MAX_WINDOWS,
+                 shared_path=DRIFT_SHARED_PATH, flush_interval=DRIFT_FLUSH_INTERVAL, oov_sample=DRIFT_OOV_SAMPLE):
+        self.enabled = enabled
+        self.window = window
+        self.max_windows = max_windows
+        self.flush_interval = flush_interval
+        self.oov_sample = oov_sample
+        self._windows = OrderedDict()
+        self._dirty = set()
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._vocabulary_source = None
+        self._analyzer = None
+        self._vocabulary = None
+        self.baseline = None
+        self.baseline_info = None
+        self.shared = None
+        if enabled and shared_path:
+            try:
+                self.shared = SharedSketchStore(shared_path)
+                logger.info(f"✅ Sketches de drift compartilhados: {shared_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Sketches de drift compartilhados desativados: {e}")
+
+    @staticmethod
+    def worker_id():
+        """Identificador do processo (calculado a cada uso: muda após um fork)"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _window_start(self, now):
+        """Início da janela que contém o instante now"""
+        return int(now // self.window * self.window)
+
+    def _oldest_start(self, now):
+        """Início da janela mais antiga mantida"""
+        return self._window_start(now) - (self.max_windows - 1) * self.window
+
+    def load_baseline(self, path, model_version=None):
+        """
+        Carrega a referência gravada por backend/tools/drift_baseline.py.
+
+        Args:
+            path: Arquivo de referência
+            model_version: Versão do modelo servido (para indicar se a referência é do mesmo modelo)
+        """
+        self.baseline = None
+        self.baseline_info = None
+        if not os.path.exists(path):
+            logger.info(f"ℹ️ Referência de drift não encontrada: {path}")
+            return
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            for name, edges in HISTOGRAM_EDGES.items():
+                if not np.array_equal(np.asarray(data['edges'][name], dtype=np.float64), edges):
+                    raise ValueError(f"bordas de '{name}' diferentes das atuais")
+            self.baseline = DriftSketch.from_dict(data['sketch'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Referência de drift ignorada: {e}")
+            return
+
+        self.baseline_info = {
+            'path': path,
+            'source': data.get('source'),
+            'comments': data.get('comments'),
+            'created': data.get('created'),
+            'model_version': data.get('model_version'),
+            'matches_model': model_version is not None and data.get('model_version') == model_version,
+        }
+        if not self.baseline_info['matches_model']:
+            logger.warning("⚠️ A referência de drift foi calculada com outro modelo: margens não comparáveis")
+        else:
+            logger.info(f"✅ Referência de drift carregada ({self.baseline.count} comentários)")
+
+    def _oov_ratios(self, scorer, processed_texts):
+        """
+        Fração de tokens fora do vocabulário de uma amostra dos textos (None sem scorer linear).
+
+        A fração exige tokenizar o texto de novo, o que custaria uma fração
+        relevante de um lote: apenas textos igualmente espaçados, no máximo
+        cerca de oov_sample por chamada, entram no histograma.
+        """
+        if scorer is None:
+            return None
+        if scorer is not self._vocabulary_source:
+            self._analyzer = scorer.vectorizer.build_analyzer()
+            self._vocabulary = vocabulary_tokens(scorer.vectorizer)
+            self._vocabulary_source = scorer
+        step = max(1, len(processed_texts) // self.oov_sample)
+        return oov_ratios(self._analyzer, self._vocabulary, processed_texts[::step])
+
+    def observe(self, scorer, processed_texts, lengths, predictions, confidences):
+        """
+        Registra predições na janela atual.
+
+        Args:
+            scorer: LinearScorer do modelo servido (ou None)
+            processed_texts: Textos processados por preprocess_text
+            lengths: Tamanhos dos comentários brutos
+            predictions: Classes previstas
+            confidences: Dados de confiança (como em ModelService._build_result)
+        """
+        if not self.enabled:
+            return
+        try:
+            is_hate = [int(prediction) == HATE_SPEECH_CLASS for prediction in predictions]
+            margins = signed_margins(predictions, confidences)
+            ratios = self._oov_ratios(scorer, processed_texts)
+
+            now = time.time()
+            pending = None
+            with self._lock:
+                start = self._window_start(now)
+                sketch = self._windows.get(start)
+                if sketch is None:
+                    sketch = self._windows[start] = DriftSketch(start)
+                    while len(self._windows) > self.max_windows:
+                        self._dirty.discard(self._windows.popitem(last=False)[0])
+                sketch.add(is_hate, lengths, margins, ratios)
+                self._dirty.add(start)
+                if self.shared is not None and now - self._last_flush >= self.flush_interval:
+                    pending = self._take_dirty(now)
+            if pending is not None:
+                self.shared.publish(self.worker_id(), pending, self._oldest_start(now))
+        except Exception as e:
+            # O monitoramento nunca interrompe a predição
+            logger.warning(f"⚠️ Falha ao registrar sketches de drift: {e}")
+
+    def _take_dirty(self, now):
+        """Serializa as janelas alteradas desde a última publicação (com o lock adquirido)"""
+        pending = {start: self._windows[start].to_dict() for start in self._dirty if start in self._windows}
+        self._dirty.clear()
+        self._last_flush = now
+        return pending
+
+    def flush(self):
+        """Publica imediatamente as janelas alteradas no SQLite compartilhado"""
+        if self.shared is None:
+            return
+        now = time.time()
+        with self._lock:
+            pending = self._take_dirty(now)
+        if pending:
+            self.shared.publish(self.worker_id(), pending, self._oldest_start(now))
+
+    def snapshot(self, windows=None):
+        """
+        Relatório das janelas mantidas (combinadas entre os workers, se compartilhadas).
+
+        Args:
+            windows: Quantidade de janelas mais recentes (padrão: todas)
+
+        Returns:
+            dict: Janelas (resumo e sketch combinável), total, referência e comparação
+        """
+        if not self.enabled:
+            return {'enabled': False}
+
+        now = time.time()
+        oldest = self._oldest_start(now)
+        with self._lock:
+            merged = {start: sketch.copy() for start, sketch in self._windows.items() if start >= oldest}
+
+        worker_id = self.worker_id()
+        workers = {worker_id}
+        if self.shared is not None:
+            self.flush()
+            for worker, sketch in self.shared.read(oldest):
+                # As janelas deste worker já vêm da memória (mais recentes que as publicadas)
+                if worker == worker_id:
+                    continue
+                workers.add(worker)
+                if sketch.start in merged:
+                    merged[sketch.start].merge(sketch)
+                else:
+                    merged[sketch.start] = sketch
+
+        starts = sorted(merged)
+        if windows is not None:
+            starts = starts[-windows:]
+        total = DriftSketch()
+        for start in starts:
+            total.merge(merged[start])
+
+        baseline = self.baseline
+        return {
+            'enabled': True,
+            'window_seconds': self.window,
+            'max_windows': self.max_windows,
+            'workers': len(workers),
+            'shared': self.shared.path if self.shared is not None else None,
+            'edges': {name: edges.tolist() for name, edges in HISTOGRAM_EDGES.items()},
+            'windows': [dict(merged[start].summary(baseline), sketch=merged[start].to_dict()) for start in starts],
+            'total': total.summary(baseline),
+            'baseline': dict(self.baseline_info, summary=baseline.summary()) if baseline is not None else None,
+        }
+
+    def reset(self):
+        """Descarta as janelas locais"""
+        with self._lock:
+            self._windows.clear()
+            self._dirty.clear()
@@ -0,0 +1,372 @@
+"""
+Predição incremental para a caixa de comentários (enquanto o usuário digita)
+
+Para um TF-IDF de unigramas com norma L2 seguido de um classificador linear,
+a decision function de um texto é
+
+    dot / sqrt(norm_sq) + intercepto,  com  dot = Σ tf(c_t)·idf_t·w_t  e
+                                             norm_sq = Σ (tf(c_t)·idf_t)²
+
+onde c_t é a contagem do token t. Cada sessão guarda o texto, as contagens
+dos tokens do vocabulário e as duas somas. Uma edição só altera os tokens das
+palavras que ela toca: preprocess_text age caractere a caractere e nenhum
+token atravessa um espaço, então basta tokenizar a palavra (ou palavras)
+antes e depois da edição e aplicar a diferença às contagens e às somas. O
+custo do modelo é proporcional ao tamanho da edição, não ao do texto.
+
+As sessões ficam em um LRU com limite de quantidade e expiração por
+inatividade; o texto de cada sessão tem tamanho máximo.
+"""
+import math
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from backend.config.settings import (
+    INCREMENTAL_MAX_SESSIONS, INCREMENTAL_SESSION_TTL, INCREMENTAL_MAX_CHARS, INCREMENTAL_RESYNC_EDITS,
+    RESPONSE_LABELS, HATE_SPEECH_CLASS
+)
+from backend.services.linear_scorer import CompactLinearModel
+from backend.services.model_service import model_service
+from backend.utils.fast_tokenizer import FastAnalyzer
+from backend.utils.text_preprocessor import preprocess_text
+
+# Códigos de erro das operações de sessão
+SESSION_NOT_FOUND = 'SESSION_NOT_FOUND'
+REVISION_MISMATCH = 'SESSION_REVISION_MISMATCH'
+INVALID_EDIT = 'INVALID_EDIT'
+TEXT_TOO_LONG = 'TEXT_TOO_LONG'
+NOT_AVAILABLE = 'INCREMENTAL_NOT_AVAILABLE'
+
+
+class IncrementalScorer:
+    """
+    Tabela token -> (idf, peso) de um modelo linear TF-IDF de unigramas.
+
+    Tokens fora do vocabulário não entram na tabela; tokens com peso nulo
+    entram com peso 0 porque participam da norma L2.
+    """
+
+    def __init__(self, analyzer, table, intercept, classes, sublinear_tf=False, binary=False):
+        self.analyzer = analyzer
+        self.table = table
+        self.intercept = float(intercept)
+        self.classes = classes
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+
+    @classmethod
+    def from_scorer(cls, scorer):
+        """
+        Constrói a tabela a partir do LinearScorer do modelo servido.
+
+        Returns:
+            IncrementalScorer ou None se o modelo não for TF-IDF de unigramas com norma L2
+        """
+        vectorizer = scorer.vectorizer
+        if isinstance(vectorizer, CompactLinearModel):
+            scale = vectorizer.idf_scale
+            weights = vectorizer.decision_weights()
+            table = {token: (float(vectorizer.idf[index]) * scale, float(weights[index]))
+                     for token, index in vectorizer.vocabulary.items()}
+            for token, group in vectorizer.norm_vocabulary.items():
+                table[token] = (float(vectorizer.norm_idf[group]) * scale, 0.0)
+            return cls(vectorizer.build_analyzer(), table, scorer.intercept, scorer.classes)
+
+        params = vectorizer.get_params()
+        analyzer = params['analyzer']
+        if isinstance(analyzer, FastAnalyzer):
+            # Analisador rápido instalado no carregamento: mesmos tokens do 'word'
+            unigrams = analyzer.ngram_range == (1, 1)
+        else:
+            unigrams = analyzer == 'word' and params['ngram_range'] == (1, 1)
+        if (not unigrams or params['norm'] != 'l2'
+                or params['tokenizer'] is not None or params['preprocessor'] is not None):
+            return None
+
+        idf = vectorizer.idf_ if params['use_idf'] else None
+        table = {
+            str(token): (float(idf[index]) if idf is not None else 1.0, float(scorer.weights[index]))
+            for token, index in vectorizer.vocabulary_.items()
+        }
+        return cls(vectorizer.build_analyzer(), table, scorer.intercept, scorer.classes,
+                   sublinear_tf=params['sublinear_tf'], binary=params['binary'])
+
+    def tokens(self, raw_text):
+        """
+        Tokens e quantidade de palavras (após preprocess_text) de um trecho de texto bruto.
+
+        Returns:
+            tuple: (Counter dos tokens do vocabulário, palavras não vazias)
+        """
+        processed = preprocess_text(raw_text)
+        table = self.table
+        return Counter(token for token in self.analyzer(processed) if token in table), len(processed.split())
+
+    def tf(self, count):
+        """Termo de frequência do TF-IDF para uma contagem"""
+        if count <= 0:
+            return 0.0
+        if self.binary:
+            return 1.0
+        return 1.0 + math.log(count) if self.sublinear_tf else float(count)
+
+    def decision(self, dot, norm_sq):
+        """Decision function a partir das somas da sessão"""
+        if norm_sq <= 0:
+            return self.intercept
+        return dot / math.sqrt(norm_sq) + self.intercept
+
+
+class _Session:
+    """Estado de uma sessão: texto, contagens dos tokens e somas do score"""
+
+    __slots__ = ('id', 'scorer', 'text', 'counts', 'dot', 'norm_sq', 'words', 'revision', 'edits', 'last_seen')
+
+    def __init__(self, session_id, scorer):
+        self.id = session_id
+        self.scorer = scorer
+        self.revision = 0
+        self.reset('')
+
+    def reset(self, text):
+        """Recalcula a sessão a partir do texto inteiro"""
+        self.text = ''
+        self.counts = {}
+        self.dot = self.norm_sq = 0.0
+        self.words = 0
+        self.edits = 0
+        self.apply(0, 0, text)
+        self.edits = 0
+
+    def recompute(self):
+        """Recalcula as somas a partir das contagens (descarta o erro acumulado de ponto flutuante)"""
+        scorer, table = self.scorer, self.scorer.table
+        dot = norm_sq = 0.0
+        for token, count in self.counts.items():
+            idf, weight = table[token]
+            value = scorer.tf(count) * idf
+            dot += value * weight
+            norm_sq += value * value
+        self.dot, self.norm_sq = dot, norm_sq
+
+    def apply(self, start, end, inserted):
+        """
+        Substitui text[start:end] por inserted e atualiza contagens e somas.
+
+        Apenas as palavras tocadas pela edição são tokenizadas: o trecho é
+        estendido até os espaços mais próximos de cada lado.
+        """
+        text = self.text
+        left = start
+        while left > 0 and not text[left - 1].isspace():
+            left -= 1
+        right = end
+        while right < len(text) and not text[right].isspace():
+            right += 1
+
+        scorer = self.scorer
+        old_tokens, old_words = scorer.tokens(text[left:right])
+        new_tokens, new_words = scorer.tokens(text[left:start] + inserted + text[end:right])
+        delta = new_tokens
+        delta.subtract(old_tokens)
+
+        table, counts = scorer.table, self.counts
+        for token, change in delta.items():
+            if not change:
+                continue
+            idf, weight = table[token]
+            before = counts.get(token, 0)
+            after = before + change
+            old_value, new_value = scorer.tf(before) * idf, scorer.tf(after) * idf
+            self.dot += (new_value - old_value) * weight
+            self.norm_sq += new_value * new_value - old_value * old_value
+            if after:
+                counts[token] = after
+            else:
+                del counts[token]
+
+        self.text = text[:start] + inserted + text[end:]
+        self.words += new_words - old_words
+        self.edits += 1
+        if not counts:
+            self.dot = self.norm_sq = 0.0
+        elif self.edits % INCREMENTAL_RESYNC_EDITS == 0:
+            self.recompute()
+
+
+class IncrementalService:
+    """
+    Sessões de predição incremental.
+
+    O cliente abre uma sessão com o texto atual e depois envia apenas as
+    edições ({start, end, text}, em posições de caracteres do texto da
+    sessão) com a revisão em que se baseiam. Uma revisão divergente (edição
+    perdida ou fora de ordem) ou uma sessão expirada obrigam o cliente a
+    reenviar o texto inteiro.
+    """
+
+    def __init__(self, service=None, max_sessions=INCREMENTAL_MAX_SESSIONS, ttl=INCREMENTAL_SESSION_TTL,
+                 max_chars=INCREMENTAL_MAX_CHARS):
+        self.service = service if service is not None else model_service
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._source = None
+        self._scorer = None
+        self._stats = {'opened': 0, 'edits': 0, 'resyncs': 0, 'evicted_idle': 0, 'evicted_capacity': 0}
+
+    def _get_scorer(self):
+        """IncrementalScorer do modelo servido (reconstruído quando o modelo muda)"""
+        scorer = self.service.scorer
+        if scorer is None:
+            return None
+        if scorer is not self._source:
+            self._scorer = IncrementalScorer.from_scorer(scorer)
+            self._source = scorer
+        return self._scorer
+
+    def _evict(self, now):
+        """Remove as sessões inativas e, acima do limite, as menos recentes"""
+        sessions = self._sessions
+        while sessions:
+            session = next(iter(sessions.values()))
+            if now - session.last_seen <= self.ttl:
+                break
+            sessions.popitem(last=False)
+            self._stats['evicted_idle'] += 1
+        while len(sessions) > self.max_sessions:
+            sessions.popitem(last=False)
+            self._stats['evicted_capacity'] += 1
+
+    def open(self, text, session_id=None):
+        """
+        Abre uma sessão (ou ressincroniza uma existente) com o texto inteiro.
+
+        Args:
+            text: Texto atual da caixa de comentários
+            session_id: Sessão a ressincronizar (opcional)
+
+        Returns:
+            dict: Resultado (com 'error' e 'code' nas falhas)
+        """
+        if len(text) > self.max_chars:
+            return {'error': True, 'code': TEXT_TOO_LONG}
+
+        with self._lock:
+            scorer = self._get_scorer()
+            if scorer is None:
+                return {'error': True, 'code': NOT_AVAILABLE}
+
+            now = time.monotonic()
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = _Session(uuid.uuid4().hex, scorer)
+                self._sessions[session.id] = session
+                self._stats['opened'] += 1
+            else:
+                session.scorer = scorer
+                self._sessions.move_to_end(session.id)
+                self._stats['resyncs'] += 1
+
+            session.reset(text)
+            session.revision += 1
+            session.last_seen = now
+            self._evict(now)
+            return self._result(session)
+
+    def update(self, session_id, revision, edits):
+        """
+        Aplica edições a uma sessão.
+
+        Args:
+            session_id: Id da sessão
+            revision: Revisão do texto em que as edições se baseiam
+            edits: Lista de {'start', 'end', 'text'}, aplicadas em ordem
+
+        Returns:
+            dict: Resultado (com 'error' e 'code' nas falhas)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {'error': True, 'code': SESSION_NOT_FOUND}
+            if revision != session.revision:
+                return {'error': True, 'code': REVISION_MISMATCH, 'revision': session.revision}
+
+            scorer = self._get_scorer()
+            if scorer is None:
+                return {'error': True, 'code': NOT_AVAILABLE}
+
+            # Validar todas as edições antes de aplicar (a sessão não fica pela metade)
+            length = len(session.text)
+            for edit in edits:
+                if not 0 <= edit['start'] <= edit['end'] <= length:
+                    return {'error': True, 'code': INVALID_EDIT}
+                length += len(edit['text']) - (edit['end'] - edit['start'])
+                if length > self.max_chars:
+                    return {'error': True, 'code': TEXT_TOO_LONG}
+
+            if scorer is not session.scorer:
+                # Modelo recarregado: recalcular a sessão com a nova tabela
+                session.scorer = scorer
+                session.reset(session.text)
+                self._stats['resyncs'] += 1
+
+            for edit in edits:
+                session.apply(edit['start'], edit['end'], edit['text'])
+            self._stats['edits'] += len(edits)
+
+            session.revision += 1
+            session.last_seen = now
+            self._sessions.move_to_end(session_id)
+            return self._result(session)
+
+    def close(self, session_id):
+        """Encerra uma sessão; retorna False se ela não existir"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _result(self, session):
+        """Predição atual de uma sessão"""
+        result = {
+            'error': False,
+            'session_id': session.id,
+            'revision': session.revision,
+            'empty': session.words == 0,
+            'tokens': sum(session.counts.values()),
+        }
+        if session.words == 0:
+            # Mesmo critério de validate_comment: texto vazio após o processamento
+            return result
+
+        scorer = session.scorer
+        decision = scorer.decision(session.dot, session.norm_sq)
+        prediction = scorer.classes[1] if decision > 0 else scorer.classes[0]
+        is_hate_speech = int(prediction) == HATE_SPEECH_CLASS
+        confidence_data = self.service._confidence_from_decision(decision)
+        result.update(
+            prediction=RESPONSE_LABELS['HATE_SPEECH'] if is_hate_speech else RESPONSE_LABELS['NOT_HATE_SPEECH'],
+            is_hate_speech=is_hate_speech,
+            confidence=confidence_data['confidence'],
+            confidence_method=confidence_data['method'],
+        )
+        return result
+
+    def get_stats(self):
+        """Sessões abertas e contadores"""
+        with self._lock:
+            self._evict(time.monotonic())
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                **self._stats,
+            }
+
+
+# Instância singleton do serviço
+incremental_service = IncrementalService()
@@ -0,0 +1,520 @@
+"""
+Jobs em lote: classificação de arquivos grandes fora do ciclo da requisição
+
+POST /api/jobs registra o job no banco SQLite de JOBS_DB_PATH e o envia a um
+pool de processos. Cada processo carrega o modelo uma única vez, lê a entrada
+em partes de JOBS_CHUNK_SIZE comentários, classifica cada parte com
+ModelService.predict_batch e acrescenta as linhas ao arquivo de resultado
+(CSV). Depois de cada parte, o progresso e a posição do arquivo de resultado
+são gravados no banco: um job interrompido (reinício do servidor, processo
+morto) é retomado da última parte concluída.
+
+Os processos do pool rodam com prioridade reduzida (JOBS_WORKER_NICE) para
+que a latência das predições interativas não dependa dos jobs.
+"""
+import codecs
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from backend.config.settings import (
+    JOBS_DIR, JOBS_DB_PATH, JOBS_INPUT_ROOT, JOBS_MAX_WORKERS, JOBS_CHUNK_SIZE, JOBS_MAX_PENDING,
+    JOBS_WORKER_NICE, JOBS_STALE_SECONDS, logger, setup_logging
+)
+from backend.services.model_service import model_service
+
+QUEUED, RUNNING, COMPLETED, FAILED = 'queued', 'running', 'completed', 'failed'
+INPUT_FORMATS = ('csv', 'text')
+RESULT_COLUMNS = ['index', 'comment', 'is_hate_speech', 'prediction', 'confidence', 'confidence_method', 'error']
+
+
+def worker_id():
+    """Identificação do processo que executa um job (host:pid)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    """
+    Verifica se o processo dono de um job ainda existe.
+
+    Returns:
+        bool: True/False para processos deste host, ou None se o dono for
+        desconhecido (outro host ou job sem dono registrado)
+    """
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class JobStore:
+    """
+    Estado dos jobs em um arquivo SQLite, compartilhado pelo processo da API
+    e pelos processos do pool. Cada thread usa sua própria conexão.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        """Retorna a conexão da thread atual, criando a tabela se necessário"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, input_path TEXT NOT NULL,"
+                " input_format TEXT NOT NULL, encoding TEXT NOT NULL, result_path TEXT NOT NULL,"
+                " total INTEGER, processed INTEGER NOT NULL DEFAULT 0,"
+                " hate_speech INTEGER NOT NULL DEFAULT 0, errors INTEGER NOT NULL DEFAULT 0,"
+                " result_offset INTEGER NOT NULL DEFAULT 0, elapsed REAL NOT NULL DEFAULT 0,"
+                " created REAL NOT NULL, started REAL, finished REAL, heartbeat REAL, error TEXT, owner TEXT)"
+            )
+            columns = {row['name'] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if 'owner' not in columns:
+                # Bancos criados antes do registro do processo dono
+                connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._local.connection = connection
+        return connection
+
+    def create(self, job_id, input_path, input_format, encoding, result_path):
+        """Registra um job na fila"""
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, input_path, input_format, encoding, result_path, created)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, input_path, input_format, encoding, result_path, time.time())
+        )
+
+    def get(self, job_id):
+        """Retorna o job como dict (ou None)"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def update(self, job_id, **fields):
+        """Atualiza campos de um job"""
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id, owner=None):
+        """
+        Marca um job da fila como em execução pelo processo owner (host:pid).
+
+        Returns:
+            bool: False se outro processo já o assumiu (ou se não está na fila)
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, started = ?, heartbeat = ?, owner = ? WHERE id = ? AND status = ?",
+            (RUNNING, now, now, owner, job_id, QUEUED)
+        )
+        return cursor.rowcount == 1
+
+    def requeue_orphaned(self, stale_seconds):
+        """
+        Devolve à fila os jobs em execução sem processo vivo.
+
+        O job volta à fila se o processo dono (neste host) não existe mais,
+        mesmo com heartbeat recente (reinício logo após uma queda); se o dono
+        não puder ser verificado (outro host ou sem dono registrado), só
+        depois de stale_seconds sem sinal de vida.
+
+        Returns:
+            int: Jobs devolvidos à fila
+        """
+        connection = self._connect()
+        rows = connection.execute("SELECT id, owner, heartbeat FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        deadline = time.time() - stale_seconds
+        requeued = 0
+        for row in rows:
+            alive = owner_alive(row['owner'])
+            if alive is False or (alive is None and (row['heartbeat'] or 0) < deadline):
+                cursor = connection.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL WHERE id = ? AND status = ? AND owner IS ?",
+                    (QUEUED, row['id'], RUNNING, row['owner'])
+                )
+                requeued += cursor.rowcount
+        return requeued
+
+    def queued_ids(self):
+        """Ids dos jobs na fila, na ordem de criação"""
+        rows = self._connect().execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,))
+        return [row['id'] for row in rows]
+
+    def count_by_status(self):
+        """Quantidade de jobs por status"""
+        counts = dict.fromkeys((QUEUED, RUNNING, COMPLETED, FAILED), 0)
+        for row in self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row['status']] = row['n']
+        return counts
+
+
+def read_comments(path, input_format, encoding):
+    """
+    Lê os comentários de um arquivo de entrada.
+
+    Args:
+        path: Caminho do arquivo
+        input_format: 'csv' (coluna "comment") ou 'text' (um comentário por linha não vazia)
+        encoding: Codificação do arquivo
+
+    Yields:
+        str: Comentários na ordem do arquivo
+
+    Raises:
+        ValueError: Se o CSV não tiver a coluna "comment"
+    """
+    with open(path, encoding=encoding, errors='replace', newline='') as f:
+        if input_format == 'csv':
+            reader = csv.DictReader(f)
+            if 'comment' not in (reader.fieldnames or []):
+                raise ValueError('Coluna "comment" ausente no CSV')
+            for row in reader:
+                yield row['comment'] or ''
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def score_chunk(service, comments):
+    """
+    Classifica uma parte da entrada.
+
+    Returns:
+        list: Resultados no formato de predict_single (com 'error' e 'message' nas falhas)
+    """
+    result = service.predict_batch(comments)
+    if not result['error']:
+        return result['results']
+    # Algum comentário inválido invalida o lote: classificar um a um
+    return [service.predict_single(comment) for comment in comments]
+
+
+def format_rows(start_index, comments, results):
+    """Linhas CSV (bytes UTF-8) de uma parte classificada"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, (comment, result) in enumerate(zip(comments, results), start_index):
+        if result['error']:
+            writer.writerow([index, comment, '', '', '', '', result['message']])
+        else:
+            writer.writerow([
+                index, comment, int(result['is_hate_speech']), result['prediction'],
+                result['confidence'], result['confidence_method'], ''
+            ])
+    return buffer.getvalue().encode('utf-8')
+
+
+def run_job(job_id, db_path, chunk_size, service=None):
+    """
+    Executa (ou retoma) um job. Chamado nos processos do pool.
+
+    Args:
+        job_id: Id do job
+        db_path: Banco SQLite com o estado dos jobs
+        chunk_size: Comentários por parte
+        service: ModelService (padrão: a instância do processo)
+    """
+    service = service if service is not None else model_service
+    store = JobStore(db_path)
+    if not store.claim(job_id, worker_id()):
+        return
+    job = store.get(job_id)
+
+    try:
+        total = job['total']
+        if total is None:
+            total = sum(1 for _ in read_comments(job['input_path'], job['input_format'], job['encoding']))
+            store.update(job_id, total=total)
+
+        processed, hate_speech, errors, elapsed = job['processed'], job['hate_speech'], job['errors'], job['elapsed']
+        comments = itertools.islice(
+            read_comments(job['input_path'], job['input_format'], job['encoding']), processed, None
+        )
+
+        mode = 'r+b' if os.path.exists(job['result_path']) else 'w+b'
+        with open(job['result_path'], mode) as result_file:
+            # Descartar linhas gravadas após a última parte registrada
+            result_file.truncate(job['result_offset'])
+            result_file.seek(job['result_offset'])
+            if job['result_offset'] == 0:
+                result_file.write(','.join(RESULT_COLUMNS).encode('utf-8') + b'\r\n')
+
+            while True:
+                chunk = list(itertools.islice(comments, chunk_size))
+                if not chunk:
+                    break
+                start = time.perf_counter()
+                results = score_chunk(service, chunk)
+                result_file.write(format_rows(processed, chunk, results))
+                result_file.flush()
+                os.fsync(result_file.fileno())
+                elapsed += time.perf_counter() - start
+
+                processed += len(chunk)
+                hate_speech += sum(1 for result in results if not result['error'] and result['is_hate_speech'])
+                errors += sum(1 for result in results if result['error'])
+                store.update(
+                    job_id, processed=processed, hate_speech=hate_speech, errors=errors,
+                    elapsed=elapsed, result_offset=result_file.tell(), heartbeat=time.time()
+                )
+
+        store.update(job_id, status=COMPLETED, finished=time.time(), total=processed)
+    except Exception as e:
+        logger.error(f"❌ Job {job_id} falhou: {e}")
+        store.update(job_id, status=FAILED, finished=time.time(), error=str(e))
+
+
+def _init_job_worker(nice):
+    """Configura o logging, reduz a prioridade do processo e carrega o modelo uma única vez"""
+    setup_logging()
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+    # Arquivos em lote não são tráfego ao vivo: fora dos sketches de drift
+    model_service.drift.enabled = False
+    if not model_service.is_loaded():
+        model_service.load_model()
+
+
+class JobService:
+    """
+    Recebe jobs, mantém o estado no SQLite e os distribui ao pool de processos.
+
+    O pool usa processos iniciados com 'spawn' (um fork do servidor copiaria
+    threads e locks em uso) e só é criado no primeiro job. Se um processo do
+    pool morrer (OOM, sinal), o pool fica inutilizável: ele é recriado e os
+    jobs interrompidos e os da fila são reenviados.
+    """
+
+    def __init__(self, db_path=JOBS_DB_PATH, jobs_dir=JOBS_DIR, input_root=JOBS_INPUT_ROOT,
+                 max_workers=JOBS_MAX_WORKERS, chunk_size=JOBS_CHUNK_SIZE, max_pending=JOBS_MAX_PENDING,
+                 nice=JOBS_WORKER_NICE):
+        self.db_path = db_path
+        self.jobs_dir = jobs_dir
+        self.input_root = input_root
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.nice = nice
+        self._store = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        """Banco dos jobs (criado no primeiro uso)"""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = JobStore(self.db_path)
+        return self._store
+
+    def _get_executor(self):
+        """Pool de processos (criado no primeiro job)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_job_worker,
+                    initargs=(self.nice,)
+                )
+            return self._executor
+
+    def start(self):
+        """Retoma os jobs interrompidos e os que ficaram na fila (chamado na inicialização)"""
+        self.store.requeue_orphaned(JOBS_STALE_SECONDS)
+        queued = self.store.queued_ids()
+        for job_id in queued:
+            self._enqueue(job_id)
+        if queued:
+            logger.info(f"✅ {len(queued)} job(s) retomado(s)")
+
+    def is_full(self):
+        """Verifica se o limite de jobs pendentes foi atingido"""
+        counts = self.store.count_by_status()
+        return counts[QUEUED] + counts[RUNNING] >= self.max_pending
+
+    def resolve_input_path(self, path):
+        """
+        Resolve um caminho local do servidor, aceito apenas dentro de input_root.
+
+        Returns:
+            str: Caminho absoluto ou None se fora da raiz permitida, inexistente
+            ou com os caminhos locais desativados (input_root vazio)
+        """
+        if not self.input_root:
+            return None
+        root = os.path.realpath(self.input_root)
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, resolved]) != root or not os.path.isfile(resolved):
+            return None
+        return resolved
+
+    def submit_upload(self, upload, input_format, encoding='utf-8'):
+        """
+        Salva um arquivo enviado e cria o job.
+
+        Args:
+            upload: FileStorage do Flask (ou objeto com save(caminho))
+            input_format: 'csv' ou 'text'
+            encoding: Codificação do arquivo
+
+        Returns:
+            dict: Job criado (formato de get_job)
+        """
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        input_path = os.path.join(self.jobs_dir, f"{job_id}.input")
+        upload.save(input_path)
+        return self._create(job_id, input_path, input_format, encoding)
+
+    def submit_path(self, input_path, input_format, encoding='utf-8'):
+        """Cria um job para um arquivo local já resolvido por resolve_input_path"""
+        return self._create(uuid.uuid4().hex, input_path, input_format, encoding)
+
+    def _create(self, job_id, input_path, input_format, encoding):
+        """Registra o job e o envia ao pool"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        result_path = os.path.join(self.jobs_dir, f"{job_id}.result.csv")
+        self.store.create(job_id, input_path, input_format, encoding, result_path)
+        self._enqueue(job_id)
+        logger.info(f"Job {job_id} criado ({input_format}, {input_path})")
+        return self.get_job(job_id)
+
+    def _enqueue(self, job_id):
+        """Envia o job ao pool (recriando o pool se estiver quebrado)"""
+        executor = self._get_executor()
+        try:
+            future = executor.submit(run_job, job_id, self.db_path, self.chunk_size)
+        except BrokenProcessPool:
+            # A recuperação reenvia todos os jobs da fila, inclusive este
+            if not self._recover(executor):
+                self._enqueue(job_id)
+            return
+        future.add_done_callback(lambda future: self._on_done(job_id, executor, future))
+
+    def _on_done(self, job_id, executor, future):
+        """Registra falhas que impediram run_job de atualizar o próprio job"""
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # Não é falha do job: recriar o pool fora da thread de gerenciamento dele
+            threading.Thread(target=self._recover, args=(executor,), daemon=True).start()
+        elif error is not None:
+            logger.error(f"❌ Job {job_id} interrompido: {error}")
+            self.store.update(job_id, status=FAILED, finished=time.time(), error=str(error))
+
+    def _recover(self, executor):
+        """
+        Substitui um pool quebrado e reenvia os jobs interrompidos e os da fila.
+
+        Returns:
+            bool: False se o pool já tinha sido substituído (por outra chamada)
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return False
+            self._executor = None
+        logger.warning("⚠️ Processo do pool de jobs encerrado; recriando o pool e retomando os jobs")
+        # Aguarda o encerramento dos demais processos para que os jobs deles voltem à fila
+        executor.shutdown(wait=True)
+        self.store.requeue_orphaned(JOBS_STALE_SECONDS)
+        for job_id in self.store.queued_ids():
+            self._enqueue(job_id)
+        return True
+
+    def get_job(self, job_id):
+        """
+        Estado de um job com progresso e vazão.
+
+        Returns:
+            dict: Job (ou None se não existir)
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+
+        processed, total, elapsed = job['processed'], job['total'], job['elapsed']
+        rate = processed / elapsed if elapsed > 0 else None
+        remaining = total - processed if total is not None else None
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'input_format': job['input_format'],
+            'total': total,
+            'processed': processed,
+            'progress': round(processed / total, 4) if total else (1.0 if job['status'] == COMPLETED else 0.0),
+            'hate_speech': job['hate_speech'],
+            'errors': job['errors'],
+            'comments_per_second': round(rate, 1) if rate else None,
+            'eta_seconds': round(remaining / rate, 1) if rate and remaining is not None else None,
+            'created': _isoformat(job['created']),
+            'started': _isoformat(job['started']),
+            'finished': _isoformat(job['finished']),
+            'error': job['error'],
+            'result_url': f"/api/jobs/{job['id']}/result" if job['status'] == COMPLETED else None,
+        }
+
+    def get_result_path(self, job_id):
+        """Arquivo de resultado de um job concluído (ou None)"""
+        job = self.store.get(job_id)
+        if job is None or job['status'] != COMPLETED:
+            return None
+        return job['result_path']
+
+    def get_stats(self):
+        """Quantidade de jobs por status"""
+        if self._store is None and not os.path.exists(self.db_path):
+            # Nenhum job criado: não criar o banco apenas para as métricas
+            return dict.fromkeys((QUEUED, RUNNING, COMPLETED, FAILED), 0)
+        return self.store.count_by_status()
+
+    def shutdown(self, wait=True):
+        """Encerra o pool de processos"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def _isoformat(timestamp):
+    """Timestamp Unix em ISO 8601 (ou None)"""
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+def is_valid_encoding(encoding):
+    """Verifica se a codificação existe"""
+    try:
+        codecs.lookup(encoding)
+    except (LookupError, TypeError):
+        return False
+    return True
+
+
+# Instância singleton do serviço
+job_service = JobService()
@@ -0,0 +1,135 @@
+"""
+Cascata de dois estágios: triagem por léxico antes do modelo completo
+
+Para um modelo linear sobre TF-IDF, cada token presente contribui com
+tfidf × coeficiente, e o TF-IDF é sempre não negativo. Se nenhum token do
+comentário tem coeficiente na direção de discurso de ódio, a decisão fica
+do lado "não ódio" do intercepto: a margem é pelo menos |intercepto|, desde
+que o intercepto já favoreça "não ódio". O primeiro estágio é, portanto, um
+teste de interseção entre os tokens do comentário e um frozenset com esses
+tokens; apenas os comentários que tocam o léxico seguem para a vetorização
+e o classificador.
+
+Com o léxico completo (todos os tokens na direção de ódio) a predição da
+cascata é idêntica à do modelo. Com um léxico menor (apenas os tokens de
+maior peso) a triagem fica mais barata, mas pode deixar passar comentários
+com tokens de ódio fracos; o erro é medido por benchmarks/bench_cascade.py.
+"""
+import threading
+import numpy as np
+from backend.utils.fast_tokenizer import FastAnalyzer
+
+# token_pattern padrão do sklearn
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class LexiconCascade:
+    """
+    Primeiro estágio da cascata: decide como "não ódio" os comentários que
+    não contêm nenhum token do léxico.
+
+    Os comentários decididos aqui não têm a decision function calculada; a
+    confiança reportada é a da margem mínima garantida (|intercepto|).
+    """
+
+    def __init__(self, analyzer, lexicon, benign_class, margin, exact=True, split_words=False):
+        self.analyzer = analyzer
+        self.lexicon = frozenset(lexicon)
+        # Textos ASCII só com palavras alfanuméricas dispensam o analisador: split()
+        # produz os mesmos tokens, exceto stop words e palavras de 1 caractere,
+        # que nunca estão no léxico (exige unigramas e o token_pattern padrão)
+        self.split_words = split_words
+        self.benign_class = benign_class
+        # Margem mínima garantida da decisão dos comentários sem tokens do léxico
+        self.margin = float(margin)
+        self.exact = exact
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @classmethod
+    def from_scorer(cls, scorer, lexicon_size=0, min_margin=0.0):
+        """
+        Constrói o léxico a partir dos coeficientes do scorer linear.
+
+        Args:
+            scorer: LinearScorer do modelo servido
+            lexicon_size: Quantidade de tokens de maior peso na direção de ódio
+                (0: todos, o que torna a triagem exata)
+            min_margin: Margem mínima do intercepto para ativar a cascata
+
+        Returns:
+            LexiconCascade ou None se o intercepto não garantir a margem
+        """
+        # Evidência de ódio: positiva para os tokens que empurram a decisão para ódio
+        hate_weights = scorer.hate_sign * scorer.weights
+        margin = -scorer.hate_sign * scorer.intercept
+        if margin <= min_margin:
+            return None
+
+        candidates = np.flatnonzero(hate_weights > 0)
+        candidates = candidates[np.argsort(-hate_weights[candidates], kind='stable')]
+        exact = lexicon_size <= 0 or lexicon_size >= len(candidates)
+        if not exact:
+            candidates = candidates[:lexicon_size]
+
+        # decision_function > 0 favorece classes[1]
+        benign_class = scorer.classes[0] if scorer.hate_sign > 0 else scorer.classes[1]
+        lexicon = [str(scorer.feature_names[index]) for index in candidates]
+
+        vectorizer = scorer.vectorizer
+        analyzer = getattr(vectorizer, 'analyzer', None)
+        word_analyzer = analyzer is None or analyzer == 'word' or isinstance(analyzer, FastAnalyzer)
+        split_words = (
+            word_analyzer
+            and getattr(vectorizer, 'token_pattern', None) == DEFAULT_TOKEN_PATTERN
+            and not any(' ' in token for token in lexicon)
+        )
+
+        return cls(
+            analyzer=vectorizer.build_analyzer(),
+            lexicon=lexicon,
+            benign_class=int(benign_class),
+            margin=margin,
+            exact=exact,
+            split_words=split_words,
+        )
+
+    def reset_stats(self):
+        """Zera os contadores da triagem"""
+        with self._lock:
+            self._stats = {'screened': 0, 'decided': 0}
+
+    def screen_many(self, processed_texts):
+        """
+        Triagem de textos já processados.
+
+        Args:
+            processed_texts: Saídas de preprocess_text
+
+        Returns:
+            list: True para os textos decididos como "não ódio" neste estágio
+        """
+        analyzer, lexicon, split_words = self.analyzer, self.lexicon, self.split_words
+        decided = []
+        for text in processed_texts:
+            if split_words and text.isascii() and text.replace(' ', '').isalnum():
+                tokens = text.split()
+            else:
+                tokens = analyzer(text)
+            decided.append(lexicon.isdisjoint(tokens))
+        with self._lock:
+            self._stats['screened'] += len(decided)
+            self._stats['decided'] += sum(decided)
+        return decided
+
+    def screen(self, processed_text):
+        """Triagem de um único texto (True se decidido como "não ódio")"""
+        return self.screen_many([processed_text])[0]
+
+    def get_stats(self):
+        """Retorna os contadores e a fração decidida no primeiro estágio"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['decided_rate'] = round(stats['decided'] / stats['screened'], 4) if stats['screened'] else 0.0
+        stats.update(lexicon_size=len(self.lexicon), exact=self.exact, margin=round(self.margin, 4))
+        return stats
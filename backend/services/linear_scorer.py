@@ -0,0 +1,374 @@
+"""
+Representação pré-computada de um pipeline linear (TF-IDF + classificador linear)
+"""
+import re
+import numpy as np
+from scipy.sparse import csr_matrix
+from backend.config.settings import HATE_SPEECH_CLASS
+from backend.utils.fast_tokenizer import FastAnalyzer
+
+# Precisões de armazenamento do CompactLinearModel: tipo dos arrays de IDF e
+# pesos e tipo usado na vetorização e no score
+PRECISIONS = {
+    'float64': (np.float64, np.float64),
+    'float32': (np.float32, np.float32),
+    'int8': (np.int8, np.float32),
+}
+
+
+def quantize_int8(values):
+    """
+    Quantização simétrica para int8 com um fator de escala.
+
+    Returns:
+        tuple: (array int8, escala) com values ≈ array * escala
+    """
+    values = np.asarray(values, dtype=np.float64)
+    peak = float(np.abs(values).max()) if values.size else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    return np.clip(np.rint(values / scale), -127, 127).astype(np.int8), scale
+
+
+class LinearScorer:
+    """
+    Mantém os pesos do classificador alinhados ao índice do vocabulário do
+    TF-IDF, permitindo calcular a contribuição de cada token com uma única
+    multiplicação sobre a matriz esparsa.
+    """
+
+    def __init__(self, vectorizer, weights, intercept, classes):
+        self.vectorizer = vectorizer
+        # Pesos float32 (modelo de precisão reduzida) são mantidos em float32
+        weights = np.asarray(weights)
+        self.weights = np.ascontiguousarray(weights, dtype=np.result_type(weights.dtype, np.float32))
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.feature_names = vectorizer.get_feature_names_out()
+        # Sinal que converte a decisão em "evidência de discurso de ódio":
+        # decision_function > 0 favorece classes[1]
+        self.hate_sign = 1.0 if self.classes[1] == HATE_SPEECH_CLASS else -1.0
+
+    @classmethod
+    def from_pipeline(cls, model):
+        """
+        Constrói o scorer a partir de um pipeline sklearn carregado.
+
+        Args:
+            model: Pipeline com um vetorizador TF-IDF seguido de um classificador
+                linear, ou um CompactLinearModel
+
+        Returns:
+            LinearScorer ou None se o modelo não for um pipeline linear binário
+        """
+        if isinstance(model, CompactLinearModel):
+            return cls(model, model.decision_weights(), model.intercept, model.classes)
+
+        steps = getattr(model, 'steps', None)
+        if not isinstance(steps, list) or len(steps) != 2:
+            return None
+
+        vectorizer, classifier = steps[0][1], steps[1][1]
+        coef = getattr(classifier, 'coef_', None)
+        if not hasattr(vectorizer, 'vocabulary_') or coef is None:
+            return None
+
+        coef = np.asarray(coef.toarray() if hasattr(coef, 'toarray') else coef)
+        if coef.ndim != 2 or coef.shape[0] != 1:
+            return None
+
+        return cls(vectorizer, coef[0], np.ravel(classifier.intercept_)[0], classifier.classes_)
+
+    def transform(self, processed_texts):
+        """Vetoriza textos já processados (matriz CSR)"""
+        return self.vectorizer.transform(processed_texts)
+
+    def decision_scores(self, X):
+        """Calcula a decision function para cada linha da matriz"""
+        return X @ self.weights + self.intercept
+
+    def predict_classes(self, scores):
+        """Converte decision scores nas classes do classificador"""
+        return self.classes[(np.asarray(scores) > 0).astype(int)]
+
+    def explain(self, X, top_k=10):
+        """
+        Calcula as contribuições dos tokens de cada linha da matriz.
+
+        A contribuição de um token é tfidf × coeficiente, com o sinal
+        ajustado para que valores positivos indiquem discurso de ódio.
+
+        Args:
+            X: Matriz CSR retornada por transform
+            top_k: Quantidade máxima de tokens por linha
+
+        Returns:
+            list: Para cada linha, (decision_score, lista de contribuições)
+        """
+        X = X.tocsr()
+        contributions = X.data * self.weights[X.indices]
+
+        explanations = []
+        for row in range(X.shape[0]):
+            start, end = X.indptr[row], X.indptr[row + 1]
+            row_contrib = contributions[start:end]
+            score = float(row_contrib.sum()) + self.intercept
+
+            order = np.argsort(-np.abs(row_contrib), kind='stable')[:top_k]
+            tokens = [
+                {
+                    'token': str(self.feature_names[X.indices[start + i]]),
+                    'tfidf': round(float(X.data[start + i]), 4),
+                    'weight': round(float(self.weights[X.indices[start + i]]), 4),
+                    'contribution': round(float(self.hate_sign * row_contrib[i]), 4),
+                }
+                for i in order
+            ]
+            explanations.append((score, tokens))
+
+        return explanations
+
+
+class CompactLinearModel:
+    """
+    Versão compacta de um pipeline TF-IDF (unigramas) + classificador linear.
+
+    Mantém índice, IDF e peso apenas dos tokens com coeficiente não nulo. Os
+    tokens de coeficiente nulo não alteram o produto escalar, mas participam
+    da normalização L2 do TF-IDF; por isso são mantidos apenas como termos de
+    norma (token -> grupo de IDF), o que preserva exatamente as decisões.
+    Com keep_norm_terms=False eles são descartados e as decisões passam a ser
+    aproximadas.
+
+    IDF e pesos podem ser armazenados em float32 ou em int8 com um fator de
+    escala (precision). A vetorização e o score usam então float32; o fator
+    de escala do IDF se cancela na normalização L2 e o dos pesos é aplicado
+    ao produto escalar.
+
+    Implementa a mesma interface usada pelo ModelService (predict e
+    decision_function) e pelo LinearScorer (transform e
+    get_feature_names_out).
+    """
+
+    def __init__(self, vocabulary, idf, weights, intercept, classes, norm_vocabulary,
+                 norm_idf, token_pattern, lowercase=True, precision='float64',
+                 idf_scale=1.0, weight_scale=1.0):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precisão não suportada: {precision}")
+        storage_dtype = PRECISIONS[precision][0]
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf, dtype=storage_dtype)
+        self.weights = np.asarray(weights, dtype=storage_dtype)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.norm_vocabulary = norm_vocabulary
+        self.norm_idf = np.asarray(norm_idf, dtype=storage_dtype)
+        self.precision = precision
+        # Valor real ≈ valor armazenado × escala (1.0 exceto em int8)
+        self.idf_scale = float(idf_scale)
+        self.weight_scale = float(weight_scale)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.analyzer = None
+        self._token_re = re.compile(token_pattern)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_token_re']
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('analyzer', None)
+        state.setdefault('precision', 'float64')
+        state.setdefault('idf_scale', 1.0)
+        state.setdefault('weight_scale', 1.0)
+        self.__dict__.update(state)
+        self._token_re = re.compile(self.token_pattern)
+
+    @classmethod
+    def from_pipeline(cls, model, keep_norm_terms=True, precision='float64'):
+        """
+        Compacta um pipeline TF-IDF + classificador linear binário.
+
+        Args:
+            model: Pipeline sklearn carregado
+            keep_norm_terms: Mantém os termos de coeficiente nulo na norma L2
+            precision: Armazenamento de IDF e pesos ('float64', 'float32' ou 'int8')
+
+        Returns:
+            CompactLinearModel
+
+        Raises:
+            ValueError: Se o pipeline não puder ser compactado sem alterar as decisões
+        """
+        scorer = LinearScorer.from_pipeline(model)
+        if scorer is None:
+            raise ValueError("O modelo não é um pipeline TF-IDF + classificador linear binário")
+
+        vectorizer = scorer.vectorizer
+        params = vectorizer.get_params()
+        if params['analyzer'] != 'word' or params['ngram_range'] != (1, 1):
+            raise ValueError("Apenas vetorizadores de unigramas (analyzer='word') são suportados")
+        if params['tokenizer'] is not None or params['preprocessor'] is not None:
+            raise ValueError("Tokenizadores e preprocessadores customizados não são suportados")
+        if params['norm'] != 'l2' or params['sublinear_tf'] or params['binary'] or not params['use_idf']:
+            raise ValueError("Apenas TF-IDF com norma L2, sem sublinear_tf/binary, é suportado")
+
+        # Com vocabulário fixo e unigramas, a lista de stop words é redundante:
+        # nenhuma stop word faz parte do vocabulário
+        stop_words = vectorizer.get_stop_words() or frozenset()
+        if stop_words & set(vectorizer.vocabulary_):
+            raise ValueError("O vocabulário contém stop words; a lista não pode ser descartada")
+
+        feature_names = scorer.feature_names
+        active = np.flatnonzero(scorer.weights)
+        inactive = np.flatnonzero(scorer.weights == 0)
+
+        vocabulary = {str(feature_names[j]): i for i, j in enumerate(active)}
+
+        idf, weights = vectorizer.idf_[active], scorer.weights[active]
+        norm_vocabulary, norm_idf = {}, np.empty(0)
+        if keep_norm_terms and inactive.size:
+            norm_idf, groups = np.unique(vectorizer.idf_[inactive], return_inverse=True)
+            norm_vocabulary = {str(feature_names[j]): int(g) for j, g in zip(inactive, groups)}
+
+        idf_scale = weight_scale = 1.0
+        if precision == 'int8':
+            # Uma escala para todo o IDF (ativos e termos de norma): ela se cancela na norma L2
+            quantized, idf_scale = quantize_int8(np.concatenate([idf, norm_idf]))
+            idf, norm_idf = quantized[:len(idf)], quantized[len(idf):]
+            weights, weight_scale = quantize_int8(weights)
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=idf,
+            weights=weights,
+            intercept=scorer.intercept,
+            classes=scorer.classes,
+            norm_vocabulary=norm_vocabulary,
+            norm_idf=norm_idf,
+            token_pattern=params['token_pattern'],
+            lowercase=params['lowercase'],
+            precision=precision,
+            idf_scale=idf_scale,
+            weight_scale=weight_scale,
+        )
+
+    @property
+    def compute_dtype(self):
+        """Tipo usado na vetorização e no score"""
+        return PRECISIONS[self.precision][1]
+
+    def decision_weights(self):
+        """Pesos no tipo do score, com o fator de escala aplicado"""
+        weights = self.weights.astype(self.compute_dtype)
+        if self.weight_scale != 1.0:
+            weights *= self.compute_dtype(self.weight_scale)
+        return weights
+
+    def get_feature_names_out(self):
+        """Tokens ativos, na ordem dos índices"""
+        names = np.empty(len(self.vocabulary), dtype=object)
+        for token, index in self.vocabulary.items():
+            names[index] = token
+        return names
+
+    def _analyze(self, text):
+        """Tokenização equivalente ao analisador 'word' do sklearn (unigramas)"""
+        return self._token_re.findall(text.lower() if self.lowercase else text)
+
+    def build_analyzer(self):
+        """Analisador usado por transform (mesma interface do sklearn)"""
+        return self.analyzer or self._analyze
+
+    def transform(self, texts):
+        """
+        Vetoriza textos com TF-IDF normalizado (L2), apenas nas colunas ativas.
+
+        Args:
+            texts: Lista de textos
+
+        Returns:
+            csr_matrix: Matriz (n_textos x n_tokens_ativos)
+        """
+        vocabulary, norm_vocabulary = self.vocabulary, self.norm_vocabulary
+        # IDF em int8: os valores inteiros bastam (a escala se cancela na norma L2)
+        dtype = self.compute_dtype
+        idf, norm_idf = self.idf.astype(dtype, copy=False), self.norm_idf.astype(dtype, copy=False)
+        analyzer = self.analyzer or self._analyze
+        indptr, indices, data = [0], [], []
+
+        for text in texts:
+            counts = {}
+            for token in analyzer(text):
+                counts[token] = counts.get(token, 0) + 1
+
+            row_start = len(data)
+            norm_sq = 0.0
+            for token, tf in counts.items():
+                index = vocabulary.get(token)
+                if index is not None:
+                    value = tf * idf[index]
+                    indices.append(index)
+                    data.append(value)
+                    norm_sq += value * value
+                else:
+                    group = norm_vocabulary.get(token)
+                    if group is not None:
+                        value = tf * norm_idf[group]
+                        norm_sq += value * value
+
+            if norm_sq > 0:
+                norm = np.sqrt(norm_sq)
+                for k in range(row_start, len(data)):
+                    data[k] /= norm
+            indptr.append(len(data))
+
+        X = csr_matrix(
+            (np.asarray(data, dtype=dtype), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(vocabulary))
+        )
+        X.sort_indices()
+        return X
+
+    def decision_function(self, texts):
+        """Decision function para cada texto"""
+        scores = self.transform(texts) @ self.weights.astype(self.compute_dtype, copy=False)
+        if self.weight_scale != 1.0:
+            scores *= self.compute_dtype(self.weight_scale)
+        return scores + self.intercept
+
+    def predict(self, texts):
+        """Classe prevista para cada texto"""
+        return self.classes[(self.decision_function(texts) > 0).astype(int)]
+
+
+def install_fast_analyzer(model):
+    """
+    Instala o FastAnalyzer no vetorizador do modelo carregado.
+
+    Só deve ser usado quando os textos chegam ao modelo já processados por
+    preprocess_text (como no ModelService). Vetorizadores com token_pattern,
+    tokenizer ou preprocessor não padrão mantêm o analisador do sklearn.
+
+    Args:
+        model: Pipeline TF-IDF + classificador ou CompactLinearModel
+
+    Returns:
+        bool: True se o analisador foi instalado
+    """
+    if isinstance(model, CompactLinearModel):
+        try:
+            model.analyzer = FastAnalyzer(model.token_pattern)
+        except ValueError:
+            return False
+        return True
+
+    scorer = LinearScorer.from_pipeline(model)
+    if scorer is None:
+        return False
+
+    try:
+        scorer.vectorizer.analyzer = FastAnalyzer.from_vectorizer(scorer.vectorizer)
+    except ValueError:
+        return False
+    return True
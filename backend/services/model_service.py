@@ -1,21 +1,113 @@
 """
 Serviço responsável pelo carregamento e predições do modelo
 """
+import hashlib
 import joblib
 import json
 import os
+import threading
 import numpy as np
+from collections import namedtuple
+from contextlib import nullcontext
 from datetime import datetime
-from backend.config.settings import MODEL_PATH, MODEL_INFO_PATH, RESPONSE_LABELS, logger
+from backend.config.settings import (
+    MODEL_PATH, MODEL_INFO_PATH, SHADOW_MODEL_PATH, RESPONSE_LABELS, HATE_SPEECH_CLASS,
+    EXPLAIN_TOP_K, FAST_TOKENIZER, BATCH_DEDUP, BATCH_NEAR_DUPLICATES, BATCH_NEAR_DUPLICATE_SIMILARITY,
+    MEMORY_PROFILE_LOAD, CASCADE, CASCADE_LEXICON_SIZE, CASCADE_MIN_MARGIN, DRIFT_BASELINE_PATH, logger
+)
+from backend.services.linear_scorer import LinearScorer, install_fast_analyzer
+from backend.services.batch_vectorizer import BatchVectorizer
+from backend.services.cache_service import ResultCache
+from backend.services.drift_service import DriftMonitor
+from backend.services.lexicon_cascade import LexiconCascade
+from backend.services.shadow_service import ShadowService
+from backend.utils.deduplication import deduplicate
+from backend.utils.memory_profile import LoadProfiler, component_sizes, deep_sizeof, model_components, rss_bytes
 from backend.utils.text_preprocessor import preprocess_text
+from backend.utils.tracing import span
+
+
+# Estado imutável do modelo servido: é substituído por inteiro a cada carga,
+# de modo que as leituras concorrentes nunca observam um estado parcial.
+# version identifica o arquivo do modelo nas chaves do cache (None: sem cache)
+# e cascade é o primeiro estágio da cascata (None: desativada)
+ModelState = namedtuple(
+    'ModelState', ['model', 'model_info', 'scorer', 'batch_vectorizer', 'version', 'cascade'],
+    defaults=(None, None, None)
+)
 
 
 class ModelService:
-    """Serviço responsável pelo modelo de classificação de discurso de ódio"""
+    """
+    Serviço responsável pelo modelo de classificação de discurso de ódio.
+    
+    Seguro para uso concorrente: as predições leem uma única referência ao
+    estado atual (sem locks) e as cargas constroem um novo estado antes de
+    trocá-lo atomicamente.
+    """
     
     def __init__(self):
-        self.model = None
-        self.model_info = None
+        self._state = ModelState(None, None, None)
+        self._state_lock = threading.Lock()
+        self.shadow = ShadowService()
+        self.deduplicate = BATCH_DEDUP
+        self.near_duplicates = BATCH_NEAR_DUPLICATES
+        self.cache = ResultCache()
+        self.drift = DriftMonitor()
+        self.cascade_enabled = CASCADE
+        # Medição da última carga do modelo (RSS e, se profile_load, tracemalloc)
+        self.profile_load = MEMORY_PROFILE_LOAD
+        self.load_memory = None
+    
+    @property
+    def model(self):
+        """Modelo servido"""
+        return self._state.model
+    
+    @model.setter
+    def model(self, value):
+        self._replace_state(model=value)
+    
+    @property
+    def model_info(self):
+        """Informações do modelo servido"""
+        return self._state.model_info
+    
+    @model_info.setter
+    def model_info(self, value):
+        self._replace_state(model_info=value)
+    
+    @property
+    def scorer(self):
+        """Scorer linear pré-computado do modelo servido (ou None)"""
+        return self._state.scorer
+    
+    @scorer.setter
+    def scorer(self, value):
+        self._replace_state(scorer=value)
+    
+    @property
+    def batch_vectorizer(self):
+        """Vetorizador de lotes do modelo servido (ou None)"""
+        return self._state.batch_vectorizer
+    
+    @batch_vectorizer.setter
+    def batch_vectorizer(self, value):
+        self._replace_state(batch_vectorizer=value)
+    
+    @property
+    def cascade(self):
+        """Primeiro estágio da cascata do modelo servido (ou None)"""
+        return self._state.cascade
+    
+    @cascade.setter
+    def cascade(self, value):
+        self._replace_state(cascade=value)
+    
+    def _replace_state(self, **fields):
+        """Substitui campos do estado criando um novo estado imutável"""
+        with self._state_lock:
+            self._state = self._state._replace(**fields)
         
     def load_model(self):
         """
@@ -28,7 +120,22 @@ class ModelService:
         try:
             # Carregar modelo
             if os.path.exists(MODEL_PATH):
-                self.model = joblib.load(MODEL_PATH)
+                rss_before = rss_bytes()
+                profiler = LoadProfiler() if self.profile_load else nullcontext()
+                with profiler:
+                    model = joblib.load(MODEL_PATH)
+                    
+                    # Os textos chegam ao modelo já processados: trocar o regex do TF-IDF por split
+                    if FAST_TOKENIZER and install_fast_analyzer(model):
+                        logger.info("✅ Tokenizador rápido instalado no vetorizador")
+                    
+                    scorer = LinearScorer.from_pipeline(model)
+                    batch_vectorizer = BatchVectorizer.from_model(model) if scorer is not None else None
+                    cascade = self._build_cascade(scorer)
+                version = self._file_version(MODEL_PATH)
+                load_memory = profiler.report() if self.profile_load else {}
+                load_memory.update(rss_before=rss_before, rss_after=rss_bytes())
+                self.load_memory = load_memory
                 logger.info("✅ Modelo carregado com sucesso!")
             else:
                 raise FileNotFoundError(f"Arquivo do modelo não encontrado: {MODEL_PATH}")
@@ -36,16 +143,50 @@ class ModelService:
             # Carregar informações do modelo
             if os.path.exists(MODEL_INFO_PATH):
                 with open(MODEL_INFO_PATH, 'r') as f:
-                    self.model_info = json.load(f)
+                    model_info = json.load(f)
                 logger.info("✅ Informações do modelo carregadas com sucesso!")
             else:
                 logger.warning("⚠️ Arquivo de informações do modelo não encontrado!")
-                self.model_info = {}
+                model_info = {}
+            
+            # Publicar o novo estado com uma única troca de referência
+            with self._state_lock:
+                self._state = ModelState(model, model_info, scorer, batch_vectorizer, version, cascade)
+            
+            # Referência de drift calculada no dataset de treino (ao lado de model_info.json)
+            self.drift.load_baseline(DRIFT_BASELINE_PATH, version)
+            
+            # Carregar modelo candidato (modo sombra), sem afetar o modelo servido
+            if SHADOW_MODEL_PATH:
+                try:
+                    self.shadow.load_candidate(SHADOW_MODEL_PATH)
+                except Exception as e:
+                    logger.warning(f"⚠️ Modo sombra desativado: {e}")
                 
         except Exception as e:
             logger.error(f"❌ Erro ao carregar o modelo: {e}")
             raise e
     
+    def _build_cascade(self, scorer):
+        """Triagem por léxico do modelo carregado (None se desativada ou inaplicável)"""
+        if not self.cascade_enabled:
+            return None
+        cascade = LexiconCascade.from_scorer(scorer, CASCADE_LEXICON_SIZE, CASCADE_MIN_MARGIN) if scorer is not None else None
+        if cascade is None:
+            logger.warning("⚠️ Cascata desativada: o modelo não é linear ou o intercepto não garante a margem")
+        else:
+            logger.info(f"✅ Cascata ativa com léxico de {len(cascade.lexicon)} tokens")
+        return cascade
+    
+    @staticmethod
+    def _file_version(path):
+        """Impressão digital do arquivo do modelo (igual em todos os workers)"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+    
     def is_loaded(self):
         """Verifica se o modelo está carregado"""
         return self.model is not None
@@ -54,6 +195,63 @@ class ModelService:
         """Retorna as informações do modelo"""
         return self.model_info if self.model_info else {}
     
+    def get_shadow_stats(self):
+        """Retorna as estatísticas do modo sombra"""
+        return self.shadow.get_stats()
+    
+    def get_cache_stats(self):
+        """Retorna as estatísticas do cache de resultados"""
+        return self.cache.get_stats()
+    
+    def get_cascade_stats(self):
+        """Retorna as estatísticas do primeiro estágio da cascata"""
+        cascade = self.cascade
+        return dict(cascade.get_stats(), enabled=True) if cascade is not None else {'enabled': False}
+    
+    def get_scoring_stats(self):
+        """Retorna as estatísticas do modo sombra, do cache e da cascata (e o processo) em uma única chamada"""
+        return {
+            'pid': os.getpid(),
+            'shadow': self.get_shadow_stats(),
+            'cache': self.get_cache_stats(),
+            'cascade': self.get_cascade_stats(),
+        }
+    
+    def get_drift_report(self, windows=None):
+        """Retorna os sketches de drift por janela e a comparação com a referência"""
+        return self.drift.snapshot(windows)
+    
+    def get_memory_report(self):
+        """
+        Retorna a memória do processo e do modelo servido (bytes).
+        
+        Os componentes do modelo (vocabulário, IDF, coeficientes, stop words)
+        são medidos primeiro; as estruturas derivadas contam apenas o que
+        não compartilham com eles.
+        
+        Returns:
+            dict: RSS atual, RSS antes da carga do modelo (base do
+            interpretador), medição da carga, componentes e caches
+        """
+        state = self._state
+        seen = set()
+        components = component_sizes(model_components(state.model), seen) if state.model is not None else {}
+        if state.scorer is not None:
+            components['scorer'] = deep_sizeof(state.scorer, seen)
+        if state.batch_vectorizer is not None:
+            components['batch_vectorizer'] = deep_sizeof(state.batch_vectorizer, seen)
+        if state.cascade is not None:
+            components['cascade'] = deep_sizeof(state.cascade, seen)
+        
+        return {
+            'rss': rss_bytes(),
+            'interpreter_baseline': self.load_memory['rss_before'] if self.load_memory else None,
+            'load': self.load_memory,
+            'model': components,
+            'model_total': sum(components.values()),
+            'caches': {'result_cache': self.cache.memory_usage()},
+        }
+    
     def predict_single(self, comment):
         """
         Faz predição para um único comentário.
@@ -65,8 +263,12 @@ class ModelService:
             dict: Resultado da predição com confiança e outros metadados
         """
         try:
+            # Ler o estado uma única vez: uma recarga concorrente não afeta esta predição
+            state = self._state
+            
             # Preprocessar texto
-            processed_comment = preprocess_text(comment)
+            with span('preprocess'):
+                processed_comment = preprocess_text(comment)
             
             if not processed_comment.strip():
                 return {
@@ -75,58 +277,291 @@ class ModelService:
                     'result': None
                 }
             
-            # Fazer predição
-            prediction = self.model.predict([processed_comment])[0]
+            # Primeiro estágio da cascata: sem tokens do léxico, não é discurso de ódio
+            if state.cascade is not None:
+                with span('cascade'):
+                    benign = state.cascade.screen(processed_comment)
+                if benign:
+                    prediction = state.cascade.benign_class
+                    confidence_data = self._cascade_confidence(state.cascade)
+                    self.shadow.submit(processed_comment, prediction, state.model)
+                    self._observe(state, [comment], [processed_comment], [prediction], [confidence_data])
+                    return self._build_result(comment, processed_comment, prediction, confidence_data)
             
-            # Calcular confiança
-            confidence_data = self._calculate_confidence(processed_comment)
+            # Resultado em cache para esta versão do modelo
+            if state.version is not None:
+                with span('cache'):
+                    cached = self.cache.get(state.version, processed_comment)
+                if cached is not None:
+                    self.shadow.submit(processed_comment, cached['prediction'], state.model)
+                    self._observe(state, [comment], [processed_comment], [cached['prediction']], [cached['confidence']])
+                    return self._build_result(comment, processed_comment, cached['prediction'], cached['confidence'])
             
-            # Determinar resultado
-            result = RESPONSE_LABELS['NOT_HATE_SPEECH'] if prediction == 1 else RESPONSE_LABELS['HATE_SPEECH']
+            if state.scorer is not None and not hasattr(state.model, 'predict_proba'):
+                # Caminho rápido: uma única vetorização para predição e confiança
+                with span('vectorize'):
+                    X = state.scorer.transform([processed_comment])
+                with span('score'):
+                    decision = state.scorer.decision_scores(X)
+                    prediction = state.scorer.predict_classes(decision)[0]
+                with span('confidence'):
+                    confidence_data = self._confidence_from_decision(decision[0])
+            else:
+                # Fazer predição (vetorização e score no pipeline)
+                with span('score'):
+                    prediction = state.model.predict([processed_comment])[0]
+                
+                # Calcular confiança
+                with span('confidence'):
+                    confidence_data = self._calculate_confidence(processed_comment, state.model)
+            
+            if state.version is not None:
+                with span('cache'):
+                    self.cache.put(state.version, processed_comment, {
+                        'prediction': int(prediction),
+                        'confidence': confidence_data
+                    })
+            
+            # Avaliar modelo candidato em segundo plano (modo sombra)
+            self.shadow.submit(processed_comment, prediction, state.model)
+            
+            self._observe(state, [comment], [processed_comment], [prediction], [confidence_data])
+            return self._build_result(comment, processed_comment, prediction, confidence_data)
+            
+        except Exception as e:
+            logger.error(f"Erro na predição: {e}")
+            return {
+                'error': True,
+                'message': str(e),
+                'result': None
+            }
+    
+    def predict_batch(self, comments):
+        """
+        Faz predição para uma lista de comentários.
+        
+        Para modelos lineares o lote é vetorizado uma única vez, pelo
+        BatchVectorizer quando disponível. Comentários duplicados (após o
+        preprocessamento) são classificados uma única vez e o resultado é
+        replicado para cada posição original. Os resultados em cache são
+        buscados com uma única consulta por nível e apenas os demais são
+        classificados. Com a cascata ativa, os comentários sem tokens do
+        léxico são decididos antes mesmo do cache.
+        
+        Args:
+            comments: Lista de comentários a serem classificados
+            
+        Returns:
+            dict: Lista de resultados (mesmo formato de predict_single) e
+            quantidade de comentários agrupados a outros, ou erro
+        """
+        try:
+            state = self._state
+            
+            with span('preprocess'):
+                if self.deduplicate:
+                    # Cópias idênticas do texto bruto são preprocessadas uma única vez
+                    processed_by_comment = {comment: preprocess_text(comment) for comment in dict.fromkeys(comments)}
+                    processed_comments = [processed_by_comment[comment] for comment in comments]
+                else:
+                    processed_comments = [preprocess_text(comment) for comment in comments]
+            
+            if not all(processed.strip() for processed in processed_comments):
+                return {
+                    'error': True,
+                    'message': 'Comentário inválido',
+                    'result': None
+                }
+            
+            if self.deduplicate:
+                with span('dedup'):
+                    representatives, positions = deduplicate(
+                        processed_comments, self.near_duplicates, BATCH_NEAR_DUPLICATE_SIMILARITY
+                    )
+                unique_comments = [processed_comments[index] for index in representatives]
+            else:
+                positions = range(len(processed_comments))
+                unique_comments = processed_comments
+            
+            predictions = [None] * len(unique_comments)
+            confidences = [None] * len(unique_comments)
+            
+            # Primeiro estágio da cascata: decide os comentários sem tokens do léxico
+            if state.cascade is not None:
+                with span('cascade'):
+                    screened = state.cascade.screen_many(unique_comments)
+                confidence_data = self._cascade_confidence(state.cascade)
+                for index, benign in enumerate(screened):
+                    if benign:
+                        predictions[index] = state.cascade.benign_class
+                        confidences[index] = confidence_data
+            pending = [index for index, prediction in enumerate(predictions) if prediction is None]
+            
+            if state.version is not None and pending:
+                with span('cache'):
+                    cached = self.cache.get_many(state.version, [unique_comments[index] for index in pending])
+                for index, value in zip(pending, cached):
+                    if value is not None:
+                        predictions[index] = value['prediction']
+                        confidences[index] = value['confidence']
+            misses = [index for index in pending if predictions[index] is None]
+            
+            if misses:
+                texts = [unique_comments[index] for index in misses]
+                if state.scorer is not None and not hasattr(state.model, 'predict_proba'):
+                    with span('vectorize'):
+                        if state.batch_vectorizer is not None:
+                            X = state.batch_vectorizer.transform(texts)
+                        else:
+                            X = state.scorer.transform(texts)
+                    with span('score'):
+                        decisions = state.scorer.decision_scores(X)
+                        new_predictions = state.scorer.predict_classes(decisions)
+                    with span('confidence'):
+                        new_confidences = [self._confidence_from_decision(decision) for decision in decisions]
+                else:
+                    with span('score'):
+                        new_predictions = state.model.predict(texts)
+                    with span('confidence'):
+                        new_confidences = [self._calculate_confidence(processed, state.model) for processed in texts]
+                
+                for index, prediction, confidence_data in zip(misses, new_predictions, new_confidences):
+                    predictions[index] = int(prediction)
+                    confidences[index] = confidence_data
+                
+                if state.version is not None:
+                    with span('cache'):
+                        self.cache.put_many(state.version, texts, [
+                            {'prediction': predictions[index], 'confidence': confidences[index]} for index in misses
+                        ])
+            
+            for processed, prediction in zip(unique_comments, predictions):
+                self.shadow.submit(processed, prediction, state.model)
+            
+            # Resultados por posição original (duplicatas contam como tráfego no drift)
+            predictions = [predictions[position] for position in positions]
+            confidences = [confidences[position] for position in positions]
+            self._observe(state, comments, processed_comments, predictions, confidences)
             
             return {
                 'error': False,
-                'comment': comment,
-                'prediction': result,
-                'is_hate_speech': result == RESPONSE_LABELS['HATE_SPEECH'],
-                'confidence': confidence_data['confidence'],
-                'confidence_method': confidence_data['method'],
-                'processed_comment': processed_comment,
-                'timestamp': datetime.now().isoformat()
+                'results': [
+                    self._build_result(comment, processed, prediction, confidence_data)
+                    for comment, processed, prediction, confidence_data
+                    in zip(comments, processed_comments, predictions, confidences)
+                ],
+                'collapsed': len(processed_comments) - len(unique_comments)
             }
             
         except Exception as e:
-            logger.error(f"Erro na predição: {e}")
+            logger.error(f"Erro na predição em lote: {e}")
+            return {
+                'error': True,
+                'message': str(e),
+                'result': None
+            }
+    
+    def _observe(self, state, comments, processed_comments, predictions, confidences):
+        """Registra predições servidas nos sketches de drift"""
+        with span('drift'):
+            self.drift.observe(
+                state.scorer, processed_comments, [len(comment) for comment in comments], predictions, confidences
+            )
+    
+    def _build_result(self, comment, processed_comment, prediction, confidence_data):
+        """Monta o dicionário de resultado de uma predição"""
+        # Determinar resultado
+        result = RESPONSE_LABELS['NOT_HATE_SPEECH'] if prediction == 1 else RESPONSE_LABELS['HATE_SPEECH']
+        
+        return {
+            'error': False,
+            'comment': comment,
+            'prediction': result,
+            'is_hate_speech': result == RESPONSE_LABELS['HATE_SPEECH'],
+            'confidence': confidence_data['confidence'],
+            'confidence_method': confidence_data['method'],
+            'processed_comment': processed_comment,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def explain_batch(self, comments, top_k=EXPLAIN_TOP_K):
+        """
+        Explica a predição de uma lista de comentários pelas contribuições dos tokens.
+        
+        As contribuições (tfidf × coeficiente) são obtidas dos pesos
+        pré-computados do scorer linear, com uma única vetorização do lote.
+        
+        Args:
+            comments: Lista de comentários a serem explicados
+            top_k: Quantidade máxima de tokens retornados por comentário
+            
+        Returns:
+            dict: Lista de explicações ou erro
+        """
+        scorer = self.scorer
+        if scorer is None:
+            return {
+                'error': True,
+                'message': 'Explicações disponíveis apenas para modelos lineares',
+                'result': None
+            }
+        
+        try:
+            processed_comments = [preprocess_text(comment) for comment in comments]
+            X = scorer.transform(processed_comments)
+            explanations = scorer.explain(X, top_k)
+            
+            results = []
+            for comment, processed_comment, (score, tokens) in zip(comments, processed_comments, explanations):
+                is_hate_speech = bool(scorer.predict_classes(score) == HATE_SPEECH_CLASS)
+                results.append({
+                    'comment': comment,
+                    'prediction': RESPONSE_LABELS['HATE_SPEECH'] if is_hate_speech else RESPONSE_LABELS['NOT_HATE_SPEECH'],
+                    'is_hate_speech': is_hate_speech,
+                    'decision_score': round(score, 4),
+                    'intercept': round(scorer.intercept, 4),
+                    'tokens': tokens,
+                    'processed_comment': processed_comment
+                })
+            
+            return {
+                'error': False,
+                'results': results
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro na explicação: {e}")
             return {
                 'error': True,
                 'message': str(e),
                 'result': None
             }
     
-    def _calculate_confidence(self, processed_text):
+    def _calculate_confidence(self, processed_text, model=None):
         """
         Calcula a confiança da predição.
         
         Args:
             processed_text: Texto já processado
+            model: Modelo a ser usado (padrão: modelo atual)
             
         Returns:
             dict: Dicionário com confiança e método usado
         """
+        model = model if model is not None else self.model
         confidence = 0.0
         method = "none"
         
         try:
             # Tentar usar probabilidade
-            probability = self.model.predict_proba([processed_text])[0]
+            probability = model.predict_proba([processed_text])[0]
             confidence = max(probability) * 100
             method = "probability"
         except AttributeError:
             try:
                 # Tentar usar decision function
-                decision = self.model.decision_function([processed_text])[0]
-                confidence = 100 * (1 / (1 + np.exp(-abs(decision))))
-                method = "decision_function"
+                decision = model.decision_function([processed_text])[0]
+                return self._confidence_from_decision(decision)
             except:
                 # Valor padrão
                 confidence = 50.0
@@ -136,6 +571,23 @@ class ModelService:
             'confidence': round(confidence, 2),
             'method': method
         }
+    
+    @classmethod
+    def _cascade_confidence(cls, cascade):
+        """Confiança dos comentários decididos pela triagem: a da margem mínima garantida"""
+        return {
+            'confidence': cls._confidence_from_decision(cascade.margin)['confidence'],
+            'method': "lexicon"
+        }
+    
+    @staticmethod
+    def _confidence_from_decision(decision):
+        """Converte a decision function em confiança (sigmoide da margem)"""
+        confidence = 100 * (1 / (1 + np.exp(-abs(decision))))
+        return {
+            'confidence': round(float(confidence), 2),
+            'method': "decision_function"
+        }
 
 
 # Instância singleton do serviço
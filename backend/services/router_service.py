@@ -0,0 +1,474 @@
+"""
+Roteamento com afinidade de cache entre nós de inferência
+
+O roteador fica na frente de várias instâncias da API e escolhe o nó de cada
+comentário por hashing consistente do texto preprocessado, a mesma chave do
+cache de resultados: cópias do mesmo texto chegam sempre ao mesmo nó, e o
+cache de cada nó guarda apenas a sua fatia do tráfego em vez de uma cópia de
+tudo. Lotes são divididos por nó, enviados em paralelo e recombinados na ordem
+original. Quando um nó entra, sai ou falha no health check, apenas as chaves
+da fatia dele mudam de nó.
+"""
+import bisect
+import hashlib
+import http.client
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from backend.config.settings import (
+    ROUTER_STRATEGY, ROUTER_VIRTUAL_NODES, ROUTER_MAX_CONNECTIONS, ROUTER_FANOUT_WORKERS,
+    ROUTER_TIMEOUT, ROUTER_HEALTH_INTERVAL, logger
+)
+from backend.utils.text_preprocessor import preprocess_text
+from hate_speech_client.connection import ConnectionPool
+
+# Estratégias de escolha do nó
+HASH = 'hash'
+ROUND_ROBIN = 'round_robin'
+STRATEGIES = (HASH, ROUND_ROBIN)
+
+# Código de erro do roteamento
+NO_BACKENDS = 'NO_BACKENDS'
+
+RING_SIZE = 2 ** 64
+
+# Cabeçalhos das respostas dos nós repassados ao cliente
+FORWARDED_HEADERS = ('Retry-After',)
+
+CONNECTION_ERRORS = (OSError, http.client.HTTPException)
+
+
+def ring_hash(key):
+    """Posição (64 bits) de uma chave no anel"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def normalize_node_url(url):
+    """
+    URL de um nó sem a barra final.
+
+    Raises:
+        ValueError: URL sem esquema http(s) ou sem host
+    """
+    if not isinstance(url, str):
+        raise ValueError("URL do nó deve ser uma string")
+    url = url.strip().rstrip('/')
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"URL de nó inválida: {url}")
+    return url
+
+
+class HashRing:
+    """
+    Anel de hashing consistente com nós virtuais.
+
+    Cada nó ocupa virtual_nodes posições do anel; uma chave pertence ao
+    primeiro nó no sentido horário a partir da sua posição. Adicionar ou
+    remover um nó move apenas as chaves da fatia dele (cerca de 1/N). As
+    posições são trocadas de uma vez a cada mudança, então node_for pode ser
+    chamado por várias threads sem trava.
+    """
+
+    def __init__(self, nodes=(), virtual_nodes=ROUTER_VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self._nodes = set()
+        self._ring = ([], [])
+        for node in nodes:
+            self.add(node)
+
+    def _rebuild(self):
+        """Recalcula as posições ordenadas e o nó de cada uma"""
+        ring = sorted(
+            (ring_hash(f"{node}#{replica}"), node)
+            for node in self._nodes for replica in range(self.virtual_nodes)
+        )
+        self._ring = ([point for point, _ in ring], [node for _, node in ring])
+
+    def add(self, node):
+        """Adiciona um nó (False se já estava no anel)"""
+        if node in self._nodes:
+            return False
+        self._nodes.add(node)
+        self._rebuild()
+        return True
+
+    def remove(self, node):
+        """Remove um nó (False se não estava no anel)"""
+        if node not in self._nodes:
+            return False
+        self._nodes.discard(node)
+        self._rebuild()
+        return True
+
+    @property
+    def nodes(self):
+        """Nós do anel, em ordem"""
+        return sorted(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._nodes
+
+    def node_for(self, key):
+        """Nó responsável pela chave (None se o anel estiver vazio)"""
+        points, owners = self._ring
+        if not points:
+            return None
+        return owners[bisect.bisect(points, ring_hash(key)) % len(owners)]
+
+    def shares(self):
+        """Fração do espaço de hashes atribuída a cada nó"""
+        points, owners = self._ring
+        shares = dict.fromkeys(self._nodes, 0)
+        previous = points[-1] - RING_SIZE if points else 0
+        for point, owner in zip(points, owners):
+            shares[owner] += point - previous
+            previous = point
+        return {node: share / RING_SIZE for node, share in shares.items()}
+
+
+class ShardRouter:
+    """
+    Distribui as predições entre os nós registrados.
+
+    Os nós registrados ficam no anel enquanto estiverem saudáveis: uma falha
+    de conexão tira o nó do anel na hora (os comentários dele são reenviados
+    aos sucessores) e o health check periódico o devolve quando /api/health
+    voltar a responder com o modelo carregado. Respostas de erro dos nós
+    (400, 429, 503...) são repassadas ao cliente.
+    """
+
+    def __init__(self, nodes=(), strategy=ROUTER_STRATEGY, virtual_nodes=ROUTER_VIRTUAL_NODES,
+                 max_connections=ROUTER_MAX_CONNECTIONS, fanout_workers=ROUTER_FANOUT_WORKERS,
+                 timeout=ROUTER_TIMEOUT, health_interval=ROUTER_HEALTH_INTERVAL):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia de roteamento desconhecida: {strategy}")
+        self.strategy = strategy
+        self.max_connections = max_connections
+        self.fanout_workers = fanout_workers
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.ring = HashRing(virtual_nodes=virtual_nodes)
+
+        self._pools = {}
+        self._node_stats = {}
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._fanout = None
+        self._health_thread = None
+        self._stop = threading.Event()
+        self._stats = {'requests': 0, 'comments': 0, 'failovers': 0, 'rebalances': 0}
+
+        for node in nodes:
+            self.add_node(node)
+
+    # Membros do cluster
+
+    def _count(self, node=None, **increments):
+        """Atualiza os contadores do roteador (ou de um nó)"""
+        with self._lock:
+            stats = self._stats if node is None else self._node_stats.get(node)
+            if stats is not None:
+                for name, value in increments.items():
+                    stats[name] += value
+
+    def _join(self, node):
+        """Coloca um nó no anel (com a trava)"""
+        if self.ring.add(node):
+            self._stats['rebalances'] += 1
+            logger.info(f"Nó {node} entrou no anel ({len(self.ring)} nós)")
+
+    def _leave(self, node):
+        """Tira um nó do anel (com a trava)"""
+        if self.ring.remove(node):
+            self._stats['rebalances'] += 1
+            logger.warning(f"Nó {node} saiu do anel ({len(self.ring)} nós)")
+
+    def add_node(self, url):
+        """
+        Registra um nó e o coloca no anel.
+
+        Returns:
+            bool: False se o nó já estava registrado
+
+        Raises:
+            ValueError: URL inválida
+        """
+        node = normalize_node_url(url)
+        with self._lock:
+            if node in self._pools:
+                return False
+            self._pools[node] = ConnectionPool(node, self.max_connections, self.timeout)
+            self._node_stats[node] = {'requests': 0, 'comments': 0, 'failures': 0}
+            self._join(node)
+        return True
+
+    def remove_node(self, url):
+        """
+        Remove um nó do cluster (as chaves dele passam aos sucessores no anel).
+
+        Returns:
+            bool: False se o nó não estava registrado
+        """
+        try:
+            node = normalize_node_url(url)
+        except ValueError:
+            return False
+        with self._lock:
+            pool = self._pools.pop(node, None)
+            if pool is None:
+                return False
+            del self._node_stats[node]
+            self._leave(node)
+        pool.close()
+        return True
+
+    def mark_down(self, node):
+        """Tira do anel um nó registrado que falhou"""
+        with self._lock:
+            if node in self._pools:
+                self._leave(node)
+
+    def mark_up(self, node):
+        """Devolve ao anel um nó registrado que voltou a responder"""
+        with self._lock:
+            if node in self._pools:
+                self._join(node)
+
+    # Roteamento
+
+    def _assign(self, keys):
+        """
+        Agrupa as posições das chaves por nó.
+
+        Com hashing consistente, cada chave vai ao nó dela no anel; com
+        round robin, todas vão ao próximo nó da rodada.
+
+        Returns:
+            dict: {nó: [posições]} ou None se não houver nós no anel
+        """
+        if self.strategy == ROUND_ROBIN:
+            nodes = self.ring.nodes
+            if not nodes:
+                return None
+            return {nodes[next(self._round_robin) % len(nodes)]: list(range(len(keys)))}
+
+        groups = {}
+        for index, key in enumerate(keys):
+            node = self.ring.node_for(key)
+            if node is None:
+                return None
+            groups.setdefault(node, []).append(index)
+        return groups
+
+    def _post(self, node, path, payload, comments):
+        """
+        Envia uma predição a um nó.
+
+        Returns:
+            tuple: (status, cabeçalhos, corpo decodificado)
+
+        Raises:
+            OSError, http.client.HTTPException: Falha de conexão (ou nó removido)
+        """
+        pool = self._pools.get(node)
+        if pool is None:
+            raise ConnectionError(f"Nó {node} removido")
+        self._count(node, requests=1, comments=comments)
+        status, headers, data = pool.request('POST', path, json.dumps(payload).encode(), {
+            'Content-Type': 'application/json', 'Accept': 'application/json'
+        })
+        try:
+            body = json.loads(data) if data else {}
+        except ValueError:
+            body = {'error': 'Resposta inválida do nó', 'message': data.decode(errors='replace')}
+        return status, headers, body
+
+    def _failed(self, node, error):
+        """Registra a falha de conexão com um nó e o tira do anel"""
+        logger.warning(f"Falha ao contatar o nó {node}: {error}")
+        self._count(node, failures=1)
+        self._count(failovers=1)
+        self.mark_down(node)
+
+    @staticmethod
+    def _forwarded_headers(headers, nodes):
+        """Cabeçalhos da resposta ao cliente"""
+        forwarded = {name: headers[name] for name in FORWARDED_HEADERS if name in headers}
+        forwarded['X-Routed-To'] = ','.join(nodes)
+        return forwarded
+
+    def predict(self, payload):
+        """
+        Encaminha uma predição única ao nó do comentário.
+
+        Args:
+            payload: Corpo validado de /api/predict
+
+        Returns:
+            dict: {'error': False, 'status', 'body', 'headers'} com a resposta
+            do nó ou {'error': True, 'code': NO_BACKENDS}
+        """
+        self._count(requests=1, comments=1)
+        key = preprocess_text(payload['comment'])
+        # Cada falha tira um nó do anel: no máximo uma tentativa por nó registrado
+        for _ in range(len(self._pools) + 1):
+            groups = self._assign([key])
+            if groups is None:
+                break
+            node = next(iter(groups))
+            try:
+                status, headers, body = self._post(node, '/api/predict', payload, 1)
+            except CONNECTION_ERRORS as e:
+                self._failed(node, e)
+                continue
+            return {'error': False, 'status': status, 'body': body,
+                    'headers': self._forwarded_headers(headers, [node])}
+        return {'error': True, 'code': NO_BACKENDS}
+
+    def _send_groups(self, groups, payload, comments):
+        """
+        Envia as partes de um lote aos nós (em paralelo se houver mais de uma).
+
+        Returns:
+            list: (nó, posições, resposta ou exceção de conexão) de cada parte
+        """
+        def send(item):
+            node, indices = item
+            part = dict(payload, comments=[comments[index] for index in indices])
+            try:
+                return node, indices, self._post(node, '/api/predict/batch', part, len(indices))
+            except CONNECTION_ERRORS as e:
+                return node, indices, e
+
+        items = list(groups.items())
+        if len(items) == 1:
+            return [send(items[0])]
+        with self._lock:
+            if self._fanout is None:
+                self._fanout = ThreadPoolExecutor(max_workers=self.fanout_workers, thread_name_prefix='router-fanout')
+        return list(self._fanout.map(send, items))
+
+    def predict_batch(self, payload):
+        """
+        Divide um lote pelos nós dos comentários e recombina as respostas.
+
+        Os comentários de um nó que falhar são reenviados aos sucessores no
+        anel. Se um nó responder com erro, a resposta dele é repassada; a
+        posição de um comentário inválido ("index") é convertida para a
+        posição no lote original.
+
+        Args:
+            payload: Corpo validado de /api/predict/batch
+
+        Returns:
+            dict: {'error': False, 'status', 'body', 'headers'} ou
+            {'error': True, 'code': NO_BACKENDS}
+        """
+        comments = payload['comments']
+        self._count(requests=1, comments=len(comments))
+        keys = [preprocess_text(comment) for comment in comments]
+        results = [None] * len(comments)
+        collapsed = 0
+        degraded = False
+        nodes = []
+        pending = list(range(len(comments)))
+
+        for _ in range(len(self._pools) + 1):
+            groups = self._assign([keys[index] for index in pending])
+            if groups is None:
+                break
+            groups = {node: [pending[index] for index in indices] for node, indices in groups.items()}
+
+            pending = []
+            for node, indices, response in self._send_groups(groups, payload, comments):
+                if isinstance(response, Exception):
+                    self._failed(node, response)
+                    pending.extend(indices)
+                    continue
+
+                status, headers, body = response
+                if status != 200:
+                    if isinstance(body.get('index'), int) and 0 <= body['index'] < len(indices):
+                        body = dict(body, index=indices[body['index']])
+                    return {'error': False, 'status': status, 'body': body,
+                            'headers': self._forwarded_headers(headers, [node])}
+
+                for index, result in zip(indices, body['results']):
+                    results[index] = result
+                collapsed += body.get('collapsed', 0)
+                degraded = degraded or body.get('degraded', False)
+                nodes.append(node)
+
+            if not pending:
+                response = {'results': results, 'total': len(results), 'collapsed': collapsed}
+                if degraded:
+                    response['degraded'] = True
+                return {'error': False, 'status': 200, 'body': response,
+                        'headers': self._forwarded_headers({}, sorted(set(nodes)))}
+            pending.sort()
+
+        return {'error': True, 'code': NO_BACKENDS}
+
+    # Health check
+
+    def check_health(self):
+        """Consulta /api/health de cada nó registrado e atualiza o anel"""
+        for node, pool in list(self._pools.items()):
+            try:
+                status, _, data = pool.request('GET', '/api/health')
+                healthy = status == 200 and json.loads(data).get('model_loaded', False)
+            except (*CONNECTION_ERRORS, ValueError):
+                healthy = False
+            if healthy:
+                self.mark_up(node)
+            else:
+                self.mark_down(node)
+
+    def _run_health_checks(self):
+        """Executa o health check a cada health_interval segundos"""
+        while not self._stop.wait(self.health_interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Erro no health check dos nós: {e}")
+
+    def start(self):
+        """Inicia o health check periódico (se health_interval > 0)"""
+        if self.health_interval > 0 and self._health_thread is None:
+            self._stop.clear()
+            self._health_thread = threading.Thread(target=self._run_health_checks, name='router-health', daemon=True)
+            self._health_thread.start()
+
+    def close(self):
+        """Para o health check e fecha as conexões"""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+        if self._fanout is not None:
+            self._fanout.shutdown(wait=True)
+            self._fanout = None
+        for pool in list(self._pools.values()):
+            pool.close()
+
+    def get_stats(self):
+        """Retorna os nós (no anel ou fora), a fatia de cada um e os contadores"""
+        with self._lock:
+            shares = self.ring.shares()
+            nodes = [
+                dict(stats, url=node, in_ring=node in self.ring, share=round(shares.get(node, 0.0), 4))
+                for node, stats in sorted(self._node_stats.items())
+            ]
+            stats = dict(self._stats)
+        return dict(stats, strategy=self.strategy, virtual_nodes=self.ring.virtual_nodes,
+                    healthy=sum(node['in_ring'] for node in nodes), nodes=nodes)
+
+
+# Instância global do roteador (nós adicionados por router.py: --node ou ROUTER_NODES)
+router_service = ShardRouter()
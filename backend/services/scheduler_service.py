@@ -0,0 +1,200 @@
+"""
+Escalonador por prioridade das rotas de predição
+
+Cada classe de tráfego (faixa) tem a sua fila limitada e a sua cota de
+workers: as predições interativas (/api/predict, a caixa de comentários ao
+vivo) não esperam vagas ocupadas por lotes. As faixas são ordenadas por
+prioridade, e uma requisição de uma faixa inferior só começa quando não há
+requisições esperando nas faixas superiores: lotes cedem a vez às predições
+interativas. Durante a execução, os lotes são processados em partes e, entre
+uma parte e outra, aguardam o fim das predições interativas em andamento
+(yield_to_higher): com o GIL, um lote em execução atrasaria cada predição
+interativa em até um intervalo de troca de thread.
+"""
+import threading
+import time
+from collections import deque
+from backend.config.settings import (
+    SCHEDULER_INTERACTIVE_WORKERS, SCHEDULER_INTERACTIVE_QUEUE, SCHEDULER_BULK_WORKERS,
+    SCHEDULER_BULK_QUEUE, SCHEDULER_QUEUE_TIMEOUT, SCHEDULER_YIELD_TIMEOUT
+)
+
+# Faixas, da maior para a menor prioridade
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+# Decisões do escalonador
+ADMITTED = 'admitted'
+QUEUE_FULL = 'queue_full'  # 429: fila da faixa cheia
+TIMEOUT = 'timeout'        # 503: tempo máximo de espera na fila excedido
+
+# Esperas recentes por faixa usadas nos percentis
+WAIT_SAMPLES = 1024
+
+
+class _Lane:
+    """Estado de uma faixa: vagas em uso, fila de espera e contadores"""
+
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = deque()
+        self.waits_ms = deque(maxlen=WAIT_SAMPLES)
+        self.counts = {ADMITTED: 0, QUEUE_FULL: 0, TIMEOUT: 0}
+        self.queued = 0
+        self.yields = 0
+        self.yielded_ms = 0.0
+
+
+class SchedulerService:
+    """
+    Distribui as vagas de execução entre as faixas de prioridade.
+
+    Dentro de uma faixa a ordem é FIFO. Uma requisição espera no máximo
+    wait_timeout segundos; com a fila da faixa cheia ela é rejeitada na hora.
+    """
+
+    def __init__(self, lanes=None, wait_timeout=SCHEDULER_QUEUE_TIMEOUT, yield_timeout=SCHEDULER_YIELD_TIMEOUT):
+        if lanes is None:
+            lanes = [
+                (INTERACTIVE, SCHEDULER_INTERACTIVE_WORKERS, SCHEDULER_INTERACTIVE_QUEUE),
+                (BULK, SCHEDULER_BULK_WORKERS, SCHEDULER_BULK_QUEUE),
+            ]
+        self.wait_timeout = wait_timeout
+        self.yield_timeout = yield_timeout
+        self._order = [name for name, _, _ in lanes]
+        self._lane_specs = lanes
+        self._condition = threading.Condition()
+        self.reset()
+
+    def reset(self):
+        """Zera o estado e os contadores"""
+        with self._condition:
+            self._lanes = {name: _Lane(name, workers, max_queue) for name, workers, max_queue in self._lane_specs}
+
+    def _higher_waiting(self, lane):
+        """Verifica se alguma faixa de maior prioridade tem requisições esperando"""
+        for name in self._order:
+            if name == lane.name:
+                return False
+            if self._lanes[name].waiting:
+                return True
+        return False
+
+    def _higher_busy(self, lane):
+        """Verifica se alguma faixa de maior prioridade tem requisições em execução ou esperando"""
+        for name in self._order:
+            if name == lane.name:
+                return False
+            other = self._lanes[name]
+            if other.running or other.waiting:
+                return True
+        return False
+
+    def _can_run(self, lane, ticket):
+        """A requisição é a primeira da fila, há vaga na faixa e nenhuma faixa superior espera"""
+        return (
+            lane.waiting[0] is ticket
+            and lane.running < lane.workers
+            and not self._higher_waiting(lane)
+        )
+
+    def acquire(self, lane_name):
+        """
+        Aguarda uma vaga de execução na faixa.
+
+        Args:
+            lane_name: Faixa da requisição (INTERACTIVE ou BULK)
+
+        Returns:
+            str: ADMITTED, QUEUE_FULL ou TIMEOUT. Para ADMITTED, release deve
+            ser chamado ao final da requisição.
+        """
+        with self._condition:
+            lane = self._lanes[lane_name]
+
+            # Caminho rápido: faixa sem fila e com vaga livre
+            if not lane.waiting and lane.running < lane.workers and not self._higher_waiting(lane):
+                lane.running += 1
+                lane.counts[ADMITTED] += 1
+                lane.waits_ms.append(0.0)
+                return ADMITTED
+
+            if len(lane.waiting) >= lane.max_queue:
+                lane.counts[QUEUE_FULL] += 1
+                return QUEUE_FULL
+
+            ticket = object()
+            lane.waiting.append(ticket)
+            lane.queued += 1
+            start = time.perf_counter()
+            admitted = self._condition.wait_for(lambda: self._can_run(lane, ticket), self.wait_timeout)
+            lane.waiting.remove(ticket)
+            # A saída da fila pode liberar a próxima da faixa ou uma faixa inferior
+            self._condition.notify_all()
+
+            if not admitted:
+                lane.counts[TIMEOUT] += 1
+                return TIMEOUT
+
+            lane.running += 1
+            lane.counts[ADMITTED] += 1
+            lane.waits_ms.append(1000 * (time.perf_counter() - start))
+            return ADMITTED
+
+    def release(self, lane_name):
+        """Libera a vaga de uma requisição admitida"""
+        with self._condition:
+            lane = self._lanes[lane_name]
+            lane.running = max(0, lane.running - 1)
+            self._condition.notify_all()
+
+    def yield_to_higher(self, lane_name):
+        """
+        Pausa uma requisição em execução enquanto as faixas superiores estiverem
+        ocupadas (no máximo yield_timeout segundos, para não parar os lotes sob
+        tráfego interativo contínuo). A vaga da requisição é mantida.
+
+        Args:
+            lane_name: Faixa da requisição em execução
+        """
+        with self._condition:
+            lane = self._lanes[lane_name]
+            if not self._higher_busy(lane):
+                return
+            start = time.perf_counter()
+            self._condition.wait_for(lambda: not self._higher_busy(lane), self.yield_timeout)
+            lane.yields += 1
+            lane.yielded_ms += 1000 * (time.perf_counter() - start)
+
+    def get_stats(self):
+        """Retorna, por faixa, vagas em uso, fila, contadores e tempos de espera na fila"""
+        with self._condition:
+            lanes = [(lane, sorted(lane.waits_ms)) for lane in self._lanes.values()]
+            stats = {}
+            for lane, waits in lanes:
+                stats[lane.name] = {
+                    'workers': lane.workers,
+                    'running': lane.running,
+                    'waiting': len(lane.waiting),
+                    'max_queue': lane.max_queue,
+                    'admitted': lane.counts[ADMITTED],
+                    'queued': lane.queued,
+                    'rejected_queue_full': lane.counts[QUEUE_FULL],
+                    'rejected_timeout': lane.counts[TIMEOUT],
+                    'yields': lane.yields,
+                    'yielded_ms': round(lane.yielded_ms, 3),
+                    'wait_ms': {
+                        'mean': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                        'p50': round(waits[len(waits) // 2], 3) if waits else 0.0,
+                        'p99': round(waits[int(len(waits) * 0.99)], 3) if waits else 0.0,
+                        'max': round(waits[-1], 3) if waits else 0.0,
+                    },
+                }
+            return stats
+
+
+# Instância singleton do serviço
+scheduler_service = SchedulerService()
@@ -0,0 +1,209 @@
+"""
+Serviço de avaliação em modo sombra (shadow) de um modelo candidato
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+from backend.config.settings import (
+    SHADOW_SAMPLE_RATE, SHADOW_MAX_WORKERS, SHADOW_MAX_QUEUE, FAST_TOKENIZER, logger
+)
+from backend.services.linear_scorer import install_fast_analyzer
+
+
+class ShadowService:
+    """
+    Pontua uma fração dos comentários com um modelo candidato, fora do
+    caminho de resposta, e registra concordância e diferença de latência.
+
+    A concordância compara o candidato com a resposta servida (inclusive
+    acertos do cache, decisões da cascata e comentários de lotes). As
+    latências dos dois lados são medidas na thread do modo sombra sobre o
+    mesmo trabalho: predict e confiança (predict_proba ou decision_function)
+    de um único texto, com o modelo servido e com o candidato. Assim a
+    diferença não depende do caminho usado na resposta (cache, cascata,
+    lote vetorizado de uma vez). O candidato recebe o mesmo tokenizador
+    rápido do modelo servido, para que a diferença meça o modelo e não o
+    tokenizador. Como o modelo servido é medido de novo em cada amostra, o
+    modo sombra gasta o dobro de CPU do candidato (disputando o GIL com as
+    requisições); SHADOW_SAMPLE_RATE limita esse custo.
+
+    A fila é limitada por um semáforo: quando todas as vagas estão ocupadas
+    a amostra é descartada em vez de enfileirada.
+    """
+
+    # Quantidade de diferenças de latência mantidas para percentis
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, sample_rate=SHADOW_SAMPLE_RATE, max_workers=SHADOW_MAX_WORKERS,
+                 max_queue=SHADOW_MAX_QUEUE):
+        self.candidate = None
+        self.candidate_path = None
+        self.sample_rate = sample_rate
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.reset_stats()
+
+    def load_candidate(self, path):
+        """
+        Carrega o modelo candidato e inicia o pool de threads de avaliação.
+
+        Args:
+            path: Caminho do arquivo .pkl do modelo candidato
+
+        Raises:
+            FileNotFoundError: Se o arquivo do modelo candidato não existir
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo do modelo candidato não encontrado: {path}")
+
+        candidate = joblib.load(path)
+        # Mesmo tokenizador do modelo servido (ModelService.load_model)
+        if FAST_TOKENIZER:
+            install_fast_analyzer(candidate)
+        self.set_candidate(candidate, path)
+        logger.info(f"✅ Modelo candidato carregado em modo sombra: {path}")
+
+    def set_candidate(self, candidate, path=None):
+        """Define o modelo candidato já carregado em memória"""
+        self.candidate = candidate
+        self.candidate_path = path
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='shadow'
+            )
+        self.reset_stats()
+
+    def is_enabled(self):
+        """Verifica se o modo sombra está ativo"""
+        return self.candidate is not None and self.sample_rate > 0
+
+    def submit(self, processed_comment, primary_prediction, primary_model):
+        """
+        Agenda a avaliação do candidato para uma amostra dos comentários.
+
+        Nunca bloqueia: se a amostra não for sorteada ou a fila estiver
+        cheia, retorna imediatamente.
+
+        Args:
+            processed_comment: Texto já processado
+            primary_prediction: Classe respondida ao cliente
+            primary_model: Modelo servido (medido sobre o mesmo trabalho que o candidato)
+
+        Returns:
+            bool: True se a amostra foi agendada
+        """
+        if not self.is_enabled():
+            return False
+
+        if self._random.random() >= self.sample_rate:
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['dropped'] += 1
+            return False
+
+        try:
+            self._executor.submit(self._score, processed_comment, primary_prediction, primary_model)
+        except RuntimeError:
+            # Executor já finalizado
+            self._slots.release()
+            return False
+
+        with self._lock:
+            self._stats['sampled'] += 1
+        return True
+
+    @staticmethod
+    def _timed_predict(model, processed_comment):
+        """
+        Classe e latência (segundos) de predict e da confiança de um texto.
+
+        Returns:
+            tuple: (classe prevista, latência)
+        """
+        start = time.perf_counter()
+        prediction = model.predict([processed_comment])[0]
+        if hasattr(model, 'predict_proba'):
+            model.predict_proba([processed_comment])
+        elif hasattr(model, 'decision_function'):
+            model.decision_function([processed_comment])
+        return prediction, time.perf_counter() - start
+
+    def _score(self, processed_comment, primary_prediction, primary_model):
+        """Pontua um comentário com o candidato e o modelo servido e atualiza as estatísticas"""
+        try:
+            prediction, latency = self._timed_predict(self.candidate, processed_comment)
+            _, primary_latency = self._timed_predict(primary_model, processed_comment)
+
+            with self._lock:
+                self._stats['scored'] += 1
+                if prediction == primary_prediction:
+                    self._stats['agreements'] += 1
+                self._stats['primary_latency_total'] += primary_latency
+                self._stats['candidate_latency_total'] += latency
+                self._latency_deltas.append(latency - primary_latency)
+
+        except Exception as e:
+            logger.warning(f"Erro na avaliação em modo sombra: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+        finally:
+            self._slots.release()
+
+    def reset_stats(self):
+        """Zera as estatísticas acumuladas"""
+        with self._lock:
+            self._stats = {
+                'sampled': 0,
+                'scored': 0,
+                'dropped': 0,
+                'errors': 0,
+                'agreements': 0,
+                'primary_latency_total': 0.0,
+                'candidate_latency_total': 0.0,
+            }
+            self._latency_deltas = deque(maxlen=self.LATENCY_WINDOW)
+
+    def get_stats(self):
+        """
+        Retorna as estatísticas do modo sombra.
+
+        Returns:
+            dict: Contadores, taxa de concordância e latências em milissegundos
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            deltas = np.array(self._latency_deltas)
+
+        scored = stats['scored']
+        return {
+            'enabled': self.is_enabled(),
+            'candidate_path': self.candidate_path,
+            'sample_rate': self.sample_rate,
+            'sampled': stats['sampled'],
+            'scored': scored,
+            'dropped': stats['dropped'],
+            'errors': stats['errors'],
+            'agreement_rate': round(stats['agreements'] / scored, 4) if scored else None,
+            'primary_latency_ms': round(1000 * stats['primary_latency_total'] / scored, 3) if scored else None,
+            'candidate_latency_ms': round(1000 * stats['candidate_latency_total'] / scored, 3) if scored else None,
+            'latency_delta_p50_ms': round(1000 * float(np.percentile(deltas, 50)), 3) if deltas.size else None,
+            'latency_delta_p95_ms': round(1000 * float(np.percentile(deltas, 95)), 3) if deltas.size else None,
+        }
+
+    def shutdown(self, wait=True):
+        """Finaliza o pool de threads do modo sombra"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
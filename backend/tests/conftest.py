@@ -9,6 +9,38 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 
+# Arquivos de testes unitários (recebem o marcador "unit" automaticamente)
+UNIT_TEST_FILES = [
+    "test_model_service",
+    "test_shadow_service",
+    "test_linear_scorer",
+    "test_admission_service",
+    "test_fast_tokenizer",
+    "test_batch_vectorizer",
+    "test_deduplication",
+    "test_cache_service",
+    "test_compression",
+    "test_logging_setup",
+    "test_tracing",
+    "test_memory_profile",
+    "test_lexicon_cascade",
+    "test_scheduler_service",
+    "test_incremental_service",
+    "test_drift_service",
+    "test_router_service",
+]
+
+
+# Arquivos de testes de integração (recebem o marcador "integration" automaticamente)
+INTEGRATION_TEST_FILES = [
+    "test_controllers",
+    "test_async_app",
+    "test_client",
+    "test_job_service",
+    "test_router_app",
+]
+
+
 def pytest_configure(config):
     """Configuração inicial do pytest"""
     config.addinivalue_line(
@@ -36,9 +68,9 @@ def pytest_collection_modifyitems(config, items):
         if "test_model_performance" in str(item.fspath):
             item.add_marker(pytest.mark.performance)
             item.add_marker(pytest.mark.slow)
-        elif "test_controllers" in str(item.fspath):
+        elif any(name in str(item.fspath) for name in INTEGRATION_TEST_FILES):
             item.add_marker(pytest.mark.integration)
-        elif "test_model_service" in str(item.fspath):
+        elif any(name in str(item.fspath) for name in UNIT_TEST_FILES):
             item.add_marker(pytest.mark.unit)
 
 
@@ -60,6 +92,26 @@ def dataset_path(test_data_dir):
     return os.path.join(test_data_dir, 'hate.csv')
 
 
+@pytest.fixture(scope="session")
+def linear_pipeline():
+    """Pipeline TF-IDF + LinearSVC pequeno, treinado com textos de exemplo (0 = ódio)"""
+    from sklearn.pipeline import Pipeline
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+    
+    texts = [
+        "you are a stupid idiot", "i hate all of you", "go back to your country",
+        "great video thanks", "very helpful explanation", "love this song so much",
+    ]
+    labels = [0, 0, 0, 1, 1, 1]
+    
+    model = Pipeline([
+        ('tfidf', TfidfVectorizer(stop_words='english')),
+        ('classifier', LinearSVC(random_state=42)),
+    ])
+    return model.fit(texts, labels)
+
+
 def pytest_report_header(config):
     """Adicionar informações ao cabeçalho do relatório"""
     return [
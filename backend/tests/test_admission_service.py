@@ -0,0 +1,73 @@
+"""
+Testes para o AdmissionService usando PyTest
+"""
+import pytest
+from backend.services.admission_service import (
+    AdmissionService, ACCEPT, DEGRADE, REJECT_BUSY, REJECT_OVERLOADED
+)
+
+
+class TestAdmissionService:
+    """Testes unitários para o controle de admissão"""
+    
+    @pytest.fixture
+    def admission(self):
+        """Fixture com limites pequenos para facilitar os testes"""
+        return AdmissionService(max_in_flight=4, degrade_in_flight=2,
+                                latency_budget_ms=100, degrade_latency_ms=50, alpha=1.0)
+    
+    def test_accepts_under_budget(self, admission):
+        """Testa admissão normal com pouca carga"""
+        assert admission.acquire() == ACCEPT
+        assert admission.acquire() == ACCEPT
+        assert admission.get_stats()['in_flight'] == 2
+    
+    def test_degrades_then_rejects_by_in_flight(self, admission):
+        """Testa degradação e rejeição (429) conforme o trabalho em andamento"""
+        decisions = [admission.acquire() for _ in range(5)]
+        
+        assert decisions == [ACCEPT, ACCEPT, DEGRADE, DEGRADE, REJECT_BUSY]
+        stats = admission.get_stats()
+        assert stats['in_flight'] == 4
+        assert stats['shed_429'] == 1
+    
+    def test_batch_cost_counts_as_more_work(self, admission):
+        """Testa que requisições em lote consomem mais do orçamento"""
+        assert admission.acquire(cost=3) == DEGRADE
+        assert admission.acquire(cost=3) == REJECT_BUSY
+    
+    def test_rejects_by_latency(self, admission):
+        """Testa rejeição (503) quando a latência recente excede o orçamento"""
+        admission.acquire()
+        admission.release(1, 500)
+        admission.acquire()  # admitida: sem trabalho em andamento
+        
+        assert admission.acquire() == REJECT_OVERLOADED
+        assert admission.get_stats()['shed_503'] == 1
+    
+    def test_idle_service_always_admits(self, admission):
+        """Testa que a latência antiga não bloqueia um serviço ocioso"""
+        admission.acquire()
+        admission.release(1, 500)
+        
+        assert admission.acquire() == DEGRADE
+    
+    def test_release_updates_latency(self, admission):
+        """Testa atualização da média móvel de latência"""
+        admission.acquire()
+        admission.release(1, 20)
+        
+        stats = admission.get_stats()
+        assert stats['in_flight'] == 0
+        assert stats['latency_ewma_ms'] == {'default': 20.0}
+    
+    def test_slow_bulk_routes_do_not_shed_single_predictions(self, admission):
+        """Testa que a latência dos lotes não degrada nem rejeita as predições únicas"""
+        for _ in range(3):
+            admission.acquire(route='predict_batch')
+            admission.release(1, 2000, route='predict_batch')
+        admission.acquire(route='predict_batch')
+        
+        assert admission.acquire(route='predict') == ACCEPT
+        assert admission.acquire(route='predict_batch') == REJECT_OVERLOADED
+        assert admission.get_stats()['latency_ewma_ms'] == {'predict_batch': 2000.0}
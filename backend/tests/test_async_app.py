@@ -0,0 +1,210 @@
+"""
+Testes para o app assíncrono (aiohttp) usando PyTest
+"""
+import pytest
+import asyncio
+import os
+import threading
+from unittest.mock import Mock
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestServer, TestClient
+import async_app
+from async_app import create_app, OffloadedScoring
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import ModelService
+from backend.config.settings import ERROR_MESSAGES
+
+
+@pytest.fixture
+def service(linear_pipeline):
+    """ModelService com pipeline linear real"""
+    service = ModelService()
+    service.model = linear_pipeline
+    service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+    return service
+
+
+def run_with_client(app, scenario):
+    """Executa um cenário assíncrono com um cliente de teste do aiohttp"""
+    async def runner():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    return asyncio.run(runner())
+
+
+class TestAsyncApp:
+    """Testes de integração do app assíncrono"""
+    
+    def test_health_check(self, service):
+        """Testa endpoint de health check"""
+        async def scenario(client):
+            response = await client.get('/api/health')
+            return response.status, await response.json()
+        
+        status, data = run_with_client(create_app(service), scenario)
+        
+        assert status == 200
+        assert data['status'] == 'healthy'
+        assert data['model_loaded'] is True
+    
+    def test_health_check_verbose_memory(self, service):
+        """Testa o relatório de memória em /api/health?verbose=1"""
+        async def scenario(client):
+            response = await client.get('/api/health?verbose=1')
+            return await response.json()
+        
+        data = run_with_client(create_app(service), scenario)
+        
+        assert data['memory']['model_total'] > 0
+        assert 'vocabulary' in data['memory']['model']
+    
+    def test_predict_matches_service(self, service):
+        """Testa que a predição é igual à do ModelService"""
+        async def scenario(client):
+            response = await client.post('/api/predict', json={'comment': 'You are a stupid idiot!'})
+            return response.status, await response.json()
+        
+        status, data = run_with_client(create_app(service), scenario)
+        expected = service.predict_single('You are a stupid idiot!')
+        
+        assert status == 200
+        assert 'error' not in data
+        assert data['is_hate_speech'] == expected['is_hate_speech']
+        assert data['confidence'] == expected['confidence']
+    
+    def test_predict_batch_in_chunks(self, service, monkeypatch):
+        """Testa predição em lote dividida em partes"""
+        monkeypatch.setattr(async_app, 'ASYNC_BATCH_CHUNK_SIZE', 2)
+        comments = ["I hate all of you", "Great video, thanks", "love this song", "go back to your country",
+                    "ok then", "OK, then!!"]
+        
+        async def scenario(client):
+            response = await client.post('/api/predict/batch', json={'comments': comments})
+            return response.status, await response.json()
+        
+        status, data = run_with_client(create_app(service), scenario)
+        
+        assert status == 200
+        assert data['total'] == len(comments)
+        assert data['collapsed'] == 1
+        assert [r['comment'] for r in data['results']] == comments
+    
+    def test_metrics_come_from_the_scoring_service(self, service):
+        """Testa que as estatísticas do modelo vêm do executor (onde as predições acontecem)"""
+        loop_service = ModelService()
+        loop_service.model = service.model
+        service._replace_state(version='v1')
+        scoring = OffloadedScoring(service, executor='thread', max_workers=1)
+        
+        async def scenario(client):
+            await client.post('/api/predict', json={'comment': 'You are a stupid idiot!'})
+            metrics = await client.get('/api/metrics')
+            health = await client.get('/api/health?verbose=1')
+            return await metrics.json(), await health.json()
+        
+        metrics, health = run_with_client(create_app(loop_service, scoring), scenario)
+        
+        assert metrics['cache']['misses'] == 1
+        assert metrics['pid'] == os.getpid()
+        assert health['memory']['model_total'] > 0
+    
+    def test_predict_batch_without_echo(self, service):
+        """Testa a omissão dos textos com echo=false e a validação do campo"""
+        async def scenario(client):
+            response = await client.post('/api/predict/batch', json={'comments': ['Um', 'Dois'], 'echo': False})
+            invalid = await client.post('/api/predict/batch', json={'comments': ['Um'], 'echo': 'não'})
+            return await response.json(), invalid.status, await invalid.json()
+        
+        data, invalid_status, invalid = run_with_client(create_app(service), scenario)
+        
+        assert all('comment' not in r and 'processed_comment' not in r for r in data['results'])
+        assert data['total'] == 2
+        assert invalid_status == 400
+        assert invalid['message'] == ERROR_MESSAGES['INVALID_ECHO']
+    
+    def test_large_response_is_compressed(self, service):
+        """Testa a compressão das respostas negociada pelo Accept-Encoding"""
+        comments = [f"a very long and repetitive comment number {i}" for i in range(50)]
+        
+        async def scenario(client):
+            compressed = await client.post('/api/predict/batch', json={'comments': comments},
+                                           headers={'Accept-Encoding': 'gzip'})
+            plain = await client.post('/api/predict/batch', json={'comments': comments},
+                                      headers={'Accept-Encoding': 'identity'})
+            small = await client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+            return (compressed.headers.get('Content-Encoding'), (await compressed.json())['total'],
+                    plain.headers.get('Content-Encoding'), small.headers.get('Content-Encoding'),
+                    compressed.headers.get('Vary'))
+        
+        encoding, total, plain_encoding, small_encoding, vary = run_with_client(create_app(service), scenario)
+        
+        assert encoding == 'gzip'
+        assert total == len(comments)
+        assert plain_encoding is None
+        assert small_encoding is None
+        assert vary == 'Accept-Encoding'
+    
+    @pytest.mark.parametrize("path,body", [
+        ('/api/predict', b'nao e json'),
+        ('/api/predict', b'{}'),
+        ('/api/predict/batch', b'{"comments": "texto"}'),
+    ])
+    def test_invalid_payload(self, service, path, body):
+        """Testa validação compartilhada com o app Flask"""
+        async def scenario(client):
+            response = await client.post(path, data=body, headers={'Content-Type': 'application/json'})
+            return response.status
+        
+        assert run_with_client(create_app(service), scenario) == 400
+    
+    def test_server_timing_header(self, service):
+        """Testa as etapas registradas no executor de threads e o cabeçalho Server-Timing"""
+        async def scenario(client):
+            traced = await client.post('/api/predict', json={'comment': 'You are a stupid idiot!'})
+            health = await client.get('/api/health')
+            return traced.headers.get('Server-Timing'), health.headers.get('Server-Timing')
+        
+        header, health_header = run_with_client(create_app(service, tracing=True), scenario)
+        
+        stages = [part.split(';')[0] for part in header.split(', ')]
+        assert stages == ['validate', 'preprocess', 'vectorize', 'score', 'confidence', 'drift', 'executor', 'serialize', 'total']
+        assert health_header is not None and health_header.startswith('total;dur=')
+    
+    def test_model_not_loaded(self):
+        """Testa erro quando modelo não está carregado"""
+        async def scenario(client):
+            response = await client.post('/api/predict', json={'comment': 'Teste'})
+            return response.status, await response.json()
+        
+        status, data = run_with_client(create_app(ModelService()), scenario)
+        
+        assert status == 500
+        assert data['error'] == 'Modelo não carregado'
+
+
+class TestOffloadedScoring:
+    """Testes unitários do executor de predições"""
+    
+    def test_cancelled_request_skips_queued_work(self):
+        """Testa que uma requisição cancelada não chega a ser processada"""
+        release = threading.Event()
+        service = Mock()
+        service.predict_single.side_effect = lambda comment: release.wait(5) and comment
+        scoring = OffloadedScoring(service, executor='thread', max_workers=1, max_pending=10)
+        
+        async def scenario():
+            first = asyncio.ensure_future(scoring.run('predict_single', 'primeiro'))
+            second = asyncio.ensure_future(scoring.run('predict_single', 'segundo'))
+            await asyncio.sleep(0.05)
+            second.cancel()
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first
+        
+        assert asyncio.run(scenario()) == 'primeiro'
+        scoring.shutdown()
+        
+        called_with = [call.args[0] for call in service.predict_single.call_args_list]
+        assert called_with == ['primeiro']
@@ -0,0 +1,121 @@
+"""
+Testes do vetorizador de lotes (BatchVectorizer) usando PyTest
+"""
+import pytest
+import copy
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from backend.services.batch_vectorizer import BatchVectorizer
+from backend.services.linear_scorer import CompactLinearModel, install_fast_analyzer
+from backend.utils.text_preprocessor import preprocess_text
+
+TRICKY_COMMENTS = [
+    "You are a STUPID idiot!!! 123",
+    "don’t “hate” me — idiot",
+    "naïve café idiot😀stupid",
+    "a i x1 snake_case_idiot",
+    "the of and",
+    "stupid idiot, stupid idiot, stupid",
+    "great video thanks",
+]
+
+
+def processed(comments):
+    """Aplica preprocess_text a uma lista de comentários"""
+    return [preprocess_text(comment) for comment in comments]
+
+
+def assert_same_matrix(expected, actual):
+    """Verifica igualdade de forma e valores de duas matrizes esparsas"""
+    assert expected.shape == actual.shape
+    np.testing.assert_allclose(expected.toarray(), actual.toarray(), rtol=0, atol=1e-12)
+
+
+class TestBatchVectorizer:
+    """Testes unitários para o BatchVectorizer"""
+    
+    def test_matches_pipeline_transform(self, linear_pipeline):
+        """Testa paridade com o TfidfVectorizer do pipeline"""
+        texts = processed(TRICKY_COMMENTS)
+        vectorizer = BatchVectorizer.from_model(linear_pipeline)
+        
+        assert_same_matrix(linear_pipeline.steps[0][1].transform(texts), vectorizer.transform(texts))
+    
+    def test_matches_pipeline_with_fast_analyzer(self, linear_pipeline):
+        """Testa criação a partir do pipeline com o FastAnalyzer instalado"""
+        pipeline = copy.deepcopy(linear_pipeline)
+        install_fast_analyzer(pipeline)
+        texts = processed(TRICKY_COMMENTS)
+        
+        vectorizer = BatchVectorizer.from_model(pipeline)
+        
+        assert vectorizer is not None
+        assert_same_matrix(linear_pipeline.steps[0][1].transform(texts), vectorizer.transform(texts))
+    
+    @pytest.mark.parametrize("keep_norm_terms", [True, False])
+    def test_matches_compact_model(self, linear_pipeline, keep_norm_terms):
+        """Testa paridade com o CompactLinearModel, com e sem termos de norma"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline, keep_norm_terms=keep_norm_terms)
+        texts = processed(TRICKY_COMMENTS)
+        
+        X = BatchVectorizer.from_model(compact).transform(texts)
+        
+        assert_same_matrix(compact.transform(texts), X)
+    
+    @pytest.mark.parametrize("precision", ["float32", "int8"])
+    def test_reduced_precision_compact_model(self, linear_pipeline, precision):
+        """Testa a vetorização em float32 dos modelos compactos de precisão reduzida"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline, precision=precision)
+        texts = processed(TRICKY_COMMENTS)
+        
+        X = BatchVectorizer.from_model(compact).transform(texts)
+        
+        assert X.dtype == np.float32
+        np.testing.assert_allclose(compact.transform(texts).toarray(), X.toarray(), rtol=1e-6)
+    
+    def test_empty_documents_and_separator(self, linear_pipeline):
+        """Testa documentos sem tokens e textos contendo o separador interno"""
+        texts = ["", "the of", "stupid\x00idiot", "idiot"]
+        X = BatchVectorizer.from_model(linear_pipeline).transform(texts)
+        expected = linear_pipeline.steps[0][1].transform([text.replace("\x00", " ") for text in texts])
+        
+        assert_same_matrix(expected, X)
+        assert X[0].nnz == 0 and X[1].nnz == 0
+    
+    def test_empty_batch(self, linear_pipeline):
+        """Testa lote vazio"""
+        vectorizer = BatchVectorizer.from_model(linear_pipeline)
+        
+        assert vectorizer.transform([]).shape == (0, vectorizer.n_output)
+    
+    def test_buffers_are_reused(self, linear_pipeline):
+        """Testa reutilização dos buffers entre lotes e cópia sob demanda"""
+        vectorizer = BatchVectorizer.from_model(linear_pipeline)
+        texts = processed(TRICKY_COMMENTS)
+        
+        first = vectorizer.transform(texts)
+        kept = vectorizer.transform(texts, copy=True)
+        second = vectorizer.transform(texts[::-1])
+        
+        assert np.shares_memory(first.data, second.data)
+        assert not np.shares_memory(kept.data, second.data)
+        assert_same_matrix(linear_pipeline.steps[0][1].transform(texts), kept)
+    
+    def test_buffers_grow_for_large_batches(self, linear_pipeline):
+        """Testa ampliação dos buffers além da capacidade inicial, em várias partes"""
+        pipeline_vectorizer = linear_pipeline.steps[0][1]
+        vectorizer = BatchVectorizer(pipeline_vectorizer.vocabulary_, pipeline_vectorizer.idf_,
+                                     initial_capacity=4, chunk_size=16)
+        texts = processed(TRICKY_COMMENTS) * 50
+        
+        assert_same_matrix(pipeline_vectorizer.transform(texts), vectorizer.transform(texts))
+    
+    def test_unsupported_models(self):
+        """Testa que vetorizadores não reproduzidos não são suportados"""
+        bigram = TfidfVectorizer(ngram_range=(1, 2)).fit(["aa bb cc", "bb cc dd"])
+        sublinear = TfidfVectorizer(sublinear_tf=True).fit(["aa bb cc", "bb cc dd"])
+        
+        assert BatchVectorizer.from_model(object()) is None
+        assert BatchVectorizer.from_model(bigram) is None
+        assert BatchVectorizer.from_model(type('Model', (), {'steps': [('tfidf', bigram)]})()) is None
+        assert BatchVectorizer.from_model(type('Model', (), {'steps': [('tfidf', sublinear)]})()) is None
@@ -0,0 +1,109 @@
+"""
+Testes do cache de resultados (LRU local e nível compartilhado SQLite) usando PyTest
+"""
+import pytest
+import sqlite3
+from backend.services import cache_service
+from backend.services.cache_service import ResultCache, SharedCacheTier, cache_key
+
+VALUE = {'prediction': 0, 'confidence': {'confidence': 91.5, 'method': 'decision_function'}}
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    """Caminho de um banco SQLite temporário"""
+    return str(tmp_path / 'cache' / 'results.sqlite')
+
+
+class TestResultCache:
+    """Testes unitários para o cache de resultados"""
+    
+    def test_local_hit_and_miss(self):
+        """Testa acerto e falha no LRU local"""
+        cache = ResultCache(max_size=10, shared_path='')
+        cache.put('v1', 'some text', VALUE)
+        
+        assert cache.get('v1', 'some text') == VALUE
+        assert cache.get('v1', 'other text') is None
+        
+        stats = cache.get_stats()
+        assert stats['local_hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['shared'] is None
+    
+    def test_model_version_is_part_of_key(self):
+        """Testa que outra versão do modelo não reaproveita resultados"""
+        cache = ResultCache(max_size=10, shared_path='')
+        cache.put('v1', 'some text', VALUE)
+        
+        assert cache.get('v2', 'some text') is None
+        assert cache_key('v1', 'some text') != cache_key('v2', 'some text')
+    
+    def test_lru_eviction(self):
+        """Testa remoção da entrada usada há mais tempo"""
+        cache = ResultCache(max_size=2, shared_path='')
+        cache.put('v1', 'a', VALUE)
+        cache.put('v1', 'b', VALUE)
+        cache.get('v1', 'a')
+        cache.put('v1', 'c', VALUE)
+        
+        assert cache.get_many('v1', ['a', 'b', 'c']) == [VALUE, None, VALUE]
+    
+    def test_shared_tier_between_instances(self, shared_path):
+        """Testa que um worker aproveita resultados gravados por outro"""
+        writer = ResultCache(max_size=10, shared_path=shared_path)
+        reader = ResultCache(max_size=10, shared_path=shared_path)
+        writer.put_many('v1', ['a', 'b'], [VALUE, VALUE])
+        
+        assert reader.get_many('v1', ['a', 'b', 'c']) == [VALUE, VALUE, None]
+        assert reader.get_stats()['shared_hits'] == 2
+        
+        # Acertos no nível compartilhado são promovidos ao LRU local
+        reader.get('v1', 'a')
+        assert reader.get_stats()['local_hits'] == 1
+    
+    def test_bulk_lookup_larger_than_variable_limit(self, shared_path, monkeypatch):
+        """Testa consultas em lote divididas em blocos de parâmetros"""
+        monkeypatch.setattr(cache_service, 'SQLITE_MAX_VARIABLES', 7)
+        texts = [f'text {i}' for i in range(30)]
+        ResultCache(max_size=0, shared_path=shared_path).put_many('v1', texts, [VALUE] * 30)
+        
+        values = ResultCache(max_size=0, shared_path=shared_path).get_many('v1', texts)
+        
+        assert values == [VALUE] * 30
+    
+    def test_shared_tier_connects_per_process(self, shared_path, monkeypatch):
+        """Testa que a conexão é aberta no primeiro uso e não é reaproveitada após um fork"""
+        tier = SharedCacheTier(shared_path)
+        assert getattr(tier._local, 'connection', None) is None
+        
+        tier.put_many([(b'a', VALUE)])
+        parent = tier._connect()
+        monkeypatch.setattr(cache_service.os, 'getpid', lambda: -1)
+        child = tier._connect()
+        
+        assert child is not parent
+        assert tier._connect() is child
+        assert tier.get_many([b'a']) == {b'a': VALUE}
+    
+    def test_shared_tier_pruning(self, shared_path, monkeypatch):
+        """Testa o limite de entradas do nível compartilhado"""
+        monkeypatch.setattr(SharedCacheTier, 'PRUNE_INTERVAL', 5)
+        tier = SharedCacheTier(shared_path, max_entries=8)
+        
+        for i in range(4):
+            tier.put_many([(cache_key('v1', f'{i}-{j}'), VALUE) for j in range(5)])
+        
+        (count,) = tier._connect().execute("SELECT COUNT(*) FROM results").fetchone()
+        assert count == 8
+    
+    def test_shared_tier_errors_are_misses(self, shared_path, monkeypatch):
+        """Testa que falhas do banco não interrompem a predição"""
+        cache = ResultCache(max_size=0, shared_path=shared_path)
+        
+        def broken():
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(cache.shared, '_connect', broken)
+        
+        cache.put('v1', 'a', VALUE)
+        assert cache.get('v1', 'a') is None
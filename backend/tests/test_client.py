@@ -0,0 +1,160 @@
+"""
+Testes do cliente Python (hate_speech_client) contra o app Flask local usando PyTest
+"""
+import pytest
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from werkzeug.serving import make_server
+from app import app
+from backend.services.admission_service import admission_service, REJECT_BUSY
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import model_service
+from hate_speech_client import HateSpeechClient, ClientError
+
+
+@pytest.fixture(scope="module")
+def server_url(linear_pipeline):
+    """Servidor Flask local (com threads) servindo o pipeline de teste"""
+    previous_state = model_service._state
+    model_service._replace_state(
+        model=linear_pipeline, scorer=LinearScorer.from_pipeline(linear_pipeline), version=None
+    )
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{server.server_port}"
+    
+    server.shutdown()
+    thread.join()
+    model_service._state = previous_state
+
+
+@pytest.fixture(scope="module")
+def async_server_url(server_url):
+    """Servidor do app assíncrono (aiohttp, com keep-alive) em uma thread"""
+    pytest.importorskip("aiohttp")
+    from aiohttp import web
+    from async_app import create_app
+    
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_app(model_service))
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{port}"
+    
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+
+@pytest.fixture
+def client(server_url):
+    """Cliente com backoff curto para os testes"""
+    admission_service.reset()
+    with HateSpeechClient(server_url, backoff=0.001, max_backoff=0.01) as client:
+        yield client
+
+
+class TestHateSpeechClient:
+    """Testes de integração do cliente com o app Flask"""
+    
+    def test_classify_matches_service(self, client):
+        """Testa que o resultado é o mesmo do ModelService"""
+        result = client.classify("You are a stupid idiot!")
+        expected = model_service.predict_single("You are a stupid idiot!")
+        
+        assert result['is_hate_speech'] == expected['is_hate_speech']
+        assert result['confidence'] == expected['confidence']
+        assert client.health()['status'] == 'healthy'
+    
+    def test_concurrent_calls_are_coalesced(self, client):
+        """Testa que chamadas concorrentes viram poucas requisições em lote"""
+        comments = [f"I hate all of you {word}" for word in ["alpha", "beta", "gamma", "delta"]] * 10
+        
+        with ThreadPoolExecutor(max_workers=len(comments)) as executor:
+            results = list(executor.map(client.classify, comments))
+        
+        stats = client.get_stats()
+        assert [r['comment'] for r in results] == comments
+        assert stats['requests'] < len(comments)
+        assert stats['batches'] >= 1
+    
+    def test_server_closing_connections(self, client):
+        """Testa requisições sequenciais quando o servidor fecha cada conexão (servidor de desenvolvimento)"""
+        for comment in ["Great video", "love this song", "go back to your country"]:
+            assert client.classify(comment)['comment'] == comment
+        
+        assert client.get_stats()['requests'] == 3
+    
+    def test_keep_alive_connections_are_reused(self, async_server_url):
+        """Testa que requisições sequenciais reutilizam a mesma conexão (app assíncrono)"""
+        with HateSpeechClient(async_server_url) as client:
+            for comment in ["Great video", "love this song", "go back to your country"]:
+                assert client.classify(comment)['comment'] == comment
+            
+            assert client.get_stats()['connections_opened'] == 1
+    
+    def test_classify_many_in_chunks(self, server_url):
+        """Testa lotes maiores que o limite da API divididos em partes"""
+        comments = [f"comment number {i} is great" for i in range(250)]
+        
+        with HateSpeechClient(server_url) as client:
+            results = client.classify_many(comments)
+            
+            assert [r['comment'] for r in results] == comments
+            assert client.get_stats()['batches'] == 3
+    
+    def test_invalid_comment_fails_only_its_call(self, client):
+        """Testa que um comentário inválido em um lote agrupado não afeta os demais"""
+        futures = [client.submit(comment) for comment in ["Great video", "!!!", "love this song"]]
+        
+        assert futures[0].result(5)['comment'] == "Great video"
+        assert futures[2].result(5)['comment'] == "love this song"
+        with pytest.raises(ClientError) as error:
+            futures[1].result(5)
+        assert error.value.status == 400
+    
+    def test_retries_on_429(self, client):
+        """Testa repetição com backoff quando o servidor rejeita por sobrecarga"""
+        decisions = iter([REJECT_BUSY, REJECT_BUSY])
+        original_acquire = admission_service.acquire
+        
+        def acquire(cost=1, route='default'):
+            return next(decisions, None) or original_acquire(cost, route)
+        
+        with patch.object(admission_service, 'acquire', side_effect=acquire):
+            result = client.classify("Great video")
+        
+        assert result['comment'] == "Great video"
+        assert client.get_stats()['retries'] == 2
+    
+    def test_gives_up_after_max_retries(self, client):
+        """Testa erro 429 após esgotar as tentativas"""
+        with patch.object(admission_service, 'acquire', return_value=REJECT_BUSY):
+            with pytest.raises(ClientError) as error:
+                client.classify("Great video")
+        
+        assert error.value.status == 429
+        assert client.get_stats()['retries'] == client.max_retries
+    
+    def test_async_usage(self, client):
+        """Testa chamadas assíncronas agrupadas"""
+        comments = ["Great video", "I hate all of you", "love this song"]
+        
+        async def scenario():
+            single = await asyncio.gather(*(client.classify_async(c) for c in comments))
+            many = await client.classify_many_async(comments)
+            return single, many
+        
+        single, many = asyncio.run(scenario())
+        
+        assert [r['is_hate_speech'] for r in single] == [r['is_hate_speech'] for r in many]
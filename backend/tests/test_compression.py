@@ -0,0 +1,70 @@
+"""
+Testes da compressão dos corpos de requisição e resposta usando PyTest
+"""
+import pytest
+import gzip
+from backend.utils import compression
+from backend.utils.compression import (
+    choose_encoding, compress, decompress, UnsupportedEncodingError, PayloadTooLargeError
+)
+
+BODY = b'{"comments": ["' + b'a very repetitive comment ' * 200 + b'"]}'
+
+
+class TestCompression:
+    """Testes unitários para as funções de compressão"""
+    
+    @pytest.mark.parametrize("accept_encoding,expected", [
+        ('gzip', 'gzip'),
+        ('gzip, deflate, br', 'gzip'),
+        ('gzip;q=0', None),
+        ('identity', None),
+        ('*', 'gzip'),
+        ('', None),
+        (None, None),
+    ])
+    def test_choose_encoding_without_zstd(self, monkeypatch, accept_encoding, expected):
+        """Testa a negociação quando apenas gzip está disponível"""
+        monkeypatch.setattr(compression, 'zstandard', None)
+        
+        assert choose_encoding(accept_encoding) == expected
+    
+    def test_choose_encoding_prefers_zstd(self):
+        """Testa a preferência por zstd e o respeito aos pesos do cliente"""
+        pytest.importorskip("zstandard")
+        
+        assert choose_encoding('gzip, zstd') == 'zstd'
+        assert choose_encoding('gzip, zstd;q=0.5') == 'gzip'
+    
+    @pytest.mark.parametrize("encoding", ['gzip', 'zstd'])
+    def test_round_trip(self, encoding):
+        """Testa compressão e descompressão"""
+        if encoding == 'zstd':
+            pytest.importorskip("zstandard")
+        
+        compressed = compress(BODY, encoding, level=1)
+        
+        assert len(compressed) < len(BODY) / 10
+        assert decompress(compressed, encoding) == BODY
+    
+    def test_decompress_gzip_from_stdlib(self):
+        """Testa corpos gerados por outros clientes (módulo gzip, x-gzip)"""
+        assert decompress(gzip.compress(BODY), 'x-gzip') == BODY
+    
+    def test_decompression_limit(self):
+        """Testa a proteção contra corpos que crescem demais ao descomprimir"""
+        bomb = compress(b'\0' * 100000, 'gzip')
+        
+        with pytest.raises(PayloadTooLargeError):
+            decompress(bomb, 'gzip', max_size=1000)
+    
+    def test_invalid_bodies(self):
+        """Testa codificação desconhecida e corpo corrompido ou truncado"""
+        compressed = compress(BODY, 'gzip')
+        
+        with pytest.raises(UnsupportedEncodingError):
+            decompress(compressed, 'br')
+        with pytest.raises(ValueError):
+            decompress(b'not gzip at all', 'gzip')
+        with pytest.raises(ValueError):
+            decompress(compressed[:len(compressed) // 2], 'gzip')
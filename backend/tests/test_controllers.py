@@ -5,7 +5,15 @@ import pytest
 from unittest.mock import Mock, patch
 import json
 from flask import Flask
-from backend.controllers import prediction_controller, health_controller
+from backend.controllers import prediction_controller, health_controller, explanation_controller, incremental_controller
+from backend.controllers.admission import admission_controlled
+from backend.controllers.scheduling import scheduled
+from backend.controllers.compression import RequestDecompressionMiddleware, compress_response
+from backend.controllers import tracing
+from backend.utils.tracing import current_trace
+from backend.utils.compression import compress, decompress
+from backend.services.admission_service import DEGRADE, REJECT_BUSY, REJECT_OVERLOADED
+from backend.services.scheduler_service import INTERACTIVE, BULK, ADMITTED, QUEUE_FULL, TIMEOUT
 
 
 class TestControllers:
@@ -20,7 +28,23 @@ class TestControllers:
         # Registrar rotas
         app.add_url_rule('/api', 'home', health_controller.home, methods=['GET'])
         app.add_url_rule('/api/health', 'health_check', health_controller.health_check, methods=['GET'])
+        app.add_url_rule('/api/metrics', 'metrics', health_controller.metrics, methods=['GET'])
+        app.add_url_rule('/api/drift', 'drift', health_controller.drift, methods=['GET'])
         app.add_url_rule('/api/predict', 'predict', prediction_controller.predict, methods=['POST'])
+        app.add_url_rule('/api/predict/batch', 'predict_batch', prediction_controller.predict_batch, methods=['POST'])
+        app.add_url_rule('/api/explain', 'explain', explanation_controller.explain, methods=['POST'])
+        app.add_url_rule('/api/predict/incremental', 'predict_incremental',
+                         incremental_controller.predict_incremental, methods=['POST'])
+        app.add_url_rule('/api/predict/incremental/<session_id>', 'close_incremental_session',
+                         incremental_controller.close_session, methods=['DELETE'])
+        app.add_url_rule('/api/guarded/predict', 'guarded_predict',
+                         admission_controlled(prediction_controller.predict), methods=['POST'])
+        app.add_url_rule('/api/guarded/predict/batch', 'guarded_predict_batch',
+                         admission_controlled(prediction_controller.predict_batch), methods=['POST'])
+        app.add_url_rule('/api/scheduled/predict', 'scheduled_predict',
+                         scheduled(prediction_controller.predict, INTERACTIVE), methods=['POST'])
+        app.add_url_rule('/api/scheduled/predict/batch', 'scheduled_predict_batch',
+                         scheduled(prediction_controller.predict_batch, BULK), methods=['POST'])
         
         return app
     
@@ -62,6 +86,57 @@ class TestControllers:
         assert data['model_loaded'] is True
         assert 'timestamp' in data
     
+    @patch('backend.controllers.health_controller.model_service')
+    def test_health_check_verbose_memory(self, mock_service, client):
+        """Testa o relatório de memória em /api/health?verbose=1"""
+        # Configurar mock
+        mock_service.is_loaded.return_value = True
+        mock_service.get_memory_report.return_value = {'rss': 150 * 1024 * 1024, 'model_total': 1024}
+        
+        # Executar
+        verbose = json.loads(client.get('/api/health?verbose=1').data)
+        plain = json.loads(client.get('/api/health').data)
+        
+        # Verificar
+        assert verbose['memory']['model_total'] == 1024
+        assert 'memory' not in plain
+        mock_service.get_memory_report.assert_called_once()
+    
+    @patch('backend.controllers.health_controller.model_service')
+    def test_metrics_endpoint(self, mock_service, client):
+        """Testa endpoint de métricas"""
+        # Configurar mock
+        mock_service.get_shadow_stats.return_value = {'enabled': False, 'scored': 0}
+        mock_service.get_cache_stats.return_value = {'local_hits': 3, 'misses': 1, 'hit_rate': 0.75}
+        mock_service.get_cascade_stats.return_value = {'enabled': True, 'decided_rate': 0.6}
+        
+        # Executar
+        response = client.get('/api/metrics')
+        data = json.loads(response.data)
+        
+        # Verificar
+        assert response.status_code == 200
+        assert data['shadow']['enabled'] is False
+        assert data['cache']['hit_rate'] == 0.75
+        assert data['cascade']['decided_rate'] == 0.6
+        assert set(data['scheduler']) == {'interactive', 'bulk'}
+        assert 'p99' in data['scheduler']['interactive']['wait_ms']
+        assert data['logging']['dropped'] >= 0
+        assert 'timestamp' in data
+    
+    @patch('backend.controllers.health_controller.model_service')
+    def test_drift_endpoint(self, mock_service, client):
+        """Testa endpoint de drift e a validação do parâmetro windows"""
+        mock_service.get_drift_report.return_value = {'enabled': True, 'windows': [], 'total': {'count': 0}}
+        
+        response = client.get('/api/drift?windows=6')
+        invalid = [client.get(f'/api/drift?windows={value}').status_code for value in ('0', '-1', 'abc')]
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['total'] == {'count': 0}
+        mock_service.get_drift_report.assert_called_once_with(6)
+        assert invalid == [400, 400, 400]
+    
     @patch('backend.controllers.prediction_controller.model_service')
     def test_predict_endpoint_success(self, mock_service, client):
         """Testa predição bem-sucedida"""
@@ -90,6 +165,183 @@ class TestControllers:
         assert data['is_hate_speech'] is False
         assert data['confidence'] == 85.5
     
+    @pytest.mark.parametrize("decision,expected_status", [
+        (REJECT_BUSY, 429),
+        (REJECT_OVERLOADED, 503),
+    ])
+    @patch('backend.controllers.admission.admission_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_endpoint_shed(self, mock_service, mock_admission, client, decision, expected_status):
+        """Testa rejeição rápida pelo controle de admissão"""
+        mock_admission.acquire.return_value = decision
+        
+        response = client.post('/api/guarded/predict', json={'comment': 'Teste'})
+        
+        assert response.status_code == expected_status
+        assert response.headers['Retry-After'] == '1'
+        mock_service.predict_single.assert_not_called()
+        mock_admission.release.assert_not_called()
+    
+    @patch('backend.controllers.admission.admission_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_endpoint_degraded(self, mock_service, mock_admission, client):
+        """Testa modo degradado: texto truncado e resposta sinalizada"""
+        mock_admission.acquire.return_value = DEGRADE
+        mock_service.is_loaded.return_value = True
+        mock_service.predict_single.return_value = {'error': False, 'prediction': 'x', 'confidence': 50.0}
+        
+        response = client.post('/api/guarded/predict', json={'comment': 'a' * 1000})
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['degraded'] is True
+        assert len(mock_service.predict_single.call_args[0][0]) == 280
+        mock_admission.release.assert_called_once()
+    
+    @patch('backend.controllers.admission.admission_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_degraded_keeps_full_text_when_truncation_is_invalid(self, mock_service, mock_admission, client):
+        """Testa que um início truncado inválido (só pontuação) não vira erro no modo degradado"""
+        mock_admission.acquire.return_value = DEGRADE
+        mock_service.is_loaded.return_value = True
+        mock_service.predict_single.return_value = {'error': False, 'prediction': 'x', 'confidence': 50.0}
+        mock_service.predict_batch.return_value = {'error': False, 'results': [{}, {}], 'collapsed': 0}
+        punctuation = '!' * 280 + ' hello'
+        
+        response = client.post('/api/guarded/predict', json={'comment': punctuation})
+        assert response.status_code == 200
+        assert mock_service.predict_single.call_args[0][0] == punctuation
+        
+        response = client.post('/api/guarded/predict/batch', json={'comments': [punctuation, 'a' * 1000]})
+        assert response.status_code == 200
+        assert response.get_json()['degraded'] is True
+        assert mock_service.predict_batch.call_args[0][0] == [punctuation, 'a' * 280]
+    
+    @pytest.mark.parametrize("decision,expected_status", [
+        (QUEUE_FULL, 429),
+        (TIMEOUT, 503),
+    ])
+    @patch('backend.controllers.scheduling.scheduler_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_endpoint_lane_rejected(self, mock_service, mock_scheduler, client, decision, expected_status):
+        """Testa rejeição pela fila da faixa de prioridade"""
+        mock_scheduler.acquire.return_value = decision
+        
+        response = client.post('/api/scheduled/predict', json={'comment': 'Teste'})
+        
+        assert response.status_code == expected_status
+        assert response.headers['Retry-After'] == '1'
+        mock_scheduler.acquire.assert_called_once_with(INTERACTIVE)
+        mock_service.predict_single.assert_not_called()
+        mock_scheduler.release.assert_not_called()
+    
+    @patch('backend.controllers.scheduling.scheduler_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_batch_bulk_lane_in_chunks(self, mock_service, mock_scheduler, client):
+        """Testa que um lote na faixa de lotes é processado em partes com pausas entre elas"""
+        mock_scheduler.acquire.return_value = ADMITTED
+        mock_service.is_loaded.return_value = True
+        mock_service.predict_batch.side_effect = lambda chunk: {
+            'error': False, 'collapsed': 1,
+            'results': [{'comment': comment, 'prediction': 'x'} for comment in chunk]
+        }
+        comments = [f'Comentário {"x" * (i + 2)}' for i in range(60)]
+        
+        response = client.post('/api/scheduled/predict/batch', json={'comments': comments})
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [item['comment'] for item in data['results']] == comments
+        assert data['collapsed'] == 3
+        assert [len(call.args[0]) for call in mock_service.predict_batch.call_args_list] == [25, 25, 10]
+        assert mock_scheduler.yield_to_higher.call_count == 2
+        mock_scheduler.release.assert_called_once_with(BULK)
+    
+    @patch('backend.controllers.scheduling.scheduler_service')
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_batch_bulk_lane_dedups_before_chunking(self, mock_service, mock_scheduler, client):
+        """Testa que cópias em partes diferentes do lote são classificadas uma única vez"""
+        mock_scheduler.acquire.return_value = ADMITTED
+        mock_service.is_loaded.return_value = True
+        mock_service.deduplicate = True
+        mock_service.predict_batch.side_effect = lambda chunk: {
+            'error': False, 'collapsed': 0,
+            'results': [{'comment': comment, 'prediction': comment.lower()} for comment in chunk]
+        }
+        unique = [f'Comentário {"x" * (i + 2)}' for i in range(30)]
+        comments = unique + ['COMENTÁRIO XX!!', unique[-1]]
+        
+        response = client.post('/api/scheduled/predict/batch', json={'comments': comments})
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        scored = [comment for call in mock_service.predict_batch.call_args_list for comment in call.args[0]]
+        assert scored == unique
+        assert [len(call.args[0]) for call in mock_service.predict_batch.call_args_list] == [25, 5]
+        assert [item['comment'] for item in data['results']] == comments
+        assert data['results'][30]['prediction'] == 'comentário xx'
+        assert data['collapsed'] == 2
+    
+    @patch('backend.controllers.incremental_controller.incremental_service')
+    @patch('backend.controllers.incremental_controller.model_service')
+    def test_predict_incremental_open_and_edit(self, mock_service, mock_incremental, client):
+        """Testa a abertura de uma sessão incremental e o envio de edições"""
+        mock_service.is_loaded.return_value = True
+        mock_incremental.open.return_value = {'error': False, 'session_id': 'abc', 'revision': 1, 'empty': False}
+        mock_incremental.update.return_value = {'error': False, 'session_id': 'abc', 'revision': 2, 'empty': False}
+        
+        opened = client.post('/api/predict/incremental', json={'text': 'Olá'})
+        edited = client.post('/api/predict/incremental', json={
+            'session_id': 'abc', 'revision': 1, 'edits': [{'start': 3, 'end': 3, 'text': '!'}]
+        })
+        
+        assert opened.status_code == 200
+        assert json.loads(opened.data) == {'session_id': 'abc', 'revision': 1, 'empty': False}
+        mock_incremental.open.assert_called_once_with('Olá', None)
+        assert edited.status_code == 200
+        mock_incremental.update.assert_called_once_with('abc', 1, [{'start': 3, 'end': 3, 'text': '!'}])
+    
+    @pytest.mark.parametrize("body", [
+        {},
+        {'session_id': 'abc', 'edits': []},
+        {'session_id': 'abc', 'revision': 1, 'edits': [{'start': '0', 'end': 1}]},
+        {'session_id': 'abc', 'revision': 1, 'edits': [{'start': 0, 'end': 0, 'text': 'x'}] * 51},
+    ])
+    @patch('backend.controllers.incremental_controller.incremental_service')
+    @patch('backend.controllers.incremental_controller.model_service')
+    def test_predict_incremental_validation(self, mock_service, mock_incremental, client, body):
+        """Testa a validação das requisições incrementais"""
+        mock_service.is_loaded.return_value = True
+        
+        response = client.post('/api/predict/incremental', json=body)
+        
+        assert response.status_code == 400
+        mock_incremental.update.assert_not_called()
+    
+    @patch('backend.controllers.incremental_controller.incremental_service')
+    @patch('backend.controllers.incremental_controller.model_service')
+    def test_predict_incremental_session_errors(self, mock_service, mock_incremental, client):
+        """Testa sessão expirada (404) e revisão divergente (409)"""
+        mock_service.is_loaded.return_value = True
+        body = {'session_id': 'abc', 'revision': 1, 'edits': []}
+        
+        mock_incremental.update.return_value = {'error': True, 'code': 'SESSION_NOT_FOUND'}
+        assert client.post('/api/predict/incremental', json=body).status_code == 404
+        
+        mock_incremental.update.return_value = {'error': True, 'code': 'SESSION_REVISION_MISMATCH', 'revision': 4}
+        response = client.post('/api/predict/incremental', json=body)
+        assert response.status_code == 409
+        assert json.loads(response.data)['revision'] == 4
+    
+    @patch('backend.controllers.incremental_controller.incremental_service')
+    def test_close_incremental_session(self, mock_incremental, client):
+        """Testa o encerramento de uma sessão incremental"""
+        mock_incremental.close.return_value = True
+        assert client.delete('/api/predict/incremental/abc').status_code == 204
+        
+        mock_incremental.close.return_value = False
+        assert client.delete('/api/predict/incremental/abc').status_code == 404
+    
     @patch('backend.controllers.prediction_controller.model_service')
     def test_predict_endpoint_model_not_loaded(self, mock_service, client):
         """Testa erro quando modelo não está carregado"""
@@ -122,4 +374,247 @@ class TestControllers:
         assert response.status_code == 400
         # A mensagem de erro quando o JSON está vazio é 'Dados inválidos'
         # Isso ocorre antes de verificar campos específicos
-        assert data['error'] == 'Dados inválidos' or data['error'] == 'Campo obrigatório ausente' 
\ No newline at end of file
+        assert data['error'] == 'Dados inválidos' or data['error'] == 'Campo obrigatório ausente' 
+    
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_batch_endpoint_success(self, mock_service, client):
+        """Testa predição em lote bem-sucedida"""
+        # Configurar mock
+        mock_service.is_loaded.return_value = True
+        mock_service.predict_batch.return_value = {
+            'error': False,
+            'results': [
+                {'comment': 'Um', 'prediction': 'Não é discurso de ódio', 'is_hate_speech': False},
+                {'comment': 'Dois', 'prediction': 'É discurso de ódio', 'is_hate_speech': True},
+            ],
+            'collapsed': 0
+        }
+        
+        # Executar
+        response = client.post('/api/predict/batch', json={'comments': ['Um', 'Dois']})
+        data = json.loads(response.data)
+        
+        # Verificar
+        assert response.status_code == 200
+        assert data['total'] == 2
+        assert data['collapsed'] == 0
+        assert data['results'][1]['is_hate_speech'] is True
+        mock_service.predict_batch.assert_called_once_with(['Um', 'Dois'])
+    
+    @pytest.mark.parametrize("payload,expected_error", [
+        ({'outro': 'campo'}, 'Campo obrigatório ausente'),
+        ({'comments': 'texto'}, 'Formato inválido'),
+        ({'comments': []}, 'Formato inválido'),
+        ({'comments': ['ok'] * 101}, 'Muitos comentários'),
+        ({'comments': ['ok', 123]}, 'Comentário inválido'),
+    ])
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_batch_endpoint_invalid_payload(self, mock_service, client, payload, expected_error):
+        """Testa validação do corpo da requisição em lote"""
+        mock_service.is_loaded.return_value = True
+        
+        response = client.post('/api/predict/batch', json=payload)
+        data = json.loads(response.data)
+        
+        assert response.status_code == 400
+        assert data['error'] == expected_error
+        mock_service.predict_batch.assert_not_called()
+    
+    @patch('backend.controllers.explanation_controller.model_service')
+    def test_explain_endpoint_success(self, mock_service, client):
+        """Testa explicação de um único comentário"""
+        # Configurar mock
+        mock_service.is_loaded.return_value = True
+        mock_service.explain_batch.return_value = {
+            'error': False,
+            'results': [{
+                'comment': 'Teste',
+                'prediction': 'É discurso de ódio',
+                'is_hate_speech': True,
+                'decision_score': -0.5,
+                'intercept': 0.1,
+                'tokens': [{'token': 'teste', 'tfidf': 1.0, 'weight': -0.6, 'contribution': 0.6}],
+                'processed_comment': 'teste'
+            }]
+        }
+        
+        # Executar
+        response = client.post('/api/explain', json={'comment': 'Teste', 'top_k': 5})
+        data = json.loads(response.data)
+        
+        # Verificar
+        assert response.status_code == 200
+        assert data['tokens'][0]['token'] == 'teste'
+        mock_service.explain_batch.assert_called_once_with(['Teste'], 5)
+    
+    @patch('backend.controllers.explanation_controller.model_service')
+    def test_explain_endpoint_batch(self, mock_service, client):
+        """Testa explicação em lote"""
+        # Configurar mock
+        mock_service.is_loaded.return_value = True
+        mock_service.explain_batch.return_value = {'error': False, 'results': [{}, {}]}
+        
+        # Executar
+        response = client.post('/api/explain', json={'comments': ['Um', 'Dois']})
+        data = json.loads(response.data)
+        
+        # Verificar
+        assert response.status_code == 200
+        assert data['total'] == 2
+    
+    @pytest.mark.parametrize("payload", [
+        {'comments': 'não é lista'},
+        {'comments': ['ok'] * 101},
+        {'comment': 'Teste', 'top_k': 0},
+        {'comments': ['ok', '!!!']},
+    ])
+    @patch('backend.controllers.explanation_controller.model_service')
+    def test_explain_endpoint_invalid_payload(self, mock_service, client, payload):
+        """Testa validação do corpo da requisição de explicação"""
+        mock_service.is_loaded.return_value = True
+        
+        response = client.post('/api/explain', json=payload)
+        
+        assert response.status_code == 400
+        mock_service.explain_batch.assert_not_called()
+    
+    @patch('backend.controllers.explanation_controller.model_service')
+    def test_explain_endpoint_non_linear_model(self, mock_service, client):
+        """Testa resposta quando o modelo não suporta explicações"""
+        mock_service.is_loaded.return_value = True
+        mock_service.scorer = None
+        
+        response = client.post('/api/explain', json={'comment': 'Teste'})
+        
+        assert response.status_code == 501
+    
+    @patch('backend.controllers.prediction_controller.model_service')
+    def test_predict_batch_without_echo(self, mock_service, client):
+        """Testa a omissão dos textos nos resultados com echo=false"""
+        mock_service.is_loaded.return_value = True
+        mock_service.predict_batch.return_value = {
+            'error': False,
+            'results': [{'comment': 'Um', 'processed_comment': 'um', 'is_hate_speech': False}],
+            'collapsed': 0
+        }
+        
+        response = client.post('/api/predict/batch', json={'comments': ['Um'], 'echo': False})
+        invalid = client.post('/api/predict/batch', json={'comments': ['Um'], 'echo': 'não'})
+        
+        assert json.loads(response.data)['results'] == [{'is_hate_speech': False}]
+        assert invalid.status_code == 400
+
+
+class TestCompressionMiddleware:
+    """Testes de integração da compressão de requisições e respostas"""
+    
+    COMMENTS = ['a very long and repetitive comment about nothing in particular'] * 50
+    
+    @pytest.fixture
+    def client(self):
+        """Aplicação Flask de teste com a compressão registrada"""
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.add_url_rule('/api/predict/batch', 'predict_batch', prediction_controller.predict_batch, methods=['POST'])
+        app.add_url_rule('/api/health', 'health_check', health_controller.health_check, methods=['GET'])
+        app.wsgi_app = RequestDecompressionMiddleware(app.wsgi_app, max_size=64 * 1024)
+        app.after_request(compress_response)
+        return app.test_client()
+    
+    @pytest.fixture
+    def mock_service(self):
+        """ModelService simulado que ecoa os comentários recebidos"""
+        with patch('backend.controllers.prediction_controller.model_service') as mock_service:
+            mock_service.is_loaded.return_value = True
+            mock_service.predict_batch.side_effect = lambda comments: {
+                'error': False,
+                'results': [{'comment': c, 'processed_comment': c, 'is_hate_speech': False} for c in comments],
+                'collapsed': 0
+            }
+            yield mock_service
+    
+    @pytest.mark.parametrize("encoding", ['gzip', 'zstd'])
+    def test_compressed_request_and_response(self, client, mock_service, encoding):
+        """Testa corpo comprimido na requisição e resposta comprimida negociada"""
+        if encoding == 'zstd':
+            pytest.importorskip("zstandard")
+        body = compress(json.dumps({'comments': self.COMMENTS}).encode(), encoding)
+        
+        response = client.post('/api/predict/batch', data=body, headers={
+            'Content-Type': 'application/json', 'Content-Encoding': encoding, 'Accept-Encoding': encoding
+        })
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response.headers['Vary']
+        data = json.loads(decompress(response.data, encoding))
+        assert data['total'] == len(self.COMMENTS)
+        mock_service.predict_batch.assert_called_once_with(self.COMMENTS)
+    
+    def test_small_or_unnegotiated_responses_are_not_compressed(self, client, mock_service):
+        """Testa respostas abaixo do limite ou sem Accept-Encoding"""
+        small = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        plain = client.post('/api/predict/batch', json={'comments': self.COMMENTS})
+        
+        assert 'Content-Encoding' not in small.headers
+        assert 'Content-Encoding' not in plain.headers
+        assert json.loads(plain.data)['total'] == len(self.COMMENTS)
+    
+    @pytest.mark.parametrize("body,encoding,status", [
+        (b'qualquer', 'br', 415),
+        (b'nao e gzip', 'gzip', 400),
+        (compress(b'[' + b'0,' * 100000 + b'0]', 'gzip'), 'gzip', 413),
+    ])
+    def test_invalid_compressed_requests(self, client, mock_service, body, encoding, status):
+        """Testa codificação não suportada, corpo corrompido e limite de descompressão"""
+        response = client.post('/api/predict/batch', data=body, headers={
+            'Content-Type': 'application/json', 'Content-Encoding': encoding
+        })
+        
+        assert response.status_code == status
+        assert 'message' in json.loads(response.data)
+        mock_service.predict_batch.assert_not_called()
+
+
+class TestTracingHooks:
+    """Testes de integração do rastreamento (cabeçalho Server-Timing)"""
+    
+    @pytest.fixture
+    def client(self, linear_pipeline):
+        """Aplicação Flask de teste com o rastreamento registrado e um ModelService real"""
+        from backend.services.model_service import ModelService
+        from backend.services.linear_scorer import LinearScorer
+        
+        service = ModelService()
+        service.model = linear_pipeline
+        service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+        
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.add_url_rule('/api/predict', 'predict', prediction_controller.predict, methods=['POST'])
+        app.before_request(tracing.start_request_trace)
+        app.after_request(tracing.finish_request_trace)
+        app.teardown_request(tracing.discard_request_trace)
+        
+        with patch('backend.controllers.prediction_controller.model_service', service):
+            yield app.test_client()
+    
+    def test_server_timing_header(self, client, monkeypatch):
+        """Testa as etapas da predição no cabeçalho Server-Timing"""
+        monkeypatch.setattr(tracing, 'TRACING', True)
+        
+        response = client.post('/api/predict', json={'comment': 'You are a stupid idiot!'})
+        
+        assert response.status_code == 200
+        stages = [part.split(';')[0] for part in response.headers['Server-Timing'].split(', ')]
+        assert stages == ['validate', 'preprocess', 'vectorize', 'score', 'confidence', 'drift', 'serialize', 'total']
+        assert current_trace() is None
+    
+    def test_disabled_tracing_has_no_header(self, client, monkeypatch):
+        """Testa que, desativado, nenhum cabeçalho é adicionado"""
+        monkeypatch.setattr(tracing, 'TRACING', False)
+        
+        response = client.post('/api/predict', json={'comment': 'You are a stupid idiot!'})
+        
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response.headers
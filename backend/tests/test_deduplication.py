@@ -0,0 +1,56 @@
+"""
+Testes da deduplicação de lotes usando PyTest
+"""
+import numpy as np
+from backend.utils.deduplication import deduplicate, minhash, jaccard
+from backend.utils.text_preprocessor import preprocess_text
+
+SPAM = "click this link now to win free money and prizes today"
+
+
+class TestDeduplication:
+    """Testes unitários para a deduplicação de lotes"""
+    
+    def test_exact_duplicates_after_preprocessing(self):
+        """Testa agrupamento de cópias que diferem só em caixa, pontuação e dígitos"""
+        texts = [preprocess_text(t) for t in ["Hello there", "HELLO, there!!! 123", "bye", "hello   there"]]
+        
+        representatives, positions = deduplicate(texts)
+        
+        assert representatives == [0, 2]
+        assert positions == [0, 0, 1, 0]
+    
+    def test_without_duplicates(self):
+        """Testa lote sem duplicatas"""
+        representatives, positions = deduplicate(["aa", "bb", "cc"], near_duplicates=True)
+        
+        assert representatives == [0, 1, 2]
+        assert positions == [0, 1, 2]
+    
+    def test_near_duplicates_only_when_enabled(self):
+        """Testa agrupamento de quase duplicatas (uma palavra trocada) apenas se ativado"""
+        texts = [SPAM, "hello world", SPAM.replace("today", "tonight"), SPAM + " now"]
+        
+        assert deduplicate(texts)[0] == [0, 1, 2, 3]
+        
+        representatives, positions = deduplicate(texts, near_duplicates=True, min_similarity=0.8)
+        
+        assert representatives == [0, 1]
+        assert positions == [0, 1, 0, 0]
+    
+    def test_dissimilar_texts_are_not_merged(self):
+        """Testa que textos abaixo da similaridade mínima não são agrupados"""
+        texts = ["you are great", "you are awful"]
+        
+        representatives, _ = deduplicate(texts, near_duplicates=True, min_similarity=0.8)
+        
+        assert representatives == [0, 1]
+    
+    def test_minhash_is_deterministic(self):
+        """Testa que a assinatura independe da ordem e estima a similaridade"""
+        words = frozenset(SPAM.split())
+        other = frozenset(SPAM.replace("today", "tonight").split())
+        
+        np.testing.assert_array_equal(minhash(words), minhash(frozenset(sorted(words))))
+        assert np.mean(minhash(words) == minhash(other)) > 0.5
+        assert jaccard(words, other) == 10 / 12
@@ -0,0 +1,230 @@
+"""
+Testes dos sketches de drift usando PyTest
+"""
+import json
+from unittest.mock import patch
+import numpy as np
+import pytest
+from backend.services.drift_service import (
+    DriftMonitor, DriftSketch, Histogram, MARGIN_EDGES, OOV_EDGES, baseline_document, psi, signed_margins
+)
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import ModelService
+from backend.tools.drift_baseline import build_sketch
+from backend.utils.text_preprocessor import preprocess_text
+
+COMMENTS = ["You are a STUPID idiot!!", "great video, thanks", "i hate all of you", "love this song",
+            "go back to your country", "very helpful explanation", "the and of", "ação naïve"]
+
+
+@pytest.fixture
+def service(linear_pipeline):
+    """ModelService com o pipeline de exemplo, sem cache e com sketches de drift"""
+    service = ModelService()
+    service.model = linear_pipeline
+    service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+    service.drift = DriftMonitor(enabled=True, shared_path='')
+    return service
+
+
+def random_sketch(rng, size):
+    """Sketch com valores aleatórios"""
+    sketch = DriftSketch()
+    sketch.add(rng.random(size) < 0.3, rng.integers(1, 5000, size), rng.normal(0, 2, size), rng.random(size))
+    return sketch
+
+
+class TestHistogram:
+    """Testes unitários para os histogramas de bordas fixas"""
+
+    def test_bins_underflow_overflow(self):
+        """Testa a contagem por faixa, as pontas e valores ausentes"""
+        histogram = Histogram(OOV_EDGES)
+        histogram.add([-0.1, 0.0, 0.01, 0.05, 0.5, 1.0, 1.5, np.nan])
+
+        assert histogram.underflow == 1
+        assert histogram.overflow == 1
+        assert histogram.counts[0] == 2
+        assert histogram.counts[1] == 1
+        assert histogram.counts[10] == 1
+        assert histogram.counts[-1] == 1  # a última borda é inclusiva
+        assert histogram.count == 7
+
+    def test_quantiles(self):
+        """Testa os quantis aproximados"""
+        values = np.random.default_rng(0).normal(0, 1, 20000)
+        histogram = Histogram(MARGIN_EDGES)
+        histogram.add(values)
+
+        for q in (0.5, 0.9, 0.99):
+            assert histogram.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+        assert Histogram(MARGIN_EDGES).quantile(0.5) is None
+
+    def test_merge_requires_same_edges(self):
+        """Testa que histogramas de bordas diferentes não são combinados"""
+        with pytest.raises(ValueError):
+            Histogram(MARGIN_EDGES).merge(Histogram(OOV_EDGES))
+
+
+class TestDriftSketch:
+    """Testes unitários para os sketches de drift"""
+
+    def test_merge_equals_single_sketch(self):
+        """Testa que combinar sketches equivale a um sketch com todo o tráfego"""
+        parts = [random_sketch(np.random.default_rng(seed), 500) for seed in range(3)]
+        merged = DriftSketch()
+        for part in parts:
+            merged.merge(DriftSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+
+        single = DriftSketch()
+        for seed in range(3):
+            rng = np.random.default_rng(seed)
+            single.add(rng.random(500) < 0.3, rng.integers(1, 5000, 500), rng.normal(0, 2, 500), rng.random(500))
+
+        assert merged.labels == single.labels
+        for name, histogram in single.histograms.items():
+            assert merged.histograms[name].counts == histogram.counts
+            assert merged.histograms[name].total == pytest.approx(histogram.total)
+
+    def test_psi(self):
+        """Testa o PSI: zero para a mesma distribuição e alto para margens deslocadas"""
+        rng = np.random.default_rng(2)
+        baseline = Histogram(MARGIN_EDGES)
+        baseline.add(rng.normal(0, 1, 20000))
+        same = Histogram(MARGIN_EDGES)
+        same.add(rng.normal(0, 1, 20000))
+        shifted = Histogram(MARGIN_EDGES)
+        shifted.add(rng.normal(1.5, 1, 20000))
+
+        assert psi(baseline, same) < 0.01
+        assert psi(baseline, shifted) > 0.25
+        assert psi(baseline, Histogram(MARGIN_EDGES)) is None
+
+    def test_signed_margins(self, linear_pipeline):
+        """Testa a margem recuperada da confiança e do rótulo previsto"""
+        decisions = linear_pipeline.decision_function([preprocess_text(c) for c in COMMENTS[:6]])
+        predictions = (decisions > 0).astype(int)
+        confidences = [ModelService._confidence_from_decision(d) for d in decisions]
+        confidences.append({'confidence': 90.0, 'method': 'lexicon'})
+        confidences.append({'confidence': 50.0, 'method': 'decision_function'})
+
+        margins = signed_margins(list(predictions) + [1, 0], confidences)
+
+        assert margins[:6] == pytest.approx(decisions, abs=0.01)
+        assert np.isnan(margins[6])
+        # Margem arredondada para zero fica do lado do rótulo previsto (0 = ódio)
+        assert -1e-6 < margins[7] < 0
+
+
+class TestDriftMonitor:
+    """Testes unitários para o monitor de drift"""
+
+    def test_predictions_are_recorded(self, service):
+        """Testa o registro das predições únicas e em lote (duplicatas contam)"""
+        with patch('backend.services.drift_service.time.time', return_value=3600.0):
+            service.predict_single(COMMENTS[0])
+            service.predict_batch(COMMENTS[:4] + COMMENTS[:2])
+            report = service.get_drift_report()
+
+        assert len(report['windows']) == 1
+        window = report['windows'][0]
+        assert window['count'] == 7
+        assert window['margin']['count'] == 7
+        assert window['length']['count'] == 7
+        assert report['total']['hate_rate'] == pytest.approx(window['hate_rate'])
+        assert report['baseline'] is None
+
+    def test_oov_ratio_is_sampled_in_batches(self, service):
+        """Testa a amostra de textos com a fração de tokens fora do vocabulário"""
+        service.drift.oov_sample = 4
+        service.predict_batch(COMMENTS * 5)
+        service.predict_single("great video from a youtuber")
+
+        window = service.get_drift_report()['windows'][0]
+        assert window['count'] == 41
+        # 4 textos do lote (um deles só com stop words, sem fração) e a predição única
+        assert window['oov_ratio']['count'] == 3 + 1
+        assert window['oov_ratio']['p99'] > 0
+
+    def test_windows_are_bounded(self):
+        """Testa a janela por instante e o limite de janelas mantidas"""
+        monitor = DriftMonitor(enabled=True, window=60, max_windows=3, shared_path='')
+        confidence = {'confidence': 80.0, 'method': 'decision_function'}
+        for minute in range(5):
+            with patch('backend.services.drift_service.time.time', return_value=minute * 60 + 1.0):
+                monitor.observe(None, ['great video'], [11], [1], [confidence])
+
+        assert list(monitor._windows) == [120, 180, 240]
+        with patch('backend.services.drift_service.time.time', return_value=4 * 60 + 1.0):
+            report = monitor.snapshot(windows=2)
+        assert [window['sketch']['start'] for window in report['windows']] == [180, 240]
+        assert report['total']['count'] == 2
+
+    def test_shared_store_merges_workers(self, tmp_path):
+        """Testa a combinação dos sketches de vários workers (várias janelas cada) pelo SQLite compartilhado"""
+        path = str(tmp_path / 'drift' / 'sketches.sqlite')
+        workers = [DriftMonitor(enabled=True, window=60, shared_path=path, flush_interval=0) for _ in range(3)]
+        confidence = {'confidence': 80.0, 'method': 'decision_function'}
+        for index, monitor in enumerate(workers):
+            for minute, count in enumerate((index + 1, index + 3)):
+                with patch.object(DriftMonitor, 'worker_id', return_value=f"host:{index}"), \
+                        patch('backend.services.drift_service.time.time', return_value=minute * 60 + 1.0):
+                    monitor.observe(None, ['x'] * count, [10] * count, [0] * count, [confidence] * count)
+
+        with patch.object(DriftMonitor, 'worker_id', return_value="host:0"), \
+                patch('backend.services.drift_service.time.time', return_value=61.0):
+            report = workers[0].snapshot()
+
+        assert report['workers'] == 3
+        assert [window['count'] for window in report['windows']] == [1 + 2 + 3, 3 + 4 + 5]
+        assert report['total']['count'] == 18
+        assert report['total']['hate_rate'] == 1.0
+
+    def test_disabled(self, service):
+        """Testa que o monitor desativado não registra nada"""
+        service.drift.enabled = False
+        service.predict_single(COMMENTS[0])
+
+        assert service.get_drift_report() == {'enabled': False}
+
+
+class TestDriftBaseline:
+    """Testes da referência de drift"""
+
+    def test_baseline_matches_live_traffic(self, service, tmp_path):
+        """Testa que a referência e o tráfego com os mesmos comentários têm as mesmas distribuições"""
+        path = str(tmp_path / 'drift_baseline.json')
+        sketch = build_sketch(service.scorer, COMMENTS * 10, chunk_size=7)
+        with open(path, 'w') as f:
+            json.dump(baseline_document(sketch, 'hate.csv', sketch.count, 'v1'), f)
+        service.drift.load_baseline(path, 'v1')
+        service.drift.oov_sample = 1000
+
+        service.predict_batch(COMMENTS * 10)
+        report = service.get_drift_report()
+
+        assert report['baseline']['matches_model']
+        assert report['baseline']['summary']['count'] == len(COMMENTS) * 10
+        drift = report['total']['drift']
+        assert drift['hate_rate_delta'] == 0.0
+        assert all(value < 1e-3 for value in drift['psi'].values())
+
+    def test_baseline_from_other_model_or_edges(self, service, tmp_path):
+        """Testa a referência de outro modelo e com bordas diferentes"""
+        path = str(tmp_path / 'drift_baseline.json')
+        document = baseline_document(build_sketch(service.scorer, COMMENTS), 'hate.csv', len(COMMENTS), 'v1')
+        with open(path, 'w') as f:
+            json.dump(document, f)
+
+        service.drift.load_baseline(path, 'v2')
+        assert service.drift.baseline is not None
+        assert not service.drift.baseline_info['matches_model']
+
+        document['edges']['margin'] = [0.0, 1.0]
+        with open(path, 'w') as f:
+            json.dump(document, f)
+        service.drift.load_baseline(path, 'v1')
+        assert service.drift.baseline is None
+
+        service.drift.load_baseline(str(tmp_path / 'missing.json'), 'v1')
+        assert service.drift.baseline is None
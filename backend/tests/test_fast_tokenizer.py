@@ -0,0 +1,105 @@
+"""
+Testes de paridade do FastAnalyzer com o analisador do sklearn usando PyTest
+"""
+import pytest
+import copy
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+from backend.utils.fast_tokenizer import FastAnalyzer
+from backend.utils.text_preprocessor import preprocess_text
+from backend.services.linear_scorer import CompactLinearModel, install_fast_analyzer
+
+TRICKY_COMMENTS = [
+    "Você é um idiota!!! 123",
+    "don’t “quote” me — ever",
+    "naïve café ação 😀emoji",
+    "a i x1 b2 snake_case CamelCase",
+    "中文字 and the of",
+    "   espaços    extras   ",
+    "stupid idiot, STUPID idiot",
+]
+
+
+def assert_same_features(vectorizer, texts):
+    """Verifica que o FastAnalyzer gera exatamente a mesma matriz TF-IDF"""
+    fast = copy.deepcopy(vectorizer)
+    fast.analyzer = FastAnalyzer.from_vectorizer(vectorizer)
+    
+    X_expected = vectorizer.transform(texts)
+    X_fast = fast.transform(texts)
+    
+    assert X_expected.shape == X_fast.shape
+    assert (X_expected != X_fast).nnz == 0
+
+
+class TestFastAnalyzer:
+    """Testes unitários para o analisador rápido"""
+    
+    @pytest.mark.parametrize("ngram_range", [(1, 1), (1, 2), (2, 3)])
+    def test_tokens_match_sklearn_analyzer(self, ngram_range):
+        """Testa que os tokens coincidem com o analisador 'word' do sklearn"""
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=ngram_range)
+        sklearn_analyzer = vectorizer.build_analyzer()
+        fast_analyzer = FastAnalyzer.from_vectorizer(vectorizer)
+        
+        for comment in TRICKY_COMMENTS:
+            processed = preprocess_text(comment)
+            assert fast_analyzer(processed) == sklearn_analyzer(processed)
+    
+    def test_features_match_on_fitted_vectorizer(self, linear_pipeline):
+        """Testa paridade das matrizes no vetorizador treinado"""
+        texts = [preprocess_text(comment) for comment in TRICKY_COMMENTS + ["you are a stupid idiot"]]
+        assert_same_features(linear_pipeline.steps[0][1], texts)
+    
+    def test_rejects_unsupported_vectorizer(self):
+        """Testa que opções não reproduzidas não são substituídas"""
+        with pytest.raises(ValueError):
+            FastAnalyzer.from_vectorizer(TfidfVectorizer(strip_accents='unicode'))
+        with pytest.raises(ValueError):
+            FastAnalyzer.from_vectorizer(TfidfVectorizer(analyzer='char'))
+        with pytest.raises(ValueError):
+            FastAnalyzer.from_vectorizer(TfidfVectorizer(token_pattern=r"\w{3,}"))
+    
+    @pytest.mark.parametrize("token_pattern", [r"\b\w+\b", r"\w{3,}"])
+    def test_non_default_pattern_keeps_sklearn_analyzer(self, token_pattern):
+        """Testa que outros token_pattern mantêm o analisador do sklearn no modelo"""
+        texts = ["a b cc dd", "cc ddd ação"]
+        labels = [0, 1]
+        pipeline = Pipeline([('tfidf', TfidfVectorizer(token_pattern=token_pattern)), ('svm', LinearSVC())])
+        pipeline.fit(texts, labels)
+        compact = CompactLinearModel.from_pipeline(pipeline)
+        expected = pipeline.decision_function(texts)
+        
+        assert install_fast_analyzer(pipeline) is False
+        assert install_fast_analyzer(compact) is False
+        assert pipeline.steps[0][1].analyzer == 'word'
+        assert compact.analyzer is None
+        np.testing.assert_array_equal(pipeline.decision_function(texts), expected)
+    
+    def test_install_on_pipeline_and_compact_model(self, linear_pipeline):
+        """Testa instalação no pipeline carregado e no modelo compactado"""
+        pipeline = copy.deepcopy(linear_pipeline)
+        compact = CompactLinearModel.from_pipeline(linear_pipeline)
+        expected_compact = compact.decision_function([preprocess_text(c) for c in TRICKY_COMMENTS])
+        texts = [preprocess_text(comment) for comment in TRICKY_COMMENTS]
+        
+        assert install_fast_analyzer(pipeline) is True
+        assert install_fast_analyzer(compact) is True
+        
+        np.testing.assert_array_equal(pipeline.decision_function(texts), linear_pipeline.decision_function(texts))
+        np.testing.assert_array_equal(compact.decision_function(texts), expected_compact)
+    
+    def test_parity_on_dataset(self, model_path, dataset_path):
+        """Testa paridade com o modelo servido em todo o corpus hate.csv"""
+        if not os.path.exists(dataset_path) or not os.path.exists(model_path):
+            pytest.skip("Dataset hate.csv ou modelo não encontrado")
+        
+        df = pd.read_csv(dataset_path, encoding='latin-1').dropna(subset=['comment'])
+        texts = df['comment'].apply(preprocess_text).tolist()
+        
+        assert_same_features(joblib.load(model_path).steps[0][1], texts)
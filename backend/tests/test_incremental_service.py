@@ -0,0 +1,195 @@
+"""
+Testes da predição incremental usando PyTest
+"""
+import copy
+import random
+from unittest.mock import patch
+import pytest
+from backend.services.incremental_service import (
+    IncrementalService, IncrementalScorer, SESSION_NOT_FOUND, REVISION_MISMATCH, INVALID_EDIT, TEXT_TOO_LONG
+)
+from backend.services.linear_scorer import LinearScorer, CompactLinearModel, install_fast_analyzer
+from backend.services.model_service import ModelService
+from backend.utils.text_preprocessor import preprocess_text
+
+WORDS = ['you', 'are', 'a', 'stupid', 'idiot', 'hate', 'great', 'video', 'thanks', 'love', 'country',
+         'ação', 'I', 'HATE', 'idiot!!', '2024', '—', 'song']
+
+
+@pytest.fixture
+def service(linear_pipeline):
+    """ModelService com o pipeline de exemplo"""
+    service = ModelService()
+    service.model = linear_pipeline
+    service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+    return service
+
+
+@pytest.fixture
+def sessions(service):
+    """IncrementalService sobre o pipeline de exemplo"""
+    return IncrementalService(service=service, max_sessions=3, ttl=60, max_chars=500)
+
+
+def full_decision(scorer, text):
+    """Decision function do texto inteiro pelo caminho normal de predição"""
+    return float(scorer.decision_scores(scorer.transform([preprocess_text(text)]))[0])
+
+
+def session_decision(sessions, session_id):
+    """Decision function mantida pela sessão"""
+    session = sessions._sessions[session_id]
+    return session.scorer.decision(session.dot, session.norm_sq)
+
+
+class TestIncrementalService:
+    """Testes unitários para as sessões de predição incremental"""
+
+    def test_open_matches_full_prediction(self, sessions, service):
+        """Testa que a sessão aberta tem a mesma predição do endpoint de predição única"""
+        text = "You are a STUPID idiot!!"
+        result = sessions.open(text)
+        expected = service.predict_single(text)
+
+        assert result['revision'] == 1
+        assert not result['empty']
+        for field in ('prediction', 'is_hate_speech', 'confidence', 'confidence_method'):
+            assert result[field] == expected[field]
+
+    def test_random_edits_match_full_scoring(self, sessions, service):
+        """Testa que edições aleatórias mantêm a decisão idêntica à do texto inteiro"""
+        rng = random.Random(0)
+        text = ''
+        result = sessions.open(text)
+        session_id, revision = result['session_id'], result['revision']
+
+        for _ in range(300):
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.choice([0, 0, 1, 3, 8]))
+            inserted = rng.choice(['', ' ', rng.choice(WORDS), ' ' + rng.choice(WORDS) + ' ', rng.choice('abtsy!,. ')])
+            if len(text) - (end - start) + len(inserted) > 500:
+                continue
+            result = sessions.update(session_id, revision, [{'start': start, 'end': end, 'text': inserted}])
+            text = text[:start] + inserted + text[end:]
+            revision = result['revision']
+
+            assert sessions._sessions[session_id].text == text
+            assert result['empty'] == (not preprocess_text(text))
+            assert session_decision(sessions, session_id) == pytest.approx(full_decision(service.scorer, text), abs=1e-9)
+
+    def test_edit_only_tokenizes_touched_words(self, sessions):
+        """Testa que o custo da edição não depende do tamanho do texto"""
+        text = 'great video ' * 30
+        result = sessions.open(text)
+        scorer = sessions._sessions[result['session_id']].scorer
+
+        with patch.object(scorer, 'tokens', wraps=scorer.tokens) as tokens:
+            sessions.update(result['session_id'], 1, [{'start': 6, 'end': 6, 'text': 'stupid '}])
+
+        assert [call.args[0] for call in tokens.call_args_list] == ['video', 'stupid video']
+
+    def test_compact_model_table(self, linear_pipeline):
+        """Testa a tabela construída a partir de um CompactLinearModel"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline)
+        service = ModelService()
+        service.model = compact
+        service.scorer = LinearScorer.from_pipeline(compact)
+        sessions = IncrementalService(service=service)
+
+        result = sessions.open('you are a stupid idiot')
+        sessions.update(result['session_id'], 1, [{'start': 0, 'end': 0, 'text': 'love this song '}])
+
+        expected = full_decision(LinearScorer.from_pipeline(linear_pipeline), 'love this song you are a stupid idiot')
+        assert session_decision(sessions, result['session_id']) == pytest.approx(expected, abs=1e-9)
+
+    def test_fast_analyzer_table(self, linear_pipeline):
+        """Testa o pipeline com o analisador rápido instalado no carregamento"""
+        pipeline = copy.deepcopy(linear_pipeline)
+        assert install_fast_analyzer(pipeline)
+        service = ModelService()
+        service.model = pipeline
+        service.scorer = LinearScorer.from_pipeline(pipeline)
+        sessions = IncrementalService(service=service)
+
+        result = sessions.open('you are a stupid idiot')
+        sessions.update(result['session_id'], 1, [{'start': 8, 'end': 9, 'text': 'such a'}])
+
+        expected = full_decision(LinearScorer.from_pipeline(linear_pipeline), 'you are such a stupid idiot')
+        assert session_decision(sessions, result['session_id']) == pytest.approx(expected, abs=1e-9)
+
+    def test_errors(self, sessions):
+        """Testa sessão inexistente, revisão divergente, edição fora do texto e texto longo"""
+        result = sessions.open('great video')
+        session_id = result['session_id']
+
+        assert sessions.update('nope', 1, [])['code'] == SESSION_NOT_FOUND
+        mismatch = sessions.update(session_id, 5, [])
+        assert mismatch['code'] == REVISION_MISMATCH and mismatch['revision'] == 1
+        assert sessions.update(session_id, 1, [{'start': 3, 'end': 99, 'text': ''}])['code'] == INVALID_EDIT
+        assert sessions.update(session_id, 1, [{'start': 0, 'end': 0, 'text': 'x' * 600}])['code'] == TEXT_TOO_LONG
+        assert sessions.open('x' * 600)['code'] == TEXT_TOO_LONG
+
+        # Nenhuma edição inválida foi aplicada
+        assert sessions._sessions[session_id].text == 'great video'
+        assert sessions.update(session_id, 1, [])['revision'] == 2
+
+    def test_resync_keeps_session_id(self, sessions):
+        """Testa a ressincronização com o texto inteiro"""
+        result = sessions.open('great video')
+        resynced = sessions.open('stupid idiot', result['session_id'])
+
+        assert resynced['session_id'] == result['session_id']
+        assert resynced['revision'] == 2
+        assert resynced['is_hate_speech']
+        assert sessions.get_stats()['resyncs'] == 1
+
+    def test_empty_text_has_no_prediction(self, sessions):
+        """Testa que texto vazio após o processamento não é classificado"""
+        result = sessions.open('!!! 123')
+
+        assert result['empty']
+        assert 'prediction' not in result
+
+    def test_capacity_eviction(self, sessions):
+        """Testa o limite de sessões (as menos recentes são removidas)"""
+        ids = [sessions.open('great video')['session_id'] for _ in range(4)]
+
+        assert ids[0] not in sessions._sessions
+        stats = sessions.get_stats()
+        assert stats['sessions'] == 3
+        assert stats['evicted_capacity'] == 1
+
+    def test_idle_eviction(self, sessions):
+        """Testa a expiração das sessões inativas"""
+        with patch('backend.services.incremental_service.time.monotonic', return_value=1000.0):
+            idle = sessions.open('great video')['session_id']
+        with patch('backend.services.incremental_service.time.monotonic', return_value=1061.0):
+            assert sessions.update(idle, 1, [])['code'] == SESSION_NOT_FOUND
+
+        assert sessions.get_stats()['evicted_idle'] == 1
+
+    def test_model_reload_rebuilds_session(self, sessions, service, linear_pipeline):
+        """Testa que a sessão é recalculada quando o modelo servido muda"""
+        result = sessions.open('great video')
+        base = service.scorer
+        service.scorer = LinearScorer(base.vectorizer, base.weights, base.intercept + 5.0, base.classes)
+
+        sessions.update(result['session_id'], 1, [])
+
+        assert session_decision(sessions, result['session_id']) == pytest.approx(
+            full_decision(service.scorer, 'great video'))
+
+    def test_close(self, sessions):
+        """Testa o encerramento de uma sessão"""
+        session_id = sessions.open('great video')['session_id']
+
+        assert sessions.close(session_id)
+        assert not sessions.close(session_id)
+
+    def test_unsupported_vectorizer(self, linear_pipeline):
+        """Testa que vetorizadores com n-gramas não são suportados"""
+        from sklearn.base import clone
+        pipeline = clone(linear_pipeline).set_params(tfidf__ngram_range=(1, 2))
+        pipeline.fit(["stupid idiot", "great video"], [0, 1])
+
+        assert IncrementalScorer.from_scorer(LinearScorer.from_pipeline(pipeline)) is None
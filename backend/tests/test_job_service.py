@@ -0,0 +1,321 @@
+"""
+Testes dos jobs em lote usando PyTest
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+import pytest
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock, patch
+from flask import Flask
+from backend.config.settings import ERROR_MESSAGES
+from backend.controllers import job_controller
+from backend.services.job_service import (
+    JobService, run_job, read_comments, worker_id, QUEUED, RUNNING, COMPLETED, FAILED, RESULT_COLUMNS
+)
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import ModelService
+
+
+@pytest.fixture
+def service(linear_pipeline):
+    """ModelService com o pipeline de exemplo"""
+    service = ModelService()
+    service.model = linear_pipeline
+    service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+    return service
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    """JobService com banco e diretório temporários (sem enviar ao pool)"""
+    jobs = JobService(db_path=str(tmp_path / 'jobs.sqlite'), jobs_dir=str(tmp_path / 'jobs'),
+                      input_root=str(tmp_path), max_pending=2)
+    jobs._enqueue = Mock()
+    return jobs
+
+
+def write_input(tmp_path, name, content):
+    """Cria um arquivo de entrada"""
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def read_result(jobs, job_id):
+    """Linhas do arquivo de resultado"""
+    with open(jobs.get_result_path(job_id), encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class TestJobService:
+    """Testes de integração para a execução dos jobs"""
+
+    def test_run_job_completes_and_writes_results(self, tmp_path, jobs, service):
+        """Testa um job CSV até a conclusão, em várias partes"""
+        path = write_input(tmp_path, 'in.csv', 'id,comment\n1,you are a stupid idiot\n2,great video thanks\n3,i hate all of you\n')
+        job = jobs.submit_path(path, 'csv')
+        assert job['status'] == QUEUED
+
+        run_job(job['id'], jobs.db_path, chunk_size=2, service=service)
+
+        job = jobs.get_job(job['id'])
+        rows = read_result(jobs, job['id'])
+        assert job['status'] == COMPLETED
+        assert job['total'] == job['processed'] == 3
+        assert job['progress'] == 1.0
+        assert job['result_url'] == f"/api/jobs/{job['id']}/result"
+        assert list(rows[0].keys()) == RESULT_COLUMNS
+        assert [row['index'] for row in rows] == ['0', '1', '2']
+        assert [row['is_hate_speech'] for row in rows] == ['1', '0', '1']
+        assert job['hate_speech'] == 2
+
+    def test_run_job_resumes_from_last_chunk(self, tmp_path, jobs, service):
+        """Testa que um job interrompido continua da última parte registrada"""
+        path = write_input(tmp_path, 'in.txt', 'you are a stupid idiot\ngreat video thanks\n\ni hate all of you\n')
+        job_id = jobs.submit_path(path, 'text')['id']
+        run_job(job_id, jobs.db_path, chunk_size=2, service=service)
+        expected = read_result(jobs, job_id)
+
+        # Simular interrupção após a primeira parte, com uma linha parcial gravada depois dela
+        with open(jobs.store.get(job_id)['result_path'], 'rb') as f:
+            content = f.read()
+        offset = content.index(b'\r\n2,') + 2
+        with open(jobs.store.get(job_id)['result_path'], 'wb') as f:
+            f.write(content[:offset] + b'2,parcial')
+        jobs.store.update(job_id, status=QUEUED, processed=2, hate_speech=1, result_offset=offset)
+
+        scored = []
+        original = service.predict_batch
+        service.predict_batch = lambda comments: scored.extend(comments) or original(comments)
+        run_job(job_id, jobs.db_path, chunk_size=2, service=service)
+
+        assert scored == ['i hate all of you']
+        assert read_result(jobs, job_id) == expected
+        assert jobs.get_job(job_id)['hate_speech'] == 2
+
+    def test_invalid_comments_are_reported_per_row(self, tmp_path, jobs, service):
+        """Testa que um comentário inválido não invalida a parte inteira"""
+        path = write_input(tmp_path, 'in.csv', 'comment\ngreat video thanks\n""\n')
+        job_id = jobs.submit_path(path, 'csv')['id']
+
+        run_job(job_id, jobs.db_path, chunk_size=10, service=service)
+
+        rows = read_result(jobs, job_id)
+        assert jobs.get_job(job_id)['errors'] == 1
+        assert rows[0]['error'] == ''
+        assert rows[1]['error'] != '' and rows[1]['prediction'] == ''
+
+    def test_csv_without_comment_column_fails(self, tmp_path, jobs, service):
+        """Testa que um CSV sem a coluna "comment" marca o job como falho"""
+        path = write_input(tmp_path, 'in.csv', 'text\nhello\n')
+        job_id = jobs.submit_path(path, 'csv')['id']
+
+        run_job(job_id, jobs.db_path, chunk_size=10, service=service)
+
+        job = jobs.get_job(job_id)
+        assert job['status'] == FAILED
+        assert 'comment' in job['error']
+        assert jobs.get_result_path(job_id) is None
+
+    def test_claimed_job_is_not_run_twice(self, tmp_path, jobs, service):
+        """Testa que um job já assumido por outro processo é ignorado"""
+        path = write_input(tmp_path, 'in.txt', 'great video thanks\n')
+        job_id = jobs.submit_path(path, 'text')['id']
+        assert jobs.store.claim(job_id)
+
+        service.predict_batch = Mock()
+        run_job(job_id, jobs.db_path, chunk_size=10, service=service)
+
+        service.predict_batch.assert_not_called()
+        assert jobs.get_job(job_id)['status'] == RUNNING
+
+    def test_start_requeues_stale_jobs(self, tmp_path, jobs):
+        """Testa que a inicialização retoma jobs parados e os da fila"""
+        path = write_input(tmp_path, 'in.txt', 'great video thanks\n')
+        stale = jobs.submit_path(path, 'text')['id']
+        fresh = jobs.submit_path(path, 'text')['id']
+        jobs.store.claim(stale)
+        jobs.store.update(stale, heartbeat=0)
+        jobs.store.claim(fresh)
+        jobs._enqueue.reset_mock()
+
+        jobs.start()
+
+        jobs._enqueue.assert_called_once_with(stale)
+        assert jobs.store.get(fresh)['status'] == RUNNING
+
+    def test_restart_right_after_crash_requeues_job(self, tmp_path, jobs):
+        """Testa que um job de um processo morto é retomado mesmo com heartbeat recente"""
+        path = write_input(tmp_path, 'in.txt', 'great video thanks\n')
+        crashed = jobs.submit_path(path, 'text')['id']
+        alive = jobs.submit_path(path, 'text')['id']
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        assert jobs.store.claim(crashed, f"{socket.gethostname()}:{process.pid}")
+        assert jobs.store.claim(alive, worker_id())
+        jobs._enqueue.reset_mock()
+
+        # Reinício logo após a queda: heartbeat dentro de JOBS_STALE_SECONDS
+        jobs.start()
+
+        jobs._enqueue.assert_called_once_with(crashed)
+        assert jobs.store.get(crashed)['status'] == QUEUED
+        assert jobs.store.get(alive)['status'] == RUNNING
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork/SIGKILL indisponíveis")
+    def test_dead_pool_worker_recreates_pool_and_resumes_jobs(self, tmp_path):
+        """Testa que a morte de um processo do pool não quebra os jobs seguintes nem marca a fila como falha"""
+        jobs = JobService(db_path=str(tmp_path / 'jobs.sqlite'), jobs_dir=str(tmp_path / 'jobs'))
+        path = write_input(tmp_path, 'in.txt', 'great video thanks\n')
+        broken = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork'))
+        pid = broken.submit(os.getpid).result(timeout=30)
+        waiting = broken.submit(time.sleep, 30)
+        os.kill(pid, signal.SIGKILL)
+        assert isinstance(waiting.exception(timeout=30), BrokenProcessPool)
+        jobs._executor = broken
+
+        with patch.object(JobService, '_enqueue', Mock()):
+            interrupted = jobs.submit_path(path, 'text')['id']
+            queued = jobs.submit_path(path, 'text')['id']
+        assert jobs.store.claim(interrupted, f"{socket.gethostname()}:{pid}")
+        # Callback do job da fila no pool quebrado: não é falha do job
+        jobs._on_done(queued, object(), Mock(exception=Mock(return_value=BrokenProcessPool())))
+
+        with patch('backend.services.job_service.ProcessPoolExecutor') as pool:
+            created = jobs.submit_path(path, 'text')['id']
+
+        submitted = [call.args[1] for call in pool.return_value.submit.call_args_list]
+        assert sorted(submitted) == sorted([interrupted, queued, created])
+        assert all(jobs.store.get(job_id)['status'] == QUEUED for job_id in submitted)
+        assert jobs._executor is pool.return_value
+
+    def test_resolve_input_path_rejects_escape(self, tmp_path, jobs):
+        """Testa que só arquivos dentro da raiz de entrada são aceitos"""
+        path = write_input(tmp_path, 'in.txt', 'x\n')
+
+        assert jobs.resolve_input_path('in.txt') == path
+        assert jobs.resolve_input_path('../in.txt') is None
+        assert jobs.resolve_input_path('/etc/passwd') is None
+        assert jobs.resolve_input_path('missing.txt') is None
+
+        jobs.input_root = ''
+        assert jobs.resolve_input_path('in.txt') is None
+
+    def test_is_full_counts_pending_jobs(self, tmp_path, jobs):
+        """Testa o limite de jobs pendentes"""
+        path = write_input(tmp_path, 'in.txt', 'x\n')
+        assert not jobs.is_full()
+        jobs.submit_path(path, 'text')
+        jobs.submit_path(path, 'text')
+        assert jobs.is_full()
+
+    def test_read_comments_text_skips_blank_lines(self, tmp_path):
+        """Testa a leitura do formato texto"""
+        path = write_input(tmp_path, 'in.txt', 'a b\n\n  \nc d\n')
+        assert list(read_comments(path, 'text', 'utf-8')) == ['a b', 'c d']
+
+    def test_stats_without_database(self, tmp_path):
+        """Testa que as métricas não criam o banco"""
+        jobs = JobService(db_path=str(tmp_path / 'none.sqlite'))
+        assert jobs.get_stats()[QUEUED] == 0
+        assert not (tmp_path / 'none.sqlite').exists()
+
+
+class TestJobController:
+    """Testes de integração para as rotas de jobs"""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste com as rotas de jobs"""
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.add_url_rule('/api/jobs', 'create_job', job_controller.create_job, methods=['POST'])
+        app.add_url_rule('/api/jobs/<job_id>', 'get_job', job_controller.get_job, methods=['GET'])
+        app.add_url_rule('/api/jobs/<job_id>/result', 'get_job_result', job_controller.get_job_result,
+                         methods=['GET'])
+        return app.test_client()
+
+    @patch('backend.controllers.job_controller.job_service')
+    def test_create_job_from_upload(self, mock_service, client):
+        """Testa a criação de um job com arquivo enviado"""
+        mock_service.is_full.return_value = False
+        mock_service.submit_upload.return_value = {'id': 'abc', 'status': QUEUED}
+
+        response = client.post('/api/jobs', data={'file': (io.BytesIO(b'comment\nhello\n'), 'in.csv')},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 202
+        assert response.headers['Location'] == '/api/jobs/abc'
+        assert mock_service.submit_upload.call_args[0][1:] == ('csv', 'utf-8')
+
+    @patch('backend.controllers.job_controller.job_service')
+    def test_create_job_from_path(self, mock_service, client):
+        """Testa a criação de um job com caminho local"""
+        mock_service.is_full.return_value = False
+        mock_service.resolve_input_path.return_value = '/data/in.txt'
+        mock_service.submit_path.return_value = {'id': 'abc', 'status': QUEUED}
+
+        response = client.post('/api/jobs', json={'path': 'in.txt', 'encoding': 'latin-1'})
+
+        assert response.status_code == 202
+        mock_service.submit_path.assert_called_once_with('/data/in.txt', 'text', 'latin-1')
+
+    @patch('backend.controllers.job_controller.job_service')
+    def test_create_job_validation(self, mock_service, client):
+        """Testa as respostas de erro da criação de jobs"""
+        mock_service.is_full.return_value = False
+        mock_service.resolve_input_path.return_value = None
+
+        assert client.post('/api/jobs', json={}).status_code == 400
+        assert client.post('/api/jobs', json={'path': 'x', 'format': 'xml'}).status_code == 400
+        assert client.post('/api/jobs', json={'path': 'x', 'encoding': 'nope'}).status_code == 400
+        assert client.post('/api/jobs', json={'path': '../x'}).status_code == 400
+
+        mock_service.is_full.return_value = True
+        response = client.post('/api/jobs', json={'path': 'x'})
+        assert response.status_code == 429
+        assert 'Retry-After' in response.headers
+
+    @patch('backend.controllers.job_controller.job_service')
+    def test_create_job_paths_disabled_by_default(self, mock_service, client):
+        """Testa que, sem JOBS_INPUT_ROOT, caminhos locais são rejeitados e uploads aceitos"""
+        mock_service.input_root = ''
+        mock_service.is_full.return_value = False
+        mock_service.submit_upload.return_value = {'id': 'abc', 'status': QUEUED}
+
+        response = client.post('/api/jobs', json={'path': 'backend/config/settings.py'})
+        assert response.status_code == 400
+        assert response.get_json()['message'] == ERROR_MESSAGES['JOB_PATHS_DISABLED']
+        mock_service.resolve_input_path.assert_not_called()
+
+        response = client.post('/api/jobs', data={'file': (io.BytesIO(b'hello\n'), 'in.txt')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 202
+
+    @patch('backend.controllers.job_controller.job_service')
+    def test_get_job_and_result(self, mock_service, client, tmp_path):
+        """Testa a consulta de um job e o download do resultado"""
+        result = write_input(tmp_path, 'r.csv', 'index,comment\n0,a\n')
+        mock_service.get_job.return_value = {'id': 'abc', 'status': COMPLETED}
+        mock_service.get_result_path.return_value = result
+
+        assert json.loads(client.get('/api/jobs/abc').data)['status'] == COMPLETED
+        response = client.get('/api/jobs/abc/result')
+        assert response.status_code == 200
+        assert response.data == b'index,comment\n0,a\n'
+
+        mock_service.get_result_path.return_value = None
+        assert client.get('/api/jobs/abc/result').status_code == 409
+
+        mock_service.get_job.return_value = None
+        assert client.get('/api/jobs/abc').status_code == 404
+        assert client.get('/api/jobs/abc/result').status_code == 404
@@ -0,0 +1,156 @@
+"""
+Testes da cascata com triagem por léxico usando PyTest
+"""
+import pytest
+from unittest.mock import Mock, patch
+from backend.services.lexicon_cascade import LexiconCascade
+from backend.services.linear_scorer import LinearScorer, CompactLinearModel
+from backend.services.model_service import ModelService
+from backend.services.shadow_service import ShadowService
+
+
+@pytest.fixture
+def scorer(linear_pipeline):
+    """Scorer do pipeline de exemplo com intercepto favorecendo "não ódio" (classe 1)"""
+    base = LinearScorer.from_pipeline(linear_pipeline)
+    return LinearScorer(base.vectorizer, base.weights, 0.25, base.classes)
+
+
+@pytest.fixture
+def service(linear_pipeline, scorer):
+    """ModelService com o scorer de exemplo e a cascata ativa"""
+    service = ModelService()
+    service.model = linear_pipeline
+    service.scorer = scorer
+    service.cascade = LexiconCascade.from_scorer(scorer)
+    return service
+
+
+class TestLexiconCascade:
+    """Testes unitários para o primeiro estágio da cascata"""
+
+    def test_lexicon_has_hate_direction_tokens(self, scorer):
+        """Testa que o léxico completo contém exatamente os tokens na direção de ódio"""
+        cascade = LexiconCascade.from_scorer(scorer)
+
+        assert cascade.lexicon == {'country', 'hate', 'idiot', 'stupid'}
+        assert cascade.exact
+        assert cascade.benign_class == 1
+        assert cascade.margin == pytest.approx(0.25)
+
+    def test_lexicon_size_keeps_strongest_tokens(self, scorer):
+        """Testa o léxico reduzido aos tokens de maior peso"""
+        cascade = LexiconCascade.from_scorer(scorer, lexicon_size=2)
+
+        assert cascade.lexicon == {'country', 'hate'}
+        assert not cascade.exact
+
+    def test_intercept_without_margin_disables_cascade(self, linear_pipeline, scorer):
+        """Testa que a cascata não é criada se o intercepto não favorece "não ódio" com margem"""
+        assert LexiconCascade.from_scorer(LinearScorer.from_pipeline(linear_pipeline)) is None
+        assert LexiconCascade.from_scorer(scorer, min_margin=0.5) is None
+
+    def test_screen_agrees_with_full_scoring(self, scorer):
+        """Testa que todo comentário decidido pela triagem é "não ódio" no modelo completo"""
+        cascade = LexiconCascade.from_scorer(scorer)
+        texts = ["great video thanks", "stupid video", "unknown words only", "i hate this country", ""]
+
+        decided = cascade.screen_many(texts)
+        decisions = scorer.decision_scores(scorer.transform(texts))
+
+        assert decided == [True, False, True, False, True]
+        assert all(decision >= cascade.margin for decision, benign in zip(decisions, decided) if benign)
+
+    def test_split_words_falls_back_to_analyzer(self, scorer):
+        """Testa que textos com caracteres não ASCII usam o analisador do vetorizador"""
+        cascade = LexiconCascade.from_scorer(scorer)
+
+        assert cascade.split_words
+        assert cascade.screen_many(["great…stupid", "ação great", "great_video"]) == [False, True, True]
+
+    def test_compact_model(self, linear_pipeline):
+        """Testa a triagem com o analisador do CompactLinearModel"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline)
+        compact.intercept = 0.25
+        cascade = LexiconCascade.from_scorer(LinearScorer.from_pipeline(compact))
+
+        assert cascade.screen_many(["great video", "stupid vídeo"]) == [True, False]
+
+    def test_stats(self, scorer):
+        """Testa os contadores da triagem"""
+        cascade = LexiconCascade.from_scorer(scorer)
+        cascade.screen_many(["great video", "stupid video", "love it", "thanks"])
+
+        stats = cascade.get_stats()
+
+        assert stats['screened'] == 4
+        assert stats['decided'] == 3
+        assert stats['decided_rate'] == 0.75
+        assert stats['lexicon_size'] == 4
+
+
+class TestModelServiceCascade:
+    """Testes da cascata integrada ao ModelService"""
+
+    def test_predict_single_decided_by_lexicon(self, service):
+        """Testa que comentários sem tokens do léxico não chegam ao vetorizador"""
+        with patch.object(service.scorer, 'transform', side_effect=AssertionError):
+            result = service.predict_single('Great video, thanks!')
+
+        assert result['error'] is False
+        assert result['is_hate_speech'] is False
+        assert result['confidence_method'] == 'lexicon'
+        assert result['confidence'] == ModelService._confidence_from_decision(0.25)['confidence']
+
+    def test_predict_single_lexicon_hit_uses_full_model(self, service):
+        """Testa que comentários com tokens do léxico seguem para o modelo completo"""
+        result = service.predict_single('You are a stupid idiot!')
+
+        assert result['is_hate_speech'] is True
+        assert result['confidence_method'] == 'decision_function'
+
+    def test_predict_batch_matches_full_scoring(self, service, scorer):
+        """Testa que o lote com cascata tem as mesmas predições do lote sem cascata"""
+        comments = ['Great video', 'stupid idiot', 'I hate this country', 'love this song', 'Great video']
+
+        with_cascade = service.predict_batch(comments)
+        service.cascade = None
+        without_cascade = service.predict_batch(comments)
+
+        assert [r['prediction'] for r in with_cascade['results']] == \
+            [r['prediction'] for r in without_cascade['results']]
+        assert [r['confidence_method'] for r in with_cascade['results']] == \
+            ['lexicon', 'decision_function', 'decision_function', 'lexicon', 'lexicon']
+
+    def test_decided_comments_shadow_the_full_model(self, service):
+        """Testa que o modo sombra mede o modelo completo, não a triagem, nos comentários decididos"""
+        service.shadow = ShadowService(sample_rate=1.0, max_workers=1)
+        candidate = Mock(spec=['predict', 'decision_function'])
+        candidate.predict.return_value = [1]
+        service.shadow.set_candidate(candidate)
+
+        with patch.object(service.model, 'predict', wraps=service.model.predict) as primary_predict:
+            result = service.predict_single('great video')
+            assert result['confidence_method'] == 'lexicon'
+            service.shadow.shutdown()
+
+        primary_predict.assert_called_once_with(['great video'])
+        stats = service.shadow.get_stats()
+        assert stats['scored'] == 1
+        assert stats['agreement_rate'] == 1.0
+
+    def test_cascade_results_are_not_cached(self, service):
+        """Testa que as decisões da triagem não ocupam o cache de resultados"""
+        service._replace_state(version='v1')
+
+        service.predict_batch(['great video', 'stupid idiot'])
+
+        assert service.cache.get('v1', 'great video') is None
+        assert service.cache.get('v1', 'stupid idiot') is not None
+
+    def test_cascade_stats(self, service):
+        """Testa as estatísticas da cascata no serviço"""
+        service.predict_single('great video')
+
+        assert service.get_cascade_stats()['decided'] == 1
+        assert ModelService().get_cascade_stats() == {'enabled': False}
@@ -0,0 +1,166 @@
+"""
+Testes para o LinearScorer usando PyTest
+"""
+import pytest
+import pickle
+import numpy as np
+from unittest.mock import Mock
+from sklearn.pipeline import Pipeline
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.svm import LinearSVC
+from backend.services.linear_scorer import LinearScorer, CompactLinearModel
+from backend.services.model_service import ModelService
+
+
+@pytest.fixture
+def pipeline(linear_pipeline):
+    """Pipeline linear pequeno treinado com textos de exemplo"""
+    return linear_pipeline
+
+
+class TestLinearScorer:
+    """Testes unitários para o scorer linear pré-computado"""
+    
+    def test_from_pipeline_rejects_non_linear(self):
+        """Testa que modelos sem vocabulário/coeficientes não geram scorer"""
+        assert LinearScorer.from_pipeline(Mock(spec=['predict'])) is None
+    
+    def test_decision_scores_match_pipeline(self, pipeline):
+        """Testa que os scores coincidem com decision_function do pipeline"""
+        scorer = LinearScorer.from_pipeline(pipeline)
+        texts = ["stupid video", "thanks for the help", "unknown words only"]
+        
+        scores = scorer.decision_scores(scorer.transform(texts))
+        
+        np.testing.assert_allclose(scores, pipeline.decision_function(texts))
+        assert list(scorer.predict_classes(scores)) == list(pipeline.predict(texts))
+    
+    def test_contributions_sum_to_decision(self, pipeline):
+        """Testa que as contribuições somadas ao intercepto reproduzem a decisão"""
+        scorer = LinearScorer.from_pipeline(pipeline)
+        X = scorer.transform(["stupid idiot great video"])
+        
+        score, tokens = scorer.explain(X, top_k=50)[0]
+        
+        # Contribuições positivas indicam ódio (classe 0), logo têm sinal oposto à decisão
+        total = -sum(token['contribution'] for token in tokens) + scorer.intercept
+        assert total == pytest.approx(score, abs=1e-3)
+        assert score == pytest.approx(pipeline.decision_function(["stupid idiot great video"])[0])
+        assert {token['token'] for token in tokens} <= {'stupid', 'idiot', 'great', 'video'}
+    
+    def test_explain_respects_top_k_and_order(self, pipeline):
+        """Testa limite de tokens e ordenação por magnitude"""
+        scorer = LinearScorer.from_pipeline(pipeline)
+        X = scorer.transform(["stupid idiot hate great video love"])
+        
+        _, tokens = scorer.explain(X, top_k=2)[0]
+        magnitudes = [abs(token['contribution']) for token in tokens]
+        
+        assert len(tokens) == 2
+        assert magnitudes == sorted(magnitudes, reverse=True)
+    
+    def test_model_service_explain_batch(self, pipeline):
+        """Testa explicações em lote pelo ModelService"""
+        service = ModelService()
+        service.model = pipeline
+        service.scorer = LinearScorer.from_pipeline(pipeline)
+        
+        result = service.explain_batch(["You are a stupid idiot!", "Great video, thanks"], top_k=3)
+        
+        assert result['error'] is False
+        assert len(result['results']) == 2
+        assert result['results'][0]['is_hate_speech'] is True
+        assert result['results'][1]['is_hate_speech'] is False
+        assert result['results'][0]['processed_comment'] == "you are a stupid idiot"
+    
+    def test_model_service_explain_without_scorer(self):
+        """Testa erro quando o modelo não é linear"""
+        service = ModelService()
+        service.model = Mock()
+        
+        result = service.explain_batch(["texto"])
+        
+        assert result['error'] is True
+
+
+class TestCompactLinearModel:
+    """Testes unitários para o modelo compactado"""
+    
+    TEXTS = [
+        "stupid video", "thanks for the help", "unknown words only", "the and of",
+        "you are a stupid stupid idiot country", "great great video love song",
+    ]
+    
+    def test_drops_zero_coefficients_keeping_norm_terms(self, linear_pipeline):
+        """Testa que apenas tokens com coeficiente não nulo ficam ativos"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline)
+        weights = LinearScorer.from_pipeline(linear_pipeline).weights
+        
+        assert len(compact.vocabulary) == np.count_nonzero(weights)
+        assert len(compact.vocabulary) + len(compact.norm_vocabulary) == len(weights)
+        assert np.all(compact.weights != 0)
+    
+    def test_decisions_match_pipeline(self, linear_pipeline):
+        """Testa que os scores são idênticos aos do pipeline original"""
+        compact = pickle.loads(pickle.dumps(CompactLinearModel.from_pipeline(linear_pipeline)))
+        
+        np.testing.assert_allclose(
+            compact.decision_function(self.TEXTS),
+            linear_pipeline.decision_function(self.TEXTS),
+            rtol=0, atol=1e-12
+        )
+        assert list(compact.predict(self.TEXTS)) == list(linear_pipeline.predict(self.TEXTS))
+    
+    def test_scorer_and_explanations_from_compact(self, linear_pipeline):
+        """Testa que o LinearScorer aceita o modelo compactado"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline)
+        scorer = LinearScorer.from_pipeline(compact)
+        original = LinearScorer.from_pipeline(linear_pipeline)
+        
+        X, X_original = scorer.transform(self.TEXTS), original.transform(self.TEXTS)
+        
+        np.testing.assert_allclose(scorer.decision_scores(X), original.decision_scores(X_original), atol=1e-12)
+        _, tokens = scorer.explain(X[4], top_k=3)[0]
+        _, original_tokens = original.explain(X_original[4], top_k=3)[0]
+        assert tokens == original_tokens
+    
+    @pytest.mark.parametrize("precision,atol", [("float32", 1e-5), ("int8", 0.05)])
+    def test_reduced_precision(self, linear_pipeline, precision, atol):
+        """Testa IDF e pesos em float32/int8 com scores próximos aos do pipeline"""
+        compact = pickle.loads(pickle.dumps(
+            CompactLinearModel.from_pipeline(linear_pipeline, precision=precision)
+        ))
+        expected = linear_pipeline.decision_function(self.TEXTS)
+        
+        scores = compact.decision_function(self.TEXTS)
+        
+        assert compact.weights.dtype == np.dtype(precision)
+        assert scores.dtype == np.float32
+        np.testing.assert_allclose(scores, expected, rtol=0, atol=atol)
+        assert list(compact.predict(self.TEXTS)) == list(linear_pipeline.predict(self.TEXTS))
+    
+    def test_int8_scorer_applies_weight_scale(self, linear_pipeline):
+        """Testa que o LinearScorer recebe os pesos int8 já multiplicados pela escala"""
+        compact = CompactLinearModel.from_pipeline(linear_pipeline, precision='int8')
+        scorer = LinearScorer.from_pipeline(compact)
+        
+        assert scorer.weights.dtype == np.float32
+        np.testing.assert_allclose(
+            scorer.decision_scores(scorer.transform(self.TEXTS)),
+            compact.decision_function(self.TEXTS), rtol=1e-6
+        )
+    
+    def test_rejects_unknown_precision(self, linear_pipeline):
+        """Testa que precisões desconhecidas são rejeitadas"""
+        with pytest.raises(ValueError):
+            CompactLinearModel.from_pipeline(linear_pipeline, precision='float16')
+    
+    def test_rejects_ngram_vectorizer(self):
+        """Testa que vetorizadores com n-gramas não são compactados"""
+        model = Pipeline([
+            ('tfidf', TfidfVectorizer(ngram_range=(1, 2))),
+            ('classifier', LinearSVC()),
+        ]).fit(["aa bb cc", "bb cc dd", "cc dd ee", "dd ee ff"], [0, 0, 1, 1])
+        
+        with pytest.raises(ValueError):
+            CompactLinearModel.from_pipeline(model)
@@ -0,0 +1,239 @@
+"""
+Testes do logging não bloqueante usando PyTest
+"""
+import pytest
+import io
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+from backend.config import settings
+from backend.utils import logging_setup
+from backend.utils.logging_setup import (
+    JsonFormatter, TextFormatter, NonBlockingQueueHandler, RouteSampler,
+    parse_sample_rates, configure_logging, log_success, get_logging_stats
+)
+
+
+def make_record(message='Predição realizada', level=logging.INFO, **fields):
+    """Cria um LogRecord com campos estruturados"""
+    record = logging.makeLogRecord({'name': 'test', 'msg': message, 'levelno': level,
+                                    'levelname': logging.getLevelName(level)})
+    record.__dict__.update(fields)
+    return record
+
+
+@pytest.fixture
+def test_logger():
+    """Logger isolado com o logging não bloqueante; restaura a configuração das settings ao final"""
+    logger = logging.getLogger('test.logging_setup')
+    logger.propagate = False
+    stream = io.StringIO()
+    yield logger, stream
+    settings.setup_logging()
+
+
+class TestFormatters:
+    """Testes unitários para os formatadores"""
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Testa que os campos de extra aparecem no JSON"""
+        record = make_record(route='/api/predict', prediction='É discurso de ódio', confidence=97.5)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry['message'] == 'Predição realizada'
+        assert entry['level'] == 'INFO'
+        assert entry['logger'] == 'test'
+        assert entry['route'] == '/api/predict'
+        assert entry['prediction'] == 'É discurso de ódio'
+        assert entry['confidence'] == 97.5
+        assert 'timestamp' in entry
+        assert 'args' not in entry
+
+    def test_json_formatter_includes_exception(self):
+        """Testa a serialização de exceções"""
+        try:
+            raise RuntimeError('falha')
+        except RuntimeError:
+            record = logging.makeLogRecord({'msg': 'Erro', 'exc_info': __import__('sys').exc_info()})
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert 'RuntimeError: falha' in entry['exception']
+
+    def test_text_formatter_appends_fields(self):
+        """Testa o formato de desenvolvimento"""
+        text = TextFormatter().format(make_record(route='/api/predict', total=3))
+
+        assert text.endswith('Predição realizada route=/api/predict total=3')
+
+
+class TestNonBlockingQueueHandler:
+    """Testes unitários para o handler com fila"""
+
+    def test_drops_when_queue_is_full(self):
+        """Testa que a fila cheia descarta registros sem bloquear"""
+        handler = NonBlockingQueueHandler(queue.Queue(2))
+
+        for _ in range(5):
+            handler.handle(make_record())
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_record_is_not_formatted_on_caller(self):
+        """Testa que o registro é enfileirado sem formatação"""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        record = make_record('%s comentários', total=2)
+        record.args = (2,)
+
+        handler.handle(record)
+
+        queued = handler.queue.get_nowait()
+        assert queued is record
+        assert queued.args == (2,)
+
+
+class TestRouteSampler:
+    """Testes unitários para a amostragem por rota"""
+
+    def test_rates_per_route(self):
+        """Testa taxas fixas e a taxa padrão"""
+        sampler = RouteSampler({'/api/predict': 0.0, '/api/predict/batch': 1.0}, default_rate=1.0)
+
+        assert not any(sampler.sample('/api/predict') for _ in range(100))
+        assert all(sampler.sample('/api/predict/batch') for _ in range(100))
+        assert sampler.sample('/api/explain')
+
+    def test_fractional_rate(self):
+        """Testa que uma taxa parcial emite aproximadamente a fração esperada"""
+        sampler = RouteSampler({'/api/predict': 0.1})
+
+        emitted = sum(sampler.sample('/api/predict') for _ in range(10000))
+
+        assert 700 < emitted < 1300
+
+    def test_parse_sample_rates(self):
+        """Testa a leitura das taxas da variável de ambiente"""
+        assert parse_sample_rates('/api/predict=0.01, /api/predict/batch=0.1') == {
+            '/api/predict': 0.01, '/api/predict/batch': 0.1
+        }
+        assert parse_sample_rates('') == {}
+        with pytest.raises(ValueError):
+            parse_sample_rates('/api/predict=alto')
+
+
+class TestConfigureLogging:
+    """Testes da configuração completa (fila + listener)"""
+
+    def test_json_records_are_written_by_listener(self, test_logger):
+        """Testa a gravação em JSON pela thread do listener"""
+        logger, stream = test_logger
+        handler, listener = configure_logging('INFO', 'json', stream=stream, target=logger)
+
+        log_success(logger, '/api/predict', 'Predição realizada', prediction='Não é discurso de ódio')
+        logger.warning('Aviso')
+        listener.stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line['message'] for line in lines] == ['Predição realizada', 'Aviso']
+        assert lines[0]['route'] == '/api/predict'
+        assert handler in logger.handlers
+
+    def test_success_logs_are_sampled(self, test_logger):
+        """Testa que rotas com taxa zero não registram sucessos"""
+        logger, stream = test_logger
+        _, listener = configure_logging('INFO', 'json', sample_rates={'/api/predict': 0.0},
+                                        stream=stream, target=logger)
+
+        for _ in range(10):
+            log_success(logger, '/api/predict', 'Predição realizada')
+        log_success(logger, '/api/predict/batch', 'Predição em lote realizada')
+        listener.stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line['route'] for line in lines] == ['/api/predict/batch']
+
+    def test_level_filters_success_logs(self, test_logger):
+        """Testa que o nível WARNING (ambiente de teste) suprime os logs de sucesso"""
+        logger, stream = test_logger
+        _, listener = configure_logging('WARNING', 'text', stream=stream, target=logger)
+
+        log_success(logger, '/api/predict', 'Predição realizada')
+        listener.stop()
+
+        assert stream.getvalue() == ''
+
+    def test_reconfigure_replaces_handler(self, test_logger):
+        """Testa que reconfigurar não duplica handlers"""
+        logger, stream = test_logger
+        configure_logging('INFO', stream=stream, target=logger)
+        configure_logging('INFO', stream=stream, target=logger)
+
+        handlers = [h for h in logger.handlers if isinstance(h, NonBlockingQueueHandler)]
+        assert len(handlers) == 1
+        assert get_logging_stats() == {'queued': 0, 'dropped': 0}
+
+    def test_forked_child_gets_its_own_listener(self, test_logger, tmp_path):
+        """Testa que registros de um processo filho (fork) são gravados pelo listener dele"""
+        if not hasattr(os, 'fork'):
+            pytest.skip("fork indisponível")
+        logger, _ = test_logger
+        path = tmp_path / 'log.jsonl'
+        with open(path, 'a') as stream:
+            _, listener = configure_logging('INFO', 'json', stream=stream, target=logger)
+            logger.warning('pai')
+
+            def child():
+                logger.warning('filho')
+                logging_setup._stop_listener()
+
+            process = multiprocessing.get_context('fork').Process(target=child)
+            process.start()
+            process.join(10)
+            listener.stop()
+
+        messages = sorted(json.loads(line)['message'] for line in path.read_text().splitlines())
+        assert process.exitcode == 0
+        assert messages == ['filho', 'pai']
+
+    def test_environment_defaults(self):
+        """Testa os padrões por ambiente"""
+        assert settings.LOG_DEFAULTS['production']['format'] == 'json'
+        assert float(settings.LOG_DEFAULTS['production']['sample_rate']) < 1.0
+        assert settings.LOG_DEFAULTS['test']['level'] == 'WARNING'
+
+    def test_importing_settings_does_not_configure_logging(self):
+        """Testa que só os pontos de entrada instalam o logging (sem listener nem globais alterados)"""
+        code = (
+            "import logging, threading\n"
+            "import backend.config.settings as settings\n"
+            "print(len(logging.getLogger().handlers), threading.active_count(), logging._srcfile is not None)\n"
+            "settings.setup_logging()\n"
+            "print(len(logging.getLogger().handlers), logging._srcfile is not None)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True, cwd=root).stdout.split('\n')
+
+        assert output[0] == '0 1 True'
+        assert output[1] == '1 True'
+
+    def test_fast_records_is_opt_in(self, test_logger, monkeypatch):
+        """Testa que os globais privados do módulo logging só mudam com fast_records"""
+        logger, stream = test_logger
+        monkeypatch.setattr(logging, '_srcfile', logging._srcfile)
+        monkeypatch.setattr(logging, 'logProcesses', True)
+        monkeypatch.setattr(logging, 'logMultiprocessing', True)
+
+        _, listener = configure_logging('INFO', stream=stream, target=logger)
+        listener.stop()
+        assert logging._srcfile is not None and logging.logProcesses and logging.logMultiprocessing
+
+        _, listener = configure_logging('INFO', stream=stream, target=logger, fast_records=True)
+        listener.stop()
+        assert logging._srcfile is None and not logging.logProcesses and not logging.logMultiprocessing
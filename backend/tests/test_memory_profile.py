@@ -0,0 +1,115 @@
+"""
+Testes da medição de memória usando PyTest
+"""
+import sys
+import threading
+import numpy as np
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import ModelService
+from backend.utils.memory_profile import (
+    deep_sizeof, model_components, component_sizes, rss_bytes, LoadProfiler
+)
+
+
+class TestDeepSizeof:
+    """Testes unitários para o tamanho profundo dos objetos"""
+
+    def test_counts_keys_and_values(self):
+        """Testa que as strings do dicionário são contadas"""
+        vocabulary = {f'token{i}': i for i in range(1000)}
+
+        size = deep_sizeof(vocabulary)
+
+        assert size > sys.getsizeof(vocabulary) + sum(sys.getsizeof(key) for key in vocabulary)
+
+    def test_shared_objects_are_counted_once(self):
+        """Testa que estruturas compartilhadas entre componentes não são contadas duas vezes"""
+        tokens = [f'token{i}' for i in range(1000)]
+        vocabulary = {token: i for i, token in enumerate(tokens)}
+        lookup = dict(vocabulary)
+
+        sizes = component_sizes({'vocabulary': vocabulary, 'lookup': lookup})
+
+        assert sizes['lookup'] == sys.getsizeof(lookup)
+
+    def test_numpy_views_count_the_base_once(self):
+        """Testa arrays NumPy e views"""
+        array = np.zeros(10000)
+        seen = set()
+
+        view_size = deep_sizeof(array[:10], seen)
+        array_size = deep_sizeof(array, seen)
+
+        assert view_size >= array.nbytes
+        assert array_size == 0
+
+    def test_object_arrays_and_instances(self):
+        """Testa arrays de objetos e atributos de instâncias"""
+        class Holder:
+            def __init__(self):
+                self.names = np.array(['a' * 1000, 'b' * 1000], dtype=object)
+
+        assert deep_sizeof(Holder()) > 2000
+
+    def test_thread_local_is_not_traversed(self):
+        """Testa que os buffers por thread não entram na medição"""
+        buffers = threading.local()
+        buffers.data = bytearray(1 << 20)
+
+        assert deep_sizeof(buffers) < 1 << 20
+
+
+class TestLoadProfiler:
+    """Testes unitários para a medição com tracemalloc"""
+
+    def test_retained_and_peak(self):
+        """Testa memória retida e pico de um bloco"""
+        with LoadProfiler() as profiler:
+            retained = bytearray(2 << 20)
+            temporary = bytearray(4 << 20)
+            del temporary
+
+        report = profiler.report()
+
+        assert report['retained'] >= 2 << 20
+        assert report['peak'] >= 6 << 20
+        assert report['top_allocations'][0]['file'] == __file__
+        assert len(retained) == 2 << 20
+
+    def test_rss_bytes(self):
+        """Testa a leitura da memória residente"""
+        assert rss_bytes() > 0
+
+
+class TestMemoryReport:
+    """Testes do relatório de memória do ModelService"""
+
+    def test_pipeline_components(self, linear_pipeline):
+        """Testa os componentes de um pipeline TF-IDF + LinearSVC"""
+        components = model_components(linear_pipeline)
+
+        assert set(components) == {'vocabulary', 'idf', 'coefficients', 'stop_words'}
+        assert components['vocabulary'] is linear_pipeline.steps[0][1].vocabulary_
+
+    def test_service_report(self, linear_pipeline):
+        """Testa o relatório com modelo, scorer e cache"""
+        service = ModelService()
+        service.model = linear_pipeline
+        service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+        service._replace_state(version='abc')
+        service.predict_single('You are a stupid idiot!')
+
+        report = service.get_memory_report()
+
+        assert report['rss'] > 0
+        assert {'vocabulary', 'idf', 'coefficients', 'scorer'} <= set(report['model'])
+        assert report['model_total'] == sum(report['model'].values())
+        assert report['caches']['result_cache'] > 0
+
+    def test_empty_service(self):
+        """Testa o relatório sem modelo carregado"""
+        report = ModelService().get_memory_report()
+
+        assert report['model'] == {}
+        assert report['model_total'] == 0
+        assert report['load'] is None
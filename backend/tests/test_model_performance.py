@@ -277,6 +277,47 @@ class TestModelPerformance:
         assert True
 
 
+class TestModelMemoryBudget:
+    """Teste de regressão da memória do modelo servido (orçamento em MODEL_MEMORY_BUDGET_MB)"""
+    
+    @pytest.fixture(scope="class")
+    def memory_report(self):
+        """Relatório de memória de um ModelService com o modelo real carregado com tracemalloc"""
+        from backend.config.settings import MODEL_PATH
+        from backend.services.model_service import ModelService
+        
+        if not os.path.exists(MODEL_PATH):
+            pytest.skip("Modelo não encontrado")
+        
+        # Primeira carga apenas para importar os módulos: a segunda mede só o modelo
+        ModelService().load_model()
+        service = ModelService()
+        service.profile_load = True
+        service.load_model()
+        return service.get_memory_report()
+    
+    def test_model_components_within_budget(self, memory_report):
+        """Verifica que os componentes do modelo cabem no orçamento"""
+        from backend.config.settings import MODEL_MEMORY_BUDGET_MB
+        
+        total_mb = memory_report['model_total'] / (1024 * 1024)
+        print(f"\nMemória do modelo: {total_mb:.2f} MB (orçamento: {MODEL_MEMORY_BUDGET_MB:g} MB)")
+        for name, size in memory_report['model'].items():
+            print(f"  {name}: {size / 1024:.0f} KB")
+        
+        assert total_mb <= MODEL_MEMORY_BUDGET_MB, \
+            f"Modelo usa {total_mb:.2f} MB, acima do orçamento de {MODEL_MEMORY_BUDGET_MB:g} MB"
+    
+    def test_model_load_retained_within_budget(self, memory_report):
+        """Verifica com tracemalloc que a carga do modelo não retém mais que o orçamento"""
+        from backend.config.settings import MODEL_MEMORY_BUDGET_MB
+        
+        retained_mb = memory_report['load']['retained'] / (1024 * 1024)
+        
+        assert retained_mb <= MODEL_MEMORY_BUDGET_MB, \
+            f"A carga retém {retained_mb:.2f} MB, acima do orçamento de {MODEL_MEMORY_BUDGET_MB:g} MB"
+
+
 if __name__ == "__main__":
     # Executar testes com pytest
     pytest.main([__file__, "-v", "--tb=short"])
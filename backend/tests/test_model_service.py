@@ -4,7 +4,10 @@ Testes para o ModelService usando PyTest
 import pytest
 from unittest.mock import Mock, patch, MagicMock, mock_open
 import json
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from backend.services.linear_scorer import LinearScorer
 from backend.services.model_service import ModelService
 from backend.config.settings import RESPONSE_LABELS
 
@@ -17,10 +20,11 @@ class TestModelService:
         """Fixture para criar instância do ModelService"""
         return ModelService()
     
+    @patch.object(ModelService, '_file_version', return_value='abc123')
     @patch('backend.services.model_service.joblib.load')
     @patch('backend.services.model_service.os.path.exists')
     @patch('builtins.open', new_callable=mock_open, read_data='{"accuracy": 0.95}')
-    def test_load_model_success(self, mock_file_open, mock_exists, mock_joblib, service):
+    def test_load_model_success(self, mock_file_open, mock_exists, mock_joblib, mock_version, service):
         """Testa carregamento bem-sucedido do modelo"""
         # Configurar mocks
         mock_exists.return_value = True
@@ -33,6 +37,7 @@ class TestModelService:
         # Verificar
         assert service.model is not None
         assert service.model_info == {"accuracy": 0.95}
+        assert service._state.version == 'abc123'
         mock_joblib.assert_called_once()
     
     @patch('backend.services.model_service.os.path.exists')
@@ -158,4 +163,156 @@ class TestModelService:
         
         # Verificar
         assert result['prediction'] == expected_label
-        assert result['is_hate_speech'] == expected_is_hate 
\ No newline at end of file
+        assert result['is_hate_speech'] == expected_is_hate 
+
+
+class TestModelServiceConcurrency:
+    """Testes de uso concorrente do ModelService (servidores com threads)"""
+    
+    COMMENTS = [
+        "You are a stupid idiot!", "I hate all of you", "Great video, thanks",
+        "Very helpful explanation", "go back to your country", "love this song",
+    ]
+    
+    @pytest.fixture
+    def service(self, linear_pipeline):
+        """ModelService com pipeline linear real"""
+        service = ModelService()
+        service.model = linear_pipeline
+        service.scorer = LinearScorer.from_pipeline(linear_pipeline)
+        return service
+    
+    def test_fast_path_matches_pipeline(self, service, linear_pipeline):
+        """Testa que o caminho rápido do scorer reproduz o pipeline"""
+        for comment in self.COMMENTS:
+            result = service.predict_single(comment)
+            expected = linear_pipeline.predict([result['processed_comment']])[0]
+            
+            assert result['is_hate_speech'] == (expected == 0)
+            assert result['confidence'] == service._calculate_confidence(result['processed_comment'])['confidence']
+    
+    def test_concurrent_predictions_are_consistent(self, service):
+        """Testa predições simultâneas em várias threads contra o resultado sequencial"""
+        expected = {c: service.predict_single(c)['confidence'] for c in self.COMMENTS}
+        
+        def worker(index):
+            comment = self.COMMENTS[index % len(self.COMMENTS)]
+            result = service.predict_single(comment)
+            return result['error'] is False and result['confidence'] == expected[comment]
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            outcomes = list(executor.map(worker, range(2000)))
+        
+        assert all(outcomes)
+    
+    def test_predictions_during_reload(self, service, linear_pipeline):
+        """Testa que trocas de modelo concorrentes não quebram predições em andamento"""
+        stop = threading.Event()
+        errors = []
+        
+        def reloader():
+            while not stop.is_set():
+                with service._state_lock:
+                    service._state = service._state._replace(
+                        model=linear_pipeline,
+                        scorer=LinearScorer.from_pipeline(linear_pipeline)
+                    )
+        
+        def predictor():
+            for comment in self.COMMENTS * 50:
+                if service.predict_single(comment)['error']:
+                    errors.append(comment)
+        
+        reload_thread = threading.Thread(target=reloader)
+        reload_thread.start()
+        threads = [threading.Thread(target=predictor) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        reload_thread.join()
+        
+        assert errors == []
+    
+    def test_predict_batch_matches_single(self, service):
+        """Testa que a predição em lote coincide com predições individuais"""
+        result = service.predict_batch(self.COMMENTS)
+        
+        assert result['error'] is False
+        for comment, item in zip(self.COMMENTS, result['results']):
+            single = service.predict_single(comment)
+            assert item['is_hate_speech'] == single['is_hate_speech']
+            assert item['confidence'] == single['confidence']
+    
+    def test_predict_batch_collapses_duplicates(self, service):
+        """Testa que duplicatas são classificadas uma vez e replicadas nas posições originais"""
+        comments = ["I hate all of you", "I HATE all of you!!!", "Great video, thanks", "i hate all of you 123"]
+        transform = Mock(wraps=service.scorer.transform)
+        service.scorer.transform = transform
+        
+        result = service.predict_batch(comments)
+        
+        assert result['collapsed'] == 2
+        assert transform.call_args[0][0] == ["i hate all of you", "great video thanks"]
+        assert [item['comment'] for item in result['results']] == comments
+        assert len({item['confidence'] for item in result['results'][:2] + result['results'][3:]}) == 1
+        assert result['results'][0] is not result['results'][1]
+    
+    def test_predict_batch_without_deduplication(self, service):
+        """Testa que a deduplicação pode ser desativada"""
+        service.deduplicate = False
+        
+        result = service.predict_batch(["I hate all of you", "I hate all of you"])
+        
+        assert result['collapsed'] == 0
+        assert len(result['results']) == 2
+    
+    def test_predict_single_uses_cache(self, service):
+        """Testa que a segunda predição do mesmo texto vem do cache"""
+        service._replace_state(version='v1')
+        transform = Mock(wraps=service.scorer.transform)
+        service.scorer.transform = transform
+        
+        first = service.predict_single("I hate all of you")
+        second = service.predict_single("I HATE all of you!!!")
+        
+        assert transform.call_count == 1
+        assert second['confidence'] == first['confidence']
+        assert second['is_hate_speech'] == first['is_hate_speech']
+        assert second['comment'] == "I HATE all of you!!!"
+    
+    def test_predict_batch_scores_only_cache_misses(self, service):
+        """Testa que o lote classifica apenas os textos ausentes do cache"""
+        service._replace_state(version='v1')
+        expected = service.predict_batch(self.COMMENTS)['results']
+        service.cache.clear()
+        service.predict_single(self.COMMENTS[0])
+        transform = Mock(wraps=service.scorer.transform)
+        service.scorer.transform = transform
+        
+        results = service.predict_batch(self.COMMENTS)['results']
+        
+        assert len(transform.call_args[0][0]) == len(self.COMMENTS) - 1
+        assert [r['confidence'] for r in results] == [r['confidence'] for r in expected]
+        
+        # Outra versão do modelo invalida o cache
+        service._replace_state(version='v2')
+        service.predict_batch(self.COMMENTS)
+        assert len(transform.call_args[0][0]) == len(self.COMMENTS)
+    
+    def test_predict_batch_invalid_comment(self, service):
+        """Testa erro quando algum comentário fica vazio após o processamento"""
+        result = service.predict_batch(["Texto válido", "!!!"])
+        
+        assert result['error'] is True
+    
+    def test_state_is_replaced_atomically(self, service):
+        """Testa que atribuições criam um novo estado em vez de mutá-lo"""
+        old_state = service._state
+        
+        service.model_info = {"accuracy": 0.9}
+        
+        assert service._state is not old_state
+        assert old_state.model_info is None
+        assert service.model_info == {"accuracy": 0.9}
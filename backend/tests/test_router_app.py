@@ -0,0 +1,161 @@
+"""
+Testes de integração do roteador (router.py) com nós locais do app Flask usando PyTest
+"""
+import os
+import pytest
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+import router
+from werkzeug.serving import make_server
+from app import app as node_app
+from router import app as router_app
+from backend.services.admission_service import admission_service
+from backend.services.linear_scorer import LinearScorer
+from backend.services.model_service import model_service
+from backend.services.router_service import router_service, ShardRouter
+from backend.utils.text_preprocessor import preprocess_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ADMIN = {'Authorization': 'Bearer segredo'}
+COMMENTS = ["You are a STUPID idiot!!", "great video, thanks", "i hate all of you", "love this song",
+            "go back to your country", "very helpful explanation", "you are a stupid idiot"]
+
+
+@pytest.fixture(scope="module")
+def node_urls(linear_pipeline):
+    """Dois nós do app Flask (servidores com threads) servindo o pipeline de teste"""
+    previous_state = model_service._state
+    model_service._replace_state(
+        model=linear_pipeline, scorer=LinearScorer.from_pipeline(linear_pipeline), version=None
+    )
+    servers = [make_server('127.0.0.1', 0, node_app, threaded=True) for _ in range(2)]
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+
+    yield [f"http://127.0.0.1:{server.server_port}" for server in servers], servers
+
+    for server, thread in zip(servers, threads):
+        server.shutdown()
+        thread.join()
+    model_service._state = previous_state
+
+
+@pytest.fixture
+def client(node_urls):
+    """Cliente de teste do roteador com os dois nós registrados"""
+    urls, _ = node_urls
+    admission_service.reset()
+    for url in urls:
+        router_service.add_node(url)
+    router_app.config['TESTING'] = True
+    with router_app.test_client() as client:
+        yield client
+    for url in list(router_service._pools):
+        router_service.remove_node(url)
+
+
+class TestRouter:
+    """Testes de integração do roteador"""
+
+    def test_predict_goes_to_the_comment_node(self, client):
+        """Testa que a predição vem do nó do texto preprocessado"""
+        response = client.post('/api/predict', json={'comment': COMMENTS[0]})
+        copy = client.post('/api/predict', json={'comment': COMMENTS[-1]})
+        expected = model_service.predict_single(COMMENTS[0])
+
+        assert response.status_code == 200
+        assert response.get_json()['is_hate_speech'] == expected['is_hate_speech']
+        assert response.get_json()['confidence'] == expected['confidence']
+        assert response.headers['X-Routed-To'] == router_service.ring.node_for(preprocess_text(COMMENTS[0]))
+        assert copy.headers['X-Routed-To'] == response.headers['X-Routed-To']
+
+    def test_batch_matches_single_node(self, client):
+        """Testa que o lote dividido entre os nós tem os mesmos resultados, na mesma ordem"""
+        response = client.post('/api/predict/batch', json={'comments': COMMENTS, 'echo': False})
+        expected = model_service.predict_batch(COMMENTS)['results']
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total'] == len(COMMENTS)
+        assert [item['confidence'] for item in data['results']] == [item['confidence'] for item in expected]
+        assert 'comment' not in data['results'][0]
+        nodes = {router_service.ring.node_for(preprocess_text(comment)) for comment in COMMENTS}
+        assert response.headers['X-Routed-To'] == ','.join(sorted(nodes))
+
+    def test_validation_errors_stay_in_the_router(self, client):
+        """Testa que requisições inválidas são rejeitadas sem chegar aos nós"""
+        requests = router_service.get_stats()['requests']
+        assert client.post('/api/predict', json={}).status_code == 400
+        response = client.post('/api/predict/batch', json={'comments': ['ok', '']})
+        assert response.status_code == 400
+        assert response.get_json()['index'] == 1
+        assert router_service.get_stats()['requests'] == requests
+
+    def test_membership_routes_require_admin_token(self, client):
+        """Testa que sem o token configurado (ou com outro) os nós não são alterados"""
+        url = 'http://127.0.0.1:9'
+        assert client.post('/api/router/nodes', json={'url': url}).status_code == 403
+        with patch('backend.controllers.router_controller.ROUTER_ADMIN_TOKEN', 'segredo'):
+            assert client.post('/api/router/nodes', json={'url': url}).status_code == 401
+            assert client.post('/api/router/nodes', json={'url': url},
+                               headers={'Authorization': 'Bearer outro'}).status_code == 401
+            assert client.delete('/api/router/nodes', json={'url': router_service.ring.nodes[0]}).status_code == 401
+        assert url not in router_service.ring
+        assert router_service.get_stats()['healthy'] == 2
+
+    @patch('backend.controllers.router_controller.ROUTER_ADMIN_TOKEN', 'segredo')
+    def test_nodes_join_and_leave(self, client, node_urls):
+        """Testa as rotas de entrada e saída de nós"""
+        urls, _ = node_urls
+        assert client.delete('/api/router/nodes', json={'url': urls[1]}, headers=ADMIN).status_code == 200
+        assert client.delete('/api/router/nodes', json={'url': urls[1]}, headers=ADMIN).status_code == 404
+        assert client.post('/api/router/nodes', json={'url': 'localhost'}, headers=ADMIN).status_code == 400
+
+        response = client.post('/api/predict/batch', json={'comments': COMMENTS})
+        assert response.headers['X-Routed-To'] == urls[0]
+
+        assert client.post('/api/router/nodes', json={'url': urls[1]}, headers=ADMIN).status_code == 201
+        stats = client.get('/api/router').get_json()
+        assert stats['healthy'] == 2
+        assert sum(node['share'] for node in stats['nodes']) == pytest.approx(1.0, abs=1e-3)
+
+    def test_unreachable_node_fails_over(self, client, node_urls):
+        """Testa o failover para o outro nó e a resposta sem nós disponíveis"""
+        urls, _ = node_urls
+        router_service.add_node('http://127.0.0.1:9')  # porta sem servidor
+
+        response = client.post('/api/predict/batch', json={'comments': COMMENTS})
+        assert response.status_code == 200
+        assert 'http://127.0.0.1:9' not in response.headers['X-Routed-To']
+        assert client.get('/api/health').get_json()['healthy_nodes'] == 2
+
+        router_service.check_health()
+        assert 'http://127.0.0.1:9' not in router_service.ring
+
+        for url in urls:
+            router_service.mark_down(url)
+        response = client.post('/api/predict', json={'comment': COMMENTS[0]})
+        assert response.status_code == 503
+        assert client.get('/api/health').status_code == 503
+
+        router_service.check_health()
+        assert router_service.ring.nodes == sorted(urls)
+
+    @patch('router.ROUTER_NODES', ['http://env-node:5000'])
+    def test_cli_nodes_replace_environment_nodes(self):
+        """Testa que --node substitui ROUTER_NODES e que a lista do ambiente é o padrão"""
+        for argv, expected in ((['router.py', '--node', 'http://cli-node:5000'], ['http://cli-node:5000']),
+                               (['router.py'], ['http://env-node:5000'])):
+            with patch('sys.argv', argv), patch.object(router.app, 'run'), \
+                    patch.object(router, 'router_service', ShardRouter(health_interval=0)) as service:
+                router.main()
+                assert service.ring.nodes == expected
+
+        # A instância global não lê ROUTER_NODES na importação (só o main)
+        code = "from backend.services.router_service import router_service; print(router_service.ring.nodes)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=ROOT, env=dict(os.environ, ROUTER_NODES='http://env-node:5000')).stdout
+        assert output.strip() == '[]'
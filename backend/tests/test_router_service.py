@@ -0,0 +1,202 @@
+"""
+Testes do roteamento com afinidade de cache usando PyTest
+"""
+import json
+from unittest.mock import patch
+import pytest
+from backend.services.router_service import (
+    HashRing, ShardRouter, ROUND_ROBIN, NO_BACKENDS, normalize_node_url
+)
+from backend.utils.text_preprocessor import preprocess_text
+
+NODES = ['http://node-a:5000', 'http://node-b:5000', 'http://node-c:5000']
+KEYS = [f"comentario {i}" for i in range(5000)]
+# Comentários distintos após preprocess_text (que remove os dígitos)
+COMMENTS = [f"comment {first}{second}x" for first in 'abcdefgh' for second in 'abcdefgh']
+
+
+def fake_post(failing=()):
+    """_post que responde como a API (ou falha para os nós informados)"""
+    calls = []
+
+    def post(node, path, payload, comments):
+        calls.append((node, path, payload))
+        if node in failing:
+            raise ConnectionRefusedError("conexão recusada")
+        if path == '/api/predict':
+            return 200, {}, {'comment': payload['comment'], 'node': node}
+        results = [{'comment': comment, 'node': node} for comment in payload['comments']]
+        return 200, {}, {'results': results, 'total': len(results), 'collapsed': 1}
+
+    return post, calls
+
+
+@pytest.fixture
+def router():
+    """Roteador com três nós, sem health check periódico"""
+    router = ShardRouter(nodes=NODES, health_interval=0)
+    yield router
+    router.close()
+
+
+class TestHashRing:
+    """Testes unitários para o anel de hashing consistente"""
+
+    def test_keys_are_spread_and_stable(self):
+        """Testa a distribuição das chaves e a mesma escolha em outro anel"""
+        ring = HashRing(NODES)
+        counts = {node: 0 for node in NODES}
+        for key in KEYS:
+            counts[ring.node_for(key)] += 1
+
+        assert all(0.2 < count / len(KEYS) < 0.47 for count in counts.values())
+        assert sum(ring.shares().values()) == pytest.approx(1.0)
+        assert all(HashRing(reversed(NODES)).node_for(key) == ring.node_for(key) for key in KEYS[:100])
+
+    def test_join_and_leave_move_only_one_slice(self):
+        """Testa que a entrada e a saída de um nó movem apenas a fatia dele"""
+        ring = HashRing(NODES)
+        before = {key: ring.node_for(key) for key in KEYS}
+
+        ring.add('http://node-d:5000')
+        after = {key: ring.node_for(key) for key in KEYS}
+        moved = [key for key in KEYS if before[key] != after[key]]
+        assert all(after[key] == 'http://node-d:5000' for key in moved)
+        assert 0.1 < len(moved) / len(KEYS) < 0.4
+
+        ring.remove('http://node-d:5000')
+        assert {key: ring.node_for(key) for key in KEYS} == before
+
+        ring.remove(NODES[0])
+        assert all(ring.node_for(key) == before[key] for key in KEYS if before[key] != NODES[0])
+
+    def test_empty_ring(self):
+        """Testa o anel vazio e a repetição de nós"""
+        ring = HashRing()
+        assert ring.node_for('texto') is None
+        assert ring.shares() == {}
+        assert ring.add(NODES[0]) and not ring.add(NODES[0])
+        assert not ring.remove(NODES[1])
+
+    def test_normalize_node_url(self):
+        """Testa a validação das URLs dos nós"""
+        assert normalize_node_url(' http://localhost:5001/ ') == 'http://localhost:5001'
+        for url in ('localhost:5001', 'ftp://host', 'http://', None):
+            with pytest.raises(ValueError):
+                normalize_node_url(url)
+
+
+class TestShardRouter:
+    """Testes unitários para o roteador"""
+
+    def test_copies_go_to_the_same_node(self, router):
+        """Testa que textos com o mesmo preprocess_text vão ao mesmo nó"""
+        post, calls = fake_post()
+        with patch.object(router, '_post', side_effect=post):
+            first = router.predict({'comment': 'You are a STUPID idiot!!'})
+            second = router.predict({'comment': 'you are a stupid idiot'})
+
+        assert first['status'] == 200
+        assert first['headers']['X-Routed-To'] == second['headers']['X-Routed-To']
+        assert calls[0][0] == router.ring.node_for(preprocess_text('you are a stupid idiot'))
+
+    def test_batch_is_split_by_shard_and_merged_in_order(self, router):
+        """Testa a divisão do lote por nó e a recombinação na ordem original"""
+        comments = COMMENTS[:60] + ['Spam!!', 'spam']
+        post, calls = fake_post()
+        with patch.object(router, '_post', side_effect=post):
+            result = router.predict_batch({'comments': comments, 'echo': True})
+
+        body = result['body']
+        assert [item['comment'] for item in body['results']] == comments
+        assert body['total'] == len(comments)
+        assert body['collapsed'] == len(calls)
+        assert len(calls) == len(NODES)
+        assert all(payload['echo'] is True for _, _, payload in calls)
+        for item in body['results']:
+            assert item['node'] == router.ring.node_for(preprocess_text(item['comment']))
+        assert body['results'][-1]['node'] == body['results'][-2]['node']
+        assert result['headers']['X-Routed-To'] == ','.join(NODES)
+
+    def test_node_error_is_forwarded_with_original_index(self, router):
+        """Testa o repasse do erro de um nó com a posição no lote original"""
+        comments = COMMENTS[:20]
+        target = router.ring.node_for(preprocess_text(comments[7]))
+        position = [i for i in range(20) if router.ring.node_for(preprocess_text(comments[i])) == target].index(7)
+        post, _ = fake_post()
+
+        def reject(node, path, payload, count):
+            if node == target:
+                return 400, {}, {'error': 'Comentário inválido', 'index': position}
+            return post(node, path, payload, count)
+
+        with patch.object(router, '_post', side_effect=reject):
+            result = router.predict_batch({'comments': comments})
+
+        assert result['status'] == 400
+        assert result['body']['index'] == 7
+
+    def test_failed_node_leaves_ring_and_comments_are_rerouted(self, router):
+        """Testa o failover: o nó com falha sai do anel e os comentários vão aos sucessores"""
+        comments = COMMENTS[:30]
+        post, calls = fake_post(failing={NODES[1]})
+        with patch.object(router, '_post', side_effect=post):
+            result = router.predict_batch({'comments': comments})
+            single = router.predict({'comment': next(
+                c for c in comments if HashRing(NODES).node_for(preprocess_text(c)) == NODES[1]
+            )})
+
+        assert [item['comment'] for item in result['body']['results']] == comments
+        assert all(item['node'] != NODES[1] for item in result['body']['results'])
+        assert NODES[1] not in router.ring
+        assert single['headers']['X-Routed-To'] != NODES[1]
+        stats = router.get_stats()
+        assert stats['failovers'] == 1
+        assert stats['healthy'] == 2
+        assert [node['in_ring'] for node in stats['nodes']] == [True, False, True]
+
+    def test_no_backends(self, router):
+        """Testa a resposta sem nós disponíveis"""
+        post, _ = fake_post(failing=set(NODES))
+        with patch.object(router, '_post', side_effect=post):
+            assert router.predict({'comment': 'texto'}) == {'error': True, 'code': NO_BACKENDS}
+            assert router.predict_batch({'comments': ['a', 'b']})['code'] == NO_BACKENDS
+        assert len(router.ring) == 0
+
+    def test_round_robin_sends_whole_batches(self):
+        """Testa o round robin: cada requisição vai inteira ao próximo nó"""
+        router = ShardRouter(nodes=NODES, strategy=ROUND_ROBIN, health_interval=0)
+        post, calls = fake_post()
+        with patch.object(router, '_post', side_effect=post):
+            for _ in range(3):
+                router.predict_batch({'comments': COMMENTS[:10]})
+            router.predict({'comment': 'texto'})
+
+        assert [node for node, _, _ in calls] == NODES + NODES[:1]
+        router.close()
+
+    def test_membership_and_health_check(self, router):
+        """Testa a entrada e saída de nós e o health check devolvendo nós ao anel"""
+        assert router.add_node('http://node-d:5000/')
+        assert not router.add_node('http://node-d:5000')
+        assert router.remove_node('http://node-d:5000')
+        assert not router.remove_node('http://node-d:5000')
+
+        router.mark_down(NODES[0])
+        responses = {NODES[0]: (200, {}, json.dumps({'model_loaded': True}).encode()),
+                     NODES[1]: (200, {}, json.dumps({'model_loaded': False}).encode())}
+
+        def health(node):
+            def request(method, path, body=None, headers=None):
+                if node not in responses:
+                    raise ConnectionRefusedError()
+                return responses[node]
+            return request
+
+        for node in NODES:
+            router._pools[node].request = health(node)
+        router.check_health()
+
+        assert router.ring.nodes == [NODES[0]]
+        # Entrada dos três nós, node-d (entrada e saída), queda de node-a e o health check
+        assert router.get_stats()['rebalances'] == len(NODES) + 2 + 1 + 3
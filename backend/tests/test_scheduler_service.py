@@ -0,0 +1,124 @@
+"""
+Testes para o SchedulerService usando PyTest
+"""
+import threading
+import time
+import pytest
+from backend.services.scheduler_service import (
+    SchedulerService, INTERACTIVE, BULK, ADMITTED, QUEUE_FULL, TIMEOUT
+)
+
+
+def wait_until(condition, timeout=2.0):
+    """Aguarda uma condição verificada por outra thread"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não atingida"
+        time.sleep(0.001)
+
+
+class TestSchedulerService:
+    """Testes unitários para as faixas de prioridade"""
+
+    @pytest.fixture
+    def scheduler(self):
+        """Fixture com uma vaga por faixa e filas pequenas"""
+        return SchedulerService(lanes=[(INTERACTIVE, 1, 2), (BULK, 1, 1)], wait_timeout=2.0, yield_timeout=2.0)
+
+    def acquire_in_thread(self, scheduler, lane, decisions):
+        """Inicia uma thread que aguarda uma vaga e registra a decisão"""
+        thread = threading.Thread(target=lambda: decisions.append((lane, scheduler.acquire(lane))))
+        thread.start()
+        return thread
+
+    def test_lanes_have_separate_worker_shares(self, scheduler):
+        """Testa que um lote em execução não ocupa a vaga das predições interativas"""
+        assert scheduler.acquire(BULK) == ADMITTED
+        assert scheduler.acquire(INTERACTIVE) == ADMITTED
+
+        stats = scheduler.get_stats()
+        assert stats[INTERACTIVE]['running'] == 1
+        assert stats[BULK]['running'] == 1
+
+    def test_bulk_yields_to_waiting_interactive(self, scheduler):
+        """Testa que lotes na fila só começam depois das predições interativas esperando"""
+        assert scheduler.acquire(INTERACTIVE) == ADMITTED
+        assert scheduler.acquire(BULK) == ADMITTED
+        decisions = []
+        interactive = self.acquire_in_thread(scheduler, INTERACTIVE, decisions)
+        wait_until(lambda: scheduler.get_stats()[INTERACTIVE]['waiting'] == 1)
+        bulk = self.acquire_in_thread(scheduler, BULK, decisions)
+        wait_until(lambda: scheduler.get_stats()[BULK]['waiting'] == 1)
+
+        # A vaga de lote é liberada primeiro, mas o lote esperando cede a vez
+        scheduler.release(BULK)
+        time.sleep(0.05)
+        assert decisions == []
+
+        scheduler.release(INTERACTIVE)
+        interactive.join()
+        bulk.join()
+        assert decisions == [(INTERACTIVE, ADMITTED), (BULK, ADMITTED)]
+
+    def test_full_queue_rejects(self, scheduler):
+        """Testa rejeição imediata com a fila da faixa cheia"""
+        assert scheduler.acquire(BULK) == ADMITTED
+        decisions = []
+        waiting = self.acquire_in_thread(scheduler, BULK, decisions)
+        wait_until(lambda: scheduler.get_stats()[BULK]['waiting'] == 1)
+
+        assert scheduler.acquire(BULK) == QUEUE_FULL
+        assert scheduler.get_stats()[BULK]['rejected_queue_full'] == 1
+
+        scheduler.release(BULK)
+        waiting.join()
+        assert decisions == [(BULK, ADMITTED)]
+
+    def test_wait_timeout(self):
+        """Testa que a espera na fila é limitada"""
+        scheduler = SchedulerService(lanes=[(INTERACTIVE, 1, 2), (BULK, 1, 1)], wait_timeout=0.01)
+        assert scheduler.acquire(INTERACTIVE) == ADMITTED
+
+        assert scheduler.acquire(INTERACTIVE) == TIMEOUT
+        stats = scheduler.get_stats()[INTERACTIVE]
+        assert stats['rejected_timeout'] == 1
+        assert stats['waiting'] == 0
+
+    def test_yield_to_higher_waits_for_interactive(self, scheduler):
+        """Testa a pausa de um lote em execução enquanto há predições interativas"""
+        assert scheduler.acquire(BULK) == ADMITTED
+        scheduler.yield_to_higher(BULK)
+        assert scheduler.get_stats()[BULK]['yields'] == 0
+
+        assert scheduler.acquire(INTERACTIVE) == ADMITTED
+        releaser = threading.Timer(0.05, scheduler.release, args=(INTERACTIVE,))
+        releaser.start()
+        start = time.perf_counter()
+        scheduler.yield_to_higher(BULK)
+
+        assert time.perf_counter() - start >= 0.04
+        stats = scheduler.get_stats()[BULK]
+        assert stats['yields'] == 1
+        assert stats['yielded_ms'] >= 40
+
+    def test_yield_is_bounded(self):
+        """Testa que a pausa de um lote tem duração máxima"""
+        scheduler = SchedulerService(lanes=[(INTERACTIVE, 1, 2), (BULK, 1, 1)], yield_timeout=0.01)
+        scheduler.acquire(INTERACTIVE)
+        scheduler.acquire(BULK)
+
+        start = time.perf_counter()
+        scheduler.yield_to_higher(BULK)
+        assert time.perf_counter() - start < 1.0
+
+    def test_wait_time_stats(self, scheduler):
+        """Testa os tempos de espera na fila por faixa"""
+        assert scheduler.acquire(BULK) == ADMITTED
+        threading.Timer(0.05, scheduler.release, args=(BULK,)).start()
+        assert scheduler.acquire(BULK) == ADMITTED
+
+        waits = scheduler.get_stats()[BULK]['wait_ms']
+        assert waits['max'] >= 40
+        assert waits['mean'] == pytest.approx(waits['max'] / 2, abs=0.01)
+        assert scheduler.get_stats()[BULK]['queued'] == 1
+        assert scheduler.get_stats()[INTERACTIVE]['wait_ms']['p99'] == 0.0
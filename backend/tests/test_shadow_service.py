@@ -0,0 +1,137 @@
+"""
+Testes para o ShadowService usando PyTest
+"""
+import pytest
+import threading
+from unittest.mock import Mock
+import joblib
+from backend.utils.fast_tokenizer import FastAnalyzer
+from backend.services.shadow_service import ShadowService
+from backend.services.model_service import ModelService
+
+
+@pytest.fixture
+def primary():
+    """Modelo servido medido pelo modo sombra"""
+    model = Mock(spec=['predict', 'decision_function'])
+    model.predict.return_value = [1]
+    return model
+
+
+class TestShadowService:
+    """Testes unitários para o modo sombra"""
+    
+    @pytest.fixture
+    def shadow(self):
+        """Fixture para criar ShadowService com amostragem total"""
+        service = ShadowService(sample_rate=1.0, max_workers=1, max_queue=2)
+        yield service
+        service.shutdown()
+    
+    def test_disabled_without_candidate(self, shadow, primary):
+        """Testa que nada é agendado sem modelo candidato"""
+        assert shadow.is_enabled() is False
+        assert shadow.submit("texto", 1, primary) is False
+        assert shadow.get_stats()['sampled'] == 0
+    
+    def test_load_candidate_file_not_found(self, shadow):
+        """Testa erro quando o arquivo do candidato não existe"""
+        with pytest.raises(FileNotFoundError):
+            shadow.load_candidate('arquivo_inexistente.pkl')
+    
+    def test_load_candidate_installs_fast_analyzer(self, shadow, linear_pipeline, tmp_path):
+        """Testa que o candidato usa o mesmo tokenizador rápido do modelo servido"""
+        path = str(tmp_path / 'candidato.pkl')
+        joblib.dump(linear_pipeline, path)
+        
+        shadow.load_candidate(path)
+        
+        assert isinstance(shadow.candidate.steps[0][1].analyzer, FastAnalyzer)
+        assert shadow.candidate_path == path
+    
+    def test_records_agreement_and_latency(self, shadow, primary):
+        """Testa registro de concordância e latências"""
+        candidate = Mock()
+        candidate.predict.side_effect = [[1], [0]]
+        shadow.set_candidate(candidate)
+        
+        assert shadow.submit("texto um", 1, primary) is True
+        assert shadow.submit("texto dois", 1, primary) is True
+        shadow.shutdown()
+        
+        stats = shadow.get_stats()
+        assert stats['scored'] == 2
+        assert stats['agreement_rate'] == 0.5
+        assert stats['primary_latency_ms'] is not None
+        assert stats['latency_delta_p50_ms'] is not None
+        # Os dois lados são medidos em predict + confiança
+        assert primary.decision_function.call_count == 2
+        assert candidate.predict_proba.call_count == 2
+    
+    def test_sample_rate_zero_skips(self, shadow, primary):
+        """Testa que taxa de amostragem zero não agenda avaliações"""
+        shadow.set_candidate(Mock())
+        shadow.sample_rate = 0.0
+        
+        assert shadow.submit("texto", 1, primary) is False
+    
+    def test_full_queue_sheds_load(self, shadow, primary):
+        """Testa que a fila cheia descarta amostras sem bloquear"""
+        release = threading.Event()
+        candidate = Mock()
+        candidate.predict.side_effect = lambda texts: release.wait(5) and [1]
+        shadow.set_candidate(candidate)
+        
+        assert shadow.submit("a", 1, primary) is True
+        assert shadow.submit("b", 1, primary) is True
+        assert shadow.submit("c", 1, primary) is False
+        
+        release.set()
+        shadow.shutdown()
+        
+        stats = shadow.get_stats()
+        assert stats['dropped'] == 1
+        assert stats['scored'] == 2
+    
+    def test_candidate_error_is_counted(self, shadow, primary):
+        """Testa que erros do candidato não propagam"""
+        candidate = Mock()
+        candidate.predict.side_effect = ValueError("falha")
+        shadow.set_candidate(candidate)
+        
+        shadow.submit("texto", 1, primary)
+        shadow.shutdown()
+        
+        assert shadow.get_stats()['errors'] == 1
+    
+    def test_model_service_submits_to_shadow(self):
+        """Testa que o ModelService envia as predições ao modo sombra"""
+        service = ModelService()
+        mock_model = Mock()
+        mock_model.predict.return_value = [1]
+        mock_model.predict_proba.return_value = [[0.1, 0.9]]
+        service.model = mock_model
+        service.shadow = Mock()
+        
+        service.predict_single("Comentário de teste")
+        
+        args = service.shadow.submit.call_args[0]
+        assert args == ("comentário de teste", 1, mock_model)
+        
+        # Acertos do cache também são amostrados
+        service.predict_single("Comentário de teste")
+        assert service.shadow.submit.call_count == 2
+    
+    def test_model_service_submits_batch_to_shadow(self):
+        """Testa que o lote envia cada comentário único ao modo sombra"""
+        service = ModelService()
+        mock_model = Mock()
+        mock_model.predict.return_value = [1, 0]
+        mock_model.predict_proba.return_value = [[0.1, 0.9]]
+        service.model = mock_model
+        service.shadow = Mock()
+        
+        service.predict_batch(["Comentário um", "Comentário dois", "Comentário um"])
+        
+        submitted = [call[0] for call in service.shadow.submit.call_args_list]
+        assert submitted == [("comentário um", 1, mock_model), ("comentário dois", 0, mock_model)]
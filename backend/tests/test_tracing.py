@@ -0,0 +1,136 @@
+"""
+Testes do rastreamento das requisições usando PyTest
+"""
+import pytest
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from backend.utils import tracing
+from backend.utils.tracing import span, current_trace, start_trace, end_trace, OtlpExporter
+from backend.tools.trace_collector import make_handler, format_traces
+
+
+class TestTracing:
+    """Testes unitários para os traces e spans"""
+
+    def test_span_without_trace_is_noop(self):
+        """Testa que, sem trace ativo, span() devolve o contexto vazio compartilhado"""
+        assert current_trace() is None
+        assert span('preprocess') is span('score')
+
+        with span('preprocess'):
+            pass
+
+        assert current_trace() is None
+
+    def test_stages_are_recorded(self):
+        """Testa o registro das etapas e a restauração do contexto"""
+        token = start_trace('POST /api/predict')
+        with span('validate'):
+            time.sleep(0.002)
+        with span('score'):
+            pass
+        trace = end_trace(token)
+
+        assert current_trace() is None
+        assert [name for name, _, _ in trace.spans] == ['validate', 'score']
+        durations = trace.durations()
+        assert durations['validate'] >= 2.0
+        assert trace.end - trace.start >= sum(durations.values()) * 1e6
+
+    def test_server_timing_aggregates_repeated_stages(self):
+        """Testa o cabeçalho Server-Timing com etapas repetidas (lotes em partes)"""
+        token = start_trace('POST /api/predict/batch')
+        for _ in range(3):
+            with span('vectorize'):
+                pass
+        with span('serialize'):
+            pass
+        header = end_trace(token).server_timing()
+
+        metrics = [part.split(';')[0] for part in header.split(', ')]
+        assert metrics == ['vectorize', 'serialize', 'total']
+        assert all(part.split(';dur=')[1].replace('.', '').isdigit() for part in header.split(', '))
+
+    def test_to_otlp(self):
+        """Testa a conversão para spans OTLP (raiz + etapas)"""
+        token = start_trace('POST /api/predict')
+        with span('score'):
+            pass
+        trace = end_trace(token)
+
+        root, stage = trace.to_otlp()
+
+        assert root['name'] == 'POST /api/predict'
+        assert 'parentSpanId' not in root
+        assert stage['parentSpanId'] == root['spanId']
+        assert stage['traceId'] == root['traceId'] == trace.trace_id
+        assert len(trace.trace_id) == 32 and len(stage['spanId']) == 16
+        assert int(root['startTimeUnixNano']) <= int(stage['startTimeUnixNano'])
+        assert int(stage['endTimeUnixNano']) <= int(root['endTimeUnixNano'])
+
+
+class TestOtlpExporter:
+    """Testes do exportador com o coletor local"""
+
+    @pytest.fixture
+    def collector(self, tmp_path):
+        """Coletor local gravando os lotes recebidos"""
+        output = open(tmp_path / 'traces.jsonl', 'w')
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(output))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{server.server_address[1]}/v1/traces', tmp_path / 'traces.jsonl'
+        server.shutdown()
+        server.server_close()
+        output.close()
+
+    def test_traces_are_exported(self, collector, monkeypatch, capsys):
+        """Testa o envio em segundo plano ao coletor"""
+        endpoint, path = collector
+        exporter = OtlpExporter(endpoint)
+        monkeypatch.setattr(tracing, 'exporter', exporter)
+
+        for _ in range(3):
+            token = start_trace('POST /api/predict')
+            with span('score'):
+                pass
+            end_trace(token)
+
+        deadline = time.monotonic() + 5
+        while exporter.stats['exported'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert exporter.stats == {'exported': 3, 'dropped': 0, 'failed': 0}
+        payloads = [json.loads(line) for line in path.read_text().splitlines()]
+        spans = [item for payload in payloads
+                 for item in payload['resourceSpans'][0]['scopeSpans'][0]['spans']]
+        assert len(spans) == 6
+        assert payloads[0]['resourceSpans'][0]['resource']['attributes'][0]['value']['stringValue'] == 'hate-speech-api'
+        assert 'POST /api/predict' in capsys.readouterr().out
+
+    def test_queue_full_drops_traces(self):
+        """Testa o descarte com a fila cheia (coletor indisponível)"""
+        exporter = OtlpExporter('http://127.0.0.1:9/v1/traces', max_queue=1)
+        exporter._thread = threading.current_thread()  # sem thread de envio
+
+        token = start_trace('GET /api/health')
+        trace = end_trace(token)
+        exporter.submit(trace)
+        exporter.submit(trace)
+
+        assert exporter.stats['dropped'] == 1
+
+    def test_format_traces(self):
+        """Testa o resumo impresso pelo coletor local"""
+        token = start_trace('POST /api/predict')
+        with span('score'):
+            pass
+        trace = end_trace(token)
+
+        lines = format_traces({'resourceSpans': [{'scopeSpans': [{'spans': trace.to_otlp()}]}]})
+
+        assert len(lines) == 1
+        assert lines[0].startswith(trace.trace_id[:8] + ' POST /api/predict')
+        assert '| score ' in lines[0]
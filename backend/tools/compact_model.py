@@ -0,0 +1,208 @@
+"""
+Ferramenta de compactação do modelo servido
+
+Lê o pipeline TF-IDF + LinearSVC, descarta os tokens cujo coeficiente é zero
+(a penalidade L1 zera a maior parte deles) e a lista de stop words, e grava
+um CompactLinearModel com IDF e pesos reindexados. Os tokens descartados
+continuam participando apenas da normalização L2, o que mantém as decisões
+idênticas; o relatório compara tamanho do pickle, tempo de carga e memória
+antes/depois e verifica os scores.
+
+Com --precision float32 ou int8, IDF e pesos são gravados com precisão
+reduzida e o relatório de tolerância compara decision scores e rótulos com
+o pipeline float64 na divisão de avaliação (os 20% de teste de hate.csv,
+como em test_model_performance.py, ou textos sintéticos na sua ausência).
+
+Uso:
+    python -m backend.tools.compact_model [--output caminho.pkl] [--drop-norm-terms]
+        [--precision float64|float32|int8] [--min-agreement 0.999]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from backend.config.settings import MODEL_PATH
+from backend.services.linear_scorer import CompactLinearModel, PRECISIONS
+from backend.utils.text_preprocessor import preprocess_text
+
+DEFAULT_OUTPUT = 'hate_speech_classifier_model.compact.pkl'
+DATASET_PATH = 'hate.csv'
+
+# Tolerância numérica para diferenças de arredondamento na soma dos termos
+SCORE_TOLERANCE = 1e-9
+
+# Concordância mínima de rótulos para gravar um artefato de precisão reduzida
+MIN_AGREEMENT = 0.999
+
+
+def measure_load(path, repeats=5):
+    """
+    Mede o tempo de carga e a memória retida pelo objeto carregado.
+
+    Returns:
+        tuple: (mediana do tempo de carga em ms, memória em KB)
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        joblib.load(path)
+        times.append(1000 * (time.perf_counter() - start))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    model = joblib.load(path)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+
+    return float(np.median(times)), (after - before) / 1024
+
+
+def load_verification_texts(model, size=5000, seed=42):
+    """
+    Textos para verificar os scores: o dataset, se disponível, e documentos
+    sintéticos com tokens do vocabulário completo (ativos, de norma e OOV).
+    """
+    texts = []
+    if os.path.exists(DATASET_PATH):
+        df = pd.read_csv(DATASET_PATH, encoding='latin-1')
+        texts.extend(df['comment'].dropna().apply(preprocess_text).tolist())
+
+    rng = random.Random(seed)
+    vocabulary = list(model.steps[0][1].vocabulary_) + ['fora', 'do', 'vocabulario', 'the', 'and']
+    for _ in range(size):
+        texts.append(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 40))))
+    return texts
+
+
+def load_evaluation_split(model, seed=42):
+    """
+    Textos da divisão de avaliação: os 20% de teste de hate.csv (mesma divisão
+    estratificada de test_model_performance.py) ou, sem o dataset, os textos
+    sintéticos de verificação.
+
+    Returns:
+        tuple: (textos processados, descrição da origem)
+    """
+    if not os.path.exists(DATASET_PATH):
+        return load_verification_texts(model, seed=seed), "textos sintéticos (hate.csv ausente)"
+
+    df = pd.read_csv(DATASET_PATH, encoding='latin-1').dropna(subset=['comment', 'label'])
+    texts = df['comment'].apply(preprocess_text).values
+    labels = df['label'].apply(lambda label: 1 if label == 'N' else 0).values
+    _, test_texts = train_test_split(texts, test_size=0.2, random_state=seed, stratify=labels)
+    return list(test_texts), f"{DATASET_PATH} (divisão de teste, 20%)"
+
+
+def tolerance_report(model, reduced, texts):
+    """
+    Compara o modelo de precisão reduzida com o pipeline float64.
+
+    Returns:
+        dict: Diferenças absolutas do decision score (máxima, média e p99),
+        concordância de rótulos e menor |score| entre os rótulos trocados
+    """
+    expected = model.decision_function(texts)
+    actual = reduced.decision_function(texts).astype(np.float64)
+    diff = np.abs(expected - actual)
+    flipped = model.predict(texts) != reduced.predict(texts)
+    return {
+        'max_diff': float(diff.max()),
+        'mean_diff': float(diff.mean()),
+        'p99_diff': float(np.percentile(diff, 99)),
+        'agreement': float(1 - flipped.mean()),
+        'flipped': int(flipped.sum()),
+        'max_flipped_margin': float(np.abs(expected[flipped]).max()) if flipped.any() else 0.0,
+    }
+
+
+def array_bytes(model):
+    """Bytes dos arrays de IDF e pesos (o que o score percorre)"""
+    return model.idf.nbytes + model.weights.nbytes + model.norm_idf.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta o modelo linear servido")
+    parser.add_argument("--input", default=MODEL_PATH, help="Pipeline sklearn de entrada")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Arquivo compactado de saída")
+    parser.add_argument(
+        "--drop-norm-terms", action="store_true",
+        help="Descarta também os termos de norma (menor, mas com decisões aproximadas)"
+    )
+    parser.add_argument(
+        "--precision", choices=list(PRECISIONS), default='float64',
+        help="Armazenamento de IDF e pesos (float32 e int8 pontuam em float32)"
+    )
+    parser.add_argument(
+        "--min-agreement", type=float, default=MIN_AGREEMENT,
+        help="Concordância mínima de rótulos com o pipeline para a precisão reduzida"
+    )
+    args = parser.parse_args()
+
+    model = joblib.load(args.input)
+    compact = CompactLinearModel.from_pipeline(
+        model, keep_norm_terms=not args.drop_norm_terms, precision=args.precision
+    )
+    joblib.dump(compact, args.output)
+
+    # Verificar os scores com o artefato regravado
+    reloaded = joblib.load(args.output)
+    texts = load_verification_texts(model)
+    expected = model.decision_function(texts)
+    actual = reloaded.decision_function(texts)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float(np.mean(model.predict(texts) == reloaded.predict(texts)))
+
+    original_size = os.path.getsize(args.input) / 1024
+    compact_size = os.path.getsize(args.output) / 1024
+    original_load, original_memory = measure_load(args.input)
+    compact_load, compact_memory = measure_load(args.output)
+    vocabulary_size = len(model.steps[0][1].vocabulary_)
+
+    print("\n=== COMPACTAÇÃO DO MODELO ===\n")
+    print(f"Tokens ativos (coeficiente != 0): {len(compact.vocabulary)} de {vocabulary_size}")
+    print(f"Termos apenas de norma: {len(compact.norm_vocabulary)} ({len(compact.norm_idf)} grupos de IDF)\n")
+    print(f"{'':<22}{'original':>12}{'compacto':>12}")
+    print(f"{'Pickle (KB)':<22}{original_size:>12.1f}{compact_size:>12.1f}")
+    print(f"{'Carga (ms)':<22}{original_load:>12.2f}{compact_load:>12.2f}")
+    print(f"{'Memória (KB)':<22}{original_memory:>12.1f}{compact_memory:>12.1f}")
+    print(f"\nTextos verificados: {len(texts)}")
+    print(f"Maior diferença de score: {max_diff:.3e}")
+    print(f"Concordância de rótulos: {agreement:.2%}")
+
+    if args.precision != 'float64':
+        evaluation, source = load_evaluation_split(model)
+        report = tolerance_report(model, reloaded, evaluation)
+        full_precision = CompactLinearModel.from_pipeline(model, keep_norm_terms=not args.drop_norm_terms)
+
+        print(f"\n=== TOLERÂNCIA ({args.precision} vs float64) ===\n")
+        print(f"Avaliação: {source}, {len(evaluation)} textos")
+        print(f"Arrays de IDF e pesos: {array_bytes(full_precision)} → {array_bytes(reloaded)} bytes")
+        if args.precision == 'int8':
+            print(f"Escalas: IDF {reloaded.idf_scale:.4g}, pesos {reloaded.weight_scale:.4g} "
+                  f"({int(np.sum(reloaded.weights == 0))} pesos quantizados para zero)")
+        print(f"Diferença de score: máx {report['max_diff']:.3e}, média {report['mean_diff']:.3e}, "
+              f"p99 {report['p99_diff']:.3e}")
+        print(f"Concordância de rótulos: {report['agreement']:.4%} ({report['flipped']} trocados, "
+              f"|score| float64 até {report['max_flipped_margin']:.3e})")
+
+        if report['agreement'] < args.min_agreement:
+            os.remove(args.output)
+            print(f"\n❌ Concordância abaixo de {args.min_agreement:.2%}: artefato descartado")
+            sys.exit(1)
+    elif not args.drop_norm_terms and (max_diff > SCORE_TOLERANCE or agreement < 1.0):
+        os.remove(args.output)
+        print("\n❌ Scores divergentes: artefato descartado")
+        sys.exit(1)
+
+    print(f"\n✅ Artefato gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
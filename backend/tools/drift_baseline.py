@@ -0,0 +1,94 @@
+"""
+Referência de drift calculada no dataset de treino
+
+Classifica o hate.csv com o modelo servido (sem cache e sem cascata, com as
+margens exatas da decision function) e grava, ao lado de model_info.json, o
+sketch com os mesmos histogramas que a API mantém por janela de tempo. A API
+carrega a referência junto com o modelo e a compara com o tráfego em
+GET /api/drift. Deve ser executado a cada novo modelo treinado: as margens só
+são comparáveis com as do modelo que gerou a referência.
+
+Uso:
+    python -m backend.tools.drift_baseline [--dataset hate.csv] [--output drift_baseline.json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import warnings
+import pandas as pd
+from backend.config.settings import DRIFT_BASELINE_PATH, HATE_SPEECH_CLASS, MODEL_PATH, logger, setup_logging
+from backend.services.drift_service import DriftSketch, baseline_document, oov_ratios, vocabulary_tokens
+from backend.services.model_service import ModelService
+from backend.utils.text_preprocessor import preprocess_text
+
+DATASET_PATH = 'hate.csv'
+CHUNK_SIZE = 2048
+
+
+def build_sketch(scorer, comments, chunk_size=CHUNK_SIZE):
+    """
+    Sketch dos comentários classificados pelo scorer linear.
+
+    Comentários vazios após preprocess_text são ignorados, como na API.
+
+    Returns:
+        DriftSketch: Sketch sem janela (start=None)
+    """
+    analyzer = scorer.vectorizer.build_analyzer()
+    vocabulary = vocabulary_tokens(scorer.vectorizer)
+    sketch = DriftSketch()
+    for start in range(0, len(comments), chunk_size):
+        chunk = [(comment, preprocess_text(comment)) for comment in comments[start:start + chunk_size]]
+        chunk = [(comment, processed) for comment, processed in chunk if processed.strip()]
+        if not chunk:
+            continue
+        processed = [text for _, text in chunk]
+        decisions = scorer.decision_scores(scorer.transform(processed))
+        predictions = scorer.predict_classes(decisions)
+        sketch.add(predictions == HATE_SPEECH_CLASS, [len(comment) for comment, _ in chunk], decisions,
+                   oov_ratios(analyzer, vocabulary, processed))
+    return sketch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Referência de drift calculada no dataset de treino")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="CSV com a coluna 'comment'")
+    parser.add_argument("--output", default=DRIFT_BASELINE_PATH, help="Arquivo de referência")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dataset):
+        print(f"❌ Dataset não encontrado: {args.dataset}")
+        sys.exit(1)
+
+    warnings.filterwarnings('ignore')
+    setup_logging()
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    if service.scorer is None:
+        print("❌ A referência de drift exige um modelo linear (margens da decision function)")
+        sys.exit(1)
+
+    comments = pd.read_csv(args.dataset, encoding='latin-1')['comment'].dropna().astype(str).tolist()
+    sketch = build_sketch(service.scorer, comments)
+    document = baseline_document(
+        sketch, os.path.basename(args.dataset), sketch.count, ModelService._file_version(MODEL_PATH)
+    )
+    with open(args.output, 'w') as f:
+        json.dump(document, f)
+
+    summary = sketch.summary()
+    print("\n=== REFERÊNCIA DE DRIFT ===\n")
+    print(f"Comentários: {summary['count']} de {len(comments)} ({args.dataset})")
+    print(f"Taxa de discurso de ódio: {summary['hate_rate']:.2%}")
+    for name in ('margin', 'length', 'oov_ratio'):
+        histogram = summary[name]
+        print(f"{name:<10} média {histogram['mean']:>9.3f}   p50 {histogram['p50']:>9.3f}   "
+              f"p90 {histogram['p90']:>9.3f}   p99 {histogram['p99']:>9.3f}")
+    print(f"\n✅ Referência gravada em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
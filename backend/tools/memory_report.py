@@ -0,0 +1,83 @@
+"""
+Relatório de memória de um worker com o modelo carregado
+
+Carrega o modelo como a API e imprime a memória residente do processo, a
+base do interpretador antes da carga e o tamanho de cada componente do modelo
+e dos caches. Em seguida, carrega o modelo mais uma vez com tracemalloc em
+volta de ModelService.load_model: com os módulos já importados, a medição
+mostra apenas o que a carga do modelo retém. Com --workers, estima a memória
+de N workers independentes (cada processo carrega sua própria cópia).
+
+Uso:
+    python -m backend.tools.memory_report [--workers N] [--json]
+"""
+import argparse
+import json
+import logging
+import warnings
+from backend.config.settings import MODEL_PATH, MODEL_MEMORY_BUDGET_MB, logger, setup_logging
+from backend.services.model_service import ModelService
+
+MB = 1024 * 1024
+
+
+def format_mb(value):
+    """Bytes em MB (ou '-' se indisponível)"""
+    return f"{value / MB:8.2f} MB" if value is not None else "       -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de memória do worker com o modelo carregado")
+    parser.add_argument("--workers", type=int, default=1, help="Workers para a estimativa total")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    setup_logging()
+    logger.setLevel(logging.WARNING)
+    # Carga como na API (sem tracemalloc, que infla o RSS)
+    service = ModelService()
+    service.profile_load = False
+    service.load_model()
+    report = service.get_memory_report()
+
+    # Segunda carga com tracemalloc: imports já feitos, apenas o modelo
+    profiled = ModelService()
+    profiled.profile_load = True
+    profiled.load_model()
+    load = profiled.load_memory
+    report['load'] = load
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n=== MEMÓRIA DO WORKER ({MODEL_PATH}) ===\n")
+    print(f"RSS com o modelo:           {format_mb(report['rss'])}")
+    print(f"Base do interpretador:      {format_mb(report['interpreter_baseline'])}  (RSS antes da carga)")
+    print(f"Retido pela carga:          {format_mb(load.get('retained'))}  (tracemalloc)")
+    print(f"Pico durante a carga:       {format_mb(load.get('peak'))}")
+
+    print("\nComponentes do modelo:")
+    for name, size in report['model'].items():
+        print(f"  {name:<24}{format_mb(size)}")
+    budget = MODEL_MEMORY_BUDGET_MB * MB
+    print(f"  {'total':<24}{format_mb(report['model_total'])}  (orçamento: {MODEL_MEMORY_BUDGET_MB:g} MB)")
+
+    print("\nCaches:")
+    for name, size in report['caches'].items():
+        print(f"  {name:<24}{format_mb(size)}")
+
+    if load.get('top_allocations'):
+        print("\nMaiores alocações da carga (por arquivo):")
+        for allocation in load['top_allocations']:
+            print(f"  {format_mb(allocation['bytes'])}  {allocation['file']}")
+
+    if args.workers > 1 and report['rss'] is not None:
+        print(f"\nEstimativa para {args.workers} workers: {format_mb(args.workers * report['rss'])}")
+    if report['model_total'] > budget:
+        print(f"\n⚠️ Modelo acima do orçamento de {MODEL_MEMORY_BUDGET_MB:g} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Coletor local de traces (substituto de um coletor OpenTelemetry)
+
+Recebe spans OTLP/HTTP em JSON (POST /v1/traces) e imprime cada trace com a
+duração das etapas. Útil para depurar requisições lentas sem instalar um
+coletor; com --output, grava também cada lote recebido (um JSON por linha).
+
+Uso:
+    python -m backend.tools.trace_collector [--port 4318] [--output traces.jsonl]
+    TRACING=1 TRACING_OTLP_ENDPOINT=http://localhost:4318/v1/traces python app.py
+"""
+import argparse
+import json
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def format_traces(payload):
+    """
+    Resume um lote OTLP/JSON em linhas de texto (uma por trace).
+
+    Returns:
+        list: Linhas "nome total | etapa duração, ..."
+    """
+    traces = defaultdict(list)
+    for resource in payload.get('resourceSpans', []):
+        for scope in resource.get('scopeSpans', []):
+            for item in scope.get('spans', []):
+                traces[item['traceId']].append(item)
+
+    lines = []
+    for trace_id, spans in traces.items():
+        root = next((item for item in spans if not item.get('parentSpanId')), spans[0])
+        stages = [
+            f"{item['name']} {(int(item['endTimeUnixNano']) - int(item['startTimeUnixNano'])) / 1e6:.2f}ms"
+            for item in spans if item is not root
+        ]
+        total = (int(root['endTimeUnixNano']) - int(root['startTimeUnixNano'])) / 1e6
+        lines.append(f"{trace_id[:8]} {root['name']} {total:.2f}ms | " + ', '.join(stages))
+    return lines
+
+
+def make_handler(output=None):
+    """Cria o handler HTTP do coletor"""
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/v1/traces':
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, 'JSON inválido')
+                return
+
+            for line in format_traces(payload):
+                print(line, flush=True)
+            if output is not None:
+                output.write(json.dumps(payload) + '\n')
+                output.flush()
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coletor local de traces OTLP/HTTP (JSON)")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", help="Arquivo para gravar os lotes recebidos (JSON por linha)")
+    args = parser.parse_args()
+
+    output = open(args.output, 'a') if args.output else None
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(output))
+    print(f"Coletor de traces em http://{args.host}:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
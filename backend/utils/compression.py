@@ -0,0 +1,123 @@
+"""
+Compressão dos corpos de requisição e resposta (gzip e, opcionalmente, zstd)
+
+zstd requer o pacote opcional zstandard; sem ele apenas gzip é aceito e
+oferecido.
+"""
+import io
+import zlib
+from backend.config.settings import COMPRESSION_GZIP_LEVEL, COMPRESSION_ZSTD_LEVEL, MAX_DECOMPRESSED_SIZE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class UnsupportedEncodingError(ValueError):
+    """Content-Encoding não suportado"""
+
+
+class PayloadTooLargeError(ValueError):
+    """Corpo descomprimido acima do limite permitido"""
+
+
+def supported_encodings():
+    """Codificações disponíveis, em ordem de preferência"""
+    return ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Escolhe a codificação da resposta a partir do cabeçalho Accept-Encoding.
+
+    Args:
+        accept_encoding: Valor do cabeçalho (ex.: "gzip, zstd;q=0.9")
+
+    Returns:
+        str: 'zstd', 'gzip' ou None (sem compressão)
+    """
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data, encoding, level=None):
+    """
+    Comprime um corpo.
+
+    Args:
+        data: Bytes a comprimir
+        encoding: 'gzip' ou 'zstd'
+        level: Nível de compressão (padrão: configurações)
+
+    Returns:
+        bytes: Corpo comprimido
+    """
+    if encoding == 'gzip':
+        level = COMPRESSION_GZIP_LEVEL if level is None else level
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == 'zstd' and zstandard is not None:
+        level = COMPRESSION_ZSTD_LEVEL if level is None else level
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise UnsupportedEncodingError(f"Codificação não suportada: {encoding}")
+
+
+def decompress(data, encoding, max_size=MAX_DECOMPRESSED_SIZE):
+    """
+    Descomprime um corpo, limitando o tamanho da saída.
+
+    Args:
+        data: Corpo comprimido
+        encoding: Valor do Content-Encoding ('gzip', 'x-gzip' ou 'zstd')
+        max_size: Tamanho máximo do corpo descomprimido em bytes
+
+    Returns:
+        bytes: Corpo descomprimido
+
+    Raises:
+        UnsupportedEncodingError: Codificação não suportada
+        PayloadTooLargeError: Corpo descomprimido acima de max_size
+        ValueError: Corpo corrompido
+    """
+    encoding = encoding.strip().lower()
+
+    if encoding in ('gzip', 'x-gzip'):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            output = decompressor.decompress(data, max_size + 1)
+        except zlib.error as e:
+            raise ValueError(f"Corpo gzip inválido: {e}") from e
+        if not decompressor.eof and len(output) <= max_size:
+            raise ValueError("Corpo gzip incompleto")
+    elif encoding == 'zstd' and zstandard is not None:
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+                output = reader.read(max_size + 1)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corpo zstd inválido: {e}") from e
+    else:
+        raise UnsupportedEncodingError(f"Codificação não suportada: {encoding}")
+
+    if len(output) > max_size:
+        raise PayloadTooLargeError(f"Corpo descomprimido maior que {max_size} bytes")
+    return output
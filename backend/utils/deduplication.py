@@ -0,0 +1,112 @@
+"""
+Deduplicação de comentários dentro de um lote
+
+Ondas de spam repetem o mesmo comentário (ou variações mínimas) centenas de
+vezes em um único lote. Após preprocess_text, cópias que diferem apenas em
+maiúsculas, pontuação, dígitos ou espaços ficam idênticas e são agrupadas por
+hash exato. Opcionalmente, textos quase idênticos (uma ou outra palavra
+diferente) são agrupados: assinaturas MinHash selecionam os candidatos e a
+similaridade de Jaccard entre os conjuntos de palavras confirma o agrupamento.
+"""
+import zlib
+import numpy as np
+
+MINHASH_PERMUTATIONS = 16
+MINHASH_ROWS_PER_BAND = 2
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Permutações fixas: as assinaturas são determinísticas entre processos
+_random = np.random.RandomState(1)
+_A = _random.randint(1, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_B = _random.randint(0, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def minhash(words):
+    """
+    Calcula a assinatura MinHash de um conjunto de palavras.
+
+    Args:
+        words: Conjunto (não vazio) de palavras de um texto processado
+
+    Returns:
+        np.ndarray: MINHASH_PERMUTATIONS valores mínimos
+    """
+    hashes = np.fromiter((zlib.crc32(word.encode()) for word in words), dtype=np.uint64, count=len(words))
+    # Hashes de 32 bits × coeficientes de 31 bits: sem overflow em 64 bits
+    return ((np.outer(_A, hashes) + _B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def jaccard(a, b):
+    """Similaridade de Jaccard entre dois conjuntos"""
+    return len(a & b) / len(a | b)
+
+
+def deduplicate(texts, near_duplicates=False, min_similarity=0.8):
+    """
+    Agrupa textos idênticos (e opcionalmente quase idênticos) de um lote.
+
+    Args:
+        texts: Lista de textos já processados por preprocess_text
+        near_duplicates: Agrupar também textos com conjuntos de palavras semelhantes
+        min_similarity: Similaridade de Jaccard mínima para o agrupamento
+
+    Returns:
+        tuple: (representantes, posições) — índices em texts dos textos a
+        processar e, para cada texto, o índice do seu representante nessa lista
+    """
+    representatives = []
+    positions = []
+    seen = {}
+
+    for index, text in enumerate(texts):
+        position = seen.get(text)
+        if position is None:
+            position = seen[text] = len(representatives)
+            representatives.append(index)
+        positions.append(position)
+
+    if not near_duplicates or len(representatives) < 2:
+        return representatives, positions
+
+    # Agrupar representantes semelhantes: candidatos são buscados apenas entre
+    # os que compartilham alguma faixa da assinatura MinHash
+    buckets = {}
+    word_sets = []
+    merged = list(range(len(representatives)))
+    kept = []
+
+    for position, index in enumerate(representatives):
+        words = frozenset(texts[index].split())
+        word_sets.append(words)
+        signature = minhash(words)
+        bands = [
+            (start, signature[start:start + MINHASH_ROWS_PER_BAND].tobytes())
+            for start in range(0, MINHASH_PERMUTATIONS, MINHASH_ROWS_PER_BAND)
+        ]
+
+        match = None
+        checked = set()
+        for key in bands:
+            for candidate in buckets.get(key, ()):
+                if candidate not in checked:
+                    checked.add(candidate)
+                    if jaccard(words, word_sets[candidate]) >= min_similarity:
+                        match = candidate
+                        break
+            if match is not None:
+                break
+
+        if match is not None:
+            merged[position] = match
+            continue
+
+        kept.append(position)
+        for key in bands:
+            buckets.setdefault(key, []).append(position)
+
+    # Renumerar as posições para a lista reduzida de representantes
+    renumbered = {position: new_position for new_position, position in enumerate(kept)}
+    representatives = [representatives[position] for position in kept]
+    positions = [renumbered[merged[position]] for position in positions]
+
+    return representatives, positions
@@ -0,0 +1,103 @@
+"""
+Analisador rápido para o TF-IDF na inferência
+
+O texto que chega ao vetorizador já passou por preprocess_text: está em
+minúsculas, sem pontuação ASCII, sem dígitos e com palavras separadas por um
+único espaço. Nesse caso o token_pattern padrão do sklearn (\\b\\w\\w+\\b)
+produz, para cada palavra alfanumérica ASCII com 2+ caracteres, exatamente a
+própria palavra; o regex só é necessário para palavras com outros caracteres
+(acentos, emojis, pontuação Unicode). Com outro token_pattern essa
+equivalência não vale, e o analisador do sklearn é mantido.
+"""
+import re
+
+# token_pattern padrão do sklearn: o único reproduzido pelo caminho rápido
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class FastAnalyzer:
+    """
+    Substitui o analisador 'word' de um TfidfVectorizer para textos já
+    processados por preprocess_text.
+
+    Pré-condição: o texto de entrada é a saída de preprocess_text (em
+    particular, já em minúsculas).
+
+    Raises:
+        ValueError: Se token_pattern não for o padrão do sklearn
+    """
+
+    def __init__(self, token_pattern=DEFAULT_TOKEN_PATTERN, stop_words=None, ngram_range=(1, 1)):
+        if token_pattern != DEFAULT_TOKEN_PATTERN:
+            raise ValueError("Apenas o token_pattern padrão do sklearn é suportado")
+        self.token_pattern = token_pattern
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = tuple(ngram_range)
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        """
+        Cria o analisador com os parâmetros de um TfidfVectorizer.
+
+        Raises:
+            ValueError: Se o vetorizador usar opções que o analisador não reproduz
+        """
+        params = vectorizer.get_params()
+        if params['analyzer'] != 'word' or params['tokenizer'] is not None or params['preprocessor'] is not None:
+            raise ValueError("Apenas o analisador 'word' padrão pode ser substituído")
+        if params['strip_accents'] is not None or not params['lowercase']:
+            raise ValueError("strip_accents e lowercase=False não são suportados")
+
+        return cls(params['token_pattern'], vectorizer.get_stop_words(), params['ngram_range'])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_token_re']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._token_re = re.compile(self.token_pattern)
+
+    def __call__(self, text):
+        """
+        Tokeniza um texto processado.
+
+        Args:
+            text: Saída de preprocess_text
+
+        Returns:
+            list: Tokens (e n-gramas) na mesma ordem do analisador do sklearn
+        """
+        tokens = []
+        for word in text.split():
+            if word.isascii() and word.isalnum():
+                # Palavra inteira casa com \w\w+ (se tiver 2+ caracteres)
+                if len(word) > 1:
+                    tokens.append(word)
+            else:
+                tokens.extend(self._token_re.findall(word))
+
+        if self.stop_words:
+            stop_words = self.stop_words
+            tokens = [token for token in tokens if token not in stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        # Mesma construção de n-gramas de VectorizerMixin._word_ngrams
+        original_tokens = tokens
+        if min_n == 1:
+            tokens = list(original_tokens)
+            min_n += 1
+        else:
+            tokens = []
+
+        n_original_tokens = len(original_tokens)
+        for n in range(min_n, min(max_n + 1, n_original_tokens + 1)):
+            for i in range(n_original_tokens - n + 1):
+                tokens.append(' '.join(original_tokens[i:i + n]))
+
+        return tokens
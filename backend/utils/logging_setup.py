@@ -0,0 +1,216 @@
+"""
+Configuração de logging não bloqueante
+
+As rotas apenas enfileiram o LogRecord (sem formatar a mensagem); uma
+thread em segundo plano (QueueListener) formata e grava os registros. Com a
+fila cheia, os registros são descartados e contados em vez de bloquear a
+requisição. Os logs de sucesso das rotas de predição são amostrados por rota.
+
+Um fork (gunicorn --preload, ProcessPoolExecutor) não copia a thread do
+listener: o processo filho instala uma fila e um listener próprios.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# Atributos padrão de um LogRecord: o restante vem de extra={...}
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+def _extra_fields(record):
+    """Campos estruturados (extra) de um registro"""
+    return {key: value for key, value in record.__dict__.items() if key not in _STANDARD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível para desenvolvimento, com os campos estruturados ao final"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            text += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return text
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enfileira os registros sem bloquear: com a fila cheia, o registro é
+    descartado e contado.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # A formatação fica para a thread do QueueListener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BackgroundListener(QueueListener):
+    """QueueListener que pode ser parado mais de uma vez"""
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+class RouteSampler:
+    """Decide quais logs de sucesso são emitidos, com uma taxa por rota"""
+
+    def __init__(self, rates=None, default_rate=1.0):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self._random = random.Random()
+
+    def sample(self, route):
+        """Retorna True se o log de sucesso desta rota deve ser emitido"""
+        rate = self.rates.get(route, self.default_rate)
+        return rate >= 1.0 or (rate > 0.0 and self._random.random() < rate)
+
+
+def parse_sample_rates(value):
+    """
+    Converte "rota=taxa,rota=taxa" em um dicionário.
+
+    Raises:
+        ValueError: Se alguma taxa não for numérica
+    """
+    rates = {}
+    for item in value.split(','):
+        if item.strip():
+            route, _, rate = item.partition('=')
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+_handler = None
+_listener = None
+_target = None
+_options = None
+_sampler = RouteSampler()
+
+
+def configure_logging(level='INFO', log_format='text', queue_size=10000, sample_rates=None,
+                      default_sample_rate=1.0, stream=None, target=None, fast_records=False):
+    """
+    Instala o logging não bloqueante (idempotente: substitui a configuração anterior).
+
+    Args:
+        level: Nível mínimo dos registros
+        log_format: 'json' ou 'text'
+        queue_size: Registros pendentes antes de começar a descartar
+        sample_rates: Taxa de amostragem dos logs de sucesso por rota
+        default_sample_rate: Taxa para rotas sem taxa própria
+        stream: Destino dos registros (padrão: stderr)
+        target: Logger configurado (padrão: raiz)
+        fast_records: Deixar de coletar arquivo/linha e processo em cada registro
+            (altera globais privados do módulo logging, válidos para todo o processo)
+
+    Returns:
+        tuple: (NonBlockingQueueHandler, BackgroundListener)
+    """
+    global _handler, _listener, _sampler, _target, _options
+
+    _options = dict(level=level, log_format=log_format, queue_size=queue_size, sample_rates=sample_rates,
+                    default_sample_rate=default_sample_rate, stream=stream, target=target,
+                    fast_records=fast_records)
+    if _handler is not None:
+        _target.removeHandler(_handler)
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter())
+
+    log_queue = queue.Queue(queue_size)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _listener = BackgroundListener(log_queue, output)
+    _listener.start()
+    _sampler = RouteSampler(sample_rates, default_sample_rate)
+
+    if fast_records:
+        # Os formatos não usam arquivo/linha nem processo: evitar coletá-los em cada registro
+        # (otimizações descritas na documentação do módulo logging)
+        logging._srcfile = None
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+    _target = target if target is not None else logging.getLogger()
+    _target.addHandler(_handler)
+    _target.setLevel(level)
+    return _handler, _listener
+
+
+def log_success(logger, route, message, **fields):
+    """
+    Registra (com amostragem por rota) o sucesso de uma requisição.
+
+    Args:
+        logger: Logger de destino
+        route: Rota da requisição (chave da taxa de amostragem)
+        message: Mensagem fixa (sem formatação)
+        **fields: Campos estruturados do registro
+    """
+    if logger.isEnabledFor(logging.INFO) and _sampler.sample(route):
+        logger.info(message, extra={'route': route, **fields})
+
+
+def get_logging_stats():
+    """Retorna os registros pendentes e descartados"""
+    if _handler is None:
+        return {'queued': 0, 'dropped': 0}
+    return {'queued': _handler.queue.qsize(), 'dropped': _handler.dropped}
+
+
+def _restart_after_fork():
+    """No processo filho de um fork: descarta a fila sem listener e instala outra"""
+    global _handler, _listener
+    if _handler is None:
+        return
+    _target.removeHandler(_handler)
+    _handler = _listener = None
+    configure_logging(**_options)
+
+
+def _stop_listener():
+    """Grava os registros pendentes ao encerrar o processo"""
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
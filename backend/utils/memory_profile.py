@@ -0,0 +1,195 @@
+"""
+Medição da memória do processo e do modelo carregado
+
+Combina três fontes:
+- RSS do processo (/proc/self/statm ou, na falta dele, o pico via resource);
+- tracemalloc em volta da carga do modelo (memória retida e pico);
+- tamanho profundo de cada componente (vocabulário, IDF, coeficientes,
+  stop words, estruturas derivadas e caches).
+"""
+import os
+import sys
+import threading
+import tracemalloc
+import types
+import numpy as np
+from scipy import sparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Não percorridos: classes, módulos e funções são compartilhados pelo processo, e
+# threading.local só expõe os dados da thread que está medindo
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, threading.local)
+
+
+def rss_bytes():
+    """Memória residente atual do processo (ou o pico, se indisponível)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss: KB no Linux, bytes no macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Tamanho aproximado de um objeto e de tudo que ele referencia.
+
+    Percorre dicts, listas, tuplas, conjuntos, arrays NumPy (inclusive de
+    objetos) e matrizes esparsas. Objetos já contados em seen (ids) são
+    ignorados, o que permite medir vários componentes sem contar duas vezes
+    as estruturas compartilhadas (ex.: as strings do vocabulário).
+
+    Args:
+        obj: Objeto a medir
+        seen: Conjunto de ids já contados (atualizado)
+
+    Returns:
+        int: Tamanho em bytes
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            # Uma view não é dona do buffer: o array base é contado (uma vez) no lugar
+            size += sys.getsizeof(item) if item.base is None else item.__sizeof__()
+            if item.base is not None:
+                stack.append(item.base)
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+            continue
+        if sparse.issparse(item):
+            size += sys.getsizeof(item)
+            stack.extend(getattr(item, name) for name in ('data', 'indices', 'indptr') if hasattr(item, name))
+            continue
+
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, _OPAQUE_TYPES):
+            # Atributos de instâncias (scorer, vetorizador de lotes, estimadores)
+            stack.append(vars(item))
+    return size
+
+
+def model_components(model):
+    """
+    Componentes do modelo servido.
+
+    Args:
+        model: Pipeline TF-IDF + classificador linear ou CompactLinearModel
+
+    Returns:
+        dict: Nome do componente -> objeto
+    """
+    steps = getattr(model, 'steps', None)
+    if isinstance(steps, list) and steps:
+        vectorizer, classifier = steps[0][1], steps[-1][1]
+        components = {
+            'vocabulary': getattr(vectorizer, 'vocabulary_', None),
+            'idf': getattr(vectorizer, 'idf_', None),
+            'coefficients': getattr(classifier, 'coef_', None),
+        }
+        analyzer = getattr(vectorizer, 'analyzer', None)
+        stop_words = getattr(analyzer, 'stop_words', None)
+        if stop_words is None and hasattr(vectorizer, 'get_stop_words'):
+            stop_words = vectorizer.get_stop_words()
+        components['stop_words'] = stop_words
+        return {name: value for name, value in components.items() if value is not None}
+
+    # CompactLinearModel: sem stop words (tokens removidos já não estão no vocabulário)
+    components = {
+        'vocabulary': getattr(model, 'vocabulary', None),
+        'idf': getattr(model, 'idf', None),
+        'coefficients': getattr(model, 'weights', None),
+        'norm_vocabulary': getattr(model, 'norm_vocabulary', None),
+    }
+    return {name: value for name, value in components.items() if value is not None}
+
+
+def component_sizes(components, seen=None):
+    """
+    Mede uma sequência de componentes, na ordem dada, sem contar duas vezes
+    as estruturas compartilhadas.
+
+    Args:
+        components: dict nome -> objeto
+        seen: Conjunto de ids já contados (atualizado)
+
+    Returns:
+        dict: Nome do componente -> bytes
+    """
+    seen = set() if seen is None else seen
+    return {name: deep_sizeof(value, seen) for name, value in components.items()}
+
+
+class LoadProfiler:
+    """
+    Mede com tracemalloc a memória alocada durante um bloco (carga do modelo).
+
+    Se o tracemalloc já estiver ativo, é reaproveitado e mantido ativo. O
+    rastreamento aumenta o RSS do processo (memória do alocador que não volta
+    ao sistema), por isso fica desativado por padrão na API.
+
+    Uso:
+        with LoadProfiler() as profiler:
+            model = joblib.load(path)
+        profiler.report()
+    """
+
+    def __init__(self, top=5):
+        self.top = top
+        self.retained = None
+        self.peak = None
+        self.top_allocations = []
+
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+        self._traced_before = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        if self._started:
+            tracemalloc.stop()
+        self.retained = current - self._traced_before
+        self.peak = peak - self._traced_before
+
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(ignore).compare_to(self._before.filter_traces(ignore), 'filename')
+        self.top_allocations = [
+            {'file': stat.traceback[0].filename, 'bytes': stat.size_diff}
+            for stat in stats[:self.top] if stat.size_diff > 0
+        ]
+        self._before = None
+
+    def report(self):
+        """Resumo da medição (bytes)"""
+        return {
+            'retained': self.retained,
+            'peak': self.peak,
+            'top_allocations': self.top_allocations,
+        }
@@ -0,0 +1,178 @@
+"""
+Validação dos corpos de requisição da API, compartilhada entre o app Flask
+e o app assíncrono
+"""
+from backend.config.settings import ERROR_MESSAGES, MAX_BATCH_SIZE, INCREMENTAL_MAX_EDITS
+from backend.utils.text_preprocessor import validate_comment
+
+
+def validate_prediction_payload(data):
+    """
+    Valida o corpo de uma requisição de predição única.
+
+    Args:
+        data: JSON decodificado da requisição
+
+    Returns:
+        tuple: (comment, None) se válido ou (None, (corpo_do_erro, status_http))
+    """
+    if not data or not isinstance(data, dict):
+        return None, ({
+            'error': 'Dados inválidos',
+            'message': ERROR_MESSAGES['INVALID_DATA']
+        }, 400)
+
+    if 'comment' not in data:
+        return None, ({
+            'error': 'Campo obrigatório ausente',
+            'message': ERROR_MESSAGES['MISSING_COMMENT']
+        }, 400)
+
+    comment = data['comment']
+
+    is_valid, error_msg = validate_comment(comment)
+    if not is_valid:
+        return None, ({
+            'error': 'Comentário inválido',
+            'message': error_msg
+        }, 400)
+
+    return comment, None
+
+
+def validate_batch_payload(data):
+    """
+    Valida o corpo de uma requisição de predição em lote.
+
+    Args:
+        data: JSON decodificado da requisição
+
+    Returns:
+        tuple: (comments, None) se válido ou (None, (corpo_do_erro, status_http))
+    """
+    if not data or not isinstance(data, dict):
+        return None, ({
+            'error': 'Dados inválidos',
+            'message': ERROR_MESSAGES['INVALID_DATA']
+        }, 400)
+
+    if 'comments' not in data:
+        return None, ({
+            'error': 'Campo obrigatório ausente',
+            'message': ERROR_MESSAGES['MISSING_COMMENTS']
+        }, 400)
+
+    comments = data['comments']
+
+    if not isinstance(comments, list):
+        return None, ({
+            'error': 'Formato inválido',
+            'message': ERROR_MESSAGES['INVALID_FORMAT']
+        }, 400)
+
+    if not comments:
+        return None, ({
+            'error': 'Formato inválido',
+            'message': ERROR_MESSAGES['EMPTY_COMMENTS']
+        }, 400)
+
+    if len(comments) > MAX_BATCH_SIZE:
+        return None, ({
+            'error': 'Muitos comentários',
+            'message': ERROR_MESSAGES['TOO_MANY_COMMENTS']
+        }, 400)
+
+    for index, comment in enumerate(comments):
+        is_valid, error_msg = validate_comment(comment)
+        if not is_valid:
+            return None, ({
+                'error': 'Comentário inválido',
+                'message': error_msg,
+                'index': index
+            }, 400)
+
+    return comments, None
+
+
+def validate_echo(data):
+    """
+    Valida o campo opcional "echo" de um lote (padrão true).
+
+    Args:
+        data: JSON decodificado da requisição (já validado como dict)
+
+    Returns:
+        tuple: (echo, None) se válido ou (None, (corpo_do_erro, status_http))
+    """
+    echo = data.get('echo', True)
+    if not isinstance(echo, bool):
+        return None, ({
+            'error': 'Formato inválido',
+            'message': ERROR_MESSAGES['INVALID_ECHO']
+        }, 400)
+    return echo, None
+
+
+def strip_echo(results):
+    """Remove comment e processed_comment dos resultados (echo=false)"""
+    for item in results:
+        item.pop('comment', None)
+        item.pop('processed_comment', None)
+    return results
+
+
+def _is_int(value):
+    """Inteiro JSON (bool não conta)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_incremental_payload(data):
+    """
+    Valida o corpo de uma requisição de predição incremental.
+
+    Aceita {"text", "session_id"?} (abre ou ressincroniza a sessão) ou
+    {"session_id", "revision", "edits"} (aplica edições).
+
+    Args:
+        data: JSON decodificado da requisição
+
+    Returns:
+        tuple: (dict com session_id, revision, text e edits, None) se válido
+        ou (None, (corpo_do_erro, status_http))
+    """
+    if not data or not isinstance(data, dict):
+        return None, ({
+            'error': 'Dados inválidos',
+            'message': ERROR_MESSAGES['INVALID_DATA']
+        }, 400)
+
+    session_id = data.get('session_id')
+    text = data.get('text')
+    edits = data.get('edits')
+    revision = data.get('revision')
+
+    if session_id is not None and not isinstance(session_id, str):
+        session_id = None
+    if text is not None and not isinstance(text, str):
+        text = None
+
+    if text is None and (session_id is None or edits is None or not _is_int(revision)):
+        return None, ({
+            'error': 'Campo obrigatório ausente',
+            'message': ERROR_MESSAGES['MISSING_SESSION_INPUT']
+        }, 400)
+
+    if text is None:
+        valid = isinstance(edits, list) and len(edits) <= INCREMENTAL_MAX_EDITS and all(
+            isinstance(edit, dict) and _is_int(edit.get('start')) and _is_int(edit.get('end'))
+            and isinstance(edit.get('text', ''), str)
+            for edit in edits
+        )
+        if not valid:
+            return None, ({
+                'error': 'Formato inválido',
+                'message': ERROR_MESSAGES['INVALID_EDITS']
+            }, 400)
+        edits = [{'start': edit['start'], 'end': edit['end'], 'text': edit.get('text', '')} for edit in edits]
+
+    return {'session_id': session_id, 'revision': revision, 'text': text, 'edits': edits}, None
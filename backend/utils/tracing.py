@@ -0,0 +1,222 @@
+"""
+Rastreamento leve das requisições: duração de cada etapa (span)
+
+O trace da requisição atual fica em uma ContextVar, válida tanto nas threads
+do Flask quanto nas tarefas do asyncio. Sem trace ativo, span() devolve um
+gerenciador de contexto vazio compartilhado, e o custo se resume a uma
+leitura da ContextVar. As durações (relógio monotônico) são devolvidas no
+cabeçalho Server-Timing e, opcionalmente, exportadas para um coletor
+OpenTelemetry (OTLP/HTTP com JSON).
+"""
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import nullcontext
+from backend.config.settings import (
+    TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME, TRACING_EXPORT_QUEUE, TRACING_EXPORT_TIMEOUT, logger
+)
+
+_current = contextvars.ContextVar('trace', default=None)
+_NO_SPAN = nullcontext()
+
+# Tipos de span do OTLP
+_SPAN_KIND_INTERNAL = 1
+_SPAN_KIND_SERVER = 2
+
+
+class _Stage:
+    """Mede uma etapa e a registra no trace ao sair do bloco"""
+
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.spans.append((self.name, self.start, time.perf_counter_ns()))
+
+
+class Trace:
+    """
+    Etapas de uma requisição.
+
+    Attributes:
+        name: Nome do trace (ex.: "POST /api/predict")
+        trace_id: Identificador (hex, 16 bytes)
+        spans: Lista de (nome, início, fim) em nanossegundos do relógio monotônico
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.start_unix_ns = time.time_ns()
+        self.start = time.perf_counter_ns()
+        self.end = None
+        self.spans = []
+
+    def span(self, name):
+        """Gerenciador de contexto que mede a etapa name"""
+        return _Stage(self, name)
+
+    def durations(self):
+        """Duração total (ms) de cada etapa, na ordem da primeira ocorrência"""
+        totals = {}
+        for name, start, end in self.spans:
+            totals[name] = totals.get(name, 0) + end - start
+        return {name: total / 1e6 for name, total in totals.items()}
+
+    def server_timing(self):
+        """Valor do cabeçalho Server-Timing (etapas e total)"""
+        parts = [f'{name};dur={duration:.3f}' for name, duration in self.durations().items()]
+        if self.end is not None:
+            parts.append(f'total;dur={(self.end - self.start) / 1e6:.3f}')
+        return ', '.join(parts)
+
+    def to_otlp(self):
+        """Spans no formato OTLP/JSON (o span raiz é a requisição)"""
+        def unix_ns(monotonic_ns):
+            return str(self.start_unix_ns + monotonic_ns - self.start)
+
+        root_id = os.urandom(8).hex()
+        spans = [{
+            'traceId': self.trace_id,
+            'spanId': root_id,
+            'name': self.name,
+            'kind': _SPAN_KIND_SERVER,
+            'startTimeUnixNano': unix_ns(self.start),
+            'endTimeUnixNano': unix_ns(self.end if self.end is not None else time.perf_counter_ns()),
+        }]
+        for name, start, end in self.spans:
+            spans.append({
+                'traceId': self.trace_id,
+                'spanId': os.urandom(8).hex(),
+                'parentSpanId': root_id,
+                'name': name,
+                'kind': _SPAN_KIND_INTERNAL,
+                'startTimeUnixNano': unix_ns(start),
+                'endTimeUnixNano': unix_ns(end),
+            })
+        return spans
+
+
+def span(name):
+    """
+    Mede a etapa name no trace atual (sem trace ativo, não faz nada).
+
+    Uso:
+        with span('preprocess'):
+            ...
+    """
+    trace = _current.get()
+    return _NO_SPAN if trace is None else _Stage(trace, name)
+
+
+def current_trace():
+    """Trace da requisição atual (ou None)"""
+    return _current.get()
+
+
+def start_trace(name):
+    """
+    Inicia o trace de uma requisição no contexto atual.
+
+    Returns:
+        contextvars.Token: Passado para end_trace
+    """
+    return _current.set(Trace(name))
+
+
+def end_trace(token):
+    """
+    Finaliza o trace iniciado por start_trace e o envia ao exportador.
+
+    Returns:
+        Trace: Trace finalizado
+    """
+    trace = _current.get()
+    _current.reset(token)
+    trace.end = time.perf_counter_ns()
+    if exporter is not None:
+        exporter.submit(trace)
+    return trace
+
+
+class OtlpExporter:
+    """
+    Envia os traces a um coletor OTLP/HTTP (JSON) em segundo plano.
+
+    Os traces são agrupados por envio; com a fila cheia, são descartados e
+    contados, sem atrasar as requisições.
+    """
+
+    def __init__(self, endpoint, service_name=TRACING_SERVICE_NAME, max_queue=TRACING_EXPORT_QUEUE,
+                 batch_size=64, timeout=TRACING_EXPORT_TIMEOUT):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'exported': 0, 'dropped': 0, 'failed': 0}
+
+    def submit(self, trace):
+        """Agenda o envio de um trace"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def _run(self):
+        """Agrupa os traces pendentes e os envia ao coletor"""
+        while True:
+            traces = [self._queue.get()]
+            while len(traces) < self.batch_size:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.export(traces)
+                self.stats['exported'] += len(traces)
+            except Exception as e:
+                self.stats['failed'] += len(traces)
+                logger.warning(f"Falha ao exportar traces para {self.endpoint}: {e}")
+
+    def export(self, traces):
+        """Envia uma lista de traces ao coletor (síncrono)"""
+        body = json.dumps({'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': self.service_name}}
+            ]},
+            'scopeSpans': [{
+                'scope': {'name': 'backend.utils.tracing'},
+                'spans': [item for trace in traces for item in trace.to_otlp()],
+            }],
+        }]}).encode()
+        request = urllib.request.Request(self.endpoint, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# Exportador global (None: apenas Server-Timing)
+exporter = OtlpExporter(TRACING_OTLP_ENDPOINT) if TRACING_OTLP_ENDPOINT else None
+
+
+def get_tracing_stats():
+    """Retorna os contadores do exportador"""
+    return dict(exporter.stats) if exporter is not None else {'exported': 0, 'dropped': 0, 'failed': 0}
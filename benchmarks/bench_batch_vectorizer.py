@@ -0,0 +1,75 @@
+"""
+Benchmark do BatchVectorizer contra o transform do pipeline em lotes grandes
+
+Mede comentários/s para cada tamanho de lote e o pico de memória alocada
+(tracemalloc) ao vetorizar vários lotes seguidos: com os buffers reutilizados
+o pico deve se manter estável entre as repetições.
+
+Uso:
+    python -m benchmarks.bench_batch_vectorizer [--sizes 1000 10000 50000] [--repeats N]
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+import joblib
+from backend.config.settings import MODEL_PATH
+from backend.services.batch_vectorizer import BatchVectorizer
+from backend.services.linear_scorer import install_fast_analyzer
+from backend.utils.text_preprocessor import preprocess_text
+from benchmarks.corpus import load_comments
+
+
+def best_of(function, repeats):
+    """Menor tempo (s) entre várias execuções"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(function, repeats):
+    """Pico de memória alocada (KB) em cada uma de várias execuções seguidas"""
+    peaks = []
+    tracemalloc.start()
+    for _ in range(repeats):
+        tracemalloc.reset_peak()
+        function()
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+    tracemalloc.stop()
+    return peaks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do vetorizador de lotes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(MODEL_PATH)
+    install_fast_analyzer(model)
+    vectorizer = model.steps[0][1]
+    batch_vectorizer = BatchVectorizer.from_model(model)
+
+    print(f"{'lote':>8}{'pipeline (c/s)':>16}{'lote (c/s)':>14}{'ganho':>8}{'idênticas':>11}")
+    for size in args.sizes:
+        texts = [preprocess_text(comment) for comment in load_comments(size)]
+
+        pipeline_time = best_of(lambda: vectorizer.transform(texts), args.repeats)
+        batch_time = best_of(lambda: batch_vectorizer.transform(texts), args.repeats)
+        difference = abs(vectorizer.transform(texts) - batch_vectorizer.transform(texts)).max()
+
+        print(f"{len(texts):>8}{len(texts) / pipeline_time:>16.0f}{len(texts) / batch_time:>14.0f}"
+              f"{pipeline_time / batch_time:>7.2f}x{str(difference < 1e-12):>11}")
+
+    texts = [preprocess_text(comment) for comment in load_comments(max(args.sizes))]
+    print(f"\nPico de memória por lote de {len(texts)} comentários (KB):")
+    print("pipeline:", ", ".join(f"{peak:.0f}" for peak in peak_memory(lambda: vectorizer.transform(texts), 5)))
+    print("lote:    ", ", ".join(f"{peak:.0f}" for peak in peak_memory(lambda: batch_vectorizer.transform(texts), 5)))
+
+
+if __name__ == "__main__":
+    main()
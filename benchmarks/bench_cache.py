@@ -0,0 +1,89 @@
+"""
+Benchmark do cache de resultados: latência de acertos (LRU local e SQLite
+compartilhado) contra uma predição sem cache
+
+Uso:
+    python -m benchmarks.bench_cache [--requests N] [--batch-size N]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import warnings
+import numpy as np
+from backend.config.settings import logger
+from backend.services.cache_service import ResultCache
+from backend.services.model_service import ModelService
+from benchmarks.corpus import load_comments
+
+
+def latencies(function, items):
+    """Latência (µs) de function para cada item"""
+    result = []
+    for item in items:
+        start = time.perf_counter()
+        function(item)
+        result.append(1e6 * (time.perf_counter() - start))
+    return np.array(result)
+
+
+def report(name, values):
+    """Imprime mediana e p99 de uma série de latências"""
+    print(f"{name:<30}{np.median(values):>12.1f}{np.percentile(values, 99):>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de resultados")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    version = service._state.version
+    comments = load_comments(args.requests)
+    batches = [comments[i:i + args.batch_size] for i in range(0, len(comments), args.batch_size)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared_path = os.path.join(directory, 'results.sqlite')
+
+        print(f"{'cenário':<30}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+
+        # Sem cache: o estado sem versão desativa os dois níveis
+        service._replace_state(version=None)
+        report("predição (sem cache)", latencies(service.predict_single, comments))
+        batch_fresh = latencies(service.predict_batch, batches)
+
+        # Popular os dois níveis e medir acertos no LRU local
+        service._replace_state(version=version)
+        service.cache = ResultCache(shared_path=shared_path)
+        for batch in batches:
+            service.predict_batch(batch)
+        report("acerto LRU local", latencies(service.predict_single, comments))
+        batch_local = latencies(service.predict_batch, batches)
+
+        # Acertos no SQLite: outro worker, com LRU vazio a cada consulta
+        service.cache = ResultCache(shared_path=shared_path)
+
+        def shared_hit(item):
+            service.cache.clear()
+            return service.predict_single(item)
+
+        def shared_hit_batch(batch):
+            service.cache.clear()
+            return service.predict_batch(batch)
+
+        report("acerto SQLite compartilhado", latencies(shared_hit, comments))
+        batch_shared = latencies(shared_hit_batch, batches)
+
+        print(f"\nLotes de {args.batch_size} comentários:")
+        report("lote (sem cache)", batch_fresh)
+        report("lote (LRU local)", batch_local)
+        report("lote (SQLite, 1 consulta)", batch_shared)
+
+
+if __name__ == "__main__":
+    main()
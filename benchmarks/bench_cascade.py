@@ -0,0 +1,96 @@
+"""
+Benchmark da cascata com triagem por léxico
+
+Para o léxico completo e para léxicos reduzidos aos N tokens de maior peso,
+mede no corpus (hate.csv, ou comentários sintéticos na sua ausência):
+- a fração de comentários decididos pela triagem;
+- o erro da cascata em relação ao modelo completo (comentários de ódio
+  decididos como "não ódio");
+- a vazão de predict_single e predict_batch com e sem a cascata.
+
+O cache de resultados fica desativado para que toda predição sem a cascata
+passe pelo modelo. Como a máquina pode ser ruidosa, cada cenário é repetido
+e a melhor rodada é reportada.
+
+Uso:
+    python -m benchmarks.bench_cascade [--comments N] [--batch-size N] [--repeats N] [--sizes 25,100,200]
+"""
+import argparse
+import logging
+import os
+import time
+import warnings
+from backend.config.settings import HATE_SPEECH_CLASS, logger
+from backend.services.lexicon_cascade import LexiconCascade
+from backend.services.model_service import ModelService
+from backend.utils.text_preprocessor import preprocess_text
+from benchmarks.corpus import DATASET_PATH, load_comments
+
+
+def throughput(service, comments, batch_size, repeats):
+    """Comentários/s de predict_single e de predict_batch (melhor rodada)"""
+    single, batch = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for comment in comments:
+            service.predict_single(comment)
+        single.append(len(comments) / (time.perf_counter() - start))
+
+        start = time.perf_counter()
+        for i in range(0, len(comments), batch_size):
+            service.predict_batch(comments[i:i + batch_size])
+        batch.append(len(comments) / (time.perf_counter() - start))
+    return max(single), max(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da cascata com triagem por léxico")
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--sizes", default="25,50,100,200", help="Tamanhos de léxico reduzido")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    service._replace_state(version=None)
+    scorer = service.scorer
+
+    comments = load_comments(args.comments)
+    source = DATASET_PATH if os.path.exists(DATASET_PATH) else "corpus sintético"
+    processed = [preprocess_text(comment) for comment in comments]
+    predictions = scorer.predict_classes(scorer.decision_scores(scorer.transform(processed)))
+    hate_total = int((predictions == HATE_SPEECH_CLASS).sum())
+
+    full = LexiconCascade.from_scorer(scorer)
+    if full is None:
+        print("O intercepto do modelo não garante a margem: cascata inaplicável")
+        return
+    cascades = [('completo', full)] + [
+        (str(size), LexiconCascade.from_scorer(scorer, size)) for size in map(int, args.sizes.split(','))
+    ]
+
+    print(f"Corpus: {source} ({len(comments)} comentários, {hate_total} de ódio pelo modelo completo)")
+    print(f"Margem garantida (|intercepto|): {full.margin:.4f}\n")
+
+    single_base, batch_base = throughput(service, comments, args.batch_size, args.repeats)
+    print(f"{'léxico':<10}{'tokens':>8}{'decididos':>11}{'erro':>9}{'ódio perdido':>14}"
+          f"{'único/s':>10}{'ganho':>8}{'lote/s':>10}{'ganho':>8}")
+    print(f"{'sem':<10}{'-':>8}{'-':>11}{'-':>9}{'-':>14}{single_base:>10.0f}{'':>8}{batch_base:>10.0f}")
+
+    for name, cascade in cascades:
+        decided = cascade.screen_many(processed)
+        errors = sum(1 for benign, prediction in zip(decided, predictions)
+                     if benign and prediction == HATE_SPEECH_CLASS)
+        service.cascade = cascade
+        single, batch = throughput(service, comments, args.batch_size, args.repeats)
+        service.cascade = None
+        print(f"{name:<10}{len(cascade.lexicon):>8}{sum(decided) / len(comments):>10.1%}"
+              f"{errors / len(comments):>9.2%}{errors / max(hate_total, 1):>14.1%}"
+              f"{single:>10.0f}{single / single_base:>7.2f}x{batch:>10.0f}{batch / batch_base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
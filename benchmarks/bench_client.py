@@ -0,0 +1,112 @@
+"""
+Benchmark do cliente Python contra uma requisição HTTP nova por comentário
+
+Sobe o app Flask (servidor de desenvolvimento, que fecha cada conexão) e o
+app assíncrono (aiohttp, com keep-alive) em threads locais e mede o tempo
+por comentário de:
+  - urllib: uma requisição (e uma conexão) por comentário
+  - classify sequencial: uma requisição por comentário em conexão do pool
+  - classify concorrente: N threads, chamadas agrupadas em lotes
+  - classify_many: lotes de até 100 comentários
+
+Uso:
+    python -m benchmarks.bench_client [--comments N] [--threads N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
+from app import app
+from backend.config.settings import logger
+from backend.services.model_service import model_service
+from benchmarks.corpus import load_comments
+from hate_speech_client import HateSpeechClient
+
+
+def start_flask():
+    """Servidor Flask local em uma thread"""
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def start_async():
+    """App assíncrono local em uma thread (None se aiohttp não estiver instalado)"""
+    try:
+        from aiohttp import web
+        from async_app import create_app
+    except ImportError:
+        return None
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_app(model_service), access_log=None)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', 0).start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def raw_request(url, comment):
+    """Uma requisição com uma conexão nova"""
+    request = urllib.request.Request(
+        f"{url}/api/predict", data=json.dumps({'comment': comment}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def per_comment(function, comments):
+    """Tempo médio por comentário (µs)"""
+    start = time.perf_counter()
+    function(comments)
+    return 1e6 * (time.perf_counter() - start) / len(comments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cliente Python")
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    model_service.load_model()
+    model_service.cache.max_size = 0  # medir requisições, não acertos de cache
+    comments = load_comments(args.comments)
+
+    servers = [('flask', start_flask()), ('aiohttp', start_async())]
+    print(f"Comentários: {len(comments)} | threads: {args.threads}")
+    print(f"{'servidor':<10}{'modo':<26}{'µs/comentário':>15}{'requisições':>13}{'conexões':>10}")
+
+    for name, url in servers:
+        if url is None:
+            print(f"{name:<10}(aiohttp não instalado)")
+            continue
+
+        def report(mode, function, client=None):
+            value = per_comment(function, comments)
+            stats = client.get_stats() if client else {'requests': len(comments), 'connections_opened': len(comments)}
+            print(f"{name:<10}{mode:<26}{value:>15.1f}{stats['requests']:>13}{stats['connections_opened']:>10}")
+
+        report("urllib (1 por comentário)", lambda items: [raw_request(url, c) for c in items])
+
+        with HateSpeechClient(url) as client:
+            report("classify sequencial", lambda items: [client.classify(c) for c in items], client)
+
+        with HateSpeechClient(url) as client, ThreadPoolExecutor(max_workers=args.threads) as executor:
+            report("classify concorrente", lambda items: list(executor.map(client.classify, items)), client)
+
+        with HateSpeechClient(url) as client:
+            report("classify_many", client.classify_many, client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark da compressão dos corpos de /api/predict/batch: bytes economizados
+vs tempo de CPU para cada codificação e nível
+
+Usa lotes de comentários do corpus (respostas reais do ModelService, com e
+sem echo) e mede, por lote, o tamanho comprimido e o tempo de compressão e
+descompressão.
+
+Uso:
+    python -m benchmarks.bench_compression [--batches N] [--batch-size N]
+"""
+import argparse
+import json
+import logging
+import time
+import warnings
+from backend.config.settings import logger
+from backend.services.model_service import ModelService
+from backend.utils.compression import compress, decompress, zstandard
+from benchmarks.corpus import load_comments
+
+LEVELS = {'gzip': [1, 6, 9], 'zstd': [1, 3, 10, 19]}
+
+
+def bodies(service, batches, batch_size):
+    """Corpos JSON de requisição e resposta (com e sem echo) de cada lote"""
+    comments = load_comments(batches * batch_size)
+    result = {'requisição': [], 'resposta': [], 'resposta (echo=false)': []}
+    for start in range(0, len(comments), batch_size):
+        batch = comments[start:start + batch_size]
+        results = service.predict_batch(batch)['results']
+        result['requisição'].append(json.dumps({'comments': batch}).encode())
+        result['resposta'].append(json.dumps({'results': results, 'total': len(results)}).encode())
+        for item in results:
+            del item['comment'], item['processed_comment']
+        result['resposta (echo=false)'].append(json.dumps({'results': results, 'total': len(results)}).encode())
+    return result
+
+
+def measure(payloads, encoding, level):
+    """Razão de compressão e tempos médios (µs) por corpo"""
+    original = sum(len(p) for p in payloads)
+    start = time.perf_counter()
+    compressed = [compress(p, encoding, level) for p in payloads]
+    compress_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for c in compressed:
+        decompress(c, encoding)
+    decompress_time = time.perf_counter() - start
+    size = sum(len(c) for c in compressed)
+    return size / original, 1e6 * compress_time / len(payloads), 1e6 * decompress_time / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da compressão dos corpos")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+
+    for name, payloads in bodies(service, args.batches, args.batch_size).items():
+        average = sum(len(p) for p in payloads) / len(payloads)
+        print(f"\n{name}: {len(payloads)} corpos, {average / 1024:.1f} KB em média")
+        print(f"{'codificação':<14}{'razão':>8}{'KB/corpo':>10}{'comprimir (µs)':>16}{'descomprimir (µs)':>19}")
+        for encoding, levels in LEVELS.items():
+            if encoding == 'zstd' and zstandard is None:
+                print("zstd          (pacote zstandard não instalado)")
+                continue
+            for level in levels:
+                ratio, compress_us, decompress_us = measure(payloads, encoding, level)
+                print(f"{f'{encoding}-{level}':<14}{ratio:>8.3f}{ratio * average / 1024:>10.1f}"
+                      f"{compress_us:>16.0f}{decompress_us:>19.0f}")
+
+
+if __name__ == "__main__":
+    main()
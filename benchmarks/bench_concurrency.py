@@ -0,0 +1,107 @@
+"""
+Benchmark de escalabilidade de /api/predict com threads vs processos
+
+Compara a vazão (requisições/s) do endpoint de predição quando servido por
+N threads em um único processo (GIL compartilhado, como Flask threaded=True
+ou workers gthread) e por N processos independentes (como workers sync do
+gunicorn), para N de 1 até o número de núcleos.
+
+Uso:
+    python -m benchmarks.bench_concurrency [--requests N] [--max-workers W]
+"""
+import argparse
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+COMMENTS = [
+    "I really enjoyed this video, thanks for sharing",
+    "you people are disgusting and should leave this country",
+    "what a stupid idea, only idiots would agree with this",
+    "great explanation, very clear and helpful",
+]
+
+_client = None
+
+
+def _init_worker():
+    """Carrega o modelo e cria um cliente de teste no worker"""
+    global _client
+    warnings.filterwarnings('ignore')
+    from backend.config.settings import logger
+    logger.setLevel(logging.WARNING)
+    from app import app
+    from backend.services.model_service import model_service
+    if not model_service.is_loaded():
+        model_service.load_model()
+    _client = app.test_client()
+
+
+def _run_requests(count):
+    """Executa requisições sequenciais de predição no worker atual"""
+    client = _client
+    for i in range(count):
+        response = client.post('/api/predict', json={'comment': COMMENTS[i % len(COMMENTS)]})
+        assert response.status_code == 200
+    return count
+
+
+def _run_thread_requests(count):
+    """Executa requisições em uma thread com seu próprio cliente de teste"""
+    from app import app
+    client = app.test_client()
+    for i in range(count):
+        response = client.post('/api/predict', json={'comment': COMMENTS[i % len(COMMENTS)]})
+        assert response.status_code == 200
+    return count
+
+
+def bench_threads(workers, requests):
+    """Mede a vazão com N threads em um único processo"""
+    per_worker = requests // workers
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        total = sum(executor.map(_run_thread_requests, [per_worker] * workers))
+        elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def bench_processes(workers, requests):
+    """Mede a vazão com N processos independentes"""
+    per_worker = requests // workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # Aquecer todos os processos antes de medir
+        list(executor.map(_run_requests, [1] * workers))
+        start = time.perf_counter()
+        total = sum(executor.map(_run_requests, [per_worker] * workers))
+        elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark threads vs processos")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    _init_worker()
+    _run_requests(100)  # aquecimento
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    print(f"{'workers':>8}{'threads (req/s)':>18}{'processos (req/s)':>20}")
+    for workers in worker_counts:
+        threads = bench_threads(workers, args.requests)
+        processes = bench_processes(workers, args.requests)
+        print(f"{workers:>8}{threads:>18.1f}{processes:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark da deduplicação em lotes com ondas de spam
+
+Monta lotes em que uma fração dos comentários são cópias de poucos textos de
+spam (variações de caixa, pontuação, dígitos e emojis, e opcionalmente uma
+palavra acrescentada) misturadas a comentários do corpus, e compara
+predict_batch sem deduplicação, com deduplicação exata e com quase duplicatas.
+
+Uso:
+    python -m benchmarks.bench_dedup [--batch-size N] [--spam-ratio R] [--batches N]
+"""
+import argparse
+import logging
+import random
+import time
+import warnings
+from backend.config.settings import logger
+from backend.services.model_service import ModelService
+from benchmarks.corpus import load_comments
+
+SPAM_VARIATIONS = [
+    lambda text, rng: text,
+    lambda text, rng: text.upper(),
+    lambda text, rng: text + '!!!',
+    lambda text, rng: text + f' {rng.randint(1, 999)}',
+    lambda text, rng: text + ' 🔥',
+    lambda text, rng: text.replace(' ', '  '),
+]
+NEAR_WORDS = ['now', 'today', 'free', 'please']
+
+
+def spam_batches(batches, batch_size, spam_ratio, near_ratio, seed=7):
+    """Gera lotes com ondas de spam sobre comentários do corpus"""
+    rng = random.Random(seed)
+    corpus = load_comments(batches * batch_size + 20)
+    templates = [' '.join(text.split()[:15]) for text in corpus[-20:] if len(text.split()) >= 8][:5]
+
+    result = []
+    for batch in range(batches):
+        comments = corpus[batch * batch_size:(batch + 1) * batch_size]
+        for index in range(batch_size):
+            if rng.random() < spam_ratio:
+                text = rng.choice(SPAM_VARIATIONS)(rng.choice(templates), rng)
+                if rng.random() < near_ratio:
+                    text += ' ' + rng.choice(NEAR_WORDS)
+                comments[index] = text
+        result.append(comments)
+    return result
+
+
+def measure(service, batches):
+    """Tempo total (ms), itens agrupados e predições do lote"""
+    start = time.perf_counter()
+    results = [service.predict_batch(comments) for comments in batches]
+    elapsed = 1000 * (time.perf_counter() - start)
+    predictions = [item['is_hate_speech'] for result in results for item in result['results']]
+    return elapsed, sum(result['collapsed'] for result in results), predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da deduplicação em lotes")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--spam-ratio", type=float, default=0.7)
+    parser.add_argument("--near-ratio", type=float, default=0.3)
+    parser.add_argument("--batches", type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    batches = spam_batches(args.batches, args.batch_size, args.spam_ratio, args.near_ratio)
+    measure(service, batches[:10])  # aquecimento
+
+    modes = [('sem deduplicação', False, False), ('exata', True, False), ('exata + quase', True, True)]
+    total = args.batches * args.batch_size
+    baseline = None
+
+    print(f"Lotes: {args.batches} x {args.batch_size} | spam: {args.spam_ratio:.0%} | "
+          f"com palavra extra: {args.near_ratio:.0%}")
+    print(f"{'modo':<18}{'total (ms)':>12}{'agrupados':>12}{'ganho':>8}{'mesma predição':>16}")
+    for name, deduplicate, near_duplicates in modes:
+        service.deduplicate, service.near_duplicates = deduplicate, near_duplicates
+        elapsed, collapsed, predictions = measure(service, batches)
+        if baseline is None:
+            baseline = (elapsed, predictions)
+        agreement = sum(a == b for a, b in zip(predictions, baseline[1])) / total
+        print(f"{name:<18}{elapsed:>12.1f}{collapsed / total:>12.1%}{baseline[0] / elapsed:>7.2f}x{agreement:>16.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark dos sketches de drift
+
+Mede, com o modelo servido e o cache de resultados desativado:
+- a latência de predict_single e a vazão de predict_batch sem e com o
+  registro nos sketches de drift;
+- a memória de um sketch e de DRIFT_MAX_WINDOWS janelas (não depende do
+  volume de predições);
+- o custo de combinar os sketches de N workers e de gerar o relatório.
+
+Como a máquina pode ser ruidosa, cada cenário é repetido e a melhor rodada é
+reportada.
+
+Uso:
+    python -m benchmarks.bench_drift [--comments N] [--batch-size N] [--repeats N] [--workers N]
+"""
+import argparse
+import logging
+import time
+import warnings
+from backend.config.settings import DRIFT_MAX_WINDOWS, logger
+from backend.services.drift_service import DriftMonitor, DriftSketch
+from backend.services.model_service import ModelService
+from backend.utils.memory_profile import deep_sizeof
+from benchmarks.corpus import load_comments
+
+
+def measure(service, comments, batch_size, repeats):
+    """Melhor latência média de predict_single (ms) e melhor vazão de predict_batch (comentários/s)"""
+    single, batch = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for comment in comments:
+            service.predict_single(comment)
+        single.append(1000 * (time.perf_counter() - start) / len(comments))
+
+        start = time.perf_counter()
+        for i in range(0, len(comments), batch_size):
+            service.predict_batch(comments[i:i + batch_size])
+        batch.append(len(comments) / (time.perf_counter() - start))
+    return min(single), max(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos sketches de drift")
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=16, help="Workers combinados no relatório")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    service._replace_state(version=None)
+    comments = load_comments(args.comments)
+
+    print(f"{args.comments} comentários, lotes de {args.batch_size} (melhor de {args.repeats} rodadas)")
+    print(f"  {'drift':<12}{'único (ms)':>12}{'lote (com./s)':>15}")
+    results = {}
+    for name, enabled in (('desativado', False), ('ativado', True)):
+        service.drift = DriftMonitor(enabled=enabled, shared_path='')
+        results[name] = measure(service, comments, args.batch_size, args.repeats)
+        print(f"  {name:<12}{results[name][0]:>12.4f}{results[name][1]:>15.0f}")
+    overhead_single = results['ativado'][0] - results['desativado'][0]
+    overhead_batch = 1 / results['ativado'][1] - 1 / results['desativado'][1]
+    print(f"  custo por comentário: único {1000 * overhead_single:.1f} µs, lote {1e6 * overhead_batch:.1f} µs")
+
+    sketch = service.drift.snapshot()['windows'][-1]['sketch']
+    window = DriftSketch.from_dict(sketch)
+    print(f"\nMemória de uma janela: {deep_sizeof(window) / 1024:.1f} KB "
+          f"({window.count} predições); {DRIFT_MAX_WINDOWS} janelas: "
+          f"{DRIFT_MAX_WINDOWS * deep_sizeof(window) / 1024:.1f} KB")
+
+    windows = [DriftSketch.from_dict(dict(sketch, start=start)) for start in range(DRIFT_MAX_WINDOWS)]
+    start = time.perf_counter()
+    for _ in range(args.workers):
+        for index, part in enumerate(windows):
+            windows[index].copy().merge(part)
+    merge_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    service.drift.snapshot()
+    snapshot_ms = 1000 * (time.perf_counter() - start)
+    print(f"Combinar {args.workers} workers × {DRIFT_MAX_WINDOWS} janelas: {merge_ms:.1f} ms; "
+          f"relatório local: {snapshot_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
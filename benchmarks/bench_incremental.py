@@ -0,0 +1,120 @@
+"""
+Benchmark da predição incremental
+
+Para textos de vários tamanhos (comentários do corpus concatenados), simula
+a digitação de palavras no meio do texto e compara, por tecla e por chamada
+com debounce (uma palavra inteira de uma vez):
+- o custo de IncrementalService.update (apenas as palavras tocadas);
+- o custo de predict_single no texto inteiro, o que o frontend faria sem
+  sessões.
+
+Usa o modelo servido e o cache de resultados desativado. Como a máquina pode
+ser ruidosa, cada cenário é repetido e a melhor rodada é reportada.
+
+Uso:
+    python -m benchmarks.bench_incremental [--lengths 200,1000,5000] [--keystrokes N] [--repeats N]
+"""
+import argparse
+import logging
+import random
+import time
+import warnings
+from backend.config.settings import INCREMENTAL_MAX_CHARS, logger
+from backend.services.incremental_service import IncrementalService
+from backend.services.model_service import ModelService
+from benchmarks.corpus import load_comments
+
+
+def build_text(comments, length):
+    """Concatena comentários até o tamanho pedido (em caracteres)"""
+    parts, size = [], 0
+    for comment in comments:
+        if size >= length:
+            break
+        parts.append(comment)
+        size += len(comment) + 1
+    return ' '.join(parts)[:length]
+
+
+def typing_edits(text, words, keystrokes, per_call, seed):
+    """
+    Edições de uma digitação: palavras inseridas em posições aleatórias entre
+    palavras, agrupadas em chamadas de per_call teclas.
+
+    Returns:
+        list: [(start, end, inserted, texto resultante)]
+    """
+    rng = random.Random(seed)
+    edits, typed = [], 0
+    while typed < keystrokes:
+        spaces = [i for i, char in enumerate(text) if char == ' '] or [len(text)]
+        position = rng.choice(spaces)
+        word = ' ' + rng.choice(words)
+        for offset in range(0, len(word), per_call):
+            chunk = word[offset:offset + per_call]
+            start = position + offset
+            text = text[:start] + chunk + text[start:]
+            edits.append((start, start, chunk, text))
+        # Apagar a palavra de volta para o texto manter o tamanho
+        text = text[:position] + text[position + len(word):]
+        edits.append((position, position + len(word), '', text))
+        typed += len(word)
+    return edits
+
+
+def best_ms_per_call(run, calls, repeats):
+    """Melhor tempo médio (ms) por chamada entre as rodadas"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return 1000 * best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da predição incremental")
+    parser.add_argument("--lengths", default=f"100,500,1000,2000,{INCREMENTAL_MAX_CHARS}",
+                        help="Tamanhos do texto (caracteres)")
+    parser.add_argument("--keystrokes", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    service = ModelService()
+    service.load_model()
+    service._replace_state(version=None)
+    sessions = IncrementalService(service=service, max_chars=10 * INCREMENTAL_MAX_CHARS)
+
+    comments = load_comments(2000)
+    words = [word for comment in comments[:200] for word in comment.split()]
+
+    print(f"{args.keystrokes} teclas digitadas no meio do texto (melhor de {args.repeats} rodadas)")
+    print(f"  {'caracteres':>10}{'chamada':>10}{'incremental (ms)':>18}{'texto inteiro (ms)':>20}{'ganho':>8}")
+    for length in map(int, args.lengths.split(',')):
+        text = build_text(comments, length)
+        for label, per_call in (('tecla', 1), ('palavra', 100)):
+            edits = typing_edits(text, words, args.keystrokes, per_call, seed=length)
+            session_id = sessions.open(text)['session_id']
+            state = {'revision': sessions.update(session_id, 1, [])['revision']}
+
+            def incremental():
+                for start, end, inserted, _ in edits:
+                    result = sessions.update(session_id, state['revision'],
+                                             [{'start': start, 'end': end, 'text': inserted}])
+                    state['revision'] = result['revision']
+
+            def full():
+                for _, _, _, current in edits:
+                    service.predict_single(current)
+
+            incremental_ms = best_ms_per_call(incremental, len(edits), args.repeats)
+            full_ms = best_ms_per_call(full, len(edits), args.repeats)
+            sessions.close(session_id)
+            print(f"  {len(text):>10}{label:>10}{incremental_ms:>18.4f}{full_ms:>20.4f}"
+                  f"{full_ms / incremental_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark dos jobs em lote
+
+Mede a latência de /api/predict (cliente de teste do Flask, no processo
+principal) sem jobs e enquanto um job em lote roda no pool de processos,
+com o processo do job em prioridade normal e reduzida (JOBS_WORKER_NICE),
+além da vazão do job (comentários/s). O banco e os arquivos dos jobs ficam
+em um diretório temporário.
+
+Uso:
+    python -m benchmarks.bench_jobs [--job-comments N] [--requests N] [--nice 0,10]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import warnings
+from backend.config.settings import logger
+from backend.services.job_service import JobService, COMPLETED, FAILED
+from backend.services.model_service import model_service
+from benchmarks.corpus import load_comments
+
+
+def request_latencies(client, comments):
+    """Latências (µs) de /api/predict"""
+    latencies = []
+    for comment in comments:
+        start = time.perf_counter()
+        response = client.post('/api/predict', json={'comment': comment})
+        latencies.append(1e6 * (time.perf_counter() - start))
+        assert response.status_code == 200
+    return sorted(latencies)
+
+
+def percentiles(latencies):
+    """p50 e p99 de latências ordenadas"""
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def wait_running(jobs, job_id):
+    """Aguarda o job começar a processar a entrada (pool iniciado e modelo carregado)"""
+    while True:
+        job = jobs.get_job(job_id)
+        if job['processed'] > 0 or job['status'] in (COMPLETED, FAILED):
+            return job
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos jobs em lote")
+    parser.add_argument("--job-comments", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--nice", default="0,10", help="Prioridades do processo do job")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    model_service.load_model()
+    # Sem cache: toda requisição faz a predição completa
+    model_service._replace_state(version=None)
+
+    from app import app
+    client = app.test_client()
+    comments = load_comments(args.requests, seed=1)
+
+    workdir = tempfile.mkdtemp(prefix='bench_jobs_')
+    input_path = os.path.join(workdir, 'input.txt')
+    with open(input_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(load_comments(args.job_comments)) + '\n')
+
+    print(f"/api/predict ({args.requests} requisições) com um job de {args.job_comments} comentários, "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"  {'cenário':<22}{'p50 (µs)':>10}{'p99 (µs)':>10}{'job (com./s)':>14}")
+    request_latencies(client, comments[:200])
+    p50, p99 = percentiles(request_latencies(client, comments))
+    print(f"  {'sem job':<22}{p50:>10.0f}{p99:>10.0f}{'-':>14}")
+
+    for nice in map(int, args.nice.split(',')):
+        jobs = JobService(db_path=os.path.join(workdir, f'jobs-{nice}.sqlite'), jobs_dir=workdir,
+                          input_root=workdir, max_workers=1, nice=nice)
+        job_id = jobs.submit_path(input_path, 'text')['id']
+        wait_running(jobs, job_id)
+
+        latencies = request_latencies(client, comments)
+        job = jobs.get_job(job_id)
+        running = job['status'] not in (COMPLETED, FAILED)
+        jobs.shutdown(wait=True)
+        p50, p99 = percentiles(latencies)
+        rate = jobs.get_job(job_id)['comments_per_second']
+        note = '' if running else ' (job terminou antes das requisições; aumente --job-comments)'
+        print(f"  {f'job com nice={nice}':<22}{p50:>10.0f}{p99:>10.0f}{rate or 0:>14.0f}{note}")
+
+
+if __name__ == "__main__":
+    main()
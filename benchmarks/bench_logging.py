@@ -0,0 +1,128 @@
+"""
+Benchmark do custo do logging de sucesso no caminho de predição
+
+Compara, na thread da requisição, o log síncrono anterior (StreamHandler +
+f-string) com o logging não bloqueante (fila + JSON gravado por uma thread
+em segundo plano), com e sem amostragem. Cada iteração faz uma predição
+(ModelService.predict_single) e registra o sucesso como /api/predict. O
+destino é um arquivo ou, com --sink-delay-ms, um destino lento (disco ou
+coletor de logs congestionado).
+
+Uso:
+    python -m benchmarks.bench_logging [--requests N] [--sink-delay-ms MS]
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+import warnings
+from backend.config.settings import logger
+from backend.services.model_service import ModelService
+from backend.utils.logging_setup import configure_logging, log_success, get_logging_stats
+from benchmarks.corpus import load_comments
+
+
+class SlowFile:
+    """Arquivo cujas escritas demoram delay segundos"""
+
+    def __init__(self, file, delay):
+        self.file = file
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+def run(service, comments, log):
+    """Latências (µs) de predição + log de sucesso"""
+    latencies = []
+    for comment in comments:
+        start = time.perf_counter()
+        result = service.predict_single(comment)
+        log(result)
+        latencies.append(1e6 * (time.perf_counter() - start))
+    return latencies
+
+
+def call_cost(log, result, calls):
+    """Custo médio (µs) da chamada de log na thread da requisição"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        log(result)
+    return 1e6 * (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do logging no caminho de predição")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    configure_logging('WARNING')
+    service = ModelService()
+    service.load_model()
+    # Sem cache: toda iteração faz a predição completa
+    service._replace_state(version=None)
+    comments = load_comments(args.requests)
+
+    bench_logger = logging.getLogger('bench.logging')
+    bench_logger.propagate = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        with open(path, 'a') as file:
+            sink = SlowFile(file, args.sink_delay_ms / 1000) if args.sink_delay_ms else file
+
+            def sync_setup():
+                handler = logging.StreamHandler(sink)
+                handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+                bench_logger.addHandler(handler)
+                bench_logger.setLevel(logging.INFO)
+                return handler
+
+            def sync_log(result):
+                bench_logger.info(f"Predição realizada: {result['prediction']} (confiança: {result['confidence']}%)")
+
+            def queued_log(result):
+                log_success(bench_logger, '/api/predict', 'Predição realizada',
+                            prediction=result['prediction'], confidence=result['confidence'])
+
+            scenarios = [
+                ('síncrono (texto)', sync_setup, sync_log),
+                ('sem log (WARNING)', lambda: configure_logging('WARNING', stream=sink, target=bench_logger), queued_log),
+                ('fila + JSON', lambda: configure_logging('INFO', 'json', stream=sink, target=bench_logger), queued_log),
+                ('fila + JSON, 1%', lambda: configure_logging('INFO', 'json', sample_rates={'/api/predict': 0.01},
+                                                            stream=sink, target=bench_logger), queued_log),
+            ]
+
+            run(service, comments[:200], lambda result: None)
+            print(f"{args.requests} predições, destino: arquivo"
+                  + (f" com {args.sink_delay_ms} ms por escrita" if args.sink_delay_ms else ""))
+            print(f"{'configuração':<20}{'chamada (µs)':>14}{'média (µs)':>12}{'p50 (µs)':>10}"
+                  f"{'p99 (µs)':>10}{'descartados':>13}")
+            result = service.predict_single(comments[0])
+            for name, setup, log in scenarios:
+                handler = setup()
+                # Custo isolado da chamada (rajada: com a fila cheia, os registros são descartados)
+                cost = call_cost(log, result, 2000)
+                time.sleep(0.5)
+                latencies = sorted(run(service, comments, log))
+                dropped = get_logging_stats()['dropped'] if log is queued_log else 0
+                print(f"{name:<20}{cost:>14.1f}{statistics.mean(latencies):>12.0f}"
+                      f"{latencies[len(latencies) // 2]:>10.0f}{latencies[int(len(latencies) * 0.99)]:>10.0f}{dropped:>13}")
+                if log is sync_log:
+                    bench_logger.removeHandler(handler)
+            configure_logging('WARNING')
+
+    logger.setLevel(logging.WARNING)
+
+
+if __name__ == "__main__":
+    main()
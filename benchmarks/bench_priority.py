@@ -0,0 +1,121 @@
+"""
+Benchmark das faixas de prioridade
+
+Teste de carga no app Flask (cliente de teste, uma thread por cliente): uma
+thread faz predições interativas em /api/predict enquanto N threads inundam
+/api/predict/batch com lotes de 100 comentários. Compara a latência das
+predições interativas sem inundação, com inundação sem as faixas (todas as
+requisições concorrem igualmente) e com inundação e as faixas ativas, e
+reporta a vazão dos lotes e as esperas na fila por faixa.
+
+Uso:
+    python -m benchmarks.bench_priority [--requests N] [--flooders N] [--batch-size N]
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+import warnings
+from backend.config.settings import MAX_BATCH_SIZE, logger
+from backend.controllers import scheduling
+from backend.services.admission_service import admission_service
+from backend.services.model_service import model_service
+from backend.services.scheduler_service import SchedulerService, INTERACTIVE, BULK
+from benchmarks.corpus import load_comments
+
+SCENARIOS = [
+    # (nome, threads de inundação, faixas ativas)
+    ('sem inundação', False, True),
+    ('inundação, sem faixas', True, False),
+    ('inundação, com faixas', True, True),
+]
+
+
+def interactive_latencies(client, comments, pause):
+    """Latências (ms) de /api/predict feitas em sequência"""
+    latencies = []
+    for comment in comments:
+        start = time.perf_counter()
+        response = client.post('/api/predict', json={'comment': comment})
+        latencies.append(1000 * (time.perf_counter() - start))
+        assert response.status_code == 200, response.status_code
+        time.sleep(pause)
+    return sorted(latencies)
+
+
+def flood(client, batches, stop, counts):
+    """Envia lotes a /api/predict/batch até stop ser sinalizado"""
+    i = 0
+    while not stop.is_set():
+        response = client.post('/api/predict/batch', data=batches[i % len(batches)], content_type='application/json')
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das faixas de prioridade")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--flooders", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--pause-ms", type=float, default=2.0, help="Intervalo entre predições interativas")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    model_service.load_model()
+    # Sem cache: toda requisição faz a predição completa
+    model_service._replace_state(version=None)
+
+    from app import app
+    client = app.test_client()
+    comments = load_comments(args.requests, seed=1)
+    bulk_comments = load_comments(args.batch_size * 20, seed=2)
+    # Corpos já serializados: o custo do gerador de carga fica fora da medição
+    batches = [json.dumps({'comments': bulk_comments[i:i + args.batch_size]})
+               for i in range(0, len(bulk_comments), args.batch_size)]
+    interactive_latencies(client, comments[:200], 0)
+
+    print(f"/api/predict ({args.requests} requisições, pausa de {args.pause_ms} ms) com {args.flooders} "
+          f"threads enviando lotes de {args.batch_size}")
+    print(f"  {'cenário':<24}{'p50 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}{'lotes/s':>10}"
+          f"{'espera int. p99':>17}{'espera lote p99':>17}")
+
+    for name, flooded, lanes in SCENARIOS:
+        if lanes:
+            scheduling.scheduler_service = SchedulerService()
+        else:
+            # Cotas ilimitadas e pausas nulas: nenhuma requisição espera e os lotes nunca cedem a vez
+            scheduling.scheduler_service = SchedulerService(
+                lanes=[(INTERACTIVE, 10000, 10000), (BULK, 10000, 10000)], yield_timeout=0
+            )
+        admission_service.reset()
+
+        stop, counts, threads = threading.Event(), {}, []
+        if flooded:
+            threads = [threading.Thread(target=flood, args=(app.test_client(), batches, stop, counts))
+                       for _ in range(args.flooders)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.5)
+
+        start = time.perf_counter()
+        latencies = interactive_latencies(client, comments, args.pause_ms / 1000)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        stats = scheduling.scheduler_service.get_stats()
+        p50, p99, worst = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], latencies[-1]
+        rate = counts.get(200, 0) / elapsed if flooded else 0
+        print(f"  {name:<24}{p50:>10.2f}{p99:>10.2f}{worst:>10.1f}{rate:>10.0f}"
+              f"{stats[INTERACTIVE]['wait_ms']['p99']:>17.2f}{stats[BULK]['wait_ms']['p99']:>17.2f}")
+        rejected = {status: n for status, n in counts.items() if status != 200}
+        if rejected:
+            print(f"  {'':<24}lotes rejeitados: {rejected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark do roteador: hashing consistente vs round robin
+
+Sobe N processos do app Flask (cada um com o seu cache de resultados de
+--cache-size entradas) e o roteador em uma thread local, e envia pelo
+roteador lotes sorteados de um conjunto de --distinct textos com frequências
+de Zipf (ondas de spam: poucos textos muito repetidos e uma cauda longa).
+Para cada estratégia, com nós novos (caches vazios), mede a taxa de acertos
+do cache somada de todos os nós (GET /api/metrics de cada nó), os comentários
+que chegaram ao modelo (falhas do cache) e a vazão. Com os nós e o roteador
+na mesma máquina, a vazão inclui o custo de dividir cada lote em N
+requisições sem o ganho de CPUs separadas.
+
+Com hashing, também mede a entrada de um nó a mais: a fração das chaves que
+muda de nó e a taxa de acertos do mesmo tráfego depois do rebalanceamento.
+
+Uso:
+    python -m benchmarks.bench_router [--nodes N] [--cache-size N] [--distinct N] [--batches N]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
+from backend.config.settings import logger
+from backend.services.router_service import router_service, HASH, ROUND_ROBIN, HashRing
+from backend.utils.text_preprocessor import preprocess_text
+from benchmarks.corpus import load_comments
+from hate_speech_client import HateSpeechClient
+
+
+def serve_node(ports):
+    """Processo de um nó: app Flask (configurado pelas variáveis de ambiente herdadas)"""
+    warnings.filterwarnings('ignore')
+    from app import app
+    from backend.services.model_service import model_service
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    model_service.load_model()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+def start_nodes(count, cache_size):
+    """Inicia count processos de nós e retorna (processos, URLs)"""
+    # Lidas pelas configurações na importação: precisam estar no ambiente antes do spawn
+    os.environ.update(CACHE_SIZE=str(cache_size), LOG_LEVEL='WARNING', DRIFT='0')
+    context = multiprocessing.get_context('spawn')
+    ports = context.Queue()
+    processes = [context.Process(target=serve_node, args=(ports,), daemon=True) for _ in range(count)]
+    for process in processes:
+        process.start()
+    return processes, [f"http://127.0.0.1:{ports.get(timeout=120)}" for _ in processes]
+
+
+def start_router():
+    """Roteador (router.py) local em uma thread"""
+    from router import app
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def cache_stats(urls):
+    """Acertos e consultas do cache somados de todos os nós (as falhas vão ao modelo)"""
+    hits = lookups = 0
+    for url in urls:
+        with urllib.request.urlopen(f"{url}/api/metrics") as response:
+            cache = json.loads(response.read())['cache']
+        hits += cache['local_hits'] + cache['shared_hits']
+        lookups += cache['local_hits'] + cache['shared_hits'] + cache['misses']
+    return hits, lookups
+
+
+def zipf_batches(texts, batches, batch_size, exponent, seed):
+    """Lotes sorteados com frequência proporcional a 1 / posição^exponent"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** exponent for rank in range(len(texts))]
+    return [rng.choices(texts, weights, k=batch_size) for _ in range(batches)]
+
+
+def run(router_url, node_urls, batches, threads):
+    """Envia os lotes pelo roteador; retorna (vazão, taxa de acertos do cluster, comentários classificados)"""
+    before = cache_stats(node_urls)
+    with HateSpeechClient(router_url, max_connections=threads, max_batch_size=len(batches[0])) as client, \
+            ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(client.classify_many, batches))
+        elapsed = time.perf_counter() - start
+    hits, lookups = (after - previous for after, previous in zip(cache_stats(node_urls), before))
+    return sum(len(batch) for batch in batches) / elapsed, hits / lookups if lookups else 0.0, lookups - hits
+
+
+def stop_nodes(processes):
+    """Encerra os processos dos nós"""
+    for process in processes:
+        process.terminate()
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do roteador: hashing consistente vs round robin")
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--cache-size", type=int, default=2000, help="Entradas do cache de cada nó")
+    parser.add_argument("--distinct", type=int, default=6000, help="Textos distintos no tráfego")
+    parser.add_argument("--batches", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--zipf", type=float, default=0.8, help="Expoente das frequências de Zipf")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.ERROR)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    router_service.health_interval = 0
+
+    texts = list(dict.fromkeys(load_comments(args.distinct * 2)))[:args.distinct]
+    batches = zipf_batches(texts, args.batches, args.batch_size, args.zipf, seed=1)
+    router_url = start_router()
+
+    print(f"{args.nodes} nós com cache de {args.cache_size} entradas | {len(texts)} textos distintos | "
+          f"{args.batches} lotes de {args.batch_size} (Zipf {args.zipf}) | {args.threads} threads")
+    print(f"  {'estratégia':<14}{'acertos do cache':>18}{'no modelo':>11}{'vazão (com./s)':>17}")
+
+    for strategy in (ROUND_ROBIN, HASH):
+        processes, urls = start_nodes(args.nodes, args.cache_size)
+        router_service.strategy = strategy
+        for url in urls:
+            router_service.add_node(url)
+        try:
+            throughput, hit_rate, scored = run(router_url, urls, batches, args.threads)
+            print(f"  {strategy:<14}{hit_rate:>18.1%}{scored:>11}{throughput:>17.0f}")
+
+            if strategy == HASH:
+                # Entrada de um nó: só a fatia dele muda de nó (e começa com o cache vazio)
+                keys = list({preprocess_text(text) for text in texts})
+                ring = HashRing(urls, router_service.ring.virtual_nodes)
+                extra_process, extra_urls = start_nodes(1, args.cache_size)
+                processes += extra_process
+                router_service.add_node(extra_urls[0])
+                moved = sum(ring.node_for(key) != router_service.ring.node_for(key) for key in keys) / len(keys)
+                throughput, hit_rate, scored = run(router_url, urls + extra_urls, batches, args.threads)
+                print(f"\n  + 1 nó: {moved:.1%} das chaves mudaram de nó; mesmo tráfego em seguida: "
+                      f"{hit_rate:.1%} de acertos, {scored} no modelo, {throughput:.0f} com./s")
+        finally:
+            for url in list(router_service.get_stats()['nodes']):
+                router_service.remove_node(url['url'])
+            stop_nodes(processes)
+
+
+if __name__ == "__main__":
+    main()
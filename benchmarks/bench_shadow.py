@@ -0,0 +1,55 @@
+"""
+Benchmark do impacto do modo sombra na latência do modelo servido
+
+Uso:
+    python -m benchmarks.bench_shadow [--requests N] [--sample-rate R]
+"""
+import argparse
+import time
+import numpy as np
+from backend.config.settings import MODEL_PATH
+from backend.services.model_service import ModelService
+
+COMMENTS = [
+    "I really enjoyed this video, thanks for sharing",
+    "you people are disgusting and should leave this country",
+    "what a stupid idea, only idiots would agree with this",
+    "great explanation, very clear and helpful",
+]
+
+
+def measure(service, requests):
+    """Mede a latência de predict_single em milissegundos"""
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        service.predict_single(COMMENTS[i % len(COMMENTS)])
+        latencies.append(1000 * (time.perf_counter() - start))
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modo sombra")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    service = ModelService()
+    service.load_model()
+    measure(service, 200)  # aquecimento
+
+    baseline = measure(service, args.requests)
+
+    service.shadow.sample_rate = args.sample_rate
+    service.shadow.load_candidate(MODEL_PATH)
+    shadow = measure(service, args.requests)
+    service.shadow.shutdown()
+
+    print(f"{'modo':<10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for name, values in (('primário', baseline), ('sombra', shadow)):
+        print(f"{name:<10}{np.percentile(values, 50):>10.3f}{np.percentile(values, 99):>10.3f}")
+    print(service.get_shadow_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark do tokenizador rápido contra o analisador regex do TfidfVectorizer
+
+Uso:
+    python -m benchmarks.bench_tokenizer [--comments N]
+"""
+import argparse
+import copy
+import time
+import warnings
+import joblib
+from backend.config.settings import MODEL_PATH
+from backend.services.linear_scorer import install_fast_analyzer
+from backend.utils.text_preprocessor import preprocess_text
+from benchmarks.corpus import load_comments
+
+
+def best_of(function, repeats=5):
+    """Menor tempo (s) entre várias execuções"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tokenizador rápido")
+    parser.add_argument("--comments", type=int, default=10000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(MODEL_PATH)
+    fast_model = copy.deepcopy(model)
+    install_fast_analyzer(fast_model)
+
+    texts = [preprocess_text(comment) for comment in load_comments(args.comments)]
+    vectorizer, fast_vectorizer = model.steps[0][1], fast_model.steps[0][1]
+
+    regex_time = best_of(lambda: vectorizer.transform(texts))
+    fast_time = best_of(lambda: fast_vectorizer.transform(texts))
+    identical = (vectorizer.transform(texts) != fast_vectorizer.transform(texts)).nnz == 0
+
+    print(f"Comentários: {len(texts)}")
+    print(f"{'analisador':<14}{'total (ms)':>12}{'µs/comentário':>16}")
+    print(f"{'regex':<14}{1000 * regex_time:>12.1f}{1e6 * regex_time / len(texts):>16.1f}")
+    print(f"{'rápido':<14}{1000 * fast_time:>12.1f}{1e6 * fast_time / len(texts):>16.1f}")
+    print(f"Ganho: {regex_time / fast_time:.2f}x | matrizes idênticas: {identical}")
+
+
+if __name__ == "__main__":
+    main()
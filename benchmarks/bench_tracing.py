@@ -0,0 +1,84 @@
+"""
+Benchmark do custo do rastreamento
+
+Mede o custo de span() sem trace ativo (rastreamento desativado) e com trace,
+e a latência de /api/predict pelo cliente de teste do Flask com TRACING
+desativado e ativado (com o cabeçalho Server-Timing). Como a máquina pode
+ser ruidosa, cada cenário é repetido e a melhor rodada é reportada.
+
+Uso:
+    python -m benchmarks.bench_tracing [--requests N] [--repeats N]
+"""
+import argparse
+import logging
+import time
+import warnings
+from backend.config.settings import logger
+from backend.controllers import tracing as tracing_hooks
+from backend.services.model_service import model_service
+from backend.utils.tracing import span, start_trace, end_trace
+from benchmarks.corpus import load_comments
+
+
+def span_cost(calls, traced):
+    """Custo médio (ns) de um bloco with span(...)"""
+    token = start_trace('bench') if traced else None
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        with span('stage'):
+            pass
+    elapsed = time.perf_counter_ns() - start
+    if token is not None:
+        end_trace(token)
+    return elapsed / calls
+
+
+def request_latencies(client, comments):
+    """Latências (µs) de /api/predict"""
+    latencies = []
+    for comment in comments:
+        start = time.perf_counter()
+        response = client.post('/api/predict', json={'comment': comment})
+        latencies.append(1e6 * (time.perf_counter() - start))
+        assert response.status_code == 200
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do custo do rastreamento")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logger.setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    model_service.load_model()
+    # Sem cache: toda requisição faz a predição completa
+    model_service._replace_state(version=None)
+
+    from app import app
+    client = app.test_client()
+    comments = load_comments(args.requests)
+
+    print("span() por chamada")
+    for name, traced in [('sem trace (desativado)', False), ('com trace', True)]:
+        cost = min(span_cost(100000, traced) for _ in range(args.repeats))
+        print(f"  {name:<24}{cost:>8.0f} ns")
+
+    print(f"\n/api/predict ({args.requests} requisições, melhor de {args.repeats} rodadas)")
+    print(f"  {'TRACING':<24}{'p50 (µs)':>10}{'p99 (µs)':>10}")
+    request_latencies(client, comments[:200])
+    for name, enabled in [('desativado', False), ('ativado', True)]:
+        tracing_hooks.TRACING = enabled
+        runs = [request_latencies(client, comments) for _ in range(args.repeats)]
+        p50 = min(run[len(run) // 2] for run in runs)
+        p99 = min(run[int(len(run) * 0.99)] for run in runs)
+        print(f"  {name:<24}{p50:>10.0f}{p99:>10.0f}")
+
+    response = client.post('/api/predict', json={'comment': comments[0]})
+    print(f"\nServer-Timing: {response.headers['Server-Timing']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Corpus de comentários para os benchmarks
+
+Usa o dataset hate.csv quando disponível; caso contrário, gera comentários
+sintéticos com palavras do vocabulário do modelo.
+"""
+import os
+import random
+import joblib
+import pandas as pd
+from backend.config.settings import MODEL_PATH
+
+DATASET_PATH = 'hate.csv'
+FILLER_WORDS = ['the', 'and', 'of', 'you', 'is', 'this', 'ação', 'naïve', '!!!', '2024']
+
+
+def load_comments(size=10000, seed=42):
+    """
+    Retorna uma lista de comentários brutos (antes de preprocess_text).
+
+    Args:
+        size: Quantidade de comentários
+        seed: Semente para os comentários sintéticos
+
+    Returns:
+        list: Comentários
+    """
+    if os.path.exists(DATASET_PATH):
+        comments = pd.read_csv(DATASET_PATH, encoding='latin-1')['comment'].dropna().astype(str).tolist()
+        return (comments * (size // len(comments) + 1))[:size]
+
+    rng = random.Random(seed)
+    model = joblib.load(MODEL_PATH)
+    if hasattr(model, 'steps'):
+        vocabulary = model.steps[0][1].vocabulary_
+    else:
+        # CompactLinearModel: tokens ativos e termos de norma
+        vocabulary = {**model.vocabulary, **model.norm_vocabulary}
+    words = list(vocabulary) + FILLER_WORDS
+    return [
+        ' '.join(rng.choice(words) for _ in range(rng.randint(3, 60))).capitalize() + '!'
+        for _ in range(size)
+    ]
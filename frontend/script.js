@@ -108,9 +108,143 @@ function resetSingleAnalysis() {
    hideResults('singleResults');
    hideError('singleError');
    hideLoading('singleLoading');
+   closeLiveSession();
+}
+
+// Predição enquanto o usuário digita: após uma pausa na digitação, apenas o
+// trecho alterado desde a última chamada é enviado para a sessão do servidor.
+const LIVE_DEBOUNCE_MS = 300;
+
+const liveSession = {
+   id: null,
+   revision: null,
+   text: [],
+   timer: null,
+   inFlight: false,
+   pending: false
+};
+
+function onCommentInput() {
+   clearTimeout(liveSession.timer);
+   liveSession.timer = setTimeout(sendLiveUpdate, LIVE_DEBOUNCE_MS);
+}
+
+// Diferença entre dois textos como uma única edição (prefixo e sufixo comuns).
+// As posições são contadas em code points, como no servidor.
+function diffText(previous, current) {
+   let start = 0;
+   while (start < previous.length && start < current.length && previous[start] === current[start]) {
+      start++;
+   }
+
+   let previousEnd = previous.length;
+   let currentEnd = current.length;
+   while (previousEnd > start && currentEnd > start && previous[previousEnd - 1] === current[currentEnd - 1]) {
+      previousEnd--;
+      currentEnd--;
+   }
+
+   if (start === previousEnd && start === currentEnd) {
+      return null;
+   }
+   return { start: start, end: previousEnd, text: current.slice(start, currentEnd).join('') };
+}
+
+async function sendLiveUpdate() {
+   if (liveSession.inFlight) {
+      liveSession.pending = true;
+      return;
+   }
+
+   const current = Array.from(document.getElementById('commentInput').value);
+   let body;
+   if (liveSession.id === null) {
+      if (current.length === 0) {
+         showLiveResult(null);
+         return;
+      }
+      body = { text: current.join('') };
+   } else {
+      const edit = diffText(liveSession.text, current);
+      if (edit === null) {
+         return;
+      }
+      body = { session_id: liveSession.id, revision: liveSession.revision, edits: [edit] };
+   }
+
+   liveSession.inFlight = true;
+   try {
+      let response = await postLive(body);
+
+      // Sessão expirada ou fora de sincronia: reenviar o texto inteiro
+      if (response.status === 404 || response.status === 409) {
+         response = await postLive({ text: current.join(''), session_id: response.status === 409 ? liveSession.id : undefined });
+      }
+
+      if (!response.ok) {
+         throw new Error(`Erro na API: ${response.status} - ${response.statusText}`);
+      }
+
+      const result = await response.json();
+      liveSession.id = result.session_id;
+      liveSession.revision = result.revision;
+      liveSession.text = current;
+      showLiveResult(result);
+
+   } catch (error) {
+      console.error('Erro na análise em tempo real:', error);
+      liveSession.id = null;
+      showLiveResult(null);
+   } finally {
+      liveSession.inFlight = false;
+      if (liveSession.pending) {
+         liveSession.pending = false;
+         sendLiveUpdate();
+      }
+   }
+}
+
+function postLive(body) {
+   return fetch(`${API_BASE_URL}/api/predict/incremental`, {
+      method: 'POST',
+      headers: {
+         'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(body)
+   });
+}
+
+function showLiveResult(result) {
+   const indicator = document.getElementById('liveIndicator');
+
+   if (!result || result.empty) {
+      indicator.innerHTML = '';
+      indicator.className = 'live-indicator';
+   } else if (result.is_hate_speech) {
+      indicator.innerHTML = `<i class="fas fa-exclamation-triangle"></i> Possível discurso de ódio (${result.confidence}%)`;
+      indicator.className = 'live-indicator hate-speech';
+   } else {
+      indicator.innerHTML = `<i class="fas fa-check-circle"></i> Parece seguro (${result.confidence}%)`;
+      indicator.className = 'live-indicator not-hate-speech';
+   }
+}
+
+function closeLiveSession() {
+   clearTimeout(liveSession.timer);
+   if (liveSession.id !== null) {
+      fetch(`${API_BASE_URL}/api/predict/incremental/${liveSession.id}`, { method: 'DELETE', keepalive: true })
+         .catch(() => {});
+   }
+   liveSession.id = null;
+   liveSession.revision = null;
+   liveSession.text = [];
+   showLiveResult(null);
 }
 
 document.addEventListener('DOMContentLoaded', () => {
+   document.getElementById('commentInput').addEventListener('input', onCommentInput);
+   window.addEventListener('pagehide', closeLiveSession);
+
    const container = document.querySelector('.container');
    container.style.opacity = '0';
    container.style.transform = 'translateY(20px)';
@@ -0,0 +1,9 @@
+"""
+Cliente Python da API de classificação de discurso de ódio
+
+Mantém conexões keep-alive, agrupa chamadas concorrentes em requisições em
+lote e repete requisições rejeitadas por sobrecarga (429/503).
+"""
+from hate_speech_client.client import HateSpeechClient, ClientError
+
+__all__ = ['HateSpeechClient', 'ClientError']
@@ -0,0 +1,305 @@
+"""
+Cliente da API de classificação de discurso de ódio
+"""
+import asyncio
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from hate_speech_client.connection import ConnectionPool
+
+# Respostas que indicam sobrecarga temporária (controle de admissão)
+RETRY_STATUSES = (429, 503)
+
+
+class ClientError(Exception):
+    """
+    Erro retornado pela API ou falha de comunicação.
+
+    Attributes:
+        status: Status HTTP (None para falhas de conexão)
+        error: Título do erro retornado pela API
+        message: Mensagem detalhada
+        index: Posição do comentário inválido em um lote (ou None)
+    """
+
+    def __init__(self, status, error, message=None, index=None):
+        super().__init__(f"{status}: {error}" + (f" - {message}" if message else ""))
+        self.status = status
+        self.error = error
+        self.message = message
+        self.index = index
+
+
+class HateSpeechClient:
+    """
+    Cliente com conexões keep-alive e agrupamento automático de chamadas.
+
+    Uma chamada de classify() é enviada assim que houver uma conexão livre;
+    enquanto todas as max_connections requisições estão em andamento, as
+    chamadas concorrentes (de várias threads ou corrotinas) se acumulam e
+    seguem juntas para /api/predict/batch, em lotes de até max_batch_size.
+    Um comentário sozinho vai para /api/predict. linger acrescenta uma
+    espera opcional por mais chamadas antes de cada envio. Respostas 429/503
+    são repetidas com backoff exponencial (respeitando Retry-After até
+    max_backoff).
+
+    Uso:
+        with HateSpeechClient('http://localhost:5000') as client:
+            client.classify("texto")
+            client.classify_many(["texto 1", "texto 2"])
+    """
+
+    def __init__(self, base_url='http://localhost:5000', max_connections=4, timeout=10.0,
+                 max_batch_size=100, linger=0.0, max_retries=3, backoff=0.1, max_backoff=5.0):
+        self.pool = ConnectionPool(base_url, max_connections, timeout)
+        self.max_connections = max_connections
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._in_flight = 0
+        self._batcher = None
+        self._senders = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='hate-speech-client')
+        self._random = random.Random()
+        self._stats_lock = threading.Lock()
+        self._stats = {'comments': 0, 'requests': 0, 'batches': 0, 'retries': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Requisições
+
+    def _count(self, **increments):
+        """Atualiza os contadores do cliente"""
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def _request(self, method, path, payload=None):
+        """
+        Executa uma requisição JSON, repetindo em caso de sobrecarga ou falha de conexão.
+
+        Returns:
+            dict: Corpo da resposta
+
+        Raises:
+            ClientError: Resposta de erro da API ou tentativas esgotadas
+        """
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+
+        for attempt in range(self.max_retries + 1):
+            self._count(requests=1)
+            try:
+                status, response_headers, data = self.pool.request(method, path, body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt == self.max_retries:
+                    raise ClientError(None, 'Falha de conexão', str(e)) from e
+                self._sleep_before_retry(attempt, None)
+                continue
+
+            if status in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep_before_retry(attempt, response_headers.get('Retry-After'))
+                continue
+
+            try:
+                content = json.loads(data) if data else {}
+            except ValueError:
+                content = {'error': data.decode(errors='replace')}
+
+            if status >= 400:
+                raise ClientError(status, content.get('error'), content.get('message'), content.get('index'))
+            return content
+
+    def _sleep_before_retry(self, attempt, retry_after):
+        """Aguarda antes de uma nova tentativa (backoff exponencial com jitter)"""
+        self._count(retries=1)
+        delay = self.backoff * (2 ** attempt) * self._random.uniform(0.5, 1.0)
+        if retry_after is not None:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        time.sleep(min(delay, self.max_backoff))
+
+    def _send(self, comments):
+        """
+        Classifica uma lista de comentários (até max_batch_size).
+
+        Um comentário inválido em um lote recebe o erro correspondente e o
+        restante é reenviado.
+
+        Returns:
+            list: Resultado (dict) ou ClientError para cada comentário
+        """
+        outcomes = [None] * len(comments)
+        remaining = list(range(len(comments)))
+
+        while remaining:
+            try:
+                if len(remaining) == 1:
+                    # Um único comentário custa menos no controle de admissão do servidor
+                    outcomes[remaining[0]] = self._request('POST', '/api/predict', {'comment': comments[remaining[0]]})
+                    return outcomes
+
+                self._count(batches=1)
+                response = self._request('POST', '/api/predict/batch', {
+                    'comments': [comments[index] for index in remaining]
+                })
+            except ClientError as e:
+                if e.status == 400 and e.index is not None and len(remaining) > 1:
+                    outcomes[remaining.pop(e.index)] = e
+                    continue
+                for index in remaining:
+                    outcomes[index] = e
+                return outcomes
+
+            for index, result in zip(remaining, response['results']):
+                if response.get('degraded'):
+                    result['degraded'] = True
+                outcomes[index] = result
+            return outcomes
+
+        return outcomes
+
+    # Agrupamento de chamadas
+
+    def submit(self, comment):
+        """
+        Agenda a classificação de um comentário.
+
+        Returns:
+            concurrent.futures.Future: Resultado da predição (dict)
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cliente fechado")
+            if self._batcher is None:
+                self._batcher = threading.Thread(target=self._run_batcher, name='hate-speech-batcher', daemon=True)
+                self._batcher.start()
+            self._pending.append((comment, future))
+            self._condition.notify()
+        self._count(comments=1)
+        return future
+
+    def _run_batcher(self):
+        """Reúne as chamadas pendentes em lotes e os envia no pool de threads"""
+        while True:
+            with self._condition:
+                # Aguardar chamadas e uma conexão livre: as que chegam nesse meio tempo formam o lote
+                while (not self._pending or self._in_flight >= self.max_connections) and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                while self._in_flight >= self.max_connections:
+                    self._condition.wait()
+
+                # Aguardar mais chamadas por até linger segundos (ou até encher o lote)
+                deadline = time.monotonic() + self.linger
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                self._in_flight += 1
+
+            self._senders.submit(self._send_pending, batch)
+
+    def _send_pending(self, batch):
+        """Envia um lote agrupado e resolve os futures"""
+        try:
+            outcomes = self._send([comment for comment, _ in batch])
+        except Exception as e:
+            outcomes = [e] * len(batch)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    # API pública
+
+    def classify(self, comment, timeout=None):
+        """
+        Classifica um comentário (agrupado com chamadas concorrentes).
+
+        Args:
+            comment: Comentário a ser classificado
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            dict: Resultado da predição (mesmo formato de /api/predict)
+
+        Raises:
+            ClientError: Erro da API para este comentário
+        """
+        return self.submit(comment).result(timeout)
+
+    def classify_many(self, comments):
+        """
+        Classifica uma lista de comentários em lotes de max_batch_size.
+
+        Returns:
+            list: Resultados na ordem dos comentários
+
+        Raises:
+            ClientError: Primeiro erro encontrado
+        """
+        results = []
+        for start in range(0, len(comments), self.max_batch_size):
+            chunk = list(comments[start:start + self.max_batch_size])
+            self._count(comments=len(chunk))
+            for outcome in self._send(chunk):
+                if isinstance(outcome, Exception):
+                    raise outcome
+                results.append(outcome)
+        return results
+
+    async def classify_async(self, comment):
+        """Versão assíncrona de classify (agrupada com as demais chamadas)"""
+        return await asyncio.wrap_future(self.submit(comment))
+
+    async def classify_many_async(self, comments):
+        """Versão assíncrona de classify_many"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.classify_many, comments)
+
+    def health(self):
+        """Consulta o health check da API"""
+        return self._request('GET', '/api/health')
+
+    def get_stats(self):
+        """Retorna os contadores do cliente (comentários, requisições, lotes, repetições, conexões)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['connections_opened'] = self.pool.opened
+        return stats
+
+    def close(self):
+        """Envia as chamadas pendentes e fecha as conexões"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._batcher is not None:
+            self._batcher.join()
+        self._senders.shutdown(wait=True)
+        self.pool.close()
@@ -0,0 +1,87 @@
+"""
+Pool de conexões HTTP keep-alive (biblioteca padrão)
+"""
+import http.client
+import queue
+import threading
+from urllib.parse import urlsplit
+
+
+class ConnectionPool:
+    """
+    Mantém até max_connections conexões persistentes com a API.
+
+    As conexões ociosas são reutilizadas (a mais recente primeiro). Se o
+    servidor tiver fechado uma conexão ociosa, a requisição é repetida uma
+    vez em uma conexão nova.
+    """
+
+    def __init__(self, base_url, max_connections=4, timeout=10.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"URL deve usar http ou https: {base_url}")
+
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _new_connection(self):
+        """Abre uma nova conexão"""
+        with self._lock:
+            self.opened += 1
+        return self._connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Executa uma requisição em uma conexão do pool.
+
+        Args:
+            method: Método HTTP
+            path: Caminho relativo à URL base (ex.: /api/predict)
+            body: Corpo da requisição (bytes)
+            headers: Cabeçalhos adicionais
+
+        Returns:
+            tuple: (status, cabeçalhos, corpo em bytes)
+
+        Raises:
+            OSError, http.client.HTTPException: Falha de conexão
+        """
+        with self._slots:
+            try:
+                connection, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._new_connection(), False
+
+            while True:
+                try:
+                    connection.request(method, self.prefix + path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                    data = response.read()
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    if not reused:
+                        raise
+                    # Conexão ociosa fechada pelo servidor: tentar em uma nova
+                    connection, reused = self._new_connection(), False
+                    continue
+
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._idle.put(connection)
+                return response.status, dict(response.getheaders()), data
+
+    def close(self):
+        """Fecha as conexões ociosas"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
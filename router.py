@@ -0,0 +1,84 @@
+"""
+Roteador com afinidade de cache na frente de várias instâncias da API
+
+Encaminha /api/predict ao nó escolhido por hashing consistente do texto
+preprocessado e divide /api/predict/batch entre os nós dos comentários,
+recombinando as respostas na ordem original. Cópias do mesmo texto chegam
+sempre ao mesmo nó, então o cache de resultados de cada nó continua
+acertando com vários nós. Nós entram e saem pelo /api/router/nodes (ou pelo
+health check) e apenas a fatia deles no anel muda de nó. As rotas de
+alteração dos nós exigem ROUTER_ADMIN_TOKEN; sem ele, os nós vêm apenas de
+--node/ROUTER_NODES.
+
+Uso:
+    PORT=5001 python app.py &
+    PORT=5002 python app.py &
+    python router.py --node http://localhost:5001 --node http://localhost:5002 [--port 8000]
+"""
+import argparse
+from flask import Flask
+from backend.services.router_service import router_service, STRATEGIES
+from backend.controllers import health_controller, router_controller
+from backend.controllers.compression import RequestDecompressionMiddleware, compress_response
+from backend.config.settings import HOST, ROUTER_PORT, ROUTER_NODES, ROUTER_STRATEGY, ROUTER_ADMIN_TOKEN, logger, setup_logging
+
+app = Flask(__name__)
+
+# Corpos comprimidos (gzip/zstd) aceitos e respostas comprimidas como na API;
+# o roteador fala JSON sem compressão com os nós
+app.wsgi_app = RequestDecompressionMiddleware(app.wsgi_app)
+app.after_request(compress_response)
+
+# Rotas de predição encaminhadas aos nós
+app.add_url_rule('/api/predict', 'predict', router_controller.predict, methods=['POST'])
+app.add_url_rule('/api/predict/batch', 'predict_batch', router_controller.predict_batch, methods=['POST'])
+
+# Estado do roteador e entrada/saída de nós
+app.add_url_rule('/api/health', 'health_check', router_controller.health_check, methods=['GET'])
+app.add_url_rule('/api/router', 'router_nodes', router_controller.nodes, methods=['GET'])
+app.add_url_rule('/api/router/nodes', 'add_node', router_controller.add_node, methods=['POST'])
+app.add_url_rule('/api/router/nodes', 'remove_node', router_controller.remove_node, methods=['DELETE'])
+
+# Handlers para tratamento de erros HTTP
+app.register_error_handler(404, health_controller.handle_404)
+app.register_error_handler(405, health_controller.handle_405)
+app.register_error_handler(500, health_controller.handle_500)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roteador com afinidade de cache entre nós da API")
+    parser.add_argument("--node", action="append", default=[],
+                        help="URL de um nó (repetir para cada nó; padrão: ROUTER_NODES)")
+    parser.add_argument("--port", type=int, default=ROUTER_PORT)
+    parser.add_argument("--strategy", choices=STRATEGIES, default=ROUTER_STRATEGY)
+    args = parser.parse_args()
+
+    setup_logging()
+    router_service.strategy = args.strategy
+    for url in args.node or ROUTER_NODES:
+        router_service.add_node(url)
+    router_service.start()
+
+    print("\nRoteador da API de Classificação de Discurso de Ódio")
+    print("=" * 50)
+    print(f"🧭 Estratégia: {args.strategy}")
+    for node in router_service.ring.nodes:
+        print(f"   nó {node}")
+    print("   GET    /api/router - Nós, fatias do anel e contadores")
+    if ROUTER_ADMIN_TOKEN:
+        print("   POST   /api/router/nodes - Adicionar um nó ({\"url\": ...}, Authorization: Bearer <token>)")
+        print("   DELETE /api/router/nodes - Remover um nó ({\"url\": ...}, Authorization: Bearer <token>)")
+    print(f"🌐 Roteador rodando em http://{HOST}:{args.port}\n")
+
+    try:
+        app.run(host=HOST, port=args.port, debug=False, threaded=True)
+    finally:
+        router_service.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        logger.error(f"Erro fatal: {e}")
+        exit(1)